@@ -18,12 +18,14 @@ from balance.model import compute_token, build_unit_names, ALLOWED_SUPPORT
 from core.unit_factory import base_price
 from core.ekonomia import EconomySystem
 from engine.token import Token
+from utils.hot_path_profiler import profiled
 
 
 class CommanderAI:
     def __init__(self, player):
         self.player = player
 
+    @profiled("CommanderAI.execute_turn")
     def execute_turn(self, game_engine) -> None:
         total_pe_before_spawn = self._sync_player_points()
         reinforcement_report = self._handle_reinforcements(game_engine, total_pe_before_spawn)
@@ -119,6 +121,7 @@ class CommanderAI:
             reinforcement_count=len(reinforcement_report["spawned"]),
         )
 
+    @profiled("CommanderAI._handle_reinforcements")
     def _handle_reinforcements(self, game_engine, available_pe: int) -> Dict[str, Any]:
         report = {
             "spawned": [],
@@ -280,41 +283,16 @@ class CommanderAI:
                 continue
 
             folder_value = event.get("folder")
-            if not folder_value:
-                failed += 1
-                log_error(
-                    "Pominięto zakup – brak ścieżki folderu",
-                    component="COMMANDER",
-                    commander_id=self.player.id,
-                    event=event,
-                )
-                continue
-
-            bundle_path = Path(folder_value)
-            blueprint_path = bundle_path / "token.json"
-
-            try:
-                with open(blueprint_path, "r", encoding="utf-8") as blueprint_file:
-                    blueprint = json.load(blueprint_file)
-            except FileNotFoundError:
-                failed += 1
-                log_error(
-                    "Pominięto zakup – brak token.json",
-                    component="COMMANDER",
-                    commander_id=self.player.id,
-                    folder=str(bundle_path),
-                )
-                continue
-            except json.JSONDecodeError as exc:
-                failed += 1
-                log_error(
-                    "Pominięto zakup – uszkodzony token.json",
-                    component="COMMANDER",
-                    commander_id=self.player.id,
-                    folder=str(bundle_path),
-                    error=str(exc),
-                )
-                continue
+            bundle_path = Path(folder_value) if folder_value else None
+            blueprint = event.get("blueprint")
+            if isinstance(blueprint, dict):
+                # Zakup AI przekazany w pamięci – kopia, aby nie modyfikować historii zakupów
+                blueprint = dict(blueprint)
+            else:
+                blueprint = self._load_purchase_blueprint(bundle_path, event)
+                if blueprint is None:
+                    failed += 1
+                    continue
 
             token_id = blueprint.get("id") or event.get("token_id")
             if not token_id:
@@ -323,7 +301,7 @@ class CommanderAI:
                     "Pominięto zakup – brak identyfikatora żetonu",
                     component="COMMANDER",
                     commander_id=self.player.id,
-                    folder=str(bundle_path),
+                    folder=str(bundle_path) if bundle_path else None,
                 )
                 continue
 
@@ -352,7 +330,7 @@ class CommanderAI:
                 "source": "general_purchase",
                 "category": event.get("category"),
                 "focus": event.get("focus"),
-                "folder": str(bundle_path),
+                "folder": str(bundle_path) if bundle_path else None,
                 "image": blueprint.get("image"),
             }
 
@@ -386,6 +364,38 @@ class CommanderAI:
                 remaining=len(deferred),
             )
 
+    def _load_purchase_blueprint(self, bundle_path: Optional[Path], event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Wczytuje token.json zakupu zapisanego na dysku (starsze zakupy / zapisy gry)."""
+        if bundle_path is None:
+            log_error(
+                "Pominięto zakup – brak blueprintu i ścieżki folderu",
+                component="COMMANDER",
+                commander_id=self.player.id,
+                event=event,
+            )
+            return None
+
+        blueprint_path = bundle_path / "token.json"
+        try:
+            with open(blueprint_path, "r", encoding="utf-8") as blueprint_file:
+                return json.load(blueprint_file)
+        except FileNotFoundError:
+            log_error(
+                "Pominięto zakup – brak token.json",
+                component="COMMANDER",
+                commander_id=self.player.id,
+                folder=str(bundle_path),
+            )
+        except json.JSONDecodeError as exc:
+            log_error(
+                "Pominięto zakup – uszkodzony token.json",
+                component="COMMANDER",
+                commander_id=self.player.id,
+                folder=str(bundle_path),
+                error=str(exc),
+            )
+        return None
+
     def _get_reinforcement_queue(self) -> List[Dict[str, Any]]:
         queue = getattr(self.player, "ai_reinforcement_queue", None)
         if queue is None:
@@ -556,6 +566,10 @@ class CommanderAI:
                     return True
             except TypeError:
                 pass
+            else:
+                # Plansza z indeksem zajętości odpowiada wiarygodnie w O(1)
+                if hasattr(board, "token_at"):
+                    return False
 
         for token in getattr(game_engine, "tokens", []):
             if getattr(token, "q", None) == q and getattr(token, "r", None) == r:
@@ -587,8 +601,11 @@ class CommanderAI:
             return None
 
         game_engine.tokens.append(token)
-        if hasattr(game_engine, "board") and hasattr(game_engine.board, "set_tokens"):
-            game_engine.board.set_tokens(game_engine.tokens)
+        board = getattr(game_engine, "board", None)
+        if hasattr(board, "register_token"):
+            board.register_token(token)
+        elif hasattr(board, "set_tokens"):
+            board.set_tokens(game_engine.tokens)
 
         players = getattr(game_engine, "players", None)
         if players is not None:
@@ -653,8 +670,12 @@ class CommanderAI:
     # ------------------------------------------------------------------
     def _my_tokens(self, game_engine) -> List:
         expected_owner = f"{self.player.id} ({self.player.nation})"
+        tokens = getattr(game_engine, "tokens", None) or []
+        by_owner = getattr(tokens, "by_owner", None)
+        if callable(by_owner):
+            return by_owner(expected_owner)
         owned = []
-        for token in getattr(game_engine, "tokens", []):
+        for token in tokens:
             owner = getattr(token, "owner", "") or ""
             if owner == expected_owner:
                 owned.append(token)
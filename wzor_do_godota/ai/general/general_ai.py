@@ -4,14 +4,16 @@ Podstawowa logika AI Generała - dystrybucja PE w oparciu o realne potrzeby dow
 from collections import defaultdict, deque
 from enum import Enum
 import math
-import shutil
 from typing import List, Dict, Tuple, Optional, Any
 
 from engine.player import Player
+from engine.token import parse_owner
 from core.ekonomia import EconomySystem
 from ai.logs import log_general, log_debug, log_error
-from utils.token_blueprint import generate_token_assets
+from utils.token_blueprint import build_token_blueprint
+from engine.rng import ECONOMY, get_rng
 from balance.model import compute_token
+from utils.hot_path_profiler import profiled
 
 
 class WarState(Enum):
@@ -37,13 +39,14 @@ class GeneralAI:
         self._last_purchase_budget = 0
         self._last_budget_plan = {}
         
+    @profiled("GeneralAI.execute_turn")
     def execute_turn(self, all_players: List[Player], game_engine) -> None:
         """Wykonuje turę AI Generała - tylko dystrybucja PE"""
         print(f"🎖️ AI Generał {self.player.nation} (id={self.player.id}) rozpoczyna turę")
         log_general(f"Generał {self.player.nation} (id={self.player.id}) rozpoczyna turę", "DEBUG")
         
         # 1. Wygeneruj punkty ekonomiczne
-        self.player.economy.generate_economic_points()
+        self.player.economy.generate_economic_points(rng=get_rng(game_engine, ECONOMY))
         self.player.economy.add_special_points()
         
         war_state = self._assess_war_state(all_players, game_engine)
@@ -178,6 +181,7 @@ class GeneralAI:
             commander_profiles=commander_profiles,
             plan=purchases_plan,
             available_budget=purchase_effective,
+            turn=getattr(game_engine, 'turn', 0) or 0,
         )
         setattr(self.player, "ai_purchase_events", purchase_events)
 
@@ -358,12 +362,9 @@ class GeneralAI:
 
             if isinstance(owner, str):
                 if '(' in owner and ')' in owner:
-                    try:
-                        owner_id = int(owner.split('(')[0].strip())
-                        owner_nation = owner.split('(')[1].replace(')', '').strip()
-                    except (ValueError, IndexError):
-                        owner_id = None
-                        owner_nation = None
+                    owner_id, owner_nation = parse_owner(owner)
+                    if not isinstance(owner_id, int):
+                        owner_id = owner_nation = None
             else:
                 owner_id = getattr(owner, 'id', None)
                 owner_nation = getattr(owner, 'nation', None)
@@ -537,12 +538,7 @@ class GeneralAI:
         owner = getattr(token, "owner", None)
         if isinstance(owner, str):
             if "(" in owner and ")" in owner:
-                try:
-                    nation_part = owner.split("(")[1].split(")")[0].strip()
-                    if nation_part:
-                        return nation_part
-                except (IndexError, ValueError):
-                    return None
+                return parse_owner(owner)[1] or None
             return None
 
         if owner is not None:
@@ -647,6 +643,7 @@ class GeneralAI:
         commander_profiles: List[Dict[str, Any]],
         plan: List[Dict[str, Any]],
         available_budget: int,
+        turn: int = 0,
     ) -> Tuple[List[Dict[str, Any]], int]:
         if available_budget <= 0 or not plan or not commanders:
             return [], 0
@@ -688,12 +685,15 @@ class GeneralAI:
                     if unit_cost > min(entry_budget, remaining_budget):
                         continue
                     try:
-                        bundle = generate_token_assets(
+                        # Blueprint tylko w pamięci – bez plików i renderowania grafiki
+                        bundle = build_token_blueprint(
                             commander_id=commander.id,
                             nation=commander.nation,
                             unit_type=unit_type,
                             unit_size=unit_size,
                             supports=[],
+                            turn=turn,
+                            sequence=getattr(commander, "ai_purchase_sequence", 0) + 1,
                         )
                     except Exception as exc:
                         log_error(
@@ -713,10 +713,6 @@ class GeneralAI:
                 try:
                     self.player.economy.subtract_points(bundle.cost)
                 except Exception as exc:
-                    try:
-                        shutil.rmtree(bundle.folder, ignore_errors=True)
-                    except Exception:
-                        pass
                     log_error(
                         "Nie udało się odjąć PE za zakup",
                         commander_id=commander.id,
@@ -728,6 +724,8 @@ class GeneralAI:
                 entry_budget -= bundle.cost
                 remaining_budget -= bundle.cost
                 token_counts[commander.id] = token_counts.get(commander.id, 0) + 1
+                # Numer zakupu dowódcy wchodzi do id żetonu (ziarno wyznacza id, bez znacznika czasu)
+                setattr(commander, "ai_purchase_sequence", getattr(commander, "ai_purchase_sequence", 0) + 1)
 
                 event = {
                     'turn': getattr(self.player, 'current_turn', None),
@@ -738,7 +736,7 @@ class GeneralAI:
                     'focus': focus,
                     'unit_type': chosen_type[0] if chosen_type else None,
                     'unit_size': chosen_type[1] if chosen_type else None,
-                    'folder': bundle.folder.as_posix(),
+                    'blueprint': bundle.blueprint,
                 }
                 events.append(event)
                 purchase_history.append(event)
@@ -754,7 +752,6 @@ class GeneralAI:
                     cost=bundle.cost,
                     category=category,
                     focus=focus,
-                    folder=event['folder'],
                     turn=event['turn'],
                     remaining_budget=remaining_budget,
                 )
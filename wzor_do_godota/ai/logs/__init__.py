@@ -5,6 +5,10 @@ Moduł logowania AI - centralne zarządzanie logami AI
 from .ai_logger import (
     AILogger,
     get_ai_logger,
+    set_ai_logger,
+    flush_ai_logs,
+    is_log_enabled,
+    set_log_level,
     log_general,
     log_commander,
     log_token,
@@ -15,6 +19,10 @@ from .ai_logger import (
 __all__ = [
     'AILogger',
     'get_ai_logger',
+    'set_ai_logger',
+    'flush_ai_logs',
+    'is_log_enabled',
+    'set_log_level',
     'log_general',
     'log_commander', 
     'log_token',
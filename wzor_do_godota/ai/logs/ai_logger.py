@@ -1,16 +1,80 @@
 """
 System logowania AI - centralne logowanie wszystkich działań AI
 """
+import atexit
 import csv
 import datetime
+import functools
 import json
 import os
-from typing import Any, Dict, Optional
+import threading
+import types
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.hot_path_profiler import profiled
+
+CSV_FIELDNAMES = ["timestamp", "component", "level", "message", "context"]
+
+# Progi poziomów logowania; "OFF" wyłącza komponent całkowicie
+LOG_LEVELS: Dict[str, int] = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "WARN": 30, "ERROR": 40, "CRITICAL": 50, "OFF": 100}
+COMPONENTS = ("GENERAL", "COMMANDER", "TOKEN", "DEBUG")
+
+
+def _level_value(level: str) -> int:
+    value = LOG_LEVELS.get(level)
+    if value is None:
+        value = LOG_LEVELS.get(str(level).upper(), LOG_LEVELS["INFO"])
+    return value
+
+
+def _resolve(value: Any) -> Any:
+    # Funkcje/lambdy i metody w kontekście są leniwe – wywoływane dopiero przy zapisie wpisu
+    if isinstance(value, (types.FunctionType, types.MethodType, functools.partial)):
+        return value()
+    return value
+
+
+def _snapshot(value: Any) -> Any:
+    # Wpis formatowany jest dopiero w wątku zapisującym – płytka kopia list/słowników/zbiorów,
+    # żeby późniejsza zmiana stanu wywołującego nie zmieniła treści wpisu
+    if type(value) in (list, dict, set):
+        return value.copy()
+    return value
+
+
+def _materialize_context(context: Dict[str, Any]) -> Dict[str, Any]:
+    """Wylicza leniwe wartości kontekstu (np. flags=lambda: "|".join(sorted(flags)));
+    `context_builder` (callable zwracający dict) rozwijany jest do pojedynczych pól."""
+    if not context:
+        return {}
+    resolved: Dict[str, Any] = {}
+    for key, value in context.items():
+        if key == "context_builder":
+            built = _resolve(value)
+            if built:
+                resolved.update({k: _snapshot(v) for k, v in built.items()})
+            continue
+        resolved[key] = _snapshot(_resolve(value))
+    return resolved
+
+# Wszystkie żywe loggery – opróżniane przy wyjściu z programu
+_live_loggers: "weakref.WeakSet[AILogger]" = weakref.WeakSet()
 
-class AILogger:
-    """Centralne logowanie działań AI"""
 
-    def __init__(self, log_dir: str = None):
+class AILogger:
+    """Centralne logowanie działań AI.
+
+    Wpisy trafiają do bufora w pamięci jako surowe krotki; formatowanie linii tekstowej,
+    json.dumps kontekstu i wiersz CSV powstają dopiero w wątku zapisującym, który dopisuje je
+    paczkami do otwartych na stałe plików, gdy bufor osiągnie `max_buffer` wpisów albo minie
+    `flush_interval` sekund. `flush()` zapisuje bufor natychmiast (koniec tury, wyjście
+    z programu). buffered=False przywraca zapis synchroniczny przy każdym wpisie.
+    Po `close()` nowe wpisy są odrzucane (licznik `dropped_after_close`) – zamknięty logger
+    nie otwiera ponownie plików."""
+
+    def __init__(self, log_dir: str = None, buffered: bool = True, flush_interval: float = 1.0, max_buffer: int = 256,
+                 levels: Optional[Dict[str, str]] = None):
         if log_dir is None:
             # Domyślny folder logs w ai/
             current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -32,6 +96,37 @@ class AILogger:
             "DEBUG": self._prepare_component_paths("debug"),
         }
 
+        self.buffered = buffered
+        self.flush_interval = flush_interval
+        self.max_buffer = max(1, max_buffer)
+        self._buffer: List[Tuple[str, str, Any]] = []
+        self._buffer_lock = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._handles: Dict[str, Any] = {}
+        self._writers: Dict[str, Any] = {}
+        self._writer_thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.dropped_after_close = 0
+        _live_loggers.add(self)
+
+        # Minimalne poziomy per komponent: AI_LOG_LEVEL (wszystkie), AI_LOG_LEVEL_<KOMPONENT>, potem `levels`
+        default_level = os.environ.get("AI_LOG_LEVEL", "DEBUG")
+        self._min_levels: Dict[str, int] = {
+            component: _level_value(os.environ.get(f"AI_LOG_LEVEL_{component}", default_level))
+            for component in COMPONENTS
+        }
+        for component, level in (levels or {}).items():
+            self.set_level(level, component)
+
+    def set_level(self, level: str, component: Optional[str] = None) -> None:
+        """Ustawia minimalny poziom zapisu dla komponentu (None = wszystkie komponenty)."""
+        for name in (COMPONENTS if component is None else (component.upper(),)):
+            self._min_levels[name] = _level_value(level)
+
+    def is_enabled(self, component: str, level: str) -> bool:
+        """Czy wpis danego poziomu zostanie zapisany – sprawdzane przed jakimkolwiek formatowaniem."""
+        return _level_value(level) >= self._min_levels.get(component, 0)
+
     def _prepare_component_paths(self, folder_name: str) -> Dict[str, str]:
         component_root = os.path.join(self.log_dir, folder_name)
         text_dir = os.path.join(component_root, "text")
@@ -57,48 +152,124 @@ class AILogger:
         formatted_pairs = ", ".join(f"{key}={value}" for key, value in context.items())
         return f" [{formatted_pairs}]"
 
-    def _write_text_entry(self, component: str, timestamp: str, level: str, message: str, context: Dict[str, Any]):
-        log_file = self._component_paths[component]["text"]
-        log_entry = f"[{timestamp}] [{level}] [{component}] {message}{self._format_context_for_text(context)}\n"
-
+    def _write_entry(self, component: str, now: datetime.datetime, level: str, message: str,
+                     context: Dict[str, Any]) -> List[str]:
+        """Formatuje wpis i dopisuje go do pliku tekstowego i CSV komponentu (wywoływane z flush).
+        Zwraca ścieżki plików, do których coś zapisano."""
+        paths = self._component_paths[component]
+        touched = []
         try:
-            with open(log_file, "a", encoding="utf-8") as file_handle:
-                file_handle.write(log_entry)
+            handle = self._handle_for(paths["text"], "text")
+            handle.write(f"[{now.strftime('%H:%M:%S')}] [{level}] [{component}] {message}"
+                         f"{self._format_context_for_text(context)}\n")
+            touched.append(paths["text"])
         except Exception as error:
             print(f"⚠️ Błąd zapisu loga (text): {error}")
-
-    def _write_csv_entry(self, component: str, iso_timestamp: str, level: str, message: str, context: Dict[str, Any]):
-        log_file = self._component_paths[component]["csv"]
-        fieldnames = ["timestamp", "component", "level", "message", "context"]
-        serialized_context = json.dumps(context, ensure_ascii=False) if context else ""
-
         try:
-            file_exists = os.path.exists(log_file)
-            with open(log_file, "a", newline="", encoding="utf-8") as file_handle:
-                writer = csv.DictWriter(file_handle, fieldnames=fieldnames)
-                if not file_exists:
-                    writer.writeheader()
-                writer.writerow(
-                    {
-                        "timestamp": iso_timestamp,
-                        "component": component,
-                        "level": level,
-                        "message": message,
-                        "context": serialized_context,
-                    }
-                )
+            serialized_context = json.dumps(context, ensure_ascii=False) if context else ""
+            self._handle_for(paths["csv"], "csv")
+            self._writers[paths["csv"]].writerow(
+                (now.isoformat(timespec="seconds"), component, level, message, serialized_context))
+            touched.append(paths["csv"])
         except Exception as error:
             print(f"⚠️ Błąd zapisu loga (csv): {error}")
-
+        return touched
+
+    def _enqueue(self, record: Tuple[str, datetime.datetime, str, Any, Dict[str, Any]]):
+        with self._buffer_lock:
+            if self._closed:
+                self.dropped_after_close += 1
+                return
+            self._buffer.append(record)
+            synchronous = not self.buffered
+            if not synchronous:
+                self._ensure_writer_thread()
+                # Budzimy wątek przy pierwszym wpisie (start odliczania) i przy pełnym buforze
+                if len(self._buffer) == 1 or len(self._buffer) >= self.max_buffer:
+                    self._buffer_lock.notify()
+        if synchronous:
+            self.flush()
+
+    def _ensure_writer_thread(self):
+        if self._writer_thread is None or not self._writer_thread.is_alive():
+            self._writer_thread = threading.Thread(target=self._writer_loop, name="AILoggerWriter", daemon=True)
+            self._writer_thread.start()
+
+    def _writer_loop(self):
+        while True:
+            with self._buffer_lock:
+                while not self._buffer and not self._closed:
+                    self._buffer_lock.wait()
+                if not self._closed and len(self._buffer) < self.max_buffer:
+                    # Zbieraj wpisy do zapełnienia bufora albo upływu flush_interval
+                    self._buffer_lock.wait(self.flush_interval)
+                closed = self._closed
+            self.flush()
+            if closed:
+                return
+
+    def _handle_for(self, log_file: str, kind: str):
+        handle = self._handles.get(log_file)
+        if handle is None:
+            if kind == "csv":
+                needs_header = not os.path.exists(log_file) or os.path.getsize(log_file) == 0
+                handle = open(log_file, "a", newline="", encoding="utf-8")
+                writer = csv.writer(handle)
+                if needs_header:
+                    writer.writerow(CSV_FIELDNAMES)
+                self._writers[log_file] = writer
+            else:
+                handle = open(log_file, "a", encoding="utf-8")
+            self._handles[log_file] = handle
+        return handle
+
+    @profiled("AILogger.flush")
+    def flush(self):
+        """Zapisuje wszystkie zbuforowane wpisy na dysk (wywoływane m.in. na koniec tury)."""
+        with self._io_lock:
+            with self._buffer_lock:
+                batch, self._buffer = self._buffer, []
+            if not batch:
+                return
+            touched = set()
+            for record in batch:
+                touched.update(self._write_entry(*record))
+            for log_file in touched:
+                try:
+                    self._handles[log_file].flush()
+                except Exception as error:
+                    print(f"⚠️ Błąd zapisu loga: {error}")
+
+    def close(self):
+        """Opróżnia bufor, zatrzymuje wątek zapisujący i zamyka pliki."""
+        with self._buffer_lock:
+            self._closed = True
+            self._buffer_lock.notify()
+        thread = self._writer_thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        self.flush()
+        with self._io_lock:
+            for handle in self._handles.values():
+                try:
+                    handle.close()
+                except Exception:
+                    pass
+            self._handles.clear()
+            self._writers.clear()
+
+    @profiled("AILogger._log")
     def _log(self, component: str, message: str, level: str, console_label: str, console_icon: str, context: Dict[str, Any], force_console: bool = False):
-        now = datetime.datetime.now()
-        timestamp = now.strftime("%H:%M:%S")
-        iso_timestamp = now.isoformat(timespec="seconds")
-
-        safe_context = context or {}
+        if not self.is_enabled(component, level):
+            return
+        if self._closed:
+            self.dropped_after_close += 1
+            return
+        message = _resolve(message)
+        safe_context = _materialize_context(context)
 
-        self._write_text_entry(component, timestamp, level, message, safe_context)
-        self._write_csv_entry(component, iso_timestamp, level, message, safe_context)
+        # Tylko surowy wpis – tekst, JSON kontekstu i wiersz CSV buduje wątek zapisujący
+        self._enqueue((component, datetime.datetime.now(), level, message, safe_context))
 
         if force_console or level == "DEBUG":
             console_context = self._format_context_for_console(safe_context)
@@ -122,6 +293,8 @@ class AILogger:
     
     def log_error(self, message: str, component: str = "GENERAL", **context: Any):
         """Loguje błędy AI"""
+        if not self.is_enabled("DEBUG", "ERROR"):
+            return
         combined_context = {"source": component}
         combined_context.update(context)
         self._log("DEBUG", message, "ERROR", "AI-ERR", "❌", combined_context, force_console=True)
@@ -137,6 +310,36 @@ def get_ai_logger() -> AILogger:
         _ai_logger = AILogger()
     return _ai_logger
 
+def set_ai_logger(logger: Optional[AILogger]) -> None:
+    """Podmienia globalną instancję AI loggera (None = utwórz domyślną przy następnym użyciu).
+    Używane np. przez farmę symulacji – każdy proces loguje do własnego katalogu.
+    Poprzedni logger jest opróżniany i zamykany."""
+    global _ai_logger
+    previous, _ai_logger = _ai_logger, logger
+    if previous is not None and previous is not logger:
+        previous.close()
+
+def flush_ai_logs() -> None:
+    """Zapisuje zbuforowane wpisy globalnego loggera (np. na koniec tury). Nie tworzy loggera."""
+    if _ai_logger is not None:
+        _ai_logger.flush()
+
+@atexit.register
+def _close_all_loggers() -> None:
+    for logger in list(_live_loggers):
+        try:
+            logger.close()
+        except Exception:
+            pass
+
+def is_log_enabled(component: str, level: str = "DEBUG") -> bool:
+    """Pozwala pominąć budowanie kosztownego komunikatu, gdy wpis i tak nie zostałby zapisany."""
+    return get_ai_logger().is_enabled(component, level)
+
+def set_log_level(level: str, component: Optional[str] = None) -> None:
+    """Ustawia minimalny poziom globalnego loggera (component None = wszystkie komponenty)."""
+    get_ai_logger().set_level(level, component)
+
 def _sanitize_context(context: Dict[str, Any]) -> Dict[str, Any]:
     """Zapobiega kolizji nazw parametrów przy delegowaniu do loggera."""
     if not context:
@@ -150,22 +353,30 @@ def _sanitize_context(context: Dict[str, Any]) -> Dict[str, Any]:
 
 def log_general(message: str, level: str = "INFO", **context: Any):
     """Skrót do logowania generała"""
-    get_ai_logger().log_general(message, level, **_sanitize_context(context))
+    logger = get_ai_logger()
+    if logger.is_enabled("GENERAL", level):
+        logger.log_general(message, level, **_sanitize_context(context))
 
 
 def log_commander(message: str, level: str = "INFO", **context: Any):
     """Skrót do logowania komendanta"""
-    get_ai_logger().log_commander(message, level, **_sanitize_context(context))
+    logger = get_ai_logger()
+    if logger.is_enabled("COMMANDER", level):
+        logger.log_commander(message, level, **_sanitize_context(context))
 
 
 def log_token(message: str, level: str = "INFO", **context: Any):
     """Skrót do logowania tokenów"""
-    get_ai_logger().log_token(message, level, **_sanitize_context(context))
+    logger = get_ai_logger()
+    if logger.is_enabled("TOKEN", level):
+        logger.log_token(message, level, **_sanitize_context(context))
 
 
 def log_debug(message: str, **context: Any):
     """Skrót do logowania debug"""
-    get_ai_logger().log_debug(message, **_sanitize_context(context))
+    logger = get_ai_logger()
+    if logger.is_enabled("DEBUG", "DEBUG"):
+        logger.log_debug(message, **_sanitize_context(context))
 
 
 def log_error(message: str, component: str = "GENERAL", **context: Any):
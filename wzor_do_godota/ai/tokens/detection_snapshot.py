@@ -0,0 +1,189 @@
+"""Wspólna migawka detekcji dowódcy dla jego żetonów.
+
+Dawniej każdy TokenAI w _collect_detection_map przechodził po wszystkich żetonach
+silnika, dla każdego wroga pytał gracza o dane detekcji i budował nowy słownik
+apply_detection_filter – O(N·M) na turę dowódcy, powtarzane w każdym _update_context.
+
+DetectionSnapshot robi przebieg po żetonach raz na gracza: dzieli wrogów każdej nacji
+na wykrytych przez gracza (gotowe, przefiltrowane rekordy) i pozostałych (kandydaci do
+wykrycia własnym wzrokiem żetonu). Widok żetonu to kopie gotowych rekordów plus
+wrogowie znalezieni przez indeks zajętości planszy w zasięgu jego wzroku – bez pętli
+po wszystkich wrogach i bez ponownego filtrowania.
+
+Migawka jest ważna, dopóki nie zmieni się widoczność gracza (Player.visibility_version,
+słowniki temp_visible_token_data / visible_token_data) ani lista żetonów silnika.
+Ruch sam jej nie unieważnia: pozycje czytane są na żywo, a rekord wroga jest
+odtwarzany tylko wtedy, gdy zmieniły się jego pozycja lub wartość bojowa. Migawki
+trzyma silnik (GameEngine.ai_detection_snapshots, klucz – gracz).
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from engine.action_refactored_clean import VisionService
+from engine.detection_filter import apply_detection_filter, get_detection_info_for_player
+from engine.hex_utils import hexes_in_range
+from engine.token import token_nation
+
+
+def _fingerprint(engine, player) -> Tuple:
+    temp = getattr(player, "temp_visible_token_data", None)
+    persistent = getattr(player, "visible_token_data", None)
+    tokens = getattr(engine, "tokens", None) or []
+    return (
+        getattr(player, "visibility_version", None),
+        id(tokens),
+        len(tokens),
+        id(temp), len(temp) if temp is not None else -1,
+        id(persistent), len(persistent) if persistent is not None else -1,
+    )
+
+
+class _NationEnemies:
+    """Wrogowie jednej nacji w migawce: wykryci przez gracza i pozostali."""
+
+    __slots__ = ("ids", "reported", "reported_ids", "unreported", "unreported_index")
+
+    def __init__(self, entries, nation):
+        self.ids = set()
+        # (indeks w engine.tokens, wróg, poziom detekcji, odległość, detected_by)
+        self.reported: List[Tuple[int, Any, float, Any, Any]] = []
+        # (indeks w engine.tokens, wróg, detected_by z danych gracza)
+        self.unreported: List[Tuple[int, Any, Any]] = []
+        for index, token, token_nat, info in entries:
+            if token_nat == nation:
+                continue
+            self.ids.add(token.id)
+            level = (info.get("detection_level", 0.0) or 0.0) if info else 0.0
+            if level > 0:
+                self.reported.append((index, token, level, info.get("distance"), info.get("detected_by")))
+            else:
+                self.unreported.append((index, token, info.get("detected_by") if info else None))
+        self.reported_ids = {token.id for _, token, _, _, _ in self.reported}
+        self.unreported_index = {id(entry[1]): entry for entry in self.unreported}
+
+
+class DetectionSnapshot:
+    """Wrogowie (wg nacji) i przefiltrowane dane detekcji gracza, policzone raz dla wersji widoczności."""
+
+    def __init__(self, engine, player):
+        self.engine = engine
+        self.player = player
+        self.fingerprint = _fingerprint(engine, player)
+        # (indeks, żeton, nacja, dane detekcji gracza lub None) w kolejności engine.tokens
+        self._entries: List[Tuple[int, Any, Optional[str], Optional[Dict[str, Any]]]] = []
+        self.active_ids = set()
+        for index, token in enumerate(getattr(engine, "tokens", None) or []):
+            token_id = getattr(token, "id", None)
+            self.active_ids.add(token_id)
+            if token_id is None:
+                continue
+            info = get_detection_info_for_player(player, token_id, include_temp=True)
+            self._entries.append((index, token, token_nation(token), info))
+        self._nations: Dict[Optional[str], _NationEnemies] = {}
+        # (id(wróg), poziom detekcji) -> ((q, r, combat_value), wynik apply_detection_filter)
+        self._records: Dict[Tuple[int, float], Tuple[Tuple, Dict[str, Any]]] = {}
+
+    def is_current(self, engine, player) -> bool:
+        return self.engine is engine and self.player is player and _fingerprint(engine, player) == self.fingerprint
+
+    def _enemies(self, nation: Optional[str]) -> _NationEnemies:
+        enemies = self._nations.get(nation)
+        if enemies is None:
+            enemies = self._nations[nation] = _NationEnemies(self._entries, nation)
+        return enemies
+
+    def commander_contact_ids(self, nation: Optional[str]) -> set:
+        """id wrogów wykrytych przez gracza (wspólne dla wszystkich żetonów tej nacji)."""
+        return self._enemies(nation).reported_ids
+
+    def _record(self, enemy, detection_level: float, distance, detected_by) -> Dict[str, Any]:
+        state = (enemy.q, enemy.r, getattr(enemy, "combat_value", 0))
+        key = (id(enemy), detection_level)
+        cached = self._records.get(key)
+        if cached is None or cached[0] != state:
+            filtered = apply_detection_filter(enemy, detection_level)
+            filtered["detection_level"] = detection_level
+            cached = self._records[key] = (state, filtered)
+        record = dict(cached[1])  # żeton może dopisać własne pola (np. distance)
+        if distance is not None:
+            record["distance"] = distance
+        if detected_by:
+            record["detected_by"] = detected_by
+        return record
+
+    def view_for(
+        self,
+        token,
+        sight: int,
+        base_map: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Mapa detekcji żetonu – wynik zgodny z dawnym TokenAI._collect_detection_map."""
+        board = getattr(self.engine, "board", None)
+        my_pos = (getattr(token, "q", None), getattr(token, "r", None))
+        enemies = self._enemies(token_nation(token))
+
+        found = [
+            (index, enemy.id, self._record(enemy, level, distance, detected_by))
+            for index, enemy, level, distance, detected_by in enemies.reported
+        ]
+        if board is not None and sight > 0 and None not in my_pos and enemies.unreported:
+            # Indeks zajętości planszy odpowiada żetonom silnika tylko po board.set_tokens(engine.tokens)
+            if hasattr(board, "tokens_at") and getattr(board, "tokens", None) is getattr(self.engine, "tokens", None):
+                candidates = self._unreported_near(board, enemies, my_pos, sight)
+            else:
+                candidates = enemies.unreported
+            own = []
+            for index, enemy, detected_by in candidates:
+                if None in (enemy.q, enemy.r):
+                    continue
+                distance = board.hex_distance(my_pos, (enemy.q, enemy.r))
+                if distance is None or distance >= sight:
+                    continue
+                level = VisionService.calculate_detection_level(distance, sight)
+                if level > 0:
+                    own.append((index, enemy.id, self._record(enemy, level, distance, detected_by)))
+            if own:
+                found.extend(own)
+                found.sort(key=lambda item: item[0])
+        detected = {enemy_id: record for _, enemy_id, record in found}
+
+        # Kolejność jak w dawnym dict(base_map) + aktualizacje: najpierw klucze z poprzedniej mapy
+        result: Dict[str, Dict[str, Any]] = {}
+        for key, value in (base_map or {}).items():
+            if key in detected:
+                result[key] = detected.pop(key)
+            elif key not in enemies.ids and key in self.active_ids:
+                result[key] = value
+        result.update(detected)
+        return result
+
+    @staticmethod
+    def _unreported_near(board, enemies: _NationEnemies, position: Tuple[int, int], sight: int) -> list:
+        """Niewykryci przez gracza wrogowie w odległości < sight – przez indeks zajętości planszy."""
+        near = []
+        lookup = enemies.unreported_index
+        for q, r in hexes_in_range(board, position, sight - 1):
+            for other in board.tokens_at(q, r):
+                entry = lookup.get(id(other))
+                if entry is not None:
+                    near.append(entry)
+        return near
+
+
+def get_detection_snapshot(engine, player) -> Optional[DetectionSnapshot]:
+    """Migawka detekcji gracza z pamięci silnika; budowana od nowa tylko po zmianie widoczności
+    gracza albo listy żetonów."""
+    if engine is None or player is None:
+        return None
+    cache = getattr(engine, "ai_detection_snapshots", None)
+    if cache is None:
+        # Atrapy silnika (testy) bez pola z GameEngine
+        try:
+            cache = engine.ai_detection_snapshots = {}
+        except AttributeError:
+            return DetectionSnapshot(engine, player)
+    key = (getattr(player, "id", None), getattr(player, "nation", None))
+    snapshot = cache.get(key)
+    if snapshot is None or not snapshot.is_current(engine, player):
+        snapshot = cache[key] = DetectionSnapshot(engine, player)
+    return snapshot
@@ -61,6 +61,13 @@ def get_shared_intel_memory() -> SharedIntelMemory:
     return _GLOBAL_SHARED_INTEL
 
 
+def reset_shared_intel_memory() -> SharedIntelMemory:
+    """Zastępuje wspólną pamięć wywiadu pustą (np. przed kolejną partią w tym samym procesie)."""
+    global _GLOBAL_SHARED_INTEL
+    _GLOBAL_SHARED_INTEL = SharedIntelMemory()
+    return _GLOBAL_SHARED_INTEL
+
+
 def _flag(context: Dict[str, Any], flag: str) -> None:
     """Pomocnik: dodaje flagę do kontekstu dla celów diagnostycznych."""
     if not flag:
@@ -0,0 +1,194 @@
+"""Mapa zagrożenia gracza jako tablica NumPy nad heksami planszy.
+
+Dla każdego heksa trzyma liczbę wrogów, w których (postrzeganym) zasięgu ataku
+leży heks – to samo, co dawny słownik danger_zones budowany od zera przez każdy
+TokenAI. Mapa jest jedna na gracza (dowódcę) i współdzielona przez jego żetony:
+`sync` dostaje aktualny zestaw kontaktów (id wroga -> (pozycja, zasięg)) i
+odejmuje/dodaje tylko dyski kontaktów, które się pojawiły, zniknęły albo
+zmieniły. Do wspólnej mapy trafiają wyłącznie kontakty wykryte przez gracza –
+te są identyczne dla wszystkich żetonów dowódcy, więc synchronizacja kolejnego
+żetonu niczego nie zmienia, dopóki nie zmieni się obraz dowódcy. Wrogów
+dostrzeżonych tylko własnym wzrokiem żetonu dokłada ThreatView – niezmienny
+widok tego żetonu nad wspólną mapą.
+
+Mapa udaje słownik {(q, r): liczba} (get, [], in, iteracja po heksach z
+zagrożeniem), więc kod specjalistów i testy z danger_zones jako dict działają bez zmian.
+"""
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from engine.hex_utils import disk_offsets
+
+Contact = Tuple[Tuple[int, int], int]
+
+
+class ThreatMap(Mapping):
+    """Liczniki zagrożenia heksów planszy (indeks = Board.hex_index)."""
+
+    def __init__(self, board):
+        self.board = board
+        self.counts = np.zeros(len(board.hex_coords), dtype=np.int32)
+        self.contacts: Dict[Any, Contact] = {}
+        # Rośnie przy każdej zmianie liczników – pozwala wykryć nieaktualne wyniki pochodne
+        self.version = 0
+        self._disks: Dict[Contact, np.ndarray] = {}
+
+    @classmethod
+    def supports(cls, board) -> bool:
+        """Czy plansza ma indeks heksów (prawdziwa Board, nie atrapa z testów)."""
+        return board is not None and hasattr(board, "hex_index") and hasattr(board, "hex_coords")
+
+    # ------------------------------------------------------------------
+    # Aktualizacja
+    # ------------------------------------------------------------------
+    def _disk(self, center: Tuple[int, int], radius: int) -> np.ndarray:
+        key = (center, radius)
+        indices = self._disks.get(key)
+        if indices is None:
+            q, r = center
+            hex_index = self.board.hex_index
+            found = [hex_index(q + dq, r + dr) for dq, dr in disk_offsets(max(0, radius))]
+            indices = np.fromiter((i for i in found if i >= 0), dtype=np.intp)
+            self._disks[key] = indices
+        return indices
+
+    def sync(self, contacts: Dict[Any, Contact]) -> bool:
+        """Ustawia mapę na podany zestaw kontaktów; zwraca True, jeśli coś się zmieniło."""
+        current = self.contacts
+        counts = self.counts
+        changed = False
+        for enemy_id, contact in current.items():
+            if contacts.get(enemy_id) != contact:
+                counts[self._disk(*contact)] -= 1
+                changed = True
+        for enemy_id, contact in contacts.items():
+            if current.get(enemy_id) != contact:
+                counts[self._disk(*contact)] += 1
+                changed = True
+        if changed:
+            self.contacts = dict(contacts)
+            self.version += 1
+        return changed
+
+    def clear(self) -> None:
+        self.sync({})
+
+    # ------------------------------------------------------------------
+    # Odczyt
+    # ------------------------------------------------------------------
+    def level_at(self, position: Optional[Tuple[int, int]]) -> int:
+        if position is None or None in position:
+            return 0
+        index = self.board.hex_index(position[0], position[1])
+        return self.counts.item(index) if index >= 0 else 0
+
+    def get(self, position, default=0):
+        if position is None or None in position:
+            return default
+        index = self.board.hex_index(position[0], position[1])
+        if index < 0:
+            return default
+        level = self.counts.item(index)
+        return level if level else default
+
+    def __getitem__(self, position) -> int:
+        level = self.get(position, None)
+        if level is None:
+            raise KeyError(position)
+        return level
+
+    def __contains__(self, position) -> bool:
+        return self.get(position, None) is not None
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        coords = self.board.hex_coords
+        return (coords[i] for i in np.flatnonzero(self.counts))
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.counts))
+
+    def __bool__(self) -> bool:
+        # Każdy kontakt zagraża co najmniej własnemu heksowi – bez skanowania tablicy
+        return bool(self.contacts)
+
+    def to_dict(self) -> Dict[Tuple[int, int], int]:
+        coords = self.board.hex_coords
+        return {coords[i]: int(self.counts[i]) for i in np.flatnonzero(self.counts)}
+
+
+class ThreatView(Mapping):
+    """Zagrożenie widziane przez jeden żeton: wspólna mapa dowódcy + kontakty z własnego wzroku.
+
+    Własne kontakty są zamrożone w chwili utworzenia widoku; część wspólna zmienia się
+    tylko razem z obrazem dowódcy (inne żetony jej nie nadpisują).
+    """
+
+    __slots__ = ("base", "contacts", "extra")
+
+    def __init__(self, base: ThreatMap, contacts: Dict[Any, Contact]):
+        self.base = base
+        self.contacts = dict(contacts)
+        extra: Dict[int, int] = {}
+        for contact in self.contacts.values():
+            for index in base._disk(*contact).tolist():
+                extra[index] = extra.get(index, 0) + 1
+        # indeks heksa -> liczba własnych kontaktów, w których zasięgu leży
+        self.extra = extra
+
+    def level_at(self, position: Optional[Tuple[int, int]]) -> int:
+        return self.get(position, 0)
+
+    def get(self, position, default=0):
+        if position is None or None in position:
+            return default
+        index = self.base.board.hex_index(position[0], position[1])
+        if index < 0:
+            return default
+        level = self.base.counts.item(index) + self.extra.get(index, 0)
+        return level if level else default
+
+    def __getitem__(self, position) -> int:
+        level = self.get(position, None)
+        if level is None:
+            raise KeyError(position)
+        return level
+
+    def __contains__(self, position) -> bool:
+        return self.get(position, None) is not None
+
+    def _indices(self):
+        indices = set(np.flatnonzero(self.base.counts).tolist())
+        indices.update(self.extra)
+        return sorted(indices)
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        coords = self.base.board.hex_coords
+        return (coords[i] for i in self._indices())
+
+    def __len__(self) -> int:
+        return len(self._indices())
+
+    def __bool__(self) -> bool:
+        return bool(self.contacts) or bool(self.base)
+
+    def to_dict(self) -> Dict[Tuple[int, int], int]:
+        coords = self.base.board.hex_coords
+        counts = self.base.counts
+        return {coords[i]: int(counts[i]) + self.extra.get(i, 0) for i in self._indices()}
+
+
+def get_player_threat_map(player, board) -> Optional[ThreatMap]:
+    """Mapa zagrożenia gracza (tworzona przy pierwszym użyciu i przy zmianie planszy)."""
+    if player is None or not ThreatMap.supports(board):
+        return None
+    threat_map = getattr(player, "ai_threat_map", None)
+    if not isinstance(threat_map, ThreatMap) or threat_map.board is not board:
+        threat_map = ThreatMap(board)
+        try:
+            setattr(player, "ai_threat_map", threat_map)
+        except AttributeError:
+            return threat_map
+    return threat_map
@@ -7,14 +7,28 @@ budżet PE na podstawowe uzupełnienia.
 """
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
 
 import random
 
 from ai.logs import log_token
-from engine.action_refactored_clean import CombatAction, MoveAction, VisionService
-from engine.detection_filter import apply_detection_filter, get_detection_info_for_player
+from engine.action_refactored_clean import CombatAction, MoveAction
+from engine.hex_utils import hexes_in_range
+from engine.rng import AI, get_rng
+from engine.token import token_nation
+from engine.token_registry import TokenRegistry
+from utils.hot_path_profiler import profiled
+
+from .detection_snapshot import get_detection_snapshot
+from .threat_map import ThreatMap, ThreatView, get_player_threat_map
+
+
+def _profiled_unit_type(ai: "TokenAI") -> str:
+    """Typ jednostki, po którym profiler grupuje czasy sekcji żetonu."""
+    stats = getattr(ai.token, "stats", None) or {}
+    return stats.get("unitType") or stats.get("type") or "?"
 
 
 @dataclass
@@ -59,6 +73,7 @@ class TokenAI:
         else:
             self.shared_intel = getattr(self.specialist, "shared_intel", None)
 
+    @profiled("TokenAI.execute_turn", token_type=_profiled_unit_type)
     def execute_turn(self, engine, player, pe_budget: int = 0) -> int:
         """Wykonuje turę żetonu w trybie minimalnym.
 
@@ -111,14 +126,6 @@ class TokenAI:
         else:
             planned_actions = list(planned_actions)
         action_profile = self.memory.get("action_profile")
-        specialist_flags = context.get("specialist_flags") or set()
-        if isinstance(specialist_flags, set):
-            specialist_flags = sorted(specialist_flags)
-        else:
-            specialist_flags = sorted(set(specialist_flags)) if specialist_flags else []
-        shared_detection = context.get("shared_enemy_detection") or {}
-        shared_contacts = len(shared_detection)
-        flags_text = "|".join(specialist_flags) if specialist_flags else None
         notes_text = "|".join(specialist_notes) if specialist_notes else None
         human_note = context.get("human_note")
 
@@ -138,8 +145,8 @@ class TokenAI:
             specialist=specialist_name,
             human_note=human_note,
             specialist_notes=notes_text,
-            specialist_flags=flags_text,
-            shared_contacts=shared_contacts,
+            specialist_flags=lambda: self._flags_text(context.get("specialist_flags")),
+            shared_contacts=lambda: len(context.get("shared_enemy_detection") or {}),
         )
         spent_pe = 0
         allocated_pe = pe_budget
@@ -356,14 +363,6 @@ class TokenAI:
             except Exception:
                 pass
 
-        final_flags = context.get("specialist_flags") or set()
-        if isinstance(final_flags, set):
-            final_flags = sorted(final_flags)
-        else:
-            final_flags = sorted(set(final_flags)) if final_flags else []
-        final_shared_contacts = len((context.get("shared_enemy_detection") or {}))
-        final_flags_text = "|".join(final_flags) if final_flags else None
-
         log_token(
             f"{self.token.id}: koniec tury (wydane PE={spent_pe})",
             "INFO",
@@ -398,8 +397,8 @@ class TokenAI:
             hold_position=self.memory.get("hold_position", False),
             hold_reason=self.memory.get("hold_reason"),
             specialist=specialist_name,
-            specialist_flags=final_flags_text,
-            shared_contacts=final_shared_contacts,
+            specialist_flags=lambda: self._flags_text(context.get("specialist_flags")),
+            shared_contacts=lambda: len(context.get("shared_enemy_detection") or {}),
         )
         return spent_pe
 
@@ -506,6 +505,7 @@ class TokenAI:
         options.sort(key=lambda item: item[0])
         return [pos for _, pos in options]
 
+    @profiled("TokenAI._attempt_move")
     def _attempt_move(self, engine, player, destination: Tuple[int, int]) -> MoveOutcome:
         if destination == (self.token.q, self.token.r):
             return MoveOutcome(False, "already_there")
@@ -606,6 +606,7 @@ class TokenAI:
                 return enemy
         return None
 
+    @profiled("TokenAI._perform_attack")
     def _perform_attack(self, engine, player, enemy) -> Dict[str, Optional[int]]:
         board = getattr(engine, "board", None)
         distance = None
@@ -866,8 +867,11 @@ class TokenAI:
         return not self._is_token_present(engine)
 
     def _is_token_present(self, engine) -> bool:
+        tokens = getattr(engine, "tokens", None) or []
+        if isinstance(tokens, TokenRegistry):
+            return self.token in tokens or tokens.get(getattr(self.token, "id", None)) is not None
         token_id = getattr(self.token, "id", None)
-        for tok in getattr(engine, "tokens", []):
+        for tok in tokens:
             if getattr(tok, "id", None) == token_id:
                 return True
         return False
@@ -918,6 +922,9 @@ class TokenAI:
         return self._token_at(engine, position) is None
 
     def _token_at(self, engine, position: Tuple[int, int]):
+        board = getattr(engine, "board", None)
+        if hasattr(board, "token_at"):
+            return board.token_at(position[0], position[1], exclude=self.token)
         for tok in getattr(engine, "tokens", []):
             if tok.id == self.token.id:
                 continue
@@ -984,16 +991,17 @@ class TokenAI:
         real_cv = getattr(enemy, "combat_value", enemy.stats.get("combat_value", 0)) or 0
         if real_cv <= 0:
             return 0
+        rng = context.get("rng") or random
 
         if detection_info is None:
-            return max(1, int(round(real_cv * random.uniform(0.6, 0.9))))
+            return max(1, int(round(real_cv * rng.uniform(0.6, 0.9))))
 
         detection_level = detection_info.get("detection_level", 0.0) or 0.0
         if detection_level >= 0.8:
             return real_cv
         if detection_level >= 0.5:
-            return max(1, int(round(real_cv * random.uniform(0.7, 0.95))))
-        return max(1, int(round(real_cv * random.uniform(0.5, 0.85))))
+            return max(1, int(round(real_cv * rng.uniform(0.7, 0.95))))
+        return max(1, int(round(real_cv * rng.uniform(0.5, 0.85))))
 
     def _sight(self) -> int:
         sight = self.token.stats.get("sight", 0)
@@ -1015,17 +1023,18 @@ class TokenAI:
     def _is_enemy(self, other) -> bool:
         if other is None or other is self.token:
             return False
-        return self._owner_nation(self.token) != self._owner_nation(other)
+        return token_nation(self.token) != token_nation(other)
 
     @staticmethod
     def _owner_nation(token) -> Optional[str]:
-        owner = getattr(token, "owner", "") or ""
-        if "(" in owner and ")" in owner:
-            return owner.split("(")[-1].replace(")", "").strip()
-        stats_nation = getattr(token, "stats", {}).get("nation")
-        if stats_nation:
-            return str(stats_nation).strip()
-        return None
+        return token_nation(token)
+
+    @staticmethod
+    def _flags_text(flags) -> Optional[str]:
+        """Flagi specjalisty jako posortowany tekst do logów (liczony leniwie)."""
+        if not flags:
+            return None
+        return "|".join(sorted(set(flags)))
 
     # ------------------------------------------------------------------
     # Nowa logika autonomiczna
@@ -1073,6 +1082,7 @@ class TokenAI:
             self.memory.setdefault("hold_reason", normalized)
             self.memory["hold_calm_turns"] = 0
 
+    @profiled("TokenAI._evaluate_state")
     def _evaluate_state(self, engine, player) -> Dict[str, Any]:
         board = getattr(engine, "board", None)
         position = (getattr(self.token, "q", None), getattr(self.token, "r", None))
@@ -1082,7 +1092,7 @@ class TokenAI:
         detection_map = self._collect_detection_map(engine, player)
         visible_enemies = self._visible_enemies(engine, detection_map)
         friendly_tokens = self._friendly_tokens(engine)
-        danger_zones = self._compute_danger_zones(engine, visible_enemies, detection_map)
+        danger_zones = self._compute_danger_zones(engine, visible_enemies, detection_map, player)
 
         context = {
             "position": position,
@@ -1097,6 +1107,7 @@ class TokenAI:
             "max_fuel": max_fuel,
             "combat_value": current_cv,
             "max_cv": self.token.stats.get("combat_value", current_cv) or 0,
+            "rng": get_rng(engine, AI),
         }
         if self.specialist is not None:
             try:
@@ -1115,7 +1126,7 @@ class TokenAI:
         visible_enemies = self._visible_enemies(engine, detection_map)
         context["enemy_detection"] = detection_map
         context["visible_enemies"] = visible_enemies
-        context["danger_zones"] = self._compute_danger_zones(engine, visible_enemies, detection_map)
+        context["danger_zones"] = self._compute_danger_zones(engine, visible_enemies, detection_map, player)
         if self.specialist is not None:
             try:
                 self.specialist.update_context(context)
@@ -1128,55 +1139,11 @@ class TokenAI:
         player,
         base_map: Optional[Dict[str, Dict[str, Any]]] = None,
     ) -> Dict[str, Dict[str, Any]]:
-        detection_map: Dict[str, Dict[str, Any]] = dict(base_map or {})
         if engine is None or player is None:
-            return detection_map
-
-        board = getattr(engine, "board", None)
-        my_pos = (getattr(self.token, "q", None), getattr(self.token, "r", None))
-        sight = self._sight()
-
-        for enemy in getattr(engine, "tokens", []):
-            enemy_id = getattr(enemy, "id", None)
-            if enemy_id is None or not self._is_enemy(enemy):
-                continue
-
-            info = get_detection_info_for_player(player, enemy_id, include_temp=True)
-            detection_level = 0.0
-            distance = None
-            detected_by = None
-
-            if info:
-                detection_level = info.get("detection_level", 0.0) or 0.0
-                distance = info.get("distance")
-                detected_by = info.get("detected_by")
-
-            if detection_level <= 0 and board is not None and sight > 0:
-                if None not in (*my_pos, enemy.q, enemy.r):
-                    distance = board.hex_distance(my_pos, (enemy.q, enemy.r))
-                    if distance is not None and distance < sight:
-                        detection_level = VisionService.calculate_detection_level(distance, sight)
-
-            if detection_level <= 0:
-                detection_map.pop(enemy_id, None)
-                continue
-
-            filtered = apply_detection_filter(enemy, detection_level)
-            filtered["detection_level"] = detection_level
-            if distance is not None:
-                filtered["distance"] = distance
-            if detected_by:
-                filtered["detected_by"] = detected_by
-
-            detection_map[enemy_id] = filtered
-
-        # Usuń wpisy dla zniszczonych żetonów
-        active_ids = {getattr(tok, "id", None) for tok in getattr(engine, "tokens", [])}
-        stale_keys = [key for key in detection_map.keys() if key not in active_ids]
-        for key in stale_keys:
-            detection_map.pop(key, None)
-
-        return detection_map
+            return dict(base_map or {})
+        # Wspólna migawka dowódcy (jeden przebieg po żetonach na wersję widoczności) + widok tego żetonu
+        snapshot = get_detection_snapshot(engine, player)
+        return snapshot.view_for(self.token, self._sight(), base_map)
 
     def _classify_status(self, context: Dict[str, Any]) -> str:
         max_cv = context.get("max_cv", 0) or 0
@@ -1321,11 +1288,38 @@ class TokenAI:
         engine,
         enemies: Optional[List] = None,
         detection_map: Optional[Dict[str, Dict[str, Any]]] = None,
-    ) -> Dict[Tuple[int, int], int]:
+        player=None,
+    ) -> Mapping[Tuple[int, int], int]:
+        """Liczba wrogów, w których zasięgu leży każdy heks.
+
+        Na prawdziwej planszy wynikiem jest ThreatMap gracza (tablica NumPy współdzielona
+        przez żetony dowódcy, tylko z kontaktami wykrytymi przez gracza) albo – gdy żeton
+        widzi własnym wzrokiem wrogów spoza obrazu dowódcy – ThreatView nad tą mapą;
+        na atrapach planszy – zwykły słownik heks -> liczba.
+        """
         enemies = enemies or []
         detection_map = detection_map or {}
-        danger: Dict[Tuple[int, int], int] = {}
         board = getattr(engine, "board", None) if engine else self.context.get("board")
+        if ThreatMap.supports(board):
+            contacts = {}
+            for enemy in enemies:
+                enemy_pos = (enemy.q, enemy.r)
+                if None in enemy_pos:
+                    continue
+                enemy_id = getattr(enemy, "id", None)
+                attack_range = self._perceived_attack_range(enemy, detection_map.get(enemy_id))
+                contacts[enemy_id if enemy_id is not None else id(enemy)] = (enemy_pos, attack_range)
+            threat_map = get_player_threat_map(player, board)
+            if threat_map is None:
+                threat_map = self._own_threat_map(board)
+                threat_map.sync(contacts)
+                return threat_map
+            shared_ids = self._commander_contact_ids(engine, player)
+            threat_map.sync({key: contact for key, contact in contacts.items() if key in shared_ids})
+            own = {key: contact for key, contact in contacts.items() if key not in shared_ids}
+            return ThreatView(threat_map, own) if own else threat_map
+
+        danger: Dict[Tuple[int, int], int] = {}
         for enemy in enemies:
             enemy_pos = (enemy.q, enemy.r)
             if None in enemy_pos:
@@ -1337,9 +1331,24 @@ class TokenAI:
                 danger[h] = danger.get(h, 0) + 1
         return danger
 
+    def _commander_contact_ids(self, engine, player) -> set:
+        snapshot = get_detection_snapshot(engine, player) if engine is not None else None
+        if snapshot is None:
+            return set()
+        return snapshot.commander_contact_ids(token_nation(self.token))
+
+    def _own_threat_map(self, board) -> ThreatMap:
+        # Bez gracza (np. szacowanie zagrożenia poza turą) – prywatna mapa tego żetonu
+        threat_map = getattr(self, "_threat_map", None)
+        if threat_map is None or threat_map.board is not board:
+            threat_map = self._threat_map = ThreatMap(board)
+        return threat_map
+
     def _hexes_in_range(self, center: Tuple[int, int], rng: int, board) -> List[Tuple[int, int]]:
         if rng <= 0:
             return [center]
+        if hasattr(board, "hex_index"):
+            return hexes_in_range(board, center, rng)
         hexes = []
         for dq in range(-rng, rng + 1):
             for dr in range(-rng, rng + 1):
@@ -1362,11 +1371,14 @@ class TokenAI:
         eq, er = end
         return int((abs(sq - eq) + abs(sr - er) + abs((sq - sr) - (eq - er))) / 2)
 
-    def _danger_level_at(self, position: Tuple[int, int], danger_zones: Dict[Tuple[int, int], int]) -> int:
+    def _danger_level_at(self, position: Tuple[int, int], danger_zones: Mapping[Tuple[int, int], int]) -> int:
         if position is None:
             return 0
+        if isinstance(danger_zones, (ThreatMap, ThreatView)):
+            return danger_zones.level_at(position)
         return danger_zones.get(position, 0)
 
+    @profiled("TokenAI._plan_candidates")
     def _plan_candidates(
         self,
         engine,
@@ -1383,30 +1395,15 @@ class TokenAI:
         if max_mp <= 0 or max_fuel <= 0:
             return [], {}
 
-        queue: List[Tuple[int, int, int, int]] = [(start[0], start[1], 0, 0)]
-        visited: Dict[Tuple[int, int], Tuple[int, int]] = {start: (0, 0)}
-        parents: Dict[Tuple[int, int], Optional[Tuple[int, int]]] = {start: None}
-        results: List[Tuple[int, int]] = []
-
-        while queue:
-            q, r, cost_mp, cost_fuel = queue.pop(0)
-            for neighbor in board.neighbors(q, r):
-                if not self._is_passable(engine, neighbor):
-                    continue
-                tile = board.get_tile(*neighbor)
-                move_mod = getattr(tile, "move_mod", 0) if tile else 0
-                step_cost = 1 + max(0, move_mod)
-                new_cost_mp = cost_mp + step_cost
-                new_cost_fuel = cost_fuel + step_cost
-                if new_cost_mp > max_mp or new_cost_fuel > max_fuel:
-                    continue
-                prev = visited.get(neighbor)
-                if prev and prev[0] <= new_cost_mp and prev[1] <= new_cost_fuel:
-                    continue
-                visited[neighbor] = (new_cost_mp, new_cost_fuel)
-                parents[neighbor] = (q, r)
-                queue.append((neighbor[0], neighbor[1], new_cost_mp, new_cost_fuel))
-                results.append(neighbor)
+        if hasattr(board, "reachability"):
+            # Mapa osiągalności z cache planszy – współdzielona z ponownymi próbami i ruchem awaryjnym.
+            # Koszt kroku jak w _search_reachable: 1 + max(0, move_mod) (teren z ujemnym
+            # move_mod nie jest tańszy niż 1 MP przy planowaniu).
+            reach = board.reachability(start, max_mp, max_fuel)
+            results = reach.order
+            parents = reach.parents
+        else:
+            results, parents = self._search_reachable(engine, board, start, max_mp, max_fuel)
 
         danger_zones = context.get("danger_zones", {}) or {}
         start_danger = self._danger_level_at(start, danger_zones)
@@ -1430,6 +1427,41 @@ class TokenAI:
             ]
         return filtered, parents
 
+    def _search_reachable(
+        self,
+        engine,
+        board,
+        start: Tuple[int, int],
+        max_mp: int,
+        max_fuel: int,
+    ) -> Tuple[List[Tuple[int, int]], Dict[Tuple[int, int], Optional[Tuple[int, int]]]]:
+        """Przeszukanie wszerz dla plansz bez Board.reachability (np. atrapy w testach)."""
+        queue = deque([(start[0], start[1], 0, 0)])
+        visited: Dict[Tuple[int, int], Tuple[int, int]] = {start: (0, 0)}
+        parents: Dict[Tuple[int, int], Optional[Tuple[int, int]]] = {start: None}
+        results: List[Tuple[int, int]] = []
+
+        while queue:
+            q, r, cost_mp, cost_fuel = queue.popleft()
+            for neighbor in board.neighbors(q, r):
+                if not self._is_passable(engine, neighbor):
+                    continue
+                tile = board.get_tile(*neighbor)
+                move_mod = getattr(tile, "move_mod", 0) if tile else 0
+                step_cost = 1 + max(0, move_mod)
+                new_cost_mp = cost_mp + step_cost
+                new_cost_fuel = cost_fuel + step_cost
+                if new_cost_mp > max_mp or new_cost_fuel > max_fuel:
+                    continue
+                prev = visited.get(neighbor)
+                if prev and prev[0] <= new_cost_mp and prev[1] <= new_cost_fuel:
+                    continue
+                visited[neighbor] = (new_cost_mp, new_cost_fuel)
+                parents[neighbor] = (q, r)
+                queue.append((neighbor[0], neighbor[1], new_cost_mp, new_cost_fuel))
+                results.append(neighbor)
+        return results, parents
+
     def _reconstruct_path(
         self,
         parents: Dict[Tuple[int, int], Optional[Tuple[int, int]]],
@@ -1506,6 +1538,7 @@ class TokenAI:
         support_score = support
         return float(safety_score + support_score + objective_score + distance_bonus + objective_bonus + repeat_penalty)
 
+    @profiled("TokenAI._select_best_hex")
     def _select_best_hex(
         self,
         engine,
@@ -1541,7 +1574,9 @@ class TokenAI:
         return self._danger_level_at(position, self.context.get("danger_zones", {})) > 0
 
     def _estimate_threat_level(self, engine, position: Tuple[int, int]) -> int:
-        danger_zones = self.context.get("danger_zones") or self._compute_danger_zones(engine, self.context.get("visible_enemies", []))
+        danger_zones = self.context.get("danger_zones")
+        if danger_zones is None:
+            danger_zones = self._compute_danger_zones(engine, self.context.get("visible_enemies", []))
         return self._danger_level_at(position, danger_zones)
 
     def _can_risk_attack(self, context: Dict[str, Any], has_support: bool = False) -> bool:
@@ -1736,7 +1771,7 @@ class TokenAI:
             evaluation["risk_type"] = "aggressive"
             if ratio_adjusted >= gamble_threshold:
                 aggression_chance = 0.12 + (0.08 * detection_level)
-                roll = random.random()
+                roll = (context.get("rng") or random).random()
                 evaluation["aggression_chance"] = aggression_chance
                 evaluation["risk_roll"] = roll
                 if roll <= aggression_chance:
@@ -482,7 +482,7 @@ class AIGameLauncher:
             game_engine.update_all_players_visibility(players)
             
             # Sprawdź warunki zwycięstwa
-            if victory_conditions.check_game_over(turn_manager.current_turn, players):
+            if victory_conditions.check_game_over(turn_manager.current_turn, players, game_engine):
                 print(victory_conditions.get_victory_message())
                 
                 victory_info = victory_conditions.get_victory_info()
@@ -10,10 +10,10 @@ class EconomySystem:
         self.special_points = 0
         self.assigned_points = 0  # Dodano pole do przechowywania przydzielonych punktów
 
-    def generate_economic_points(self):
-        """Generuje punkty ekonomiczne."""
+    def generate_economic_points(self, rng=None):
+        """Generuje punkty ekonomiczne (rng: strumień ekonomii partii; domyślnie globalny random)."""
         start_points = self.economic_points
-        points = random.randint(1, 100)
+        points = (rng or random).randint(1, 100)
         self.economic_points += points
 
     def add_special_points(self):
@@ -0,0 +1,178 @@
+"""
+Farma symulacji – równoległe rozgrywanie partii AI vs AI w puli procesów.
+
+Silnik i AI trzymają stan w singletonach modułów (AI logger, SessionManager, wspólna pamięć
+wywiadu, kontekst tury) i używają ścieżek względnych (saves/, data/map_data.json,
+assets/tokens/, ai/logs/). Dlatego każdy proces roboczy dostaje własny katalog roboczy
+z kopią mapy i plików startowych, a przed każdą partią singletony są zerowane.
+Wyniki wszystkich procesów są scalane w jedno FarmSummary.
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core.symulacja import (
+    DEFAULT_MAP_PATH,
+    DEFAULT_TOKENS_INDEX_PATH,
+    DEFAULT_TOKENS_START_PATH,
+    GameResult,
+    run_headless_game,
+)
+
+# Ścieżki względne wewnątrz katalogu roboczego procesu
+WORKER_MAP_PATH = os.path.join("data", "map_data.json")
+WORKER_TOKENS_INDEX_PATH = os.path.join("assets", "tokens", "index.json")
+WORKER_TOKENS_START_PATH = os.path.join("assets", "start_tokens.json")
+
+# Stan procesu roboczego (ustawiany w _init_worker)
+_WORKER_STATE: Dict[str, str] = {}
+
+
+@dataclass
+class FarmSummary:
+    """Scalone podsumowanie partii z całej farmy."""
+    games: int = 0
+    workers: int = 0
+    errors: int = 0
+    wins: Dict[str, int] = field(default_factory=dict)
+    draws: int = 0
+    avg_turns: float = 0.0
+    avg_game_s: float = 0.0
+    wall_time_s: float = 0.0
+    games_per_s: float = 0.0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def prepare_worker_dir(
+    root: Path,
+    name: str,
+    map_path: str = DEFAULT_MAP_PATH,
+    tokens_index_path: str = DEFAULT_TOKENS_INDEX_PATH,
+    tokens_start_path: str = DEFAULT_TOKENS_START_PATH,
+) -> Path:
+    """Zakłada izolowany katalog roboczy z kopią mapy, indeksu żetonów i żetonów startowych."""
+    workdir = Path(root) / name
+    for relative, source in (
+        (WORKER_MAP_PATH, map_path),
+        (WORKER_TOKENS_INDEX_PATH, tokens_index_path),
+        (WORKER_TOKENS_START_PATH, tokens_start_path),
+    ):
+        target = workdir / relative
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(source, target)
+    (workdir / "saves").mkdir(exist_ok=True)
+    return workdir
+
+
+def reset_game_singletons(log_dir: Optional[str] = None) -> None:
+    """Zeruje stan globalny, który inaczej przeciekałby między partiami w jednym procesie."""
+    from ai.logs import AILogger, set_ai_logger
+    from ai.tokens.specialized_ai import reset_shared_intel_memory
+    from utils.session_manager import SessionManager
+    from utils.turn_context import clear_correlation_id, clear_current_turn
+
+    set_ai_logger(AILogger(log_dir=log_dir) if log_dir else None)
+    SessionManager.reset()
+    reset_shared_intel_memory()
+    clear_current_turn()
+    clear_correlation_id()
+
+
+def _init_worker(root: str, map_path: str, tokens_index_path: str, tokens_start_path: str) -> None:
+    workdir = prepare_worker_dir(Path(root), f"worker_{os.getpid()}", map_path, tokens_index_path, tokens_start_path)
+    os.chdir(workdir)
+    _WORKER_STATE["workdir"] = str(workdir)
+    _WORKER_STATE["log_dir"] = str(workdir / "ai" / "logs")
+
+
+def _play_in_worker(seed: int, max_turns: int, victory_mode: str) -> dict:
+    reset_game_singletons(_WORKER_STATE.get("log_dir"))
+    result = run_headless_game(
+        seed,
+        max_turns=max_turns,
+        victory_mode=victory_mode,
+        map_path=WORKER_MAP_PATH,
+        tokens_index_path=WORKER_TOKENS_INDEX_PATH,
+        tokens_start_path=WORKER_TOKENS_START_PATH,
+    )
+    return result.to_dict()
+
+
+def summarize(results: List[GameResult], wall_time_s: float, workers: int) -> FarmSummary:
+    """Scala rekordy partii w jedno podsumowanie."""
+    summary = FarmSummary(games=len(results), workers=workers, wall_time_s=round(wall_time_s, 3))
+    wins: Counter = Counter()
+    finished = [r for r in results if not r.error]
+    for result in results:
+        if result.error:
+            summary.errors += 1
+        elif result.winner_nation:
+            wins[result.winner_nation] += 1
+        else:
+            summary.draws += 1
+    summary.wins = dict(wins)
+    if finished:
+        summary.avg_turns = round(sum(r.turns_played for r in finished) / len(finished), 2)
+        summary.avg_game_s = round(sum(r.duration_s for r in finished) / len(finished), 3)
+    if wall_time_s > 0:
+        summary.games_per_s = round(len(results) / wall_time_s, 3)
+    return summary
+
+
+def run_farm(
+    games: int,
+    base_seed: int = 0,
+    workers: Optional[int] = None,
+    max_turns: int = 10,
+    victory_mode: str = "turns",
+    root: Optional[str] = None,
+    map_path: str = DEFAULT_MAP_PATH,
+    tokens_index_path: str = DEFAULT_TOKENS_INDEX_PATH,
+    tokens_start_path: str = DEFAULT_TOKENS_START_PATH,
+    on_result: Optional[Callable[[GameResult], None]] = None,
+) -> Tuple[List[GameResult], FarmSummary]:
+    """Rozgrywa `games` partii (ziarna base_seed..base_seed+games-1) na `workers` procesach
+    (domyślnie wszystkie rdzenie). Zwraca wyniki posortowane po ziarnie i scalone podsumowanie.
+    Katalogi robocze procesów powstają w `root` (domyślnie nowy katalog tymczasowy) i zostają
+    na dysku razem z logami AI."""
+    workers = max(1, min(workers or os.cpu_count() or 1, games or 1))
+    root = root or tempfile.mkdtemp(prefix="farma_symulacji_")
+    os.makedirs(root, exist_ok=True)
+    init_args = (
+        os.path.abspath(root),
+        os.path.abspath(map_path),
+        os.path.abspath(tokens_index_path),
+        os.path.abspath(tokens_start_path),
+    )
+
+    results: List[GameResult] = []
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as pool:
+        futures = {
+            pool.submit(_play_in_worker, base_seed + index, max_turns, victory_mode): base_seed + index
+            for index in range(games)
+        }
+        for future in as_completed(futures):
+            try:
+                result = GameResult(**future.result())
+            except Exception as exc:
+                # Awaria procesu roboczego – zapisz jako błąd partii, nie przerywaj farmy
+                result = GameResult(seed=futures[future], victory_mode=victory_mode, max_turns=max_turns,
+                                    error=f"{type(exc).__name__}: {exc}")
+            results.append(result)
+            if on_result:
+                on_result(result)
+    wall_time = time.perf_counter() - started
+
+    results.sort(key=lambda r: r.seed)
+    return results, summarize(results, wall_time, workers)
@@ -1,7 +1,9 @@
 import random
 
 class Pogoda:
-    def __init__(self):
+    def __init__(self, rng=None):
+        # rng: strumień pogody partii (engine.rng.get_rng(silnik, "weather")); domyślnie globalny random
+        self.rng = rng or random
         self.temperatura = None
         self.zachmurzenie = None
         self.opady = None
@@ -13,25 +15,25 @@ class Pogoda:
         max_temp = None
 
         if self.poprzednia_temperatura is None:
-            self.temperatura = random.randint(-5, 25)  # Pierwszy dzień bez ograniczeń
+            self.temperatura = self.rng.randint(-5, 25)  # Pierwszy dzień bez ograniczeń
         else:
             min_temp = max(-5, self.poprzednia_temperatura - 2)
             max_temp = min(25, self.poprzednia_temperatura + 2)
-            self.temperatura = random.randint(min_temp, max_temp)
+            self.temperatura = self.rng.randint(min_temp, max_temp)
 
         # Zapisanie obecnej temperatury jako poprzedniej na przyszłość
         self.poprzednia_temperatura = self.temperatura
 
         # Generowanie zachmurzenia
-        self.zachmurzenie = random.choice(["Bezchmurnie", "Zachmurzenie umiarkowane", "Duże zachmurzenie"])
+        self.zachmurzenie = self.rng.choice(["Bezchmurnie", "Zachmurzenie umiarkowane", "Duże zachmurzenie"])
 
         # Generowanie opadów z walidacją
         if self.zachmurzenie == "Bezchmurnie":
             self.opady = "Bezdeszczowo"
         elif self.zachmurzenie == "Zachmurzenie umiarkowane":
-            self.opady = random.choice(["Bezdeszczowo", "Lekkie opady"])
+            self.opady = self.rng.choice(["Bezdeszczowo", "Lekkie opady"])
         else:  # Duże zachmurzenie
-            self.opady = random.choice(["Bezdeszczowo", "Lekkie opady", "Intensywne opady"])
+            self.opady = self.rng.choice(["Bezdeszczowo", "Lekkie opady", "Intensywne opady"])
 
         # Dodanie opadów śniegu, jeśli temperatura poniżej zera i nie jest bezdeszczowo
         if self.temperatura < 0 and self.opady != "Bezdeszczowo":
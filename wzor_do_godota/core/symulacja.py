@@ -0,0 +1,172 @@
+"""
+Symulacja wsadowa gier AI vs AI bez GUI.
+
+Buduje GameEngine, sześciu graczy AI (Generał + 2 Dowódców na stronę), TurnManager
+i VictoryConditions, rozgrywa partię do końca i zwraca zwięzły rekord wyniku.
+Uruchomienie z linii poleceń: scripts/batch_ai_games.py.
+"""
+from __future__ import annotations
+
+import contextlib
+import os
+import random
+import time
+import traceback
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_MAP_PATH = str(PROJECT_ROOT / "data" / "map_data.json")
+DEFAULT_TOKENS_INDEX_PATH = str(PROJECT_ROOT / "assets" / "tokens" / "index.json")
+DEFAULT_TOKENS_START_PATH = str(PROJECT_ROOT / "assets" / "start_tokens.json")
+
+# Kolejność i role graczy jak w ai_launcher / scripts/auto_ai_session.py
+PLAYER_SETUP = [
+    (1, "Polska", "Generał"),
+    (2, "Polska", "Dowódca"),
+    (3, "Polska", "Dowódca"),
+    (4, "Niemcy", "Generał"),
+    (5, "Niemcy", "Dowódca"),
+    (6, "Niemcy", "Dowódca"),
+]
+
+
+@dataclass
+class GameResult:
+    """Zwięzły wynik jednej partii."""
+    seed: int
+    winner_nation: Optional[str] = None
+    victory_reason: str = ""
+    victory_mode: str = "turns"
+    max_turns: int = 0
+    turns_played: int = 0
+    player_turns: int = 0
+    victory_points: Dict[str, int] = field(default_factory=dict)
+    units_alive: Dict[str, int] = field(default_factory=dict)
+    combat_value: Dict[str, int] = field(default_factory=dict)
+    duration_s: float = 0.0
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def build_ai_players() -> List:
+    """Tworzy sześciu graczy AI z własną ekonomią."""
+    from core.ekonomia import EconomySystem
+    from engine.player import Player
+
+    players = []
+    for player_id, nation, role in PLAYER_SETUP:
+        player = Player(player_id, nation, role, time_limit=5, economy=EconomySystem())
+        player.is_ai = True
+        player.is_ai_commander = role == "Dowódca"
+        players.append(player)
+    return players
+
+
+def _summarize(result: GameResult, players, tokens) -> None:
+    from engine.token import token_nation
+
+    for player in players:
+        result.victory_points[player.nation] = result.victory_points.get(player.nation, 0) + getattr(player, "victory_points", 0)
+        result.units_alive.setdefault(player.nation, 0)
+        result.combat_value.setdefault(player.nation, 0)
+    for token in tokens:
+        nation = token_nation(token)
+        if nation is None:
+            continue
+        result.units_alive[nation] = result.units_alive.get(nation, 0) + 1
+        result.combat_value[nation] = result.combat_value.get(nation, 0) + int(getattr(token, "combat_value", 0) or 0)
+
+
+def run_headless_game(
+    seed: int,
+    max_turns: int = 10,
+    victory_mode: str = "turns",
+    map_path: str = DEFAULT_MAP_PATH,
+    tokens_index_path: str = DEFAULT_TOKENS_INDEX_PATH,
+    tokens_start_path: str = DEFAULT_TOKENS_START_PATH,
+    quiet: bool = True,
+) -> GameResult:
+    """Rozgrywa jedną partię AI vs AI do końca i zwraca GameResult.
+    quiet=True wycisza wydruki AI na stdout (logi plikowe AI działają bez zmian).
+    Błąd w trakcie partii nie przerywa wywołującego – trafia do GameResult.error."""
+    result = GameResult(seed=seed, victory_mode=victory_mode, max_turns=max_turns)
+    started = time.perf_counter()
+    sink = open(os.devnull, "w", encoding="utf-8") if quiet else None
+    try:
+        with contextlib.redirect_stdout(sink) if sink else contextlib.nullcontext():
+            _play(result, seed, max_turns, victory_mode, map_path, tokens_index_path, tokens_start_path)
+    except Exception as exc:
+        result.error = f"{type(exc).__name__}: {exc}"
+        if not quiet:
+            traceback.print_exc()
+    finally:
+        if sink:
+            sink.close()
+        result.duration_s = round(time.perf_counter() - started, 3)
+    return result
+
+
+def _play(result: GameResult, seed, max_turns, victory_mode, map_path, tokens_index_path, tokens_start_path) -> None:
+    from ai import CommanderAI, GeneralAI
+    from core.tura import TurnManager
+    from core.zwyciestwo import VictoryConditions
+    from engine.engine import GameEngine, clear_temp_visibility, update_all_players_visibility
+    from utils.turn_context import set_current_turn
+
+    # Silnik losuje ze strumieni GameRNG(seed); globalny random zasiewany dla kodu spoza silnika
+    random.seed(seed)
+    engine = GameEngine(
+        map_path=map_path,
+        tokens_index_path=tokens_index_path,
+        tokens_start_path=tokens_start_path,
+        seed=seed,
+        read_only=True,
+        load_saved_state=False,
+    )
+    players = build_ai_players()
+    engine.players = players
+    update_all_players_visibility(players, engine.tokens, engine.board)
+
+    generals = {p.id: GeneralAI(p) for p in players if p.role == "Generał"}
+    commanders = {p.id: CommanderAI(p) for p in players if p.role == "Dowódca"}
+    turn_manager = TurnManager(players, game_engine=engine)
+    victory = VictoryConditions(max_turns=max_turns, victory_mode=victory_mode)
+
+    # Zabezpieczenie przed nieskończoną pętlą (np. gdy warunki zwycięstwa nigdy nie zajdą)
+    max_player_turns = (max_turns + 1) * len(players)
+    while result.player_turns < max_player_turns:
+        set_current_turn(turn_manager.current_turn)
+        current_player = turn_manager.get_current_player()
+        engine.current_player_obj = current_player
+        if current_player.role == "Generał":
+            generals[current_player.id].execute_turn(players, engine)
+        elif current_player.role == "Dowódca":
+            commanders[current_player.id].execute_turn(engine)
+        result.player_turns += 1
+
+        update_all_players_visibility(players, engine.tokens, engine.board)
+        if turn_manager.next_turn():
+            result.turns_played += 1
+            engine.process_key_points(players)
+            engine.update_all_players_visibility(players)
+            clear_temp_visibility(players)
+        set_current_turn(turn_manager.current_turn)
+
+        if victory.check_game_over(turn_manager.current_turn, players, engine):
+            break
+
+    info = victory.get_victory_info()
+    result.winner_nation = info.get("winner_nation")
+    result.victory_reason = info.get("victory_reason") or ""
+    _summarize(result, players, engine.tokens)
+
+
+def run_batch(games: int, base_seed: int = 0, **kwargs) -> Iterator[GameResult]:
+    """Rozgrywa `games` partii z ziarnami base_seed, base_seed+1, ...; zwraca wyniki na bieżąco."""
+    for index in range(games):
+        yield run_headless_game(base_seed + index, **kwargs)
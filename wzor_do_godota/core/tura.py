@@ -44,7 +44,8 @@ class TurnManager:
 
         # Inicjalizacja obiektu Pogoda jako atrybutu klasy
         from core.pogoda import Pogoda
-        self.weather = Pogoda()
+        from engine.rng import WEATHER, get_rng
+        self.weather = Pogoda(rng=get_rng(game_engine, WEATHER))
         self.weather.generuj_pogode()
         self.current_weather = self.weather.generuj_raport_pogodowy()
 
@@ -105,6 +106,10 @@ class TurnManager:
         Przechodzi do następnego gracza w kolejności.
         Zwraca True, jeśli wszyscy gracze zakończyli swoje tury.
         """
+        # Koniec tury gracza – zbuforowane logi AI trafiają na dysk
+        from ai.logs import flush_ai_logs
+        flush_ai_logs()
+
         self.current_player_index += 1
 
         if self.current_player_index >= len(self.players):
@@ -126,10 +131,18 @@ class TurnManager:
                 self.weather.generuj_pogode()
                 self.current_weather = self.weather.generuj_raport_pogodowy()
 
+            self._journal_checkpoint()
             return True  # Zakończono pełną turę
 
+        self._journal_checkpoint()
         return False
 
+    def _journal_checkpoint(self):
+        """Punkt kontrolny dziennika akcji silnika (engine.replay) po turze gracza."""
+        journal = getattr(self.game_engine, 'journal', None)
+        if journal is not None:
+            journal.record_checkpoint(self.game_engine)
+
     def get_current_player(self):
         """
         Zwraca aktualnego gracza.
@@ -13,11 +13,12 @@ class VictoryConditions:
         self.winner_nation = None
         self.victory_reason = ""
 
-    def check_game_over(self, current_turn, players=None):
+    def check_game_over(self, current_turn, players=None, game_engine=None):
         """
         Sprawdza, czy gra się zakończyła.
         :param current_turn: Aktualny numer tury.
         :param players: Lista graczy (potrzebna dla trybu eliminacji).
+        :param game_engine: Silnik gry (liczniki żywych jednostek dla trybu eliminacji).
         :return: True, jeśli gra się zakończyła, False w przeciwnym razie.
         """
         if self.game_over:
@@ -38,36 +39,19 @@ class VictoryConditions:
         
         # Sprawdzenie eliminacji (tylko w trybie elimination)
         if self.victory_mode == "elimination" and players:
-            return self._check_elimination_victory(players)
+            return self._check_elimination_victory(players, game_engine)
             
         return False
 
-    def _check_elimination_victory(self, players):
-        """Sprawdza warunki zwycięstwa przez eliminację"""
+    def _check_elimination_victory(self, players, game_engine=None):
+        """Sprawdza warunki zwycięstwa przez eliminację – O(graczy) dzięki licznikom rejestru żetonów"""
         # Grupuj graczy po narodach
         nations_alive = {}
         for player in players:
             if player.nation not in nations_alive:
                 nations_alive[player.nation] = False
-            
-            # Sprawdź czy gracz ma żywe jednostki (używamy globalnego game_engine jeśli dostępny)
-            try:
-                from engine.engine import GameEngine
-                # Znajdź aktywny GameEngine w module
-                game_engine = None
-                import sys
-                for name, obj in sys.modules.items():
-                    if hasattr(obj, 'game_engine') and hasattr(obj.game_engine, 'tokens'):
-                        game_engine = obj.game_engine
-                        break
-                        
-                if game_engine and player.has_living_units(game_engine):
-                    nations_alive[player.nation] = True
-                else:
-                    # Fallback - sprawdź czy ma dowolne tokeny (bez sprawdzania HP)
-                    nations_alive[player.nation] = True  # Zakładamy że żyje
-            except:
-                # W przypadku błędu zakładaj że naród żyje
+            # Bez silnika nie wiemy nic o jednostkach – has_living_units zakłada, że naród żyje
+            if not nations_alive[player.nation] and player.has_living_units(game_engine):
                 nations_alive[player.nation] = True
         
         # Policz żywych narodów
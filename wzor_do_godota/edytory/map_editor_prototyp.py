@@ -82,6 +82,11 @@ EDGE_BLEND_PROFILE_LABEL_TO_KEY = {meta["label"]: key for key, meta in EDGE_BLEN
 BRUSH_RADIUS_MIN = 0
 BRUSH_RADIUS_MAX = 4
 BRUSH_RADIUS_DEFAULT = 1
+# Okno widoku siatki: elementy heksów (tekstura, obrys, opis) istnieją tylko przy widocznym obszarze
+GRID_VIEWPORT_MARGIN_HEXES = 4
+# Uproszczony poziom szczegółów (bez tekstur, obrysów i opisów) – małe heksy albo bardzo dużo heksów w oknie
+GRID_LOD_MIN_HEX_PX = 12
+GRID_LOD_MAX_DETAILED_HEXES = 3000
 
 HEX_TEXTURE_DIR = ASSET_ROOT / "terrain" / "hex_painted"
 HEX_TEXTURE_DIR.mkdir(parents=True, exist_ok=True)
@@ -2419,11 +2424,11 @@ class MapEditor:
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
         # Dodanie suwaka pionowego
-        self.v_scrollbar = tk.Scrollbar(self.canvas_frame, orient=tk.VERTICAL, command=self.canvas.yview)
+        self.v_scrollbar = tk.Scrollbar(self.canvas_frame, orient=tk.VERTICAL, command=self._on_canvas_yview)
         self.v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
         # Przeniesienie poziomego suwaka do root
-        self.h_scrollbar = tk.Scrollbar(self.root, orient=tk.HORIZONTAL, command=self.canvas.xview)
+        self.h_scrollbar = tk.Scrollbar(self.root, orient=tk.HORIZONTAL, command=self._on_canvas_xview)
         self.h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
         self.canvas.configure(xscrollcommand=self.h_scrollbar.set, yscrollcommand=self.v_scrollbar.set)
 
@@ -2435,6 +2440,7 @@ class MapEditor:
         self.canvas.bind("<B2-Motion>", self.do_pan)
         self.canvas.bind("<ButtonPress-2>", self.start_pan)
         self.canvas.bind("<Motion>", self.on_canvas_hover)
+        self.canvas.bind("<Configure>", lambda _e: self._schedule_grid_viewport())
         
         # Bind klawiatury
         self.root.bind("<Delete>", self.delete_token_from_selected_hex)
@@ -2756,6 +2762,10 @@ class MapEditor:
         if not hasattr(self, 'photo_bg'):
             self.photo_bg = ImageTk.PhotoImage(Image.new("RGB", (1, 1), (255, 255, 255)))
         self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo_bg)
+        # Niewidoczny znacznik warstwy: elementy heksów wstawiane pod niego, pod żetony i znaczniki
+        self._grid_layer_marker = self.canvas.create_line(0, 0, 0, 0, state="hidden", tags="grid_layer_marker")
+        self._grid_cells = set()
+        self._grid_detail = None
         self.hex_centers = {}
         s = self.hex_size
         hex_height = math.sqrt(3) * s
@@ -2787,14 +2797,8 @@ class MapEditor:
                         "defense_mod": 0
                     }
 
-                terrain = self.hex_data.get(hex_id, self.hex_defaults)
-                texture_rel = terrain.get("texture")
-                if texture_rel:
-                    texture_image = self._get_hex_texture_image(texture_rel)
-                    if texture_image:
-                        self.canvas.create_image(center_x, center_y, image=texture_image)
-                        self.canvas.image_store.append(texture_image)
-                self.draw_hex(hex_id, center_x, center_y, s, terrain)
+        # Tekstury, obrysy i opisy tylko dla heksów w oknie widoku
+        self._update_grid_viewport()
 
     # Rysowanie żetonów na mapie
         for hex_id, terrain in self.hex_data.items():
@@ -2832,7 +2836,8 @@ class MapEditor:
     def draw_hex(self, hex_id, center_x, center_y, s, terrain=None):
         'Rysuje pojedynczy heksagon na canvasie wraz z tekstem modyfikatorów.'
         points = get_hex_vertices(center_x, center_y, s)
-        self.canvas.create_polygon(points, outline="red", fill="", width=2, tags=hex_id)        # usuwamy poprzedni tekst
+        cell_tags = ("grid_cell", f"cell_{hex_id}")
+        self.canvas.create_polygon(points, outline="red", fill="", width=2, tags=(hex_id,) + cell_tags)        # usuwamy poprzedni tekst
         self.canvas.delete(f"tekst_{hex_id}")
         # rysujemy modyfikatory tylko jeśli ten heks ma niestandardowe dane
         if hex_id in self.hex_data:
@@ -2845,9 +2850,98 @@ class MapEditor:
                 fill="blue",
                 font=("Arial", 10),
                 anchor="center",
-                tags=f"tekst_{hex_id}"
+                tags=(f"tekst_{hex_id}",) + cell_tags
             )
 
+    def _draw_grid_cell(self, hex_id):
+        """Tekstura, obrys i opis jednego heksa, wstawione pod znacznik warstwy siatki."""
+        center_x, center_y = self.hex_centers[hex_id]
+        terrain = self.hex_data.get(hex_id, self.hex_defaults)
+        texture_rel = terrain.get("texture")
+        if texture_rel:
+            # Obraz trzyma hex_texture_cache – bez dopisywania do canvas.image_store przy każdym przewinięciu
+            texture_image = self._get_hex_texture_image(texture_rel)
+            if texture_image:
+                self.canvas.create_image(center_x, center_y, image=texture_image, tags=("grid_cell", f"cell_{hex_id}"))
+        self.draw_hex(hex_id, center_x, center_y, self.hex_size, terrain)
+        self.canvas.tag_lower(f"cell_{hex_id}", self._grid_layer_marker)
+
+    def _redraw_grid_cell(self, hex_id):
+        """Odrysowanie heksa po edycji: stare elementy usunięte, nowe tylko gdy heks jest w oknie widoku."""
+        self.canvas.delete(f"cell_{hex_id}")
+        if hex_id in self._grid_cells:
+            self._draw_grid_cell(hex_id)
+
+    def _canvas_view_rect(self):
+        """Widoczny obszar canvasu mapy we współrzędnych świata: (x0, y0, x1, y1)."""
+        try:
+            width = self.canvas.winfo_width()
+            height = self.canvas.winfo_height()
+            if width <= 1 or height <= 1:
+                # Okno jeszcze nie wyświetlone – rozmiar z konfiguracji canvasu
+                width = int(self.canvas.cget("width"))
+                height = int(self.canvas.cget("height"))
+            x0 = self.canvas.canvasx(0)
+            y0 = self.canvas.canvasy(0)
+        except (tk.TclError, ValueError):
+            return (0, 0, getattr(self, "world_width", 0), getattr(self, "world_height", 0))
+        return (x0, y0, x0 + width, y0 + height)
+
+    def _update_grid_viewport(self):
+        """Tworzy elementy heksów wchodzących w okno widoku (z zapasem) i usuwa te, które z niego wyszły.
+        Edytor nie ma skalowania, więc uproszczony poziom ('coarse' – heksy bez własnych elementów,
+        tylko tło, żetony i znaczniki) zależy od hex_size mapy i rozmiaru okna."""
+        self._grid_viewport_job = None
+        if not getattr(self, "hex_centers", None) or getattr(self, "_grid_layer_marker", None) is None:
+            return
+        x0, y0, x1, y1 = self._canvas_view_rect()
+        s = self.hex_size
+        # Pole heksa = 3·√3/2·s²
+        hexes_in_view = (x1 - x0) * (y1 - y0) / (2.598 * s * s)
+        detail = "coarse" if s < GRID_LOD_MIN_HEX_PX or hexes_in_view > GRID_LOD_MAX_DETAILED_HEXES else "full"
+        if detail != self._grid_detail:
+            self.canvas.delete("grid_cell")
+            self._grid_cells = set()
+            self._grid_detail = detail
+
+        wanted = set()
+        if detail == "full":
+            margin = s * 2 * GRID_VIEWPORT_MARGIN_HEXES
+            horizontal_spacing = 1.5 * s
+            hex_height = math.sqrt(3) * s
+            col_min = max(0, int((x0 - margin - s) // horizontal_spacing))
+            col_max = int((x1 + margin - s) // horizontal_spacing) + 1
+            row_min = max(0, int((y0 - margin) // hex_height) - 1)
+            row_max = int((y1 + margin) // hex_height) + 1
+            for col in range(col_min, col_max + 1):
+                for row in range(row_min, row_max + 1):
+                    # offset even-q -> axial, jak w draw_grid
+                    hex_id = f"{col},{row - (col // 2)}"
+                    if hex_id in self.hex_centers:
+                        wanted.add(hex_id)
+        for hex_id in self._grid_cells - wanted:
+            self.canvas.delete(f"cell_{hex_id}")
+        for hex_id in wanted - self._grid_cells:
+            self._draw_grid_cell(hex_id)
+        self._grid_cells = wanted
+
+    def _schedule_grid_viewport(self):
+        """Aktualizacja okna widoku po przewinięciu – raz na serię zdarzeń."""
+        if getattr(self, "_grid_viewport_job", None) is not None:
+            return
+        try:
+            self._grid_viewport_job = self.canvas.after_idle(self._update_grid_viewport)
+        except tk.TclError:
+            self._grid_viewport_job = None
+
+    def _on_canvas_xview(self, *args):
+        self.canvas.xview(*args)
+        self._schedule_grid_viewport()
+
+    def _on_canvas_yview(self, *args):
+        self.canvas.yview(*args)
+        self._schedule_grid_viewport()
+
     def draw_spawn_marker(self, nation, hex_id):
         """Rysuje prosty, wyraźny znacznik punktu wystawienia (kolorowa obwódka + litera nacji)."""
         if hex_id not in self.hex_centers:
@@ -8855,7 +8949,6 @@ class MapEditor:
                 self._clear_flat_texture_from_record(updated_record)
 
             self.hex_data[self.selected_hex] = updated_record
-            terrain_for_draw = updated_record
             # Zapisz dane i odrysuj heks
             self.save_data()
             new_texture = updated_record.get("texture")
@@ -8863,8 +8956,7 @@ class MapEditor:
             if needs_full_redraw:
                 self.draw_grid()
             else:
-                cx, cy = self.hex_centers[self.selected_hex]
-                self.draw_hex(self.selected_hex, cx, cy, self.hex_size, terrain_for_draw)
+                self._redraw_grid_cell(self.selected_hex)
             self.update_hex_info_display(self.selected_hex)
             messagebox.showinfo("Zapisano", f"Dla heksu {self.selected_hex} ustawiono teren: {terrain_key}")
             self.auto_save('malowanie terenu')
@@ -9071,8 +9163,7 @@ class MapEditor:
         if previous_texture != new_texture:
             self.draw_grid()
         else:
-            cx, cy = self.hex_centers[target_hex]
-            self.draw_hex(target_hex, cx, cy, self.hex_size, record)
+            self._redraw_grid_cell(target_hex)
 
         if self.selected_hex == target_hex:
             self.update_hex_info_display(target_hex)
@@ -9479,6 +9570,7 @@ class MapEditor:
     def do_pan(self, event):
         'Przesuwa mapę myszką.'
         self.canvas.scan_dragto(event.x, event.y, gain=1)
+        self._schedule_grid_viewport()
 
     def start_pan(self, event):
         'Rozpoczyna przesuwanie mapy myszką.'
@@ -9715,15 +9807,13 @@ class MapEditor:
                 self._clear_flat_texture_from_record(updated_record)
 
             self.hex_data[hex_id] = updated_record
-            terrain_for_draw = updated_record
             self.save_data()
             new_texture = updated_record.get("texture")
             needs_full_redraw = previous_texture != new_texture
             if needs_full_redraw:
                 self.draw_grid()
             else:
-                cx, cy = self.hex_centers[hex_id]
-                self.draw_hex(hex_id, cx, cy, self.hex_size, terrain_for_draw)
+                self._redraw_grid_cell(hex_id)
             if self.selected_hex == hex_id:
                 self.update_hex_info_display(hex_id)
         else:
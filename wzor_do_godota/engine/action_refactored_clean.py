@@ -7,6 +7,12 @@ Podział na mniejsze, testowalne komponenty
 from typing import Tuple, Optional, Dict, Any, List, Set
 from dataclasses import dataclass
 
+from engine.hex_utils import hexes_in_range
+from engine.rng import COMBAT, RETREAT, get_rng
+from engine.token import owned_by, token_nation
+from engine.token_registry import find_token
+from engine.detection_filter import mark_visibility_changed
+
 
 @dataclass
 class ActionResult:
@@ -32,7 +38,7 @@ class BaseAction:
     
     def _find_token(self, engine, token_id: str):
         """Znajdź żeton po ID"""
-        return next((t for t in engine.tokens if t.id == token_id), None)
+        return find_token(engine, token_id)
     
     def _find_player_by_token(self, engine, token):
         """Znajdź gracza będącego właścicielem żetonu"""
@@ -40,7 +46,7 @@ class BaseAction:
             return None
         
         for player in getattr(engine, 'players', []):
-            if token.owner == f"{player.id} ({player.nation})":
+            if owned_by(token, player):
                 return player
         return None
 
@@ -63,8 +69,12 @@ class MovementValidator:
         
         # Sprawdź czy pole nie jest zajęte przez sojusznika
         if engine.board.is_occupied(dest_q, dest_r):
-            for t in engine.tokens:
-                if t.q == dest_q and t.r == dest_r and t.owner == token.owner:
+            if hasattr(engine.board, 'tokens_at'):
+                occupants = engine.board.tokens_at(dest_q, dest_r)
+            else:
+                occupants = [t for t in engine.tokens if t.q == dest_q and t.r == dest_r]
+            for t in occupants:
+                if t.owner == token.owner:
                     return False, "Pole zajęte przez sojusznika."
         
         return True, "OK"
@@ -105,7 +115,19 @@ class PathfindingService:
         if player and hasattr(player, 'visible_tokens'):
             visible_tokens = set(player.visible_tokens)
         
-        return engine.board.find_path(
+        board = engine.board
+        if hasattr(board, 'reachability'):
+            # Jedna mapa osiągalności na (start, MP, paliwo, wersja zajętości) – ponowne próby ruchu korzystają z cache
+            reach = board.reachability(start, token.currentMovePoints, token.currentFuel, visible_tokens)
+            path = reach.path_to(tuple(goal))
+            if path is not None:
+                return path
+            closest = reach.closest_to(tuple(goal))
+            if closest == reach.start:
+                return None
+            return reach.path_to(closest)
+
+        return board.find_path(
             start, goal,
             max_mp=token.currentMovePoints,
             max_fuel=token.currentFuel,
@@ -127,7 +149,7 @@ class PathfindingService:
         for step in path[1:]:  # pomijamy start
             tile = engine.board.get_tile(*step)
             move_mod = getattr(tile, 'move_mod', 0)
-            move_cost = 1 + move_mod
+            move_cost = max(1, 1 + move_mod)  # jak w Board.find_path / reachability
             
             # Sprawdź czy stać na ten krok
             if (token.currentMovePoints - (path_cost + move_cost) < 0 or 
@@ -150,19 +172,16 @@ class PathfindingService:
     @staticmethod
     def _enemy_in_sight(engine, token, position: Tuple[int, int], sight: int) -> bool:
         """Sprawdź czy w polu widzenia jest przeciwnik"""
+        if not getattr(token, 'owner', None):
+            return False
         visible_hexes = VisionService.calculate_visible_hexes(engine.board, position, sight)
+        own_nation = token_nation(token)
         
         for enemy_token in engine.tokens:
-            if not hasattr(enemy_token, 'owner') or not hasattr(token, 'owner'):
-                continue
-            if not enemy_token.owner or not token.owner:
+            if not getattr(enemy_token, 'owner', None):
                 continue
-            
-            if (enemy_token.q, enemy_token.r) in visible_hexes:
-                enemy_nation = enemy_token.owner.split('(')[-1].replace(')', '').strip()
-                token_nation = token.owner.split('(')[-1].replace(')', '').strip()
-                if enemy_nation != token_nation:
-                    return True
+            if (enemy_token.q, enemy_token.r) in visible_hexes and token_nation(enemy_token) != own_nation:
+                return True
         
         return False
 
@@ -204,18 +223,7 @@ class VisionService:
     @staticmethod
     def calculate_visible_hexes(board, position: Tuple[int, int], sight: int) -> Set[Tuple[int, int]]:
         """Oblicz widzialne heksy z danej pozycji"""
-        visible_hexes = set()
-        q, r = position
-        
-        for dq in range(-sight, sight + 1):
-            for dr in range(-sight, sight + 1):
-                hex_q = q + dq
-                hex_r = r + dr
-                if board.hex_distance(position, (hex_q, hex_r)) <= sight:
-                    if board.get_tile(hex_q, hex_r) is not None:
-                        visible_hexes.add((hex_q, hex_r))
-        
-        return visible_hexes
+        return set(hexes_in_range(board, position, sight))
     
     @staticmethod
     def update_player_vision(engine, player, token, path: List[Tuple[int, int]], final_pos: Tuple[int, int]):
@@ -241,31 +249,29 @@ class VisionService:
         """Dodaj żetony przeciwnika z widzialnych heksów z detection_level"""
         token_pos = (token.q, token.r)
         sight_range = token.stats.get('sight', 0)
+        own_nation = token_nation(token)
         
-        for hex_pos in visible_hexes:
-            for enemy_token in engine.tokens:
-                if ((enemy_token.q, enemy_token.r) == hex_pos and 
-                    hasattr(enemy_token, 'owner') and hasattr(token, 'owner')):
-                    
-                    enemy_nation = enemy_token.owner.split('(')[-1].replace(')', '').strip()
-                    token_nation = token.owner.split('(')[-1].replace(')', '').strip()
+        # Jeden przebieg po żetonach zamiast (heksy × żetony) – każdy żeton stoi na jednym heksie
+        for enemy_token in engine.tokens:
+            hex_pos = (enemy_token.q, enemy_token.r)
+            if (hex_pos in visible_hexes and hasattr(enemy_token, 'owner') and hasattr(token, 'owner')
+                    and token_nation(enemy_token) != own_nation):
+                # NOWE: Oblicz detection_level na podstawie odległości
+                distance = engine.board.hex_distance(token_pos, hex_pos)
+                detection_level = VisionService.calculate_detection_level(distance, sight_range)
+                
+                # Sprawdź czy player ma detection_data
+                if not hasattr(player, 'temp_visible_token_data'):
+                    player.temp_visible_token_data = {}
                     
-                    if enemy_nation != token_nation:
-                        # NOWE: Oblicz detection_level na podstawie odległości
-                        distance = engine.board.hex_distance(token_pos, hex_pos)
-                        detection_level = VisionService.calculate_detection_level(distance, sight_range)
-                        
-                        # Sprawdź czy player ma detection_data
-                        if not hasattr(player, 'temp_visible_token_data'):
-                            player.temp_visible_token_data = {}
-                            
-                        # Dodaj z metadanymi detection
-                        player.temp_visible_tokens.add(enemy_token.id)
-                        player.temp_visible_token_data[enemy_token.id] = {
-                            'detection_level': detection_level,
-                            'distance': distance,
-                            'detected_by': token.id
-                        }
+                # Dodaj z metadanymi detection
+                player.temp_visible_tokens.add(enemy_token.id)
+                player.temp_visible_token_data[enemy_token.id] = {
+                    'detection_level': detection_level,
+                    'distance': distance,
+                    'detected_by': token.id
+                }
+                mark_visibility_changed(player)
 
 
 class MoveAction(BaseAction):
@@ -340,8 +346,8 @@ class CombatCalculator:
     @staticmethod
     def calculate_combat_result(attacker, defender, engine) -> Dict[str, Any]:
         """Oblicz wynik walki między dwoma żetonami"""
-        import random
-        
+        rng = get_rng(engine, COMBAT)
+
         # Wartości ataku i obrony
         attack_val = attacker.stats.get('attack', {}).get('value', 0)
         defense_val = defender.stats.get('defense_value', 0)
@@ -352,8 +358,8 @@ class CombatCalculator:
         defense_total = defense_val + defense_mod
         
         # Losowe modyfikatory
-        attack_mult = random.uniform(0.8, 1.2)
-        defense_mult = random.uniform(0.8, 1.2)
+        attack_mult = rng.uniform(0.8, 1.2)
+        defense_mult = rng.uniform(0.8, 1.2)
         
         # Wyniki
         attack_result = int(round(attack_val * attack_mult))
@@ -410,7 +416,7 @@ class CombatResolver:
         # Sprawdź eliminację atakującego
         if attacker.combat_value <= 0:
             CombatResolver._award_vp_for_elimination(engine, defender, attacker)
-            engine.tokens.remove(attacker)
+            CombatResolver._remove_token(engine, attacker)
             messages.append("Atakujący został zniszczony!")
         else:
             if defense_damage > 0:
@@ -421,10 +427,8 @@ class CombatResolver:
     @staticmethod
     def _handle_defender_elimination(engine, attacker, defender) -> str:
         """Obsłuż eliminację obrońcy"""
-        import random
-        
         # 50% szans na przeżycie i odwrót
-        if random.random() < 0.5:
+        if get_rng(engine, RETREAT).random() < 0.5:
             retreat_pos = CombatResolver._find_retreat_position(engine, attacker, defender)
             if retreat_pos:
                 defender.combat_value = 1
@@ -433,8 +437,16 @@ class CombatResolver:
         
         # Obrońca ginie
         CombatResolver._award_vp_for_elimination(engine, attacker, defender)
-        engine.tokens.remove(defender)
+        CombatResolver._remove_token(engine, defender)
         return "Obrońca został zniszczony!"
+
+    @staticmethod
+    def _remove_token(engine, token):
+        """Usuń żeton z gry (lista silnika + indeks zajętości planszy)"""
+        engine.tokens.remove(token)
+        board = getattr(engine, 'board', None)
+        if board is not None and hasattr(board, 'unregister_token'):
+            board.unregister_token(token)
     
     @staticmethod
     def _find_retreat_position(engine, attacker, defender) -> Optional[Tuple[int, int]]:
@@ -471,7 +483,7 @@ class CombatResolver:
             # Znajdź gracza-właściciela
             token_player = None
             for player in getattr(engine, 'players', []):
-                if token.owner == f"{player.id} ({player.nation})":
+                if owned_by(token, player):
                     token_player = player
                     break
             
@@ -509,9 +521,9 @@ class CombatResolver:
         loser_player = None
         
         for player in getattr(engine, 'players', []):
-            if hasattr(winner_token, 'owner') and winner_token.owner == f"{player.id} ({player.nation})":
+            if hasattr(winner_token, 'owner') and owned_by(winner_token, player):
                 winner_player = player
-            if hasattr(loser_token, 'owner') and loser_token.owner == f"{player.id} ({player.nation})":
+            if hasattr(loser_token, 'owner') and owned_by(loser_token, player):
                 loser_player = player
         
         price = loser_token.stats.get('price', 0)
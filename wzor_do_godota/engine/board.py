@@ -1,15 +1,29 @@
 import json
-from typing import Dict, Tuple, Optional, List
+import os
+from typing import Any, Dict, Tuple, Optional, List
+
+import numpy as np
+
 from engine.hex_utils import get_hex_vertices, point_in_polygon
+from utils.hot_path_profiler import profiled
+
+# Kierunki sąsiadów (axial) – kolejność ma znaczenie dla rozstrzygania remisów w A*
+HEX_DIRECTIONS = ((+1, 0), (+1, -1), (0, -1), (-1, 0), (-1, +1), (0, +1))
+# Heksy, których wielokąt może zawierać punkt zaokrąglony do (q, r): sam heks i jego sąsiedzi
+_PICK_OFFSETS = ((0, 0),) + HEX_DIRECTIONS
+
 
 class Tile:
-    def __init__(self, q: int, r: int, data: Dict):
-        self.q = q
-        self.r = r
+    """Lekki widok heksa nad tablicami terenu planszy.
+    move_mod, defense_mod i type są czytane z tablic Board (indeks heksa), reszta pól trzymana lokalnie."""
+
+    __slots__ = ("_board", "index", "q", "r", "terrain_key", "value", "spawn_nation", "texture")
+
+    def __init__(self, board: "Board", index: int, data: Dict):
+        self._board = board
+        self.index = index
+        self.q, self.r = board.hex_coords[index]
         self.terrain_key = data.get("terrain_key", "teren_płaski")
-        self.move_mod = data.get("move_mod", 0)
-        self.defense_mod = data.get("defense_mod", 0)
-        self.type = data.get("type", None)
         self.value = data.get("value", None)
         self.spawn_nation = data.get("spawn_nation", None)
         texture = data.get("texture")
@@ -17,8 +31,37 @@ class Tile:
             texture = texture.replace("\\", "/")
         self.texture = texture
 
+    @property
+    def move_mod(self):
+        return self._board.move_mods[self.index]
+
+    @move_mod.setter
+    def move_mod(self, value):
+        self._board.move_mods[self.index] = value
+        self._board.invalidate_reachability()
+
+    @property
+    def defense_mod(self):
+        return self._board.defense_mods[self.index]
+
+    @defense_mod.setter
+    def defense_mod(self, value):
+        self._board.defense_mods[self.index] = value
+
+    @property
+    def type(self):
+        return self._board.tile_types[self.index]
+
+    @type.setter
+    def type(self, value):
+        self._board.tile_types[self.index] = value
+
+
 class Board:
-    def __init__(self, json_path: str):
+    # Maksymalna liczba map osiągalności trzymanych naraz (w obrębie jednej wersji zajętości)
+    REACHABILITY_CACHE_SIZE = 256
+
+    def __init__(self, json_path: str, debug_occupancy: Optional[bool] = None):
         self.json_path = json_path  # Dodane: zapamiętaj ścieżkę do pliku mapy
         with open(json_path, encoding="utf-8") as f:
             d = json.load(f)
@@ -27,11 +70,8 @@ class Board:
         self.cols = m["cols"]
         self.rows = m["rows"]
         self.background_meta = m.get("background", {}) if isinstance(m.get("background"), dict) else {}
-        # terrain
-        self.terrain = {
-            k: Tile(*map(int, k.split(",")), v)
-            for k, v in d.get("terrain", {}).items()
-        }
+        # terrain: tablice indeksowane liczbowym indeksem heksa + słownik "q,r" -> Tile dla zgodności
+        self._load_terrain(d.get("terrain", {}))
         # Dodano: spawn_points
         self.spawn_points = d.get("spawn_points", {})
         # Ustaw spawn_nation w terrain na podstawie spawn_points
@@ -43,6 +83,20 @@ class Board:
         # Dodano: key_points
         self.key_points = d.get("key_points", {})
         # key_points można dodać później
+        # Indeks zajętości: (q, r) -> lista żetonów stojących na heksie
+        self.tokens: List = []
+        self._occupancy: Dict[Tuple[int, int], List] = {}
+        self._token_positions: Dict[int, Tuple[int, int]] = {}
+        if debug_occupancy is None:
+            debug_occupancy = os.environ.get("KAMPANIA_DEBUG_OCCUPANCY") == "1"
+        self.debug_occupancy = debug_occupancy
+        # Wersja zajętości – rośnie przy każdej zmianie indeksu (ruch, wystawienie, usunięcie żetonu)
+        self.occupancy_version = 0
+        # Pamięć podręczna map osiągalności (patrz reachability)
+        self._reachability_cache: Dict[Tuple, Any] = {}
+        self._reachability_version = 0
+        self.reachability_hits = 0
+        self.reachability_misses = 0
 
     def hex_to_pixel(self, q: int, r: int) -> Tuple[float, float]:
         # Axial -> pixel (dla pointy-top) z offsetem, by heks 0,0 był w pełni widoczny
@@ -54,8 +108,10 @@ class Board:
         return (x, y)
 
     def pixel_to_hex(self, x: float, y: float) -> Tuple[int, int]:
-        # Szybkie przeliczanie pixel -> axial (dla pointy-top)
+        # Szybkie przeliczanie pixel -> axial (dla pointy-top); odwrotność hex_to_pixel razem z offsetem
         s = self.hex_size
+        x -= s
+        y -= s * (3**0.5) / 2
         q = (2/3 * x) / s
         r = ((-1/3 * x) + (3**0.5/3 * y)) / s
         return self._hex_round(q, r)
@@ -76,39 +132,257 @@ class Board:
         # s = -q - r
         return (q, r)
 
+    def _load_terrain(self, raw_terrain: Dict[str, Dict[str, Any]]):
+        """Buduje zwarty magazyn terenu: tablice move_mod/defense_mod/type, tabelę sąsiadów
+        oraz siatkę (q, r) -> indeks heksa obejmującą prostokąt współrzędnych mapy."""
+        self.hex_coords: List[Tuple[int, int]] = []
+        self.move_mods: List[int] = []
+        self.defense_mods: List[int] = []
+        self.tile_types: List[Optional[str]] = []
+        for key, data in raw_terrain.items():
+            q_str, r_str = key.split(",")
+            self.hex_coords.append((int(q_str), int(r_str)))
+            self.move_mods.append(data.get("move_mod", 0))
+            self.defense_mods.append(data.get("defense_mod", 0))
+            self.tile_types.append(data.get("type", None))
+
+        if self.hex_coords:
+            self._q_min = min(q for q, _ in self.hex_coords)
+            self._r_min = min(r for _, r in self.hex_coords)
+            self._q_span = max(q for q, _ in self.hex_coords) - self._q_min + 1
+            self._r_span = max(r for _, r in self.hex_coords) - self._r_min + 1
+        else:
+            self._q_min = self._r_min = self._q_span = self._r_span = 0
+        self._grid: List[int] = [-1] * (self._q_span * self._r_span)
+        for index, (q, r) in enumerate(self.hex_coords):
+            self._grid[(q - self._q_min) * self._r_span + (r - self._r_min)] = index
+
+        self.tiles: List[Tile] = []
+        self.terrain: Dict[str, Tile] = {}
+        for index, (key, data) in enumerate(raw_terrain.items()):
+            tile = Tile(self, index, data)
+            self.tiles.append(tile)
+            self.terrain[key] = tile
+
+        # Tabela sąsiadów: indeks heksa -> indeksy istniejących sąsiadów (kolejność HEX_DIRECTIONS)
+        self.neighbor_table: List[Tuple[int, ...]] = []
+        for q, r in self.hex_coords:
+            neighbors = []
+            for dq, dr in HEX_DIRECTIONS:
+                n_index = self.hex_index(q + dq, r + dr)
+                if n_index >= 0:
+                    neighbors.append(n_index)
+            self.neighbor_table.append(tuple(neighbors))
+
+    def hex_index(self, q: int, r: int) -> int:
+        """Zwraca liczbowy indeks heksa (q, r) albo -1, jeśli heksa nie ma na mapie."""
+        dq = q - self._q_min
+        dr = r - self._r_min
+        if 0 <= dq < self._q_span and 0 <= dr < self._r_span:
+            return self._grid[dq * self._r_span + dr]
+        return -1
+
     def get_tile(self, q: int, r: int) -> Optional[Tile]:
-        return self.terrain.get(f"{q},{r}")
+        index = self.hex_index(q, r)
+        if index < 0:
+            return None
+        return self.tiles[index]
 
     def set_tokens(self, tokens: List):
         """Przypisz listę żetonów do planszy (do obsługi kolizji, pathfindingu itp.).
-        UWAGA: Jeśli zmieniasz pozycje żetonów ręcznie (np. w testach), wywołaj ponownie set_tokens po zmianie!"""
+        Buduje od nowa indeks zajętości. Ruchy przez Token.set_position aktualizują go na bieżąco;
+        jeśli zmieniasz q/r żetonów ręcznie (np. w testach), wywołaj ponownie set_tokens po zmianie!"""
         self.tokens = tokens
+        self.rebuild_occupancy()
+
+    def rebuild_occupancy(self):
+        """Odbudowuje indeks zajętości na podstawie self.tokens."""
+        for token in list(self._iter_indexed_tokens()):
+            self._detach_token(token)
+        self._occupancy = {}
+        self._token_positions = {}
+        self.occupancy_version += 1
+        for token in self.tokens:
+            self._index_token(token)
+
+    def register_token(self, token):
+        """Dodaje żeton do indeksu zajętości (np. po wystawieniu wzmocnienia).
+        Nie modyfikuje listy żetonów – tę prowadzi właściciel (silnik gry)."""
+        if id(token) in self._token_positions:
+            self.update_token_position(token)
+            return
+        self._index_token(token)
+
+    def unregister_token(self, token):
+        """Usuwa żeton z indeksu zajętości (np. po eliminacji w walce)."""
+        pos = self._token_positions.pop(id(token), None)
+        if pos is not None:
+            self._remove_from_cell(token, pos)
+        self._detach_token(token)
+
+    def update_token_position(self, token):
+        """Przenosi żeton w indeksie na jego bieżące (q, r). Wywoływane przez Token.set_position."""
+        key = id(token)
+        if key not in self._token_positions:
+            return
+        indexed_pos = self._token_positions[key]
+        new_pos = (token.q, token.r)
+        if indexed_pos == new_pos:
+            return
+        self._remove_from_cell(token, indexed_pos)
+        self._occupancy.setdefault(new_pos, []).append(token)
+        self._token_positions[key] = new_pos
+        self.occupancy_version += 1
+
+    def tokens_at(self, q: int, r: int) -> List:
+        """Zwraca listę żetonów stojących na heksie (O(1))."""
+        return list(self._occupancy.get((q, r), ()))
+
+    def token_at(self, q: int, r: int, exclude=None):
+        """Zwraca pierwszy żeton na heksie (pomijając `exclude`) albo None."""
+        for token in self._occupancy.get((q, r), ()):
+            if token is not exclude:
+                return token
+        return None
 
     def is_occupied(self, q: int, r: int, visible_tokens: Optional[set] = None) -> bool:
         """Sprawdza, czy pole jest zajęte przez żeton. Jeśli podano visible_tokens, sprawdza tylko żetony widoczne."""
+        cell = self._occupancy.get((q, r))
         if visible_tokens is not None:
-            return any(t.q == q and t.r == r and t.id in visible_tokens for t in getattr(self, 'tokens', []))
-        return any(t.q == q and t.r == r for t in getattr(self, 'tokens', []))
+            result = bool(cell) and any(t.id in visible_tokens for t in cell)
+        else:
+            result = bool(cell)
+        if self.debug_occupancy:
+            self._verify_occupancy(q, r, visible_tokens, result)
+        return result
+
+    def check_occupancy_consistency(self) -> List[str]:
+        """Porównuje indeks zajętości z pełnym skanem self.tokens. Zwraca listę rozbieżności."""
+        problems = []
+        expected: Dict[Tuple[int, int], List] = {}
+        for token in self.tokens:
+            expected.setdefault((token.q, token.r), []).append(token)
+        for pos in set(expected) | set(self._occupancy):
+            indexed = {id(t) for t in self._occupancy.get(pos, ())}
+            actual = {id(t) for t in expected.get(pos, ())}
+            if indexed != actual:
+                indexed_ids = sorted(str(getattr(t, 'id', '?')) for t in self._occupancy.get(pos, ()))
+                actual_ids = sorted(str(getattr(t, 'id', '?')) for t in expected.get(pos, ()))
+                problems.append(f"{pos}: indeks={indexed_ids} rzeczywiste={actual_ids}")
+        return problems
+
+    def _verify_occupancy(self, q: int, r: int, visible_tokens: Optional[set], result: bool):
+        if visible_tokens is not None:
+            expected = any(t.q == q and t.r == r and t.id in visible_tokens for t in self.tokens)
+        else:
+            expected = any(t.q == q and t.r == r for t in self.tokens)
+        if expected != result:
+            problems = self.check_occupancy_consistency()
+            raise RuntimeError(
+                f"Niespójny indeks zajętości dla ({q},{r}): indeks={result}, skan={expected}; "
+                f"rozbieżności: {problems}"
+            )
+
+    def _index_token(self, token):
+        pos = (getattr(token, 'q', None), getattr(token, 'r', None))
+        self._occupancy.setdefault(pos, []).append(token)
+        self._token_positions[id(token)] = pos
+        self.occupancy_version += 1
+        try:
+            token._board = self
+        except AttributeError:
+            pass
+
+    def _remove_from_cell(self, token, pos: Tuple[int, int]):
+        cell = self._occupancy.get(pos)
+        if not cell:
+            return
+        self.occupancy_version += 1
+        for i, other in enumerate(cell):
+            if other is token:
+                del cell[i]
+                break
+        if not cell:
+            del self._occupancy[pos]
+
+    def _detach_token(self, token):
+        if getattr(token, '_board', None) is self:
+            try:
+                token._board = None
+            except AttributeError:
+                pass
+
+    def _iter_indexed_tokens(self):
+        for cell in self._occupancy.values():
+            yield from cell
+
+    def _needs_is_occupied(self) -> bool:
+        """Wyszukiwania czytają indeks zajętości bezpośrednio; is_occupied wołane jest tylko
+        w trybie debug lub gdy podklasa go nadpisuje."""
+        return self.debug_occupancy or type(self).is_occupied is not Board.is_occupied
+
+    def reachability(self, start: Tuple[int, int], max_mp: int, max_fuel: int, visible_tokens: Optional[set] = None):
+        """Zwraca (z pamięci podręcznej) mapę osiągalności Dijkstry z pola start.
+        Klucz: start, budżet min(MP, paliwo), filtr widoczności i wersja zajętości – każdy ruch,
+        wystawienie lub usunięcie żetonu unieważnia wszystkie mapy. Krok kosztuje
+        1 + max(0, move_mod) – tak samo dla ruchu silnika i planowania AI."""
+        from engine.reachability import compute_reachability
+        if self._reachability_version != self.occupancy_version:
+            self._reachability_cache.clear()
+            self._reachability_version = self.occupancy_version
+        budget = min(max_mp, max_fuel)
+        visible_key = frozenset(visible_tokens) if visible_tokens is not None else None
+        key = (tuple(start), budget, visible_key)
+        cached = self._reachability_cache.get(key)
+        if cached is not None:
+            self.reachability_hits += 1
+            return cached
+        self.reachability_misses += 1
+        if len(self._reachability_cache) >= self.REACHABILITY_CACHE_SIZE:
+            self._reachability_cache.clear()
+        result = compute_reachability(self, tuple(start), budget, visible_tokens)
+        self._reachability_cache[key] = result
+        return result
+
+    def reachability_cache_stats(self) -> Dict[str, int]:
+        """Liczniki trafień/chybień pamięci podręcznej osiągalności."""
+        return {
+            "hits": self.reachability_hits,
+            "misses": self.reachability_misses,
+            "entries": len(self._reachability_cache),
+        }
+
+    def invalidate_reachability(self):
+        """Czyści mapy osiągalności (np. po zmianie terenu)."""
+        self._reachability_cache.clear()
 
     def neighbors(self, q: int, r: int) -> List[Tuple[int, int]]:
         """Zwraca listę sąsiadów heksa (axial)."""
-        directions = [(+1, 0), (+1, -1), (0, -1), (-1, 0), (-1, +1), (0, +1)]
-        return [(q+dq, r+dr) for dq, dr in directions]
+        return [(q+dq, r+dr) for dq, dr in HEX_DIRECTIONS]
 
+    @profiled("Board.find_path")
     def find_path(self, start: Tuple[int, int], goal: Tuple[int, int], max_mp: int = 99, max_fuel: int = 99, visible_tokens: Optional[set] = None, fallback_to_closest: bool = False) -> Optional[List[Tuple[int, int]]]:
         """Prosty pathfinding A* (uwzględnia move_mod, zajętość pól, MP i paliwo, widoczność wrogów).
         Jeśli fallback_to_closest=True i celu nie da się osiągnąć, zwraca ścieżkę do najbliższego (heurystycznie) osiągalnego pola względem celu.
+        Działa na indeksach heksów (tabela sąsiadów + tablica move_mod).
         """
         import heapq
+        coords = self.hex_coords
+        move_mods = self.move_mods
+        neighbor_table = self.neighbor_table
+        occupancy = self._occupancy
+        use_is_occupied = self._needs_is_occupied()
+        gq, gr = goal
+        start_index = self.hex_index(*start)
         open_set = []
-        heapq.heappush(open_set, (0, start))
+        heapq.heappush(open_set, (0, start, start_index))
         came_from = {}
         cost_so_far = {start: (0, 0)}  # (mp_cost, fuel_cost)
         # Najlepszy dotychczas osiągalny węzeł względem celu (heurystyka)
         best_node = start
         best_h = self.hex_distance(start, goal)
         while open_set:
-            _, current = heapq.heappop(open_set)
+            _, current, current_index = heapq.heappop(open_set)
             if current == goal:
                 # Odtwórz ścieżkę
                 path = [current]
@@ -117,27 +391,38 @@ class Board:
                     path.append(current)
                 return path[::-1]
             # aktualizuj najlepszy węzeł względem celu
-            h_curr = self.hex_distance(current, goal)
+            cq, cr = current
+            h_curr = (abs(cq - gq) + abs(cq + cr - gq - gr) + abs(cr - gr)) // 2
             if h_curr < best_h:
                 best_h = h_curr
                 best_node = current
-            for neighbor in self.neighbors(*current):
-                tile = self.get_tile(*neighbor)
-                if not tile:
-                    continue
-                if self.is_occupied(*neighbor, visible_tokens=visible_tokens):
-                    continue
-                if tile.move_mod == -1:
+            current_mp, current_fuel = cost_so_far[current]
+            if current_index >= 0:
+                neighbor_indices = neighbor_table[current_index]
+            else:
+                neighbor_indices = [i for i in (self.hex_index(cq + dq, cr + dr) for dq, dr in HEX_DIRECTIONS) if i >= 0]
+            for n_index in neighbor_indices:
+                neighbor = coords[n_index]
+                if use_is_occupied:
+                    if self.is_occupied(*neighbor, visible_tokens=visible_tokens):
+                        continue
+                else:
+                    cell = occupancy.get(neighbor)
+                    if cell and (visible_tokens is None or any(t.id in visible_tokens for t in cell)):
+                        continue
+                move_mod = move_mods[n_index]
+                if move_mod == -1:
                     continue
-                move_cost = 1 + tile.move_mod
-                new_mp = cost_so_far[current][0] + move_cost
-                new_fuel = cost_so_far[current][1] + move_cost
+                move_cost = 1 + move_mod if move_mod > 0 else 1
+                new_mp = current_mp + move_cost
+                new_fuel = current_fuel + move_cost
                 if new_mp > max_mp or new_fuel > max_fuel:
                     continue
                 if neighbor not in cost_so_far or (new_mp, new_fuel) < cost_so_far[neighbor]:
                     cost_so_far[neighbor] = (new_mp, new_fuel)
-                    priority = new_mp + self.hex_distance(neighbor, goal)
-                    heapq.heappush(open_set, (priority, neighbor))
+                    nq, nr = neighbor
+                    priority = new_mp + (abs(nq - gq) + abs(nq + nr - gq - gr) + abs(nr - gr)) // 2
+                    heapq.heappush(open_set, (priority, neighbor, n_index))
                     came_from[neighbor] = current
         # Nie udało się dojść do celu
         if fallback_to_closest and best_node != start:
@@ -156,21 +441,92 @@ class Board:
         bq, br = b
         return int((abs(aq - bq) + abs(aq + ar - bq - br) + abs(ar - br)) / 2)
 
-    def coords_to_hex(self, x, y):
-        # Nowa wersja: iteruj po wszystkich kluczach terrain (q,r mogą być ujemne)
-        for hex_id in self.terrain:
-            q, r = map(int, hex_id.split(","))
+    def coords_to_hex(self, x, y) -> Optional[Tuple[int, int]]:
+        """Heks mapy pod punktem (x, y) w pikselach albo None.
+        pixel_to_hex wskazuje kandydata w O(1). Punkt wyraźnie wewnątrz okręgu wpisanego kandydata
+        nie wymaga testu wielokąta; przy krawędzi/wierzchołku sprawdzamy wielokąty kandydata
+        i jego 6 sąsiadów, a przy kilku trafieniach wygrywa heks wcześniejszy w hex_coords –
+        wynik zgodny z dawnym skanem wszystkich heksów (coords_to_hex_scan)."""
+        q, r = self.pixel_to_hex(x, y)
+        if self.hex_index(q, r) >= 0:
+            cx, cy = self.hex_to_pixel(q, r)
+            dx = x - cx
+            dy = y - cy
+            if dx * dx + dy * dy < self._pick_inner_radius_sq():
+                return q, r
+        return self._pick_near(x, y, q, r)
+
+    def coords_to_hex_many(self, points) -> List[Optional[Tuple[int, int]]]:
+        """Wsadowa wersja coords_to_hex dla wielu punktów [(x, y), ...] (np. próbki pędzla edytora).
+        Zaokrąglenie i test okręgu wpisanego liczone wektorowo w NumPy; punkty przy krawędziach
+        rozstrzyga _pick_near jak w coords_to_hex."""
+        xy = np.asarray(points, dtype=float).reshape(-1, 2)
+        if not len(xy):
+            return []
+        s = self.hex_size
+        x = xy[:, 0]
+        y = xy[:, 1]
+        px = x - s
+        py = y - s * (3**0.5) / 2
+        qf = (2/3 * px) / s
+        rf = ((-1/3 * px) + (3**0.5/3 * py)) / s
+        sf = -qf - rf
+        q = np.round(qf)
+        r = np.round(rf)
+        cube_s = np.round(sf)
+        dq = np.abs(q - qf)
+        dr = np.abs(r - rf)
+        ds = np.abs(cube_s - sf)
+        fix_q = (dq > dr) & (dq > ds)
+        fix_r = ~fix_q & (dr > ds)
+        q = np.where(fix_q, -r - cube_s, q)
+        r = np.where(fix_r, -q - cube_s, r)
+        # Środki kandydatów – to samo wyrażenie co hex_to_pixel
+        cx = s * (3/2 * q) + s
+        cy = s * (3**0.5 * (r + q/2)) + s * (3**0.5) / 2
+        inside = (x - cx) ** 2 + (y - cy) ** 2 < self._pick_inner_radius_sq()
+
+        results: List[Optional[Tuple[int, int]]] = []
+        hex_index = self.hex_index
+        for i, (cq, cr) in enumerate(zip(q.astype(int).tolist(), r.astype(int).tolist())):
+            if inside[i] and hex_index(cq, cr) >= 0:
+                results.append((cq, cr))
+            else:
+                results.append(self._pick_near(float(x[i]), float(y[i]), cq, cr))
+        return results
+
+    def coords_to_hex_scan(self, x, y) -> Optional[Tuple[int, int]]:
+        """Referencyjny skan wszystkich heksów (test wielokąta) – do testów zgodności coords_to_hex."""
+        for q, r in self.hex_coords:
             cx, cy = self.hex_to_pixel(q, r)
             verts = get_hex_vertices(cx, cy, self.hex_size)
             if point_in_polygon(x, y, verts):
                 return q, r
         return None
 
+    def _pick_inner_radius_sq(self) -> float:
+        # Kwadrat promienia okręgu wpisanego z marginesem na błędy zaokrągleń wierzchołków
+        inner = self.hex_size * (3**0.5) / 2 * (1 - 1e-9)
+        return inner * inner
+
+    def _pick_near(self, x: float, y: float, q: int, r: int) -> Optional[Tuple[int, int]]:
+        """Test wielokątów kandydata (q, r) i jego sąsiadów; przy remisie najniższy indeks heksa."""
+        best = -1
+        for dq, dr in _PICK_OFFSETS:
+            nq = q + dq
+            nr = r + dr
+            index = self.hex_index(nq, nr)
+            if index < 0 or (0 <= best < index):
+                continue
+            cx, cy = self.hex_to_pixel(nq, nr)
+            if point_in_polygon(x, y, get_hex_vertices(cx, cy, self.hex_size)):
+                best = index
+        return self.hex_coords[best] if best >= 0 else None
+
     def get_overlay_items(self):
         items = []
-        for key, tile in self.terrain.items():
-            q, r = map(int, key.split(","))
-            cx, cy = self.hex_to_pixel(q, r)
+        for tile in self.tiles:
+            cx, cy = self.hex_to_pixel(tile.q, tile.r)
             verts = get_hex_vertices(cx, cy, self.hex_size)
             if tile.spawn_nation:
                 txt = f"spawn{tile.spawn_nation.lower()}"
@@ -73,6 +73,11 @@ def estimate_unit_type(token):
     else:
         return "heavy_unit"
 
+def mark_visibility_changed(player):
+    """Zgłasza zmianę danych widoczności gracza (unieważnia migawki detekcji AI)."""
+    if player is not None:
+        player.visibility_version = getattr(player, 'visibility_version', 0) + 1
+
 def get_detection_info_for_player(player, token_id, include_temp=True):
     """Pobierz informacje o detekcji konkretnego tokena dla gracza
 
@@ -1,60 +1,118 @@
-import random
 import os
-import json
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 
 from ai.logs import log_token
 from engine.board import Board
-from engine.token import load_tokens, Token
+from engine.hex_utils import hexes_in_range
+from engine.fog_of_war import get_fog_of_war
+from engine.key_points import KeyPointLedger
+from engine.rng import ENGINE, GameRNG
+from engine.token_registry import TokenRegistry
+from engine import save_format
+from engine.replay import KEYFRAME_INTERVAL, ActionJournal
+from engine.detection_filter import mark_visibility_changed
+from engine.token import load_tokens, owned_by, token_nation, Token
 from engine.action_refactored_clean import ActionResult
+from utils.hot_path_profiler import profiled
 
 class GameEngine:
-    def __init__(self, map_path: str, tokens_index_path: str, tokens_start_path: str, seed: int = 42, read_only: bool = False):
-        self.random = random.Random(seed)
+    def __init__(self, map_path: str, tokens_index_path: str, tokens_start_path: str, seed: int = 42, read_only: bool = False, load_saved_state: bool = True):
+        # Nazwane strumienie losowości partii (walka, odwrót, pogoda, AI, ekonomia) – ziarno wyznacza partię
+        self.rng = GameRNG(seed)
+        self.random = self.rng.stream(ENGINE)
         self.board = Board(map_path)
         self.read_only = read_only  # Dodana flaga tylko do odczytu
+        # (tura, ścieżka) bazy zapisu co turę – save_state zapisuje delty względem niej
+        self.state_save_base = None
+        self._init_key_points_state()
         state_path = os.path.join("saves", "latest.json")
-        if os.path.exists(state_path):
-            self.load_state(state_path)
-        else:
+        # load_saved_state=False: zawsze świeży stan startowy (np. symulacje wsadowe)
+        # Zapis, którego bazy już nie ma (usunięta lub podmieniona), nie blokuje startu – stan startowy
+        if not (load_saved_state and os.path.exists(state_path) and self.load_state(state_path)):
             self.tokens = load_tokens(tokens_index_path, tokens_start_path)
             self.board.set_tokens(self.tokens)
             self.turn = 1
             self.current_player = 0
-        self._init_key_points_state()
         self.ai_reserved_hexes = {}
         self.ai_enemy_memory: Dict[str, Dict[str, Any]] = {}
+        # Migawki detekcji AI per gracz (ai.tokens.detection_snapshot), odtwarzane po zmianie widoczności
+        self.ai_detection_snapshots: Dict[Any, Any] = {}
+        # Dziennik akcji do odtwarzania partii (engine.replay) – włączany przez start_journal
+        self.journal = None
+
+    def start_journal(self, path: str, keyframe_interval: int = KEYFRAME_INTERVAL, compress: bool = False) -> ActionJournal:
+        """Zaczyna dziennik akcji partii od klatki kluczowej bieżącego stanu."""
+        self.stop_journal()
+        self.journal = ActionJournal(path, keyframe_interval=keyframe_interval, compress=compress)
+        self.journal.write_keyframe(self)
+        return self.journal
+
+    def stop_journal(self) -> None:
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
 
     def _init_key_points_state(self):
-        """Tworzy słownik: hex_id -> {'initial_value': X, 'current_value': Y, 'type': ...} na podstawie mapy."""
-        self.key_points_state = {}
-        if hasattr(self.board, 'key_points'):
-            for hex_id, kp in self.board.key_points.items():
-                self.key_points_state[hex_id] = {
-                    'initial_value': kp['value'],
-                    'current_value': kp['value'],
-                    'type': kp.get('type', None)
-                }
-
-    def save_state(self, filepath: str):
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        """Tworzy rejestr: hex_id -> {'initial_value': X, 'current_value': Y, 'type': ...} na podstawie mapy.
+        Plik mapy pozostaje niezmienny – stan punktów zapisywany jest wyłącznie z zapisem gry."""
+        self.key_points_state = KeyPointLedger.from_board(self.board)
+
+    def save_state(self, filepath: str, keyframe_interval: int = save_format.TURN_KEYFRAME_INTERVAL):
+        # Zapis co turę (saves/latest.json) – format wersji 2. Co keyframe_interval tur pełna tabela
+        # żetonów trafia do pliku bazowego <nazwa>_base_<tura>.json, a sam plik tury jest deltą
+        # względem niej (tylko zmienione żetony); starsze bazy usuwane po zapisie nowej delty
+        key_points = getattr(self, 'key_points_state', None)
+        rows = [t.serialize() for t in self.tokens]
         state = {
-            "tokens": [t.serialize() for t in self.tokens],
+            "format": save_format.SAVE_FORMAT,
+            "version": save_format.SAVE_FORMAT_VERSION,
             "turn": self.turn,
             "current_player": self.current_player
         }
-        tmp_file = filepath + ".tmp"
-        with open(tmp_file, "w", encoding="utf-8") as f:
-            json.dump(state, f, indent=2, ensure_ascii=False)
-        os.replace(tmp_file, filepath)
-
-    def load_state(self, filepath: str):
-        with open(filepath, "r", encoding="utf-8") as f:
-            state = json.load(f)
-        self.tokens = [Token.from_dict(t) for t in state["tokens"]]
+        if key_points is not None:
+            state["key_points_state"] = dict(key_points)
+        if isinstance(getattr(self, 'rng', None), GameRNG):
+            state["rng_state"] = self.rng.getstate()
+
+        directory = os.path.dirname(filepath)
+        stem = os.path.splitext(os.path.basename(filepath))[0]
+        base = getattr(self, 'state_save_base', None)
+        if save_format.needs_keyframe(base, self.turn, keyframe_interval):
+            base_path = os.path.join(directory, f"{stem}_base_{self.turn:04d}.json")
+            data = save_format.write_document(base_path, dict(state, kind="full", tokens=save_format.encode_token_table(rows)))
+            save_format.remember_base(base_path, data, rows)
+            base = self.state_save_base = (self.turn, base_path)
+        base_digest, base_rows = save_format.load_base(base[1])
+        delta = save_format.encode_token_delta(base_rows, rows)
+        if delta is None:
+            save_format.write_document(filepath, dict(state, kind="full", tokens=save_format.encode_token_table(rows)))
+        else:
+            save_format.write_document(filepath, dict(state, kind="delta", base=os.path.relpath(base[1], directory or "."),
+                                                      base_digest=base_digest, tokens=delta))
+        for name in os.listdir(directory or "."):
+            old_base = os.path.join(directory, name)
+            if name.startswith(f"{stem}_base_") and name.endswith(".json") and os.path.abspath(old_base) != os.path.abspath(base[1]):
+                save_format.remove_document(old_base)
+
+    def load_state(self, filepath: str) -> bool:
+        # Wczytuje też dawny zapis JSON z listą żetonów. False (bez zmiany stanu), gdy zapis jest
+        # deltą, której plik bazowy zniknął albo zmienił się od jej utworzenia
+        state = save_format.read_document(filepath)
+        try:
+            rows = save_format.token_rows(state, os.path.dirname(filepath))
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Pominięto zapis {filepath}: {e}")
+            return False
+        self.tokens = [Token.from_dict(t) for t in rows]
         self.board.set_tokens(self.tokens)
         self.turn = state["turn"]
         self.current_player = state["current_player"]
+        if isinstance(state.get("key_points_state"), dict):
+            self.key_points_state = KeyPointLedger.from_state(state["key_points_state"])
+            self.key_points_state.prune_board(self.board)
+        if isinstance(getattr(self, 'rng', None), GameRNG):
+            self.rng.setstate(state.get("rng_state"))
+        return True
 
     def next_turn(self):
         self.turn += 1
@@ -89,6 +147,8 @@ class GameEngine:
 
         self.ai_reserved_hexes = {}
         self._decay_enemy_memory()
+        if self.journal is not None:
+            self.journal.record_checkpoint(self)
 
     def end_turn(self):
         self.next_turn()
@@ -108,16 +168,49 @@ class GameEngine:
             'tokens': [t.serialize() for t in self.tokens]
         }
 
+    @property
+    def tokens(self) -> TokenRegistry:
+        """Żetony w grze – TokenRegistry (zachowuje się jak lista, z indeksami id/właściciel/nacja)."""
+        return self._tokens
+
+    @tokens.setter
+    def tokens(self, value):
+        # TokenRegistry jest przyjmowany bez kopiowania. Zwykła lista jest KOPIOWANA do nowego
+        # rejestru – późniejsze zmiany tej listy nie trafiają do engine.tokens (i odwrotnie);
+        # po przypisaniu modyfikuj engine.tokens. Powtórzony obiekt żetonu to ValueError.
+        self._tokens = value if isinstance(value, TokenRegistry) else TokenRegistry(value or [])
+
+    def get_token(self, token_id) -> Optional[Token]:
+        """Żeton o danym id (O(1))."""
+        return self._tokens.get(token_id)
+
+    def tokens_of_owner(self, owner: str) -> List[Token]:
+        return self._tokens.by_owner(owner)
+
+    def tokens_of_nation(self, nation: str) -> List[Token]:
+        return self._tokens.by_nation(nation)
+
+    def alive_unit_count(self, player_id=None, nation: Optional[str] = None) -> int:
+        """Liczba żywych jednostek gracza albo nacji – licznik rejestru, O(1)."""
+        return self._tokens.alive_count(owner_id=player_id, nation=nation)
+
+    def combat_strength(self, player_id=None, nation: Optional[str] = None) -> int:
+        """Suma combat_value żywych jednostek gracza albo nacji – licznik rejestru, O(1)."""
+        return self._tokens.combat_strength(owner_id=player_id, nation=nation)
+
     def execute_action(self, action, player=None):
         """Rejestruje i wykonuje akcję (np. ruch, walka). Weryfikuje właściciela żetonu."""
         # Sprawdzenie właściciela żetonu
-        token = next((t for t in self.tokens if t.id == getattr(action, 'token_id', None)), None)
+        token = self.get_token(getattr(action, 'token_id', None))
         if player and token:
-            expected_owner = f"{player.id} ({player.nation})"
-            if token.owner != expected_owner:
+            if not owned_by(token, player):
                 return False, "Ten żeton nie należy do twojego dowódcy."
         pre_state = self._prepare_action_log_state(action, token)
+        journal = self.journal
+        rng_before = journal.rng_fingerprint(self) if journal is not None else None
         result = action.execute(self)
+        if journal is not None:
+            journal.record_action(self, action, pre_state, result, rng_before, player)
         self._log_human_action(action, player, pre_state, result)
         return result
 
@@ -132,7 +225,7 @@ class GameEngine:
         }
         defender_id = getattr(action, "defender_id", None)
         if defender_id:
-            defender = next((t for t in self.tokens if t.id == defender_id), None)
+            defender = self.get_token(defender_id)
             state["defender"] = self._capture_token_snapshot(defender)
         return state
 
@@ -165,9 +258,9 @@ class GameEngine:
         attacker_token = None
         defender_token = None
         if attacker_id:
-            attacker_token = next((t for t in self.tokens if t.id == attacker_id), None)
+            attacker_token = self.get_token(attacker_id)
         if defender_id:
-            defender_token = next((t for t in self.tokens if t.id == defender_id), None)
+            defender_token = self.get_token(defender_id)
 
         return {
             "attacker": self._capture_token_snapshot(attacker_token),
@@ -443,8 +536,7 @@ class GameEngine:
             q, r = map(int, hex_id.split(","))
             token = tokens_by_pos.get((q, r))
             if token and hasattr(token, 'owner') and token.owner:
-                # Wyciągnij nację z ownera (np. "2 (Polska)")
-                nation = token.owner.split("(")[-1].replace(")", "").strip()
+                nation = token.nation
                 general = generals.get(nation)
                 if general and hasattr(general, 'economy'):
                     give = int(0.1 * kp['initial_value'])
@@ -455,30 +547,11 @@ class GameEngine:
                     if give > kp['current_value']:
                         give = kp['current_value']
                     general.economy.economic_points += give
-                    kp['current_value'] -= give
-                    if kp['current_value'] <= 0:
+                    if self.key_points_state.consume(hex_id, give) <= 0:
                         to_remove.append(hex_id)
-        # Usuń wyzerowane punkty z key_points_state i z planszy
+        # Usuń wyzerowane punkty z key_points_state i z planszy (stan trafi na dysk z zapisem gry)
         for hex_id in to_remove:
-            self.key_points_state.pop(hex_id, None)
-            if hasattr(self.board, 'key_points'):
-                self.board.key_points.pop(hex_id, None)        # (Opcjonalnie) zapisz do pliku mapy aktualny stan key_points
-        self._save_key_points_to_map()
-
-    def _save_key_points_to_map(self):
-        """Zapisuje aktualny stan key_points do pliku mapy (data/map_data.json)."""
-        if getattr(self, 'read_only', False):
-            return
-        try:
-            map_path = self.board.__dict__.get('json_path', 'data/map_data.json')
-            with open(map_path, encoding='utf-8') as f:
-                data = json.load(f)
-            # Aktualizuj key_points
-            data['key_points'] = {k: {'type': v['type'], 'value': v['current_value']} for k, v in self.key_points_state.items()}
-            with open(map_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            pass
+            self.key_points_state.remove(hex_id, self.board)
 
     def log_key_points_status(self, current_player):
         """Loguje stan key pointów na początku tury gracza."""
@@ -501,8 +574,8 @@ class GameEngine:
                 kp_info = f"📍 {hex_id}: wartość {kp['current_value']}/{kp['initial_value']} (typ: {kp.get('type', 'unknown')})"
                 
                 if token and hasattr(token, 'owner') and token.owner:
-                    owner_nation = token.owner.split("(")[-1].replace(")", "").strip()
-                    owner_id = token.owner.split("(")[0].strip()
+                    owner_nation = token.nation
+                    owner_id = token.owner_id
                     
                     if owner_nation == current_player.nation:
                         occupied_by_player.append(f"  ✅ {kp_info} - okupowany przez {owner_id} ({owner_nation})")
@@ -573,8 +646,8 @@ class GameEngine:
                     print(f"  ⚠️ {hex_id}: {unit_type_display} nie może zbierać PE - tylko Zaopatrzenie (Z)")
                     continue
                     
-                nation = token.owner.split("(")[-1].replace(")", "").strip()
-                owner_id = token.owner.split("(")[0].strip()
+                nation = token.nation
+                owner_id = token.owner_id
                 general = generals.get(nation)
                 if general and hasattr(general, 'economy'):
                     give = int(0.1 * kp['initial_value'])
@@ -589,7 +662,7 @@ class GameEngine:
                     kp_value_before = kp['current_value']
                     old_economy = general.economy.economic_points
                     general.economy.economic_points += give
-                    kp['current_value'] -= give
+                    self.key_points_state.consume(hex_id, give)
                     
                     print(f"  💰 {hex_id}: +{give} punktów dla generała {nation} (okupant: {owner_id} - Zaopatrzenie)")
                     print(f"      👤 Okupant: {owner_id} ({nation}) - jednostka Zaopatrzenia (Z)")
@@ -637,10 +710,7 @@ class GameEngine:
         if to_remove:
             print(f"\n🗑️ Usuwanie wyczerpanych key pointów: {to_remove}")
         for hex_id in to_remove:
-            self.key_points_state.pop(hex_id, None)
-            if hasattr(self.board, 'key_points'):
-                self.board.key_points.pop(hex_id, None)
-        self._save_key_points_to_map()
+            self.key_points_state.remove(hex_id, self.board)
         # Zwróć informacje o przyznanych punktach
         return debug_points_per_general
 
@@ -656,16 +726,9 @@ def get_token_vision_hexes(token, board):
     if token.q is None or token.r is None:
         return set()
     vision_range = token.stats.get('sight', 0)
-    visible = set()
-    for dq in range(-vision_range, vision_range + 1):
-        for dr in range(-vision_range, vision_range + 1):
-            q = token.q + dq
-            r = token.r + dr
-            if board.hex_distance((token.q, token.r), (q, r)) <= vision_range:
-                if board.get_tile(q, r) is not None:
-                    visible.add((q, r))
-    return visible
+    return set(hexes_in_range(board, (token.q, token.r), vision_range))
 
+@profiled("visibility.update_player")
 def update_player_visibility(player, all_tokens, board):
     """
     Aktualizuje widoczność gracza: zbiera wszystkie heksy w zasięgu widzenia jego żetonów
@@ -674,9 +737,9 @@ def update_player_visibility(player, all_tokens, board):
     visible_hexes = set()
     # Dowódca: tylko własne żetony; Generał: sumuje widoczność dowódców swojej nacji
     if player.role.lower() == 'dowódca':
-        own_tokens = [t for t in all_tokens if t.owner == f"{player.id} ({player.nation})"]
+        own_tokens = [t for t in all_tokens if owned_by(t, player)]
     elif player.role.lower() == 'generał':
-        own_tokens = [t for t in all_tokens if t.owner.endswith(f"({player.nation})")]
+        own_tokens = [t for t in all_tokens if token_nation(t) == player.nation]
     else:
         own_tokens = []
     for token in own_tokens:
@@ -700,6 +763,7 @@ def update_player_visibility(player, all_tokens, board):
         if not hasattr(player, 'visible_token_data'):
             player.visible_token_data = {}
         player.visible_token_data.update(player.temp_visible_token_data)
+    mark_visibility_changed(player)
 
 def update_general_visibility(general, all_players, all_tokens):
     """
@@ -717,7 +781,18 @@ def update_general_visibility(general, all_players, all_tokens):
     enemy_tokens = {t.id for t in all_tokens if t.owner and not t.owner.endswith(f"({nation})") and (t.q, t.r) in all_hexes}
     general.visible_tokens = own_tokens | enemy_tokens
 
+@profiled("visibility.update_all_players")
 def update_all_players_visibility(players, all_tokens, board):
+    """Aktualizuje widoczność wszystkich graczy przyrostowo (engine.fog_of_war) –
+    dyski widzenia przeliczane są tylko dla żetonów, które się zmieniły."""
+    fog = get_fog_of_war(board)
+    if fog is None:
+        recompute_all_players_visibility(players, all_tokens, board)
+        return
+    fog.update_players(players, all_tokens)
+
+def recompute_all_players_visibility(players, all_tokens, board):
+    """Pełne przeliczenie widoczności od zera (punkt odniesienia dla FogOfWar)."""
     for player in players:
         update_player_visibility(player, all_tokens, board)
     # Dodatkowa aktualizacja dla generałów (po wszystkich dowódcach!)
@@ -734,6 +809,7 @@ def clear_temp_visibility(players):
         # NOWE: Wyczyść detection data
         if hasattr(p, 'temp_visible_token_data'):
             p.temp_visible_token_data.clear()
+        mark_visibility_changed(p)
 
 # Przykład użycia:
 # engine = GameEngine('data/map_data.json', 'data/tokens_index.json', 'data/start_tokens.json', seed=123)
@@ -0,0 +1,171 @@
+"""
+Przyrostowa mgła wojny.
+
+FogOfWar trzyma dla każdego żetonu jego ostatni dysk widzenia oraz liczniki obserwatorów
+per heks dla każdego właściciela (dowódcy, np. "2 (Polska)"). Przy aktualizacji przelicza
+dyski tylko dla żetonów, które się ruszyły, zmieniły właściciela/zasięg, pojawiły się lub
+zniknęły. Wynik (visible_hexes / visible_tokens / visible_token_data) jest identyczny
+z pełnym przeliczeniem recompute_all_players_visibility z engine.engine.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from engine.detection_filter import mark_visibility_changed
+
+Hex = Tuple[int, int]
+
+
+class FogOfWar:
+    """Liczniki obserwatorów per heks i właściciela, aktualizowane przyrostowo."""
+
+    def __init__(self, board):
+        self.board = board
+        # id(żetonu) -> (żeton, właściciel, pozycja, zasięg, dysk widzenia)
+        self._entries: Dict[int, Tuple] = {}
+        # właściciel -> {heks: liczba żetonów widzących heks}
+        self._owner_counts: Dict[str, Dict[Hex, int]] = {}
+        # heks -> żetony stojące na heksie (wg ostatniej synchronizacji)
+        self._tokens_by_hex: Dict[Hex, List] = {}
+        # Statystyki (ile dysków przeliczono, ile żetonów pominięto bez zmian)
+        self.vision_recomputations = 0
+        self.unchanged_tokens = 0
+
+    def sync_tokens(self, all_tokens) -> int:
+        """Porównuje żetony z ostatnim stanem i aktualizuje liczniki tylko dla zmienionych.
+        Zwraca liczbę żetonów, których dysk widzenia trzeba było przeliczyć (łącznie z usuniętymi)."""
+        from engine.engine import get_token_vision_hexes
+
+        entries = self._entries
+        seen = set()
+        changed = 0
+        for token in all_tokens:
+            key = id(token)
+            seen.add(key)
+            owner = token.owner
+            pos = (token.q, token.r)
+            sight = token.stats.get('sight', 0)
+            entry = entries.get(key)
+            if entry is not None and entry[1] == owner and entry[2] == pos and entry[3] == sight:
+                self.unchanged_tokens += 1
+                continue
+            if entry is not None:
+                self._drop_entry(entry)
+            hexes = tuple(get_token_vision_hexes(token, self.board))
+            self.vision_recomputations += 1
+            changed += 1
+            entry = (token, owner, pos, sight, hexes)
+            entries[key] = entry
+            self._add_entry(entry)
+        for key in [k for k in entries if k not in seen]:
+            self._drop_entry(entries.pop(key))
+            changed += 1
+        return changed
+
+    def owner_hexes(self, owner: str) -> set:
+        """Zbiór heksów widzianych przez żetony danego właściciela."""
+        return set(self._owner_counts.get(owner, ()))
+
+    def observer_count(self, owner: str, hex_pos: Hex) -> int:
+        return self._owner_counts.get(owner, {}).get(hex_pos, 0)
+
+    def update_players(self, players, all_tokens):
+        """Odpowiednik update_all_players_visibility: dowódcy, potem generałowie."""
+        self.sync_tokens(all_tokens)
+        for player in players:
+            role = player.role.lower()
+            if role == 'dowódca':
+                self._apply_temp_and_tokens(player, self.owner_hexes(f"{player.id} ({player.nation})"))
+            elif role == 'generał':
+                # Heksy i żetony generała wyznacza _update_general; tu tylko dane detekcji
+                self._merge_temp_token_data(player)
+            else:
+                self._apply_temp_and_tokens(player, set())
+        for player in players:
+            if player.role.lower() == 'generał':
+                self._update_general(player, players, all_tokens)
+
+    def _apply_temp_and_tokens(self, player, visible_hexes: set):
+        if hasattr(player, 'temp_visible_hexes'):
+            visible_hexes |= player.temp_visible_hexes
+        player.visible_hexes = visible_hexes
+        visible_tokens = set()
+        tokens_by_hex = self._tokens_by_hex
+        if len(tokens_by_hex) <= len(visible_hexes):
+            for pos, tokens in tokens_by_hex.items():
+                if pos in visible_hexes:
+                    visible_tokens.update(t.id for t in tokens)
+        else:
+            for pos in visible_hexes:
+                tokens = tokens_by_hex.get(pos)
+                if tokens:
+                    visible_tokens.update(t.id for t in tokens)
+        if hasattr(player, 'temp_visible_tokens'):
+            visible_tokens |= player.temp_visible_tokens
+        player.visible_tokens = visible_tokens
+        self._merge_temp_token_data(player)
+
+    @staticmethod
+    def _merge_temp_token_data(player):
+        if hasattr(player, 'temp_visible_token_data'):
+            if not hasattr(player, 'visible_token_data'):
+                player.visible_token_data = {}
+            player.visible_token_data.update(player.temp_visible_token_data)
+        mark_visibility_changed(player)
+
+    def _update_general(self, general, all_players, all_tokens):
+        nation = general.nation
+        suffix = f"({nation})"
+        all_hexes = set()
+        for p in all_players:
+            if p.role.lower() == 'dowódca' and p.nation == nation:
+                all_hexes |= getattr(p, 'visible_hexes', set())
+        general.visible_hexes = all_hexes
+        visible_tokens = set()
+        for t in all_tokens:
+            owner = t.owner
+            if owner and owner.endswith(suffix):
+                visible_tokens.add(t.id)
+            elif owner and (t.q, t.r) in all_hexes:
+                visible_tokens.add(t.id)
+        general.visible_tokens = visible_tokens
+
+    def _add_entry(self, entry):
+        token, owner, pos, _, hexes = entry
+        counts = self._owner_counts.setdefault(owner, {})
+        for h in hexes:
+            counts[h] = counts.get(h, 0) + 1
+        self._tokens_by_hex.setdefault(pos, []).append(token)
+
+    def _drop_entry(self, entry):
+        token, owner, pos, _, hexes = entry
+        counts = self._owner_counts.get(owner)
+        if counts is not None:
+            for h in hexes:
+                left = counts[h] - 1
+                if left:
+                    counts[h] = left
+                else:
+                    del counts[h]
+            if not counts:
+                del self._owner_counts[owner]
+        cell = self._tokens_by_hex.get(pos)
+        if cell:
+            for i, other in enumerate(cell):
+                if other is token:
+                    del cell[i]
+                    break
+            if not cell:
+                del self._tokens_by_hex[pos]
+
+
+def get_fog_of_war(board) -> Optional[FogOfWar]:
+    """Zwraca (tworząc przy pierwszym użyciu) mgłę wojny przypisaną do planszy.
+    None, jeśli planszy nie da się rozszerzyć o atrybut (wtedy pełne przeliczenie)."""
+    fog = getattr(board, '_fog_of_war', None)
+    if not isinstance(fog, FogOfWar):
+        fog = FogOfWar(board)
+        try:
+            board._fog_of_war = fog
+        except AttributeError:
+            return None
+    return fog
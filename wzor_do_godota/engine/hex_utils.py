@@ -1,4 +1,5 @@
 import math
+from functools import lru_cache
 
 def get_hex_vertices(cx, cy, s):
     angles = [math.radians(60 * i) for i in range(6)]
@@ -24,3 +25,58 @@ def get_neighbors(q, r):
         (q + 1, r - 1),
         (q - 1, r + 1)
     ]
+
+
+# --- Tablice przesunięć dysków i pierścieni heksowych (axial) ---
+
+@lru_cache(maxsize=None)
+def disk_offsets(radius):
+    """Przesunięcia (dq, dr) wszystkich heksów w odległości <= radius (zapamiętywane per promień)."""
+    if radius < 0:
+        return ()
+    offsets = []
+    for dq in range(-radius, radius + 1):
+        # Dla danego dq warunek |dq| + |dr| + |dq + dr| <= 2*radius daje ciągły przedział dr
+        for dr in range(max(-radius, -dq - radius), min(radius, -dq + radius) + 1):
+            offsets.append((dq, dr))
+    return tuple(offsets)
+
+
+@lru_cache(maxsize=None)
+def ring_offsets(radius):
+    """Przesunięcia (dq, dr) heksów w odległości dokładnie radius (zapamiętywane per promień)."""
+    if radius < 0:
+        return ()
+    if radius == 0:
+        return ((0, 0),)
+    directions = ((+1, 0), (+1, -1), (0, -1), (-1, 0), (-1, +1), (0, +1))
+    dq, dr = -radius, radius  # start: radius kroków w kierunku (-1, +1)
+    offsets = []
+    for step_q, step_r in directions:
+        for _ in range(radius):
+            offsets.append((dq, dr))
+            dq += step_q
+            dr += step_r
+    return tuple(offsets)
+
+
+def hexes_in_range(board, center, radius, clip_to_board=True):
+    """Heksy w odległości <= radius od center.
+    Dla planszy z indeksem terenu (Board.hex_index) używa tablicy przesunięć i przycina do mapy;
+    dla innych obiektów planszy (np. atrap w testach) skanuje kwadrat przez board.hex_distance."""
+    q, r = center
+    hex_index = getattr(board, "hex_index", None)
+    if hex_index is not None:
+        if not clip_to_board:
+            return [(q + dq, r + dr) for dq, dr in disk_offsets(radius)]
+        return [(q + dq, r + dr) for dq, dr in disk_offsets(radius) if hex_index(q + dq, r + dr) >= 0]
+    hexes = []
+    for dq in range(-radius, radius + 1):
+        for dr in range(-radius, radius + 1):
+            target = (q + dq, r + dr)
+            if board.hex_distance(center, target) > radius:
+                continue
+            if clip_to_board and board.get_tile(*target) is None:
+                continue
+            hexes.append(target)
+    return hexes
@@ -0,0 +1,57 @@
+"""
+Rejestr stanu punktów kluczowych (key points) w pamięci.
+
+Mapa (data/map_data.json) jest wyłącznie danymi wejściowymi – wartości początkowe.
+Bieżący stan (ile punktów zostało, które wyczerpano) żyje w KeyPointLedger i trafia
+na dysk tylko razem z zapisem gry (save_manager.save_game / GameEngine.save_state).
+"""
+
+from typing import Any, Dict, Optional
+
+
+class KeyPointLedger(dict):
+    """Słownik hex_id -> {'initial_value', 'current_value', 'type'}.
+    Dziedziczy po dict, więc dotychczasowe odczyty engine.key_points_state działają bez zmian."""
+
+    @classmethod
+    def from_board(cls, board) -> "KeyPointLedger":
+        """Stan początkowy na podstawie key_points wczytanych z mapy."""
+        ledger = cls()
+        for hex_id, kp in getattr(board, 'key_points', {}).items():
+            ledger[hex_id] = {
+                'initial_value': kp['value'],
+                'current_value': kp['value'],
+                'type': kp.get('type', None)
+            }
+        return ledger
+
+    @classmethod
+    def from_state(cls, data: Optional[Dict[str, Dict[str, Any]]]) -> "KeyPointLedger":
+        """Odtwarza rejestr z zapisu gry."""
+        ledger = cls()
+        for hex_id, kp in (data or {}).items():
+            ledger[hex_id] = dict(kp)
+        return ledger
+
+    def consume(self, hex_id: str, amount: int) -> int:
+        """Zmniejsza bieżącą wartość punktu o amount; zwraca wartość po zmianie."""
+        kp = self[hex_id]
+        kp['current_value'] -= amount
+        return kp['current_value']
+
+    def remove(self, hex_id: str, board=None) -> None:
+        """Usuwa wyczerpany punkt z rejestru (i z key_points planszy, jeśli podano)."""
+        self.pop(hex_id, None)
+        if board is not None and hasattr(board, 'key_points'):
+            board.key_points.pop(hex_id, None)
+
+    def prune_board(self, board) -> None:
+        """Usuwa z key_points planszy punkty nieobecne w rejestrze (np. wyczerpane przed zapisem)."""
+        key_points = getattr(board, 'key_points', None)
+        if not key_points:
+            return
+        for hex_id in [h for h in key_points if h not in self]:
+            key_points.pop(hex_id, None)
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {hex_id: dict(kp) for hex_id, kp in self.items()}
@@ -70,6 +70,7 @@ class Player:
         self.temp_visible_hexes = set()  # Heksy odkryte tymczasowo w tej turze
         self.temp_visible_tokens = set()  # Żetony przeciwnika widoczne tymczasowo w tej turze
         self.temp_visible_token_data = {}  # Metadane detection_level dla temp_visible_tokens
+        self.visibility_version = 0  # Rośnie przy każdej zmianie danych widoczności (detection_filter.mark_visibility_changed)
 
         # --- PUNKTY ZWYCIĘSTWA (VP) ---
         self.victory_points = 0
@@ -83,21 +84,17 @@ class Player:
         """
         if not game_engine:
             return True  # Zakładamy że ma jednostki jeśli nie mamy dostępu do silnika
-            
-        # Sprawdź czy gracz ma jakiekolwiek tokeny
-        player_tokens = []
-        for token in game_engine.tokens:
-            token_owner = getattr(token, 'owner', '')
-            if f"{self.id} (" in str(token_owner):  # Sprawdź ID gracza w owner
-                player_tokens.append(token)
-        
-        # Sprawdź czy któryś token ma punkty HP > 0
-        for token in player_tokens:
-            current_hp = getattr(token, 'currentCombatStrength', 0)
-            if current_hp > 0:
-                return True
-                
-        return False
+
+        # Rejestr żetonów utrzymuje liczniki żywych jednostek na gracza – O(1)
+        tokens = getattr(game_engine, 'tokens', None) or []
+        alive_count = getattr(tokens, 'alive_count', None)
+        if callable(alive_count):
+            player_id = int(self.id) if isinstance(self.id, str) and self.id.isdigit() else self.id
+            return alive_count(owner_id=player_id) > 0
+
+        # Zwykła lista żetonów (testy, narzędzia) – żeton usunięty z gry = wyeliminowany
+        from engine.token import owned_by
+        return any(owned_by(token, self) for token in tokens)
 
     def serialize(self):
         return {
@@ -0,0 +1,118 @@
+"""
+Mapa osiągalności (Dijkstra) dla planszy heksowej.
+
+Jedno przeszukanie z danego pola startowego odpowiada na wszystkie pytania planowania ruchu:
+zbiór osiągalnych heksów, koszt dojścia i odtworzenie ścieżki. Board.reachability trzyma
+te mapy w pamięci podręcznej (klucz: start, budżet ruchu, filtr widoczności, wersja zajętości).
+"""
+
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+from engine.board import HEX_DIRECTIONS
+
+Hex = Tuple[int, int]
+
+
+class ReachabilityMap:
+    """Wynik jednego przeszukania Dijkstry z pola `start` przy budżecie `budget` (MP i paliwo)."""
+
+    __slots__ = ("start", "budget", "costs", "parents", "order")
+
+    def __init__(self, start: Hex, budget: int):
+        self.start = start
+        self.budget = budget
+        self.costs: Dict[Hex, int] = {start: 0}
+        self.parents: Dict[Hex, Optional[Hex]] = {start: None}
+        # Kolejność ustalania kosztów (rosnąco po koszcie) – bez pola startowego
+        self.order: List[Hex] = []
+
+    def reachable(self) -> List[Hex]:
+        """Osiągalne heksy (bez startu) w kolejności rosnącego kosztu."""
+        return list(self.order)
+
+    def is_reachable(self, pos: Hex) -> bool:
+        return pos in self.costs
+
+    def cost(self, pos: Hex) -> Optional[int]:
+        """Koszt dojścia (MP = paliwo) albo None, jeśli pole jest nieosiągalne."""
+        return self.costs.get(pos)
+
+    def path_to(self, goal: Hex) -> Optional[List[Hex]]:
+        """Ścieżka od startu do celu (włącznie z oboma końcami) albo None."""
+        if goal not in self.parents:
+            return None
+        path = [goal]
+        current = self.parents[goal]
+        while current is not None:
+            path.append(current)
+            current = self.parents[current]
+        path.reverse()
+        return path
+
+    def closest_to(self, goal: Hex) -> Hex:
+        """Osiągalne pole najbliższe celowi (dystans heksowy, potem koszt, potem współrzędne)."""
+        gq, gr = goal
+        best = self.start
+        best_key = None
+        for pos, cost in self.costs.items():
+            q, r = pos
+            key = ((abs(q - gq) + abs(q + r - gq - gr) + abs(r - gr)) // 2, cost, pos)
+            if best_key is None or key < best_key:
+                best_key = key
+                best = pos
+        return best
+
+
+def compute_reachability(board, start: Hex, budget: int, visible_tokens: Optional[set] = None) -> ReachabilityMap:
+    """Dijkstra po tabeli sąsiadów planszy. Blokują pola z move_mod == -1 i zajęte przez żetony
+    (tylko widoczne, jeśli podano visible_tokens) – te same zasady co Board.find_path.
+    Krok kosztuje 1 + move_mod, ale nie mniej niż 1 (move_mod < -1 nie daje kroku darmowego
+    ani ujemnego, który złamałby kolejność ustalania kosztów)."""
+    result = ReachabilityMap(start, budget)
+    coords = board.hex_coords
+    move_mods = board.move_mods
+    neighbor_table = board.neighbor_table
+    occupancy = board._occupancy
+    use_is_occupied = board._needs_is_occupied()
+    costs = result.costs
+    parents = result.parents
+    order = result.order
+
+    start_index = board.hex_index(*start)
+    open_set = [(0, start, start_index)]
+    settled = set()
+    while open_set:
+        cost, current, current_index = heapq.heappop(open_set)
+        if current in settled:
+            continue
+        settled.add(current)
+        if current != start:
+            order.append(current)
+        if current_index >= 0:
+            neighbor_indices = neighbor_table[current_index]
+        else:
+            cq, cr = current
+            neighbor_indices = [i for i in (board.hex_index(cq + dq, cr + dr) for dq, dr in HEX_DIRECTIONS) if i >= 0]
+        for n_index in neighbor_indices:
+            move_mod = move_mods[n_index]
+            if move_mod == -1:
+                continue
+            new_cost = cost + (1 + move_mod if move_mod > 0 else 1)
+            if new_cost > budget:
+                continue
+            neighbor = coords[n_index]
+            known = costs.get(neighbor)
+            if known is not None and known <= new_cost:
+                continue
+            if use_is_occupied:
+                if board.is_occupied(*neighbor, visible_tokens=visible_tokens):
+                    continue
+            else:
+                cell = occupancy.get(neighbor)
+                if cell and (visible_tokens is None or any(t.id in visible_tokens for t in cell)):
+                    continue
+            costs[neighbor] = new_cost
+            parents[neighbor] = current
+            heapq.heappush(open_set, (new_cost, neighbor, n_index))
+    return result
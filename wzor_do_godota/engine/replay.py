@@ -0,0 +1,360 @@
+"""Dziennik akcji partii i odtwarzacz stanu tura po turze.
+
+ActionJournal dopisuje do pliku JSON Lines (opcjonalnie gzip) rekordy:
+- "keyframe" – pełna tabela żetonów (engine.save_format), stan strumieni RNG, tura,
+- "action"   – typ i parametry akcji z GameEngine.execute_action, wynik, odciski
+               strumieni RNG, z których losowano, oraz delta żetonów (zmienione pola,
+               nowe i usunięte żetony),
+- "turn"     – punkt kontrolny po turze gracza: delta wszystkiego, co zmieniło się
+               poza akcjami (reset punktów ruchu, zakupy, uzupełnienia).
+Co `keyframe_interval` rekordów dopisywana jest klatka kluczowa. W dzienniku gzip każda
+klatka kluczowa zaczyna nowy, niezależny człon gzip (odcinek), więc czytelnik może
+zacząć dekompresję od odcinka, a nie od początku pliku.
+
+ReplayReader indeksuje plik jednym przebiegiem (bez parsowania całych rekordów),
+a stan dowolnej tury lub rekordu odtwarza od najbliższej wcześniejszej klatki
+kluczowej, nakładając delty – bez ponownego uruchamiania AI. Koszt odczytu jest
+ograniczony długością odcinka (keyframe_interval rekordów), także dla gzip.
+"""
+
+import bisect
+import gzip
+import json
+import os
+import re
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from engine import save_format
+from engine.rng import GameRNG
+from engine.token import Token
+
+KEYFRAME_INTERVAL = 256
+
+# Rekordy zaczynają się zawsze od k/seq/turn – indeks czyta tylko ten nagłówek
+_HEADER = re.compile(rb'^\{"k":"(\w+)","seq":(\d+),"turn":(-?\d+|null)')
+_PRIMITIVES = (str, int, float, bool, type(None))
+_MISSING = object()
+
+
+def _is_compressed(path: str) -> bool:
+    with open(path, "rb") as probe:
+        return probe.read(2) == save_format.GZIP_MAGIC
+
+
+def _gzip_members(f, chunk_size: int = 1 << 16) -> Iterator[Tuple[int, bytes]]:
+    """(pozycja członu w pliku, zdekompresowana treść) kolejnych członów gzip.
+    Niedomknięty ostatni człon (dziennik w trakcie zapisu) zwracany jest w takiej postaci, jaką ma."""
+    offset = 0
+    pending = b""
+    while True:
+        start = offset
+        inflater = zlib.decompressobj(wbits=31)
+        parts = []
+        while not inflater.eof:
+            chunk = pending or f.read(chunk_size)
+            pending = b""
+            if not chunk:
+                break
+            offset += len(chunk)
+            parts.append(inflater.decompress(chunk))
+        if not inflater.eof:
+            parts.append(inflater.flush())
+            data = b"".join(parts)
+            if data:
+                yield start, data
+            return
+        pending = inflater.unused_data
+        offset -= len(pending)
+        yield start, b"".join(parts)
+
+
+def _row_changes(previous: Dict[str, Any], row: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in row.items() if previous.get(key, _MISSING) != value}
+
+
+def _action_params(action) -> Dict[str, Any]:
+    params = {}
+    for key, value in vars(action).items():
+        if key.startswith("_"):
+            continue
+        if isinstance(value, tuple):
+            value = list(value)
+        if isinstance(value, _PRIMITIVES) or (isinstance(value, list) and all(isinstance(v, _PRIMITIVES) for v in value)):
+            params[key] = value
+    return params
+
+
+class ActionJournal:
+    """Dopisywany dziennik akcji jednej partii (GameEngine.start_journal)."""
+
+    def __init__(self, path: str, keyframe_interval: int = KEYFRAME_INTERVAL, compress: bool = False):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.compress = compress
+        self._raw = open(path, "wb")
+        self._file = gzip.GzipFile(fileobj=self._raw, mode="wb") if compress else self._raw
+        self.seq = 0
+        self._since_keyframe = 0
+        # id żetonu -> ostatni zapisany wiersz (Token.serialize), w kolejności engine.tokens
+        self._rows: Dict[Any, Dict[str, Any]] = {}
+
+    # ------------------------------------------------------------ zapis
+
+    def _write(self, kind: str, turn, payload: Dict[str, Any]) -> None:
+        record = {"k": kind, "seq": self.seq, "turn": turn}
+        record.update(payload)
+        self._file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n")
+        self.seq += 1
+        self._since_keyframe += 1
+
+    def write_keyframe(self, engine) -> None:
+        if self.compress and self.seq:
+            # Nowy człon gzip – odcinek od tej klatki kluczowej da się zdekompresować samodzielnie
+            self._file.close()  # zamyka tylko człon (GzipFile z fileobj nie zamyka pliku)
+            self._file = gzip.GzipFile(fileobj=self._raw, mode="wb")
+        self._rows = {row.get("id"): row for row in (token.serialize() for token in engine.tokens)}
+        rng = getattr(engine, "rng", None)
+        self._write("keyframe", engine._resolve_turn_number(), {
+            "current_player": getattr(engine, "current_player", None),
+            "rng": rng.getstate() if isinstance(rng, GameRNG) else None,
+            "tokens": save_format.encode_token_table(self._rows.values()),
+        })
+        self._since_keyframe = 0
+        self._file.flush()
+
+    @staticmethod
+    def rng_fingerprint(engine) -> Optional[Dict[str, int]]:
+        rng = getattr(engine, "rng", None)
+        return rng.fingerprint() if isinstance(rng, GameRNG) else None
+
+    def record_action(self, engine, action, pre_state, result, rng_before=None, player=None) -> None:
+        """Akcja z execute_action: delta tylko dla jej żetonów, chyba że zmieniła się liczba żetonów."""
+        involved = []
+        for snapshot in (pre_state or {}).values():
+            if snapshot and snapshot.get("id") is not None:
+                involved.append(snapshot["id"])
+        for attr in ("token_id", "attacker_id", "defender_id"):
+            token_id = getattr(action, attr, None)
+            if token_id is not None and token_id not in involved:
+                involved.append(token_id)
+
+        delta = self._diff_tokens(engine, involved)
+        success, message, _ = engine._extract_action_result(result)
+        payload = {
+            "type": action.__class__.__name__,
+            "params": _action_params(action),
+            "player": getattr(player, "id", None),
+            "success": success,
+            "message": message,
+        }
+        rng_after = self.rng_fingerprint(engine)
+        if rng_after is not None:
+            payload["rng"] = {name: value for name, value in rng_after.items()
+                              if (rng_before or {}).get(name) != value}
+        payload["delta"] = delta
+        self._write("action", engine._resolve_turn_number(), payload)
+        self._maybe_keyframe(engine)
+
+    def record_checkpoint(self, engine) -> None:
+        """Punkt kontrolny po turze gracza – pełne porównanie żetonów (O(N) raz na turę gracza)."""
+        self._write("turn", engine._resolve_turn_number(), {
+            "current_player": getattr(engine, "current_player", None),
+            "delta": self._diff_tokens(engine, None),
+        })
+        self._file.flush()
+        self._maybe_keyframe(engine)
+
+    def _maybe_keyframe(self, engine) -> None:
+        if self._since_keyframe >= self.keyframe_interval:
+            self.write_keyframe(engine)
+
+    def _diff_tokens(self, engine, token_ids: Optional[List[Any]]) -> Dict[str, Any]:
+        tokens = engine.tokens
+        full = token_ids is None
+        changed: Dict[Any, Dict[str, Any]] = {}
+        added: List[Dict[str, Any]] = []
+        removed: List[Any] = []
+        if not full:
+            for token_id in token_ids:
+                token = engine.get_token(token_id)
+                if token is None:
+                    if token_id in self._rows:
+                        del self._rows[token_id]
+                        removed.append(token_id)
+                    continue
+                self._note_row(token.serialize(), changed, added)
+            # Żetony dodane/usunięte poza akcją – porównanie pełne
+            full = len(tokens) != len(self._rows)
+        order = None
+        if full:
+            current = {}
+            for token in tokens:
+                row = token.serialize()
+                current[row.get("id")] = None
+                self._note_row(row, changed, added)
+            for token_id in [token_id for token_id in self._rows if token_id not in current]:
+                del self._rows[token_id]
+                removed.append(token_id)
+            if list(current) != list(self._rows):
+                order = list(current)
+                self._rows = {token_id: self._rows[token_id] for token_id in order}
+
+        delta: Dict[str, Any] = {}
+        if changed:
+            delta["set"] = [[token_id, fields] for token_id, fields in changed.items()]
+        if added:
+            delta["add"] = added
+        if removed:
+            delta["del"] = removed
+        if order is not None:
+            delta["order"] = order
+        return delta
+
+    def _note_row(self, row, changed, added) -> None:
+        token_id = row.get("id")
+        previous = self._rows.get(token_id)
+        if previous is None:
+            added.append(row)
+        else:
+            fields = _row_changes(previous, row)
+            if fields:
+                changed.setdefault(token_id, {}).update(fields)
+        self._rows[token_id] = row
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+        if not self._raw.closed:
+            self._raw.close()
+
+
+class ReplayState:
+    """Stan partii odtworzony z dziennika: wiersze żetonów (Token.serialize) i metadane."""
+
+    def __init__(self, rows: Dict[Any, Dict[str, Any]], turn=None, seq: int = -1, current_player=None, rng_state=None):
+        self.rows = rows
+        self.turn = turn
+        self.seq = seq
+        self.current_player = current_player
+        self.rng_state = rng_state  # stan RNG z ostatniej klatki kluczowej (akcje niosą tylko odciski)
+
+    def apply(self, record: Dict[str, Any]) -> None:
+        kind = record.get("k")
+        if kind == "keyframe":
+            rows = save_format.decode_token_table(record.get("tokens", {}))
+            self.rows = {row.get("id"): row for row in rows}
+            self.rng_state = record.get("rng")
+        else:
+            delta = record.get("delta") or {}
+            for token_id in delta.get("del", ()):
+                self.rows.pop(token_id, None)
+            for row in delta.get("add", ()):
+                self.rows[row.get("id")] = row
+            for token_id, fields in delta.get("set", ()):
+                self.rows[token_id] = dict(self.rows.get(token_id, {}), **fields)
+            if delta.get("order") is not None:
+                self.rows = {token_id: self.rows[token_id] for token_id in delta["order"] if token_id in self.rows}
+        if "current_player" in record:
+            self.current_player = record["current_player"]
+        self.turn = record.get("turn")
+        self.seq = record.get("seq", self.seq)
+
+    def tokens(self) -> List[Token]:
+        return [Token.from_dict(row) for row in self.rows.values()]
+
+
+class ReplayReader:
+    """Odtwarzanie stanu z dziennika: indeks rekordów i klatek kluczowych, przewijanie delt."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.compressed = _is_compressed(path)
+        # Rekord seq: pozycja członu gzip w pliku i pozycja w jego treści (bez kompresji: 0 i pozycja w pliku)
+        self._members: List[int] = []
+        self._offsets: List[int] = []
+        self._turns: List[int] = []
+        self._keyframes: List[int] = []  # numery seq klatek kluczowych
+        with open(path, "rb") as f:
+            if self.compressed:
+                for member, data in _gzip_members(f):
+                    self._index_lines(member, data.splitlines(keepends=True))
+            else:
+                self._index_lines(0, f)
+
+    def _index_lines(self, member: int, lines) -> None:
+        offset = 0
+        for line in lines:
+            match = _HEADER.match(line)
+            if match is not None:
+                kind, seq, turn = match.groups()
+                if int(seq) != len(self._offsets):
+                    raise ValueError(f"Dziennik {self.path}: nieciągła numeracja rekordów przy {seq}")
+                self._members.append(member)
+                self._offsets.append(offset)
+                self._turns.append(int(turn) if turn != b"null" else 0)
+                if kind == b"keyframe":
+                    self._keyframes.append(int(seq))
+            offset += len(line)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    @property
+    def turns(self) -> List[int]:
+        return sorted(set(self._turns))
+
+    def records(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Rekordy o seq w [start, stop)."""
+        stop = len(self._offsets) if stop is None else min(stop, len(self._offsets))
+        if start >= stop:
+            return
+        with open(self.path, "rb") as raw:
+            raw.seek(self._members[start])
+            f = gzip.GzipFile(fileobj=raw, mode="rb") if self.compressed else raw
+            # Przewinięcie w obrębie członu – najwyżej jeden odcinek między klatkami kluczowymi
+            f.seek(self._offsets[start])
+            for _ in range(start, stop):
+                yield json.loads(f.readline())
+
+    def actions(self, turn: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Rekordy akcji (całej partii albo jednej tury)."""
+        start, stop = 0, len(self._offsets)
+        if turn is not None:
+            start = bisect.bisect_left(self._turns, turn)
+            stop = bisect.bisect_right(self._turns, turn)
+        for record in self.records(start, stop):
+            if record.get("k") == "action":
+                yield record
+
+    def seq_for_turn(self, turn: int) -> int:
+        """Ostatni rekord tury `turn` (stan na koniec tej tury); -1 gdy dziennik zaczyna się później."""
+        return bisect.bisect_right(self._turns, turn) - 1
+
+    def state_at(self, seq: Optional[int] = None, turn: Optional[int] = None) -> ReplayState:
+        """Stan po rekordzie `seq` albo na koniec tury `turn` – od najbliższej klatki kluczowej."""
+        if seq is None:
+            seq = self.seq_for_turn(turn) if turn is not None else len(self._offsets) - 1
+        if seq < 0 or not self._keyframes or seq < self._keyframes[0]:
+            raise ValueError(f"Brak stanu dla rekordu {seq} w dzienniku {self.path}")
+        keyframe = self._keyframes[bisect.bisect_right(self._keyframes, seq) - 1]
+        state = ReplayState({})
+        for record in self.records(keyframe, seq + 1):
+            state.apply(record)
+        return state
+
+    def restore(self, engine, seq: Optional[int] = None, turn: Optional[int] = None) -> ReplayState:
+        """Ustawia żetony, turę i aktywnego gracza silnika na odtworzony stan (AI nie jest uruchamiane)."""
+        state = self.state_at(seq=seq, turn=turn)
+        engine.tokens = state.tokens()
+        board = getattr(engine, "board", None)
+        if board is not None and hasattr(board, "set_tokens"):
+            board.set_tokens(engine.tokens)
+        if state.turn is not None:
+            engine.turn = state.turn
+        if state.current_player is not None:
+            engine.current_player = state.current_player
+        return state
@@ -0,0 +1,76 @@
+"""
+Deterministyczne źródło losowości partii.
+
+GameRNG trzyma niezależne, nazwane strumienie (walka, odwrót, pogoda, AI, ekonomia),
+każdy zasiany skrótem (ziarno partii, nazwa strumienia). Dzięki temu ziarno w pełni
+wyznacza partię, a dodatkowe losowanie w jednym podsystemie (np. nowa heurystyka AI)
+nie przesuwa sekwencji w pozostałych.
+"""
+
+import hashlib
+import random
+from typing import Any, Dict, Optional
+
+COMBAT = "combat"
+RETREAT = "retreat"
+WEATHER = "weather"
+AI = "ai"
+ECONOMY = "economy"
+ENGINE = "engine"
+
+STREAM_NAMES = (COMBAT, RETREAT, WEATHER, AI, ECONOMY, ENGINE)
+
+
+def derive_seed(seed: Any, name: str) -> int:
+    """Stabilne (niezależne od PYTHONHASHSEED) ziarno podstrumienia."""
+    digest = hashlib.sha256(f"{seed}:{name}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+class GameRNG:
+    """Zestaw nazwanych strumieni random.Random jednej partii."""
+
+    def __init__(self, seed: Any = 0):
+        self.seed = seed
+        self._streams: Dict[str, random.Random] = {}
+
+    def stream(self, name: str) -> random.Random:
+        """Zwraca (tworząc przy pierwszym użyciu) strumień o danej nazwie."""
+        rng = self._streams.get(name)
+        if rng is None:
+            rng = random.Random(derive_seed(self.seed, name))
+            self._streams[name] = rng
+        return rng
+
+    def getstate(self) -> Dict[str, Any]:
+        """Stan wszystkich użytych strumieni w postaci zgodnej z JSON (do zapisu gry)."""
+        streams = {}
+        for name, rng in self._streams.items():
+            version, internal, gauss_next = rng.getstate()
+            streams[name] = [version, list(internal), gauss_next]
+        return {"seed": self.seed, "streams": streams}
+
+    def fingerprint(self) -> Dict[str, int]:
+        """Krótki odcisk stanu każdego użytego strumienia – tani sposób sprawdzenia, czy coś losowano."""
+        return {name: hash(rng.getstate()[1]) & 0xFFFFFFFF for name, rng in self._streams.items()}
+
+    def setstate(self, state: Optional[Dict[str, Any]]) -> None:
+        """Odtwarza stan zapisany przez getstate (strumienie spoza zapisu startują od ziarna)."""
+        if not state:
+            return
+        self.seed = state.get("seed", self.seed)
+        self._streams = {}
+        for name, (version, internal, gauss_next) in (state.get("streams") or {}).items():
+            rng = random.Random()
+            rng.setstate((version, tuple(internal), gauss_next))
+            self._streams[name] = rng
+
+
+def get_rng(owner: Any, name: str):
+    """Strumień `name` z GameRNG właściciela (silnik lub obiekt z atrybutem rng).
+    Gdy go brak (np. atrapy silnika w testach), zwraca globalny moduł random –
+    ma to samo API (random(), uniform(), randint(), choice())."""
+    rng = getattr(owner, "rng", None)
+    if isinstance(rng, GameRNG):
+        return rng.stream(name)
+    return random
@@ -0,0 +1,260 @@
+"""Format zapisu gry w wersji 2: kolumnowa tabela żetonów, magazyn plików i delty tur.
+
+Wersja 1 (nadal wczytywana) to słownik JSON z listą `tokens` – każdy żeton z pełnym
+słownikiem statystyk, a nowe żetony dodatkowo z wklejonym JSON-em i obrazem PNG w base64.
+
+Wersja 2:
+- dokument ma nagłówek {"format": SAVE_FORMAT, "version": 2, "kind": "full" | "delta"},
+- żetony są tabelą kolumnową (kolumna = pole Token.serialize), a identyczne słowniki
+  statystyk (żetony jednego blueprintu) trafiają do tabeli `stats` raz i są wskazywane indeksem,
+- pliki nowych żetonów leżą w BlobStore obok zapisów, adresowane skrótem SHA-256
+  (ten sam obraz zapisany w wielu zapisach zajmuje miejsce raz),
+- zapis "delta" trzyma tylko żetony zmienione względem zapisu bazowego (plus usunięte id
+  i ewentualnie nową kolejność) – autozapis co turę nie przepisuje całej armii,
+- plik może być skompresowany gzipem (rozpoznawany po nagłówku przy wczytywaniu).
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+SAVE_FORMAT = "kampania-save"
+SAVE_FORMAT_VERSION = 2
+GZIP_MAGIC = b"\x1f\x8b"
+
+# Kolumna ze statystykami przechowywana jako indeks do tabeli `stats`
+STATS_COLUMN = "stats"
+# Co ile tur zapis co turę (autozapis, saves/latest.json) robi nową pełną bazę zamiast delty
+TURN_KEYFRAME_INTERVAL = 10
+
+
+def content_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def is_versioned(state: Dict[str, Any]) -> bool:
+    """Czy dokument jest w formacie wersji 2 (w przeciwnym razie: dawny zapis JSON)."""
+    return isinstance(state, dict) and state.get("format") == SAVE_FORMAT
+
+
+# ---------------------------------------------------------------- tabela żetonów
+
+def encode_token_table(rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Lista słowników żetonów (Token.serialize) -> tabela kolumnowa."""
+    rows = list(rows)
+    columns: List[str] = []
+    seen = set()
+    for row in rows:
+        for key in row:
+            if key not in seen:
+                seen.add(key)
+                columns.append(key)
+
+    values: Dict[str, List[Any]] = {column: [] for column in columns}
+    absent: Dict[str, List[int]] = {}
+    stats_table: List[Any] = []
+    stats_index: Dict[str, int] = {}
+    for index, row in enumerate(rows):
+        for column in columns:
+            if column not in row:
+                absent.setdefault(column, []).append(index)
+                values[column].append(None)
+                continue
+            value = row[column]
+            if column == STATS_COLUMN:
+                key = json.dumps(value, sort_keys=True, ensure_ascii=False)
+                position = stats_index.get(key)
+                if position is None:
+                    position = stats_index[key] = len(stats_table)
+                    stats_table.append(value)
+                value = position
+            values[column].append(value)
+
+    table = {"rows": len(rows), "columns": columns, "values": values, "stats": stats_table}
+    if absent:
+        table["absent"] = absent
+    return table
+
+
+def decode_token_table(table: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Tabela kolumnowa -> lista słowników żetonów dla Token.from_dict."""
+    count = table.get("rows", 0)
+    columns = table.get("columns", [])
+    values = table.get("values", {})
+    stats_table = table.get("stats", [])
+    absent = {column: set(indices) for column, indices in (table.get("absent") or {}).items()}
+    rows: List[Dict[str, Any]] = [{} for _ in range(count)]
+    for column in columns:
+        column_values = values.get(column, [])
+        missing = absent.get(column, ())
+        for index, value in enumerate(column_values[:count]):
+            if index in missing:
+                continue
+            if column == STATS_COLUMN and isinstance(value, int):
+                value = dict(stats_table[value])
+            rows[index][column] = value
+    return rows
+
+
+# ---------------------------------------------------------------- delty
+
+def encode_token_delta(base_rows: List[Dict[str, Any]], rows: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Zmiany żetonów względem zapisu bazowego; None gdy id nie są unikalne (wtedy zapis pełny)."""
+    base_by_id = {row.get("id"): row for row in base_rows}
+    current_ids = [row.get("id") for row in rows]
+    if len(base_by_id) != len(base_rows) or len(set(current_ids)) != len(current_ids):
+        return None
+
+    changed = [row for row in rows if base_by_id.get(row.get("id")) != row]
+    current = set(current_ids)
+    removed = [token_id for token_id in base_by_id if token_id not in current]
+    delta = {"changed": encode_token_table(changed), "removed": removed}
+    # Kolejność zapisujemy tylko gdy różni się od: baza bez usuniętych + nowe na końcu
+    expected = [token_id for token_id in base_by_id if token_id in current]
+    expected += [token_id for token_id in current_ids if token_id not in base_by_id]
+    if expected != current_ids:
+        delta["order"] = current_ids
+    return delta
+
+
+def apply_token_delta(base_rows: List[Dict[str, Any]], delta: Dict[str, Any]) -> List[Dict[str, Any]]:
+    removed = set(delta.get("removed", ()))
+    by_id = {row.get("id"): row for row in base_rows if row.get("id") not in removed}
+    order = [row.get("id") for row in base_rows if row.get("id") not in removed]
+    for row in decode_token_table(delta.get("changed", {})):
+        token_id = row.get("id")
+        if token_id not in by_id:
+            order.append(token_id)
+        by_id[token_id] = row
+    if delta.get("order") is not None:
+        order = delta["order"]
+    return [by_id[token_id] for token_id in order if token_id in by_id]
+
+
+# ---------------------------------------------------------------- pliki
+
+def write_document(path: str, document: Dict[str, Any], compress: bool = False) -> bytes:
+    """Zapis atomowy (plik tymczasowy + os.replace); zwraca zapisane bajty."""
+    data = json.dumps(document, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if compress:
+        data = gzip.compress(data, compresslevel=6, mtime=0)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return data
+
+
+def read_document(path: str) -> Dict[str, Any]:
+    """Wczytuje zapis w dowolnej wersji (JSON lub JSON skompresowany gzipem)."""
+    with open(path, "rb") as f:
+        return decode_document(f.read())
+
+
+def decode_document(data: bytes) -> Dict[str, Any]:
+    """Dokument zapisu z bajtów pliku (JSON lub JSON skompresowany gzipem)."""
+    if data[:2] == GZIP_MAGIC:
+        data = gzip.decompress(data)
+    return json.loads(data.decode("utf-8"))
+
+
+class BlobStore:
+    """Pliki nowych żetonów (JSON/PNG) adresowane skrótem treści – każda treść zapisana raz."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path_for(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    def put(self, data: bytes) -> str:
+        digest = content_digest(data)
+        path = self.path_for(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return digest
+
+    def get(self, digest: str) -> Optional[bytes]:
+        try:
+            with open(self.path_for(digest), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+
+# Zdekodowane żetony zapisów bazowych: ścieżka -> ((mtime_ns, rozmiar), skrót, wiersze).
+# Ostatnio używane na końcu; w użyciu jest zwykle jedna baza na serię zapisów, więc kilka wystarczy
+BASE_CACHE_SIZE = 8
+_BASE_CACHE: "OrderedDict[str, Tuple[Tuple[int, int], str, List[Dict[str, Any]]]]" = OrderedDict()
+
+
+def _file_key(path: str) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _cache_base(key: str, entry: Tuple[Tuple[int, int], str, List[Dict[str, Any]]]) -> None:
+    _BASE_CACHE[key] = entry
+    _BASE_CACHE.move_to_end(key)
+    while len(_BASE_CACHE) > BASE_CACHE_SIZE:
+        _BASE_CACHE.popitem(last=False)
+
+
+def remember_base(path: str, data: bytes, rows: List[Dict[str, Any]]) -> None:
+    """Zapamiętuje żetony świeżo zapisanej bazy – kolejne delty nie czytają jej z dysku."""
+    _cache_base(os.path.abspath(path), (_file_key(path), content_digest(data), rows))
+
+
+def needs_keyframe(base: Optional[Tuple[int, str]], turn: int, interval: int) -> bool:
+    """Czy zapis tury `turn` ma być nową bazą: brak bazy (turn, ścieżka), minął interwał albo tura się cofnęła."""
+    if not base or not base[1] or not os.path.exists(base[1]):
+        return True
+    return turn - base[0] >= interval or turn < base[0]
+
+
+def remove_document(path: str) -> None:
+    """Usuwa plik zapisu razem z jego wpisem w pamięci baz."""
+    _BASE_CACHE.pop(os.path.abspath(path), None)
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def load_base(path: str) -> Tuple[str, List[Dict[str, Any]]]:
+    """(skrót pliku, wiersze żetonów) zapisu bazowego; pełny odczyt tylko po zmianie pliku."""
+    key = os.path.abspath(path)
+    cached = _BASE_CACHE.get(key)
+    if cached is not None and cached[0] == _file_key(path):
+        _BASE_CACHE.move_to_end(key)
+        return cached[1], cached[2]
+    file_key = _file_key(path)
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = content_digest(data)
+    rows = token_rows(decode_document(data), os.path.dirname(path))
+    _cache_base(key, (file_key, digest, rows))
+    return digest, rows
+
+
+def token_rows(state: Dict[str, Any], directory: str = "") -> List[Dict[str, Any]]:
+    """Wiersze żetonów dokumentu dowolnej wersji (delta rozwijana względem swojej bazy)."""
+    if not is_versioned(state):
+        return list(state.get("tokens", []))
+    if state.get("kind") == "delta":
+        base_path = os.path.join(directory, state["base"])
+        digest, base_rows = load_base(base_path)
+        if state.get("base_digest") and state["base_digest"] != digest:
+            raise ValueError(f"Zapis bazowy {base_path} zmienił się od utworzenia delty")
+        return apply_token_delta(base_rows, state.get("tokens", {}))
+    return decode_token_table(state.get("tokens", {}))
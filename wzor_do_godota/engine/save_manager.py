@@ -2,8 +2,14 @@ import os
 import json
 import base64
 from pathlib import Path
+from engine import save_format
 from engine.token import Token
 from engine.player import Player
+from engine.key_points import KeyPointLedger
+from engine.rng import GameRNG
+
+AKTUALNE_DIR = Path("assets/tokens/aktualne")
+BLOB_DIR_NAME = "blobs"  # magazyn plików nowych żetonów obok zapisów (format wersji 2)
 
 def _ensure_saves_dir(path):
     dir_name = os.path.dirname(path)
@@ -14,21 +20,39 @@ def _ensure_saves_dir(path):
         os.makedirs(dir_name, exist_ok=True)
     return path
 
-def save_game(path, engine, active_player=None):
-    path = _ensure_saves_dir(path)
-    def player_to_dict(p):
-        return p.serialize()
 
-    # Serializuj żetony z pełnymi danymi dla nowych żetonów
+def _game_state(engine, active_player):
+    """Stan gry poza żetonami – wspólny dla zapisu JSON i formatu wersji 2."""
+    return {
+        "players": [p.serialize() for p in getattr(engine, 'players', [])],
+        "turn": getattr(engine, 'turn', 1),
+        # ZAPISUJEMY current_player jako id aktywnego gracza
+        "current_player": getattr(engine, 'current_player_obj', getattr(engine, 'current_player', None)).id if hasattr(engine, 'current_player_obj') and getattr(engine, 'current_player_obj', None) else getattr(engine, 'current_player', 0),
+        "weather": {k: v for k, v in engine.weather.__dict__.items() if k != 'rng'} if getattr(engine, 'weather', None) else None,
+        "turn_manager": getattr(engine, 'turn_manager', None).__dict__ if hasattr(engine, 'turn_manager') and getattr(engine, 'turn_manager', None) else None,
+        "active_player_info": {
+            "id": getattr(active_player, 'id', None),
+            "role": getattr(active_player, 'role', None),
+            "nation": getattr(active_player, 'nation', None)
+        },
+        # Stan key pointów żyje tylko w zapisie gry (mapa jest niezmiennym wejściem)
+        "key_points_state": dict(getattr(engine, 'key_points_state', {})),
+        # Stan strumieni losowości – wczytana gra losuje dalej tak samo jak oryginał
+        "rng_state": engine.rng.getstate() if isinstance(getattr(engine, 'rng', None), GameRNG) else None
+    }
+
+
+def _legacy_token_rows(engine):
+    """Żetony w formacie JSON (wersja 1): nowe żetony z pełnymi danymi i obrazem base64."""
     tokens_data = []
     for token in engine.tokens:
         token_data = token.serialize()
-        
+
         # Jeśli to nowy żeton, zapisz pełne dane + obraz
         if "nowy_" in token.id:
-            json_path = Path(f"assets/tokens/aktualne/{token.id}.json")
-            png_path = Path(f"assets/tokens/aktualne/{token.id}.png")
-            
+            json_path = AKTUALNE_DIR / f"{token.id}.json"
+            png_path = AKTUALNE_DIR / f"{token.id}.png"
+
             # Wczytaj pełne dane JSON
             if json_path.exists():
                 try:
@@ -36,7 +60,7 @@ def save_game(path, engine, active_player=None):
                         token_data['full_data'] = json.load(f)
                 except Exception as e:
                     print(f"[WARN] Nie udało się wczytać {json_path}: {e}")
-            
+
             # Zakoduj obraz do base64
             if png_path.exists():
                 try:
@@ -44,30 +68,75 @@ def save_game(path, engine, active_player=None):
                         token_data['image_data'] = base64.b64encode(f.read()).decode('utf-8')
                 except Exception as e:
                     print(f"[WARN] Nie udało się zakodować {png_path}: {e}")
-        
+
         tokens_data.append(token_data)
+    return tokens_data
 
-    state = {
-        "tokens": tokens_data,
-        "players": [player_to_dict(p) for p in getattr(engine, 'players', [])],
-        "turn": getattr(engine, 'turn', 1),
-        # ZAPISUJEMY current_player jako id aktywnego gracza
-        "current_player": getattr(engine, 'current_player_obj', getattr(engine, 'current_player', None)).id if hasattr(engine, 'current_player_obj') and getattr(engine, 'current_player_obj', None) else getattr(engine, 'current_player', 0),
-        "weather": getattr(engine, 'weather', None).__dict__ if hasattr(engine, 'weather') and getattr(engine, 'weather', None) else None,
-        "turn_manager": getattr(engine, 'turn_manager', None).__dict__ if hasattr(engine, 'turn_manager') and getattr(engine, 'turn_manager', None) else None,
-        "active_player_info": {
-            "id": getattr(active_player, 'id', None),
-            "role": getattr(active_player, 'role', None),
-            "nation": getattr(active_player, 'nation', None)
-        },
-        # Dodajemy key_points_state do zapisu
-        "key_points_state": getattr(engine, 'key_points_state', {})
-    }
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(state, f, ensure_ascii=False, indent=2)
-    
+
+def _token_rows(engine, blobs):
+    """Żetony w formacie wersji 2: pliki nowych żetonów w magazynie, w wierszu tylko ich skróty."""
+    # token.id -> {"json": skrót, "png": skrót}; pamiętane na silniku, bo po zapisie
+    # cleanup_aktualne_folder usuwa pliki nowych żetonów z folderu aktualne
+    refs = getattr(engine, 'save_asset_refs', None)
+    if refs is None:
+        refs = {}
+        try:
+            engine.save_asset_refs = refs
+        except AttributeError:
+            pass
+    rows = []
+    for token in engine.tokens:
+        row = token.serialize()
+        if "nowy_" in token.id:
+            assets = dict(refs.get(token.id, {}))
+            for kind in ("json", "png"):
+                file_path = AKTUALNE_DIR / f"{token.id}.{kind}"
+                if file_path.exists():
+                    try:
+                        assets[kind] = blobs.put(file_path.read_bytes())
+                    except Exception as e:
+                        print(f"[WARN] Nie udało się zapisać {file_path} w magazynie: {e}")
+            if assets:
+                refs[token.id] = assets
+                row['assets'] = assets
+        rows.append(row)
+    return rows
+
+
+def save_game(path, engine, active_player=None, compress=False, base=None, legacy_json=False, cleanup=True):
+    """
+    Zapisuje grę.
+    :param compress: Kompresja gzip pliku zapisu.
+    :param base: Ścieżka zapisu bazowego – zapisywane są tylko żetony zmienione względem niego.
+    :param legacy_json: Dawny format JSON (wersja 1) zamiast formatu wersji 2.
+    :param cleanup: Usuń nowe żetony z folderu aktualne po zapisie.
+    """
+    path = _ensure_saves_dir(path)
+    state = _game_state(engine, active_player)
+    if legacy_json:
+        state = dict(tokens=_legacy_token_rows(engine), **state)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+    else:
+        directory = os.path.dirname(path)
+        rows = _token_rows(engine, save_format.BlobStore(os.path.join(directory, BLOB_DIR_NAME)))
+        header = {"format": save_format.SAVE_FORMAT, "version": save_format.SAVE_FORMAT_VERSION,
+                  "blob_store": BLOB_DIR_NAME}
+        delta = None
+        if base is not None:
+            base_digest, base_rows = save_format.load_base(base)
+            delta = save_format.encode_token_delta(base_rows, rows)
+        if delta is not None:
+            header.update(kind="delta", base=os.path.relpath(base, directory or "."), base_digest=base_digest)
+            save_format.write_document(path, dict(header, tokens=delta, **state), compress)
+        else:
+            header["kind"] = "full"
+            data = save_format.write_document(path, dict(header, tokens=save_format.encode_token_table(rows), **state), compress)
+            save_format.remember_base(path, data, rows)
     # Wyczyść folder aktualne po zapisie
-    cleanup_aktualne_folder()
+    if cleanup:
+        cleanup_aktualne_folder()
+
 
 def cleanup_aktualne_folder():
     """Usuwa nowe żetony z folderu aktualne po zapisie"""
@@ -80,40 +149,64 @@ def cleanup_aktualne_folder():
                 except Exception as e:
                     print(f"[WARN] Nie udało się usunąć {file_path}: {e}")
 
+
+def _restore_asset(path, data):
+    """Zapisuje plik żetonu w folderze aktualne, chyba że ma już identyczną treść."""
+    try:
+        if path.exists() and path.stat().st_size == len(data) and path.read_bytes() == data:
+            return
+        with open(path, 'wb') as f:
+            f.write(data)
+    except Exception as e:
+        print(f"[WARN] Nie udało się odtworzyć {path}: {e}")
+
+
 def load_game(path, engine):
     import types
     from core.ekonomia import EconomySystem
-    with open(path, "r", encoding="utf-8") as f:
-        state = json.load(f)    # Odtwórz żetony
+    state = save_format.read_document(path)
+    versioned = save_format.is_versioned(state)
+    directory = os.path.dirname(path)
+    # Odtwórz żetony
     engine.tokens = []
-    aktualne_path = Path("assets/tokens/aktualne")
-    aktualne_path.mkdir(parents=True, exist_ok=True)
-    
-    for tdata in state["tokens"]:
-        from engine.token import Token
+    AKTUALNE_DIR.mkdir(parents=True, exist_ok=True)
+    blobs = save_format.BlobStore(os.path.join(directory, state.get("blob_store", BLOB_DIR_NAME))) if versioned else None
+    refs = {}
+
+    for tdata in save_format.token_rows(state, directory):
         token = Token.from_dict(tdata)
         engine.tokens.append(token)
-        
+        if "nowy_" not in token.id:
+            continue
+
+        if versioned:
+            # Format wersji 2: pliki nowego żetonu w magazynie adresowanym skrótem
+            assets = tdata.get("assets") or {}
+            for kind, digest in assets.items():
+                data = blobs.get(digest)
+                if data is None:
+                    print(f"[WARN] Brak pliku {digest} w magazynie zapisu")
+                    continue
+                _restore_asset(AKTUALNE_DIR / f"{token.id}.{kind}", data)
+            if assets:
+                refs[token.id] = dict(assets)
         # Jeśli to nowy żeton z pełnymi danymi, odtwórz pliki
-        if "nowy_" in token.id and "full_data" in tdata:
-            json_path = aktualne_path / f"{token.id}.json"
-            png_path = aktualne_path / f"{token.id}.png"
-            
-            # Zapisz JSON
-            try:
-                with open(json_path, 'w', encoding='utf-8') as f:
-                    json.dump(tdata['full_data'], f, indent=2, ensure_ascii=False)
-            except Exception as e:
-                print(f"[WARN] Nie udało się odtworzyć {json_path}: {e}")
-            
+        elif "full_data" in tdata:
+            _restore_asset(AKTUALNE_DIR / f"{token.id}.json",
+                           json.dumps(tdata['full_data'], indent=2, ensure_ascii=False).encode('utf-8'))
             # Zapisz obraz
             if "image_data" in tdata:
                 try:
-                    image_bytes = base64.b64decode(tdata['image_data'])
-                    with open(png_path, 'wb') as f:
-                        f.write(image_bytes)
+                    _restore_asset(AKTUALNE_DIR / f"{token.id}.png", base64.b64decode(tdata['image_data']))
                 except Exception as e:
-                    print(f"[WARN] Nie udało się odtworzyć {png_path}: {e}")
+                    print(f"[WARN] Nie udało się odtworzyć obrazu {token.id}: {e}")
+    try:
+        engine.save_asset_refs = refs
+    except AttributeError:
+        pass
+    board = getattr(engine, 'board', None)
+    if board is not None and hasattr(board, 'set_tokens'):
+        board.set_tokens(engine.tokens)
     # Odtwórz graczy
     engine.players = []
     for pdata in state["players"]:
@@ -140,8 +233,12 @@ def load_game(path, engine):
         engine.current_player = state["current_player"]
         engine.current_player_obj = next((p for p in engine.players if getattr(p, 'id', None) == engine.current_player), None)
     # Odtwórz stan key_points
+    if isinstance(getattr(engine, 'rng', None), GameRNG):
+        engine.rng.setstate(state.get("rng_state"))
     if "key_points_state" in state and isinstance(state["key_points_state"], dict):
-        engine.key_points_state = state["key_points_state"]
+        engine.key_points_state = KeyPointLedger.from_state(state["key_points_state"])
+        if board is not None:
+            engine.key_points_state.prune_board(board)
     if "weather" in state and state["weather"]:
         if hasattr(engine, "weather") and engine.weather:
             engine.weather.__dict__.update(state["weather"])
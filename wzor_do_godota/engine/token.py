@@ -1,11 +1,206 @@
+import copy
 import json
-from typing import Any, Dict, Optional
+import sys
+import weakref
+from collections.abc import MutableMapping
+from types import MappingProxyType
+from typing import Any, Dict, Optional, Tuple
+
+# owner -> (owner_id, nation); ownerów w partii jest kilku, więc parsujemy każdy napis raz
+_OWNER_CACHE: Dict[str, Tuple[Any, Optional[str]]] = {}
+_MISSING = object()
+
+
+def parse_owner(owner: Any) -> Tuple[Any, Optional[str]]:
+    """Rozbija owner "2 (Polska)" na (2, "Polska"). Napisy są internowane, id gracza
+    jest liczbą, jeśli się da. Owner bez nawiasu daje (owner, None)."""
+    if not isinstance(owner, str) or not owner:
+        return None, None
+    parsed = _OWNER_CACHE.get(owner)
+    if parsed is None:
+        if "(" in owner and ")" in owner:
+            raw_id = owner.split("(")[0].strip()
+            nation = sys.intern(owner.split("(")[-1].replace(")", "").strip())
+        else:
+            raw_id, nation = owner.strip(), None
+        owner_id = int(raw_id) if raw_id.isdigit() else (sys.intern(raw_id) if raw_id else None)
+        parsed = _OWNER_CACHE[owner] = (owner_id, nation)
+    return parsed
+
+
+def token_nation(token) -> Optional[str]:
+    """Nacja żetonu: pole Token.nation albo (atrapy, stare obiekty) parsowanie owner/stats."""
+    nation = getattr(token, "nation", _MISSING)
+    if nation is not _MISSING:
+        return nation
+    nation = parse_owner(getattr(token, "owner", None))[1]
+    if nation is None:
+        stats_nation = (getattr(token, "stats", None) or {}).get("nation")
+        nation = str(stats_nation).strip() if stats_nation else None
+    return nation
+
+
+def owned_by(token, player) -> bool:
+    """Czy żeton należy do gracza (odpowiednik owner == f"{player.id} ({player.nation})")."""
+    if player is None:
+        return False
+    owner_id = getattr(token, "owner_id", _MISSING)
+    if owner_id is _MISSING:
+        return getattr(token, "owner", None) == f"{player.id} ({player.nation})"
+    player_id = getattr(player, "id", None)
+    if isinstance(player_id, str) and player_id.isdigit():
+        player_id = int(player_id)
+    return owner_id == player_id and token.nation == getattr(player, "nation", None)
+
+
+class _StatTemplate(dict):
+    """Słownik szablonu; podklasa tylko po to, żeby dało się go trzymać w WeakValueDictionary."""
+
+    __slots__ = ("__weakref__",)
+
+
+# Zawartość statystyk -> wspólny szablon; żetony tego samego blueprintu mają identyczne
+# statystyki bazowe, więc trzymamy je raz zamiast w każdym żetonie. Słabe referencje:
+# szablon znika razem z ostatnim żetonem, więc długie serie partii nie zbierają starych blueprintów.
+_STAT_TEMPLATES: "weakref.WeakValueDictionary[Any, _StatTemplate]" = weakref.WeakValueDictionary()
+_DELETED = object()
+# Zagnieżdżone kontenery szablonu (np. stats['attack']) żeton kopiuje przy pierwszym odczycie
+_MUTABLE_TYPES = (dict, list, set)
+
+
+def _template_key(stats: Dict[str, Any]) -> Tuple:
+    # Typ w kluczu odróżnia 1 od True/1.0; kolejność kluczy jest stała dla from_json/from_dict
+    parts = []
+    for key, value in stats.items():
+        kind = type(value)
+        if kind is dict:
+            value = tuple(value.items())
+        elif kind is list:
+            value = tuple(value)
+        parts.append((key, kind, value))
+    return tuple(parts)
+
+
+def stat_template(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Wspólny (tylko do odczytu) słownik statystyk o tej samej zawartości co `stats`."""
+    key = _template_key(stats)
+    try:
+        template = _STAT_TEMPLATES.get(key)
+    except TypeError:
+        key = repr(stats)  # wartości niehaszowalne głębiej w strukturze
+        template = _STAT_TEMPLATES.get(key)
+    if template is None:
+        template = _STAT_TEMPLATES[key] = _StatTemplate(copy.deepcopy(dict(stats)))
+    return template
+
+
+class TokenStats(MutableMapping):
+    """Statystyki żetonu: wspólny szablon blueprintu + własne nadpisania żetonu.
+
+    Odczyt idzie najpierw do nadpisań (zwykle puste), potem do szablonu. Zapis
+    (np. stats['image'] = ...) trafia tylko do nadpisań tego żetonu, więc szablon
+    pozostaje niezmienny. Zagnieżdżony kontener szablonu (np. stats['attack']) przy
+    pierwszym odczycie jest kopiowany do nadpisań, więc stats['attack']['value'] = ...
+    zmienia tylko ten żeton; wspólne zostają wartości proste.
+    """
+
+    __slots__ = ("_template", "_own")
+
+    def __init__(self, stats: Optional[Dict[str, Any]] = None):
+        if isinstance(stats, TokenStats):
+            self._template = stats._template
+            self._own = copy.deepcopy(stats._own) if stats._own else None
+        else:
+            self._template = stat_template(stats or {})
+            self._own = None
+
+    @property
+    def template(self):
+        return MappingProxyType(self._template)
+
+    def get(self, key, default=None):
+        own = self._own
+        if own is not None and key in own:
+            value = own[key]
+            return default if value is _DELETED else value
+        value = self._template.get(key, _DELETED)
+        if value is _DELETED:
+            return default
+        if type(value) in _MUTABLE_TYPES:
+            value = copy.deepcopy(value)
+            self[key] = value
+        return value
+
+    def __getitem__(self, key):
+        value = self.get(key, _DELETED)
+        if value is _DELETED:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, _DELETED) is not _DELETED
+
+    def __setitem__(self, key, value) -> None:
+        if self._own is None:
+            self._own = {}
+        self._own[key] = value
+
+    def __delitem__(self, key) -> None:
+        if key not in self:
+            raise KeyError(key)
+        if self._own is None:
+            self._own = {}
+        if key in self._template:
+            self._own[key] = _DELETED
+        else:
+            del self._own[key]
+
+    def __iter__(self):
+        own = self._own
+        if not own:
+            return iter(self._template)
+        return iter([key for key in {**self._template, **own} if own.get(key) is not _DELETED])
+
+    def __len__(self) -> int:
+        if not self._own:
+            return len(self._template)
+        return sum(1 for _ in self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Zwykły słownik (z kopiami zagnieżdżonych kontenerów) – do zapisu gry i JSON."""
+        own = self._own
+        merged = {**self._template, **own} if own else self._template
+        return {key: copy.deepcopy(value) if type(value) in _MUTABLE_TYPES else value
+                for key, value in merged.items() if value is not _DELETED}
+
+    def copy(self) -> Dict[str, Any]:
+        return self.to_dict()
+
+    def __repr__(self) -> str:
+        return f"TokenStats({dict(self.items())!r})"
+
 
 class Token:
+    # Stan zmienny żetonu w slotach; statystyki bazowe współdzielone przez TokenStats.
+    # Bez __dict__ – każdy atrybut żetonu musi być wymieniony poniżej (literówka to AttributeError).
+    __slots__ = (
+        "_registry", "_board", "id", "_owner", "owner_id", "nation", "stats", "q", "r",
+        "maxMovePoints", "currentMovePoints", "maxFuel", "currentFuel", "_combat_value",
+        "movement_mode", "movement_mode_locked", "shots_fired_this_turn", "reaction_shot_used",
+        "defense_value", "base_move", "base_defense",
+        # Pamięć specjalistów AI (ai.tokens.specialized_ai), ustawiana dopiero przy pierwszym użyciu
+        "supply_assigned_kp", "supply_kp_lock_turns", "recon_last_target", "cavalry_last_target",
+        "infantry_focus_hex",
+        # Znacznik GUI: żeton wykryty w ruchu pozostaje widoczny do końca tury (gui.panel_mapa)
+        "wykryty_do_konca_tury",
+    )
+
     def __init__(self, id: str, owner: str, stats: Dict[str, Any], q: int = None, r: int = None, movement_mode: str = 'combat'):
+        # Rejestr żetonów silnika (engine.token_registry), który indeksuje ten żeton po właścicielu
+        self._registry = None
         self.id = id
-        self.owner = owner
-        self.stats = stats  # np. {'move': 12, 'combat_value': 6, ...}
+        self.stats = TokenStats(stats)  # np. {'move': 12, 'combat_value': 6, ...}
+        self.owner = owner  # ustawia też owner_id i nation
         self.q = q
         self.r = r
         # Inicjalizacja punktów ruchu
@@ -24,6 +219,42 @@ class Token:
         self.shots_fired_this_turn = getattr(self, 'shots_fired_this_turn', 0)
         self.reaction_shot_used = getattr(self, 'reaction_shot_used', False)
 
+        # Plansza, której indeks zajętości śledzi ten żeton (ustawiana przez Board)
+        self._board = None
+
+    @property
+    def owner(self) -> str:
+        return self._owner
+
+    @owner.setter
+    def owner(self, value: str):
+        self._owner = value
+        self.owner_id, nation = parse_owner(value)
+        if nation is None:
+            stats_nation = self.stats.get("nation")
+            nation = sys.intern(str(stats_nation).strip()) if stats_nation else None
+        self.nation = nation
+        if self._registry is not None:
+            self._registry.owner_changed(self)
+
+    @property
+    def combat_value(self):
+        return self._combat_value
+
+    @combat_value.setter
+    def combat_value(self, value):
+        # Rejestr utrzymuje sumy siły bojowej graczy/nacji – zgłaszamy mu każdą zmianę (walka, uzupełnienia)
+        previous = getattr(self, "_combat_value", None)
+        self._combat_value = value
+        if self._registry is not None and previous != value:
+            self._registry.combat_value_changed(self)
+
+    def is_enemy_of(self, other) -> bool:
+        """Czy `other` jest żetonem innej nacji (nacje są internowane, porównanie jest tanie)."""
+        if other is None or other is self:
+            return False
+        return self.nation != token_nation(other)
+
     def can_attack(self, attack_type: str = 'normal') -> bool:
         """Sprawdza czy jednostka może zaatakować
         
@@ -69,12 +300,14 @@ class Token:
     def set_position(self, q: int, r: int):
         self.q = q
         self.r = r
+        if self._board is not None:
+            self._board.update_token_position(self)
 
     def serialize(self) -> Dict[str, Any]:
         return {
             'id': self.id,
             'owner': self.owner,
-            'stats': self.stats,
+            'stats': self.stats.to_dict(),
             'q': self.q,
             'r': self.r,
             'maxMovePoints': getattr(self, 'maxMovePoints', self.stats.get('move', 0)),
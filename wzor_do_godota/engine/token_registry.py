@@ -0,0 +1,303 @@
+"""
+Rejestr żetonów silnika: lista zgodna z dotychczasowym `engine.tokens` + indeksy.
+
+Kolejność żetonów (wstawiania) jest zachowana, a wyszukiwanie po id, właścicielu
+i nacji oraz usuwanie żetonu kosztują O(1) zamiast skanowania całej listy.
+Zmiana `token.owner` jest zgłaszana rejestrowi przez Token, więc indeksy
+właściciela/nacji pozostają aktualne.
+
+Rejestr prowadzi też liczniki żywych jednostek i sumy siły bojowej (combat_value)
+na gracza (owner_id) i nację – aktualizowane przy wystawieniu, zmianie combat_value
+i eliminacji żetonu – więc warunki zwycięstwa nie skanują żetonów.
+
+Różnice względem listy:
+- każdy obiekt żetonu występuje w rejestrze co najwyżej raz – append/insert/extend
+  obiektu, który już jest w rejestrze, oraz przypisanie r[i] = żeton z innej pozycji
+  zgłaszają ValueError;
+- iteracja nie kopiuje żetonów – pętla, która dodaje lub usuwa żetony (np. walka),
+  iteruje po migawce list(engine.tokens);
+- remove/del/pop na końcu oraz r[i], r[i] = x kosztują O(1) (zamortyzowane):
+  usunięcie ze środka zostawia dziurę w liście bazowej, zagęszczanej leniwie;
+  insert w środek i usuwanie z początku z indeksowaniem pomiędzy kosztują O(N), jak w liście.
+"""
+
+from collections.abc import MutableSequence
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Znacznik usuniętej pozycji w liście bazowej (zagęszczanej leniwie)
+_HOLE = object()
+
+from engine.token import parse_owner, token_nation
+
+
+def _combat_strength(token) -> int:
+    """Siła bojowa żetonu do sum rejestru (nieujemna; brak/niepoprawna wartość = 0)."""
+    value = getattr(token, "combat_value", 0)
+    try:
+        return max(0, int(value or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+class TokenRegistry(MutableSequence):
+    """Sekwencja żetonów z indeksami id / właściciel / nacja."""
+
+    def __init__(self, tokens: Iterable[Any] = ()):
+        # Lista bazowa w kolejności wstawiania (z dziurami _HOLE) + id(żeton) -> pozycja
+        self._items: List[Any] = []
+        self._positions: Dict[int, int] = {}
+        self._holes = 0
+        self._by_id: Dict[Any, List[Any]] = {}
+        self._by_owner: Dict[Any, Dict[int, Any]] = {}
+        self._by_nation: Dict[Any, Dict[int, Any]] = {}
+        # id(żeton) -> (owner, nacja, owner_id, siła) użyte przy indeksowaniu
+        self._indexed_keys: Dict[int, Tuple[Any, Any, Any, int]] = {}
+        # Liczniki żywych jednostek i sumy combat_value: owner_id / nacja -> wartość
+        self._alive_by_owner_id: Dict[Any, int] = {}
+        self._strength_by_owner_id: Dict[Any, int] = {}
+        self._alive_by_nation: Dict[Any, int] = {}
+        self._strength_by_nation: Dict[Any, int] = {}
+        for token in tokens:
+            self.append(token)
+
+    # ------------------------------------------------------------------
+    # Indeksy
+    # ------------------------------------------------------------------
+    def _index(self, token, position: Optional[int] = None) -> None:
+        key = id(token)
+        if position is None:
+            position = len(self._items)
+            self._items.append(token)
+        else:
+            self._items[position] = token
+        self._positions[key] = position
+        self._by_id.setdefault(getattr(token, "id", None), []).append(token)
+        self._index_owner(token)
+        try:
+            token._registry = self
+        except AttributeError:
+            pass
+
+    def _index_owner(self, token) -> None:
+        key = id(token)
+        owner = getattr(token, "owner", None)
+        nation = token_nation(token)
+        owner_id = getattr(token, "owner_id", None)
+        if owner_id is None and owner:
+            owner_id = parse_owner(owner)[0]
+        strength = _combat_strength(token)
+        self._by_owner.setdefault(owner, {})[key] = token
+        self._by_nation.setdefault(nation, {})[key] = token
+        self._indexed_keys[key] = (owner, nation, owner_id, strength)
+        self._count(owner_id, nation, 1, strength)
+
+    def _unindex_owner(self, token) -> None:
+        key = id(token)
+        owner, nation, owner_id, strength = self._indexed_keys.pop(key, (None, None, None, 0))
+        for index, value in ((self._by_owner, owner), (self._by_nation, nation)):
+            bucket = index.get(value)
+            if bucket is not None:
+                bucket.pop(key, None)
+                if not bucket:
+                    del index[value]
+        self._count(owner_id, nation, -1, -strength)
+
+    def _count(self, owner_id, nation, units: int, strength: int) -> None:
+        for counters, value in ((self._alive_by_owner_id, units), (self._strength_by_owner_id, strength)):
+            counters[owner_id] = counters.get(owner_id, 0) + value
+        for counters, value in ((self._alive_by_nation, units), (self._strength_by_nation, strength)):
+            counters[nation] = counters.get(nation, 0) + value
+        if self._alive_by_owner_id[owner_id] <= 0:
+            del self._alive_by_owner_id[owner_id]
+            self._strength_by_owner_id.pop(owner_id, None)
+        if self._alive_by_nation[nation] <= 0:
+            del self._alive_by_nation[nation]
+            self._strength_by_nation.pop(nation, None)
+
+    def _unindex(self, token, keep_slot: bool = False) -> int:
+        """Usuwa żeton z indeksów; zwraca jego pozycję w liście bazowej.
+        keep_slot=True zostawia pozycję do ponownego zapisania (r[i] = x)."""
+        key = id(token)
+        position = self._positions.pop(key)
+        if not keep_slot:
+            self._release(position)
+        token_id = getattr(token, "id", None)
+        same_id = self._by_id.get(token_id, [])
+        for slot, candidate in enumerate(same_id):
+            if candidate is token:
+                del same_id[slot]
+                break
+        if not same_id:
+            self._by_id.pop(token_id, None)
+        self._unindex_owner(token)
+        if getattr(token, "_registry", None) is self:
+            token._registry = None
+        return position
+
+    def _release(self, position: int) -> None:
+        items = self._items
+        if position == len(items) - 1:
+            items.pop()
+            while items and items[-1] is _HOLE:
+                items.pop()
+                self._holes -= 1
+            return
+        items[position] = _HOLE
+        self._holes += 1
+        if self._holes > 32 and self._holes * 2 > len(items):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Usuwa dziury z listy bazowej i przelicza pozycje – O(N), po nim indeksowanie jest O(1)."""
+        if not self._holes:
+            return
+        self._items = [token for token in self._items if token is not _HOLE]
+        self._positions = {id(token): position for position, token in enumerate(self._items)}
+        self._holes = 0
+
+    def owner_changed(self, token) -> None:
+        """Wywoływane przez Token po zmianie owner."""
+        if token in self:
+            self._unindex_owner(token)
+            self._index_owner(token)
+
+    def combat_value_changed(self, token) -> None:
+        """Wywoływane przez Token po zmianie combat_value (obrażenia, uzupełnienia)."""
+        key = id(token)
+        indexed = self._indexed_keys.get(key)
+        if indexed is None or token not in self:
+            return
+        owner, nation, owner_id, strength = indexed
+        new_strength = _combat_strength(token)
+        if new_strength != strength:
+            self._indexed_keys[key] = (owner, nation, owner_id, new_strength)
+            self._count(owner_id, nation, 0, new_strength - strength)
+
+    # ------------------------------------------------------------------
+    # Zapytania
+    # ------------------------------------------------------------------
+    def get(self, token_id: Any, default: Any = None):
+        """Żeton o danym id (pierwszy zarejestrowany, jak przy next(...) po liście)."""
+        same_id = self._by_id.get(token_id)
+        return same_id[0] if same_id else default
+
+    def by_owner(self, owner: str) -> List[Any]:
+        return list(self._by_owner.get(owner, {}).values())
+
+    def by_nation(self, nation: str) -> List[Any]:
+        return list(self._by_nation.get(nation, {}).values())
+
+    def count_by_nation(self, nation: str) -> int:
+        return len(self._by_nation.get(nation, ()))
+
+    def alive_count(self, owner_id: Any = None, nation: Any = None) -> int:
+        """Liczba żywych jednostek gracza (owner_id) albo nacji – O(1)."""
+        if owner_id is not None:
+            return self._alive_by_owner_id.get(owner_id, 0)
+        return self._alive_by_nation.get(nation, 0)
+
+    def combat_strength(self, owner_id: Any = None, nation: Any = None) -> int:
+        """Suma combat_value żywych jednostek gracza (owner_id) albo nacji – O(1)."""
+        if owner_id is not None:
+            return self._strength_by_owner_id.get(owner_id, 0)
+        return self._strength_by_nation.get(nation, 0)
+
+    def alive_nations(self) -> List[Any]:
+        """Nacje, które mają jeszcze co najmniej jedną jednostkę."""
+        return [nation for nation, count in self._alive_by_nation.items() if count > 0 and nation is not None]
+
+    # ------------------------------------------------------------------
+    # Interfejs listy
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self._items) - self._holes
+
+    def __iter__(self):
+        # Bez kopii (odczyty w pętlach AI i widoczności); pętle zmieniające rejestr biorą list(...)
+        for token in self._items:
+            if token is not _HOLE:
+                yield token
+
+    def __contains__(self, token) -> bool:
+        position = self._positions.get(id(token))
+        return position is not None and self._items[position] is token
+
+    def __getitem__(self, index):
+        self._compact()
+        return self._items[index]
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, slice):
+            values = list(self)
+            values[index] = value
+            self._rebuild(values)
+            return
+        self._compact()
+        old = self._items[index]
+        if old is value:
+            return
+        if value in self:
+            raise ValueError("TokenRegistry: żeton jest już w rejestrze na innej pozycji")
+        position = self._unindex(old, keep_slot=True)
+        self._index(value, position)
+
+    def __delitem__(self, index) -> None:
+        if isinstance(index, slice):
+            values = list(self)
+            del values[index]
+            self._rebuild(values)
+            return
+        self._compact()
+        self._unindex(self._items[index])
+
+    def insert(self, index: int, token) -> None:
+        if token in self:
+            raise ValueError("TokenRegistry: żeton jest już w rejestrze")
+        if index >= len(self):
+            self.append(token)
+            return
+        values = list(self)
+        values.insert(index, token)
+        self._rebuild(values)
+
+    def append(self, token) -> None:
+        """Dodaje żeton na koniec; ValueError, gdy ten obiekt już jest w rejestrze."""
+        if token in self:
+            raise ValueError("TokenRegistry: żeton jest już w rejestrze")
+        self._index(token)
+
+    def remove(self, token) -> None:
+        if token not in self:
+            raise ValueError("TokenRegistry.remove(x): x not in registry")
+        self._unindex(token)
+
+    def reverse(self) -> None:
+        self._rebuild(reversed(tuple(self)))
+
+    def clear(self) -> None:
+        # Od końca – każde usunięcie zdejmuje ostatni element listy bazowej
+        for token in reversed(tuple(self)):
+            self._unindex(token)
+        self._items = []
+        self._holes = 0
+
+    def _rebuild(self, values: Iterable[Any]) -> None:
+        self.clear()
+        for token in values:
+            self.append(token)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (TokenRegistry, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"TokenRegistry({list(self)!r})"
+
+
+def find_token(engine, token_id: Any):
+    """Żeton o danym id z engine.tokens – O(1) dla TokenRegistry, skan dla zwykłej listy."""
+    tokens = getattr(engine, "tokens", None) or []
+    if isinstance(tokens, TokenRegistry):
+        return tokens.get(token_id)
+    return next((t for t in tokens if getattr(t, "id", None) == token_id), None)
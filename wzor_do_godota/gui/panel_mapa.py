@@ -1,13 +1,84 @@
 import tkinter as tk
 from tkinter import ttk, simpledialog
 from engine.hex_utils import get_hex_vertices
+from engine.token_registry import find_token
+from utils.token_blueprint import token_sprite_path
 from PIL import Image, ImageTk
 import os
 import math
+import time
+from collections import deque
 from pathlib import Path
 
 ASSETS_ROOT = Path(__file__).resolve().parent.parent / "assets"
 
+# SKALOWANIE ŻETONÓW: bazowo 40x40; lekkie powiększenie o ~10% (wcześniej 30%).
+# Aby zmienić globalnie: dostosuj TOKEN_SIZE_FACTOR albo BASE_TOKEN_SIZE poniżej.
+BASE_TOKEN_SIZE = 40
+TOKEN_SIZE_FACTOR = 1.1  # 10% większe (BYŁO 1.3)
+# Limit zbuforowanych obrazów żetonów (ścieżka + przezroczystość)
+TOKEN_PHOTO_CACHE_SIZE = 512
+# Okno widoku: elementy heksów istnieją tylko w fragmentach (chunk) mapy przy widocznym obszarze
+VIEWPORT_CHUNK_HEXES = 8  # bok fragmentu w kolumnach heksów
+VIEWPORT_MARGIN_HEXES = 4  # zapas wokół widocznego obszaru (przewijanie bez pustych brzegów)
+# Uproszczony poziom szczegółów (bez tekstur i obrysów heksów) – małe heksy albo bardzo dużo heksów w oknie
+LOD_MIN_HEX_PX = 12
+LOD_MAX_DETAILED_HEXES = 3000
+
+
+class FrameTimeCounter:
+    """Licznik klatek mapy: czas odświeżenia oraz liczba utworzonych/usuniętych/zmienionych elementów Canvas.
+
+    Z KAMPANIA_FRAME_STATS=1 każda klatka jest wypisywana na konsolę."""
+
+    def __init__(self, history: int = 120):
+        self.frames = 0
+        self.last_ms = 0.0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.recent = deque(maxlen=history)
+        # Operacje na elementach Canvas w bieżącej/ostatniej klatce
+        self.items_created = 0
+        self.items_deleted = 0
+        self.items_updated = 0
+        self.verbose = os.environ.get("KAMPANIA_FRAME_STATS") == "1"
+        self._started = None
+
+    def start(self):
+        self._started = time.perf_counter()
+        self.items_created = self.items_deleted = self.items_updated = 0
+
+    def stop(self) -> float:
+        if self._started is None:
+            return 0.0
+        elapsed = (time.perf_counter() - self._started) * 1000.0
+        self._started = None
+        self.frames += 1
+        self.last_ms = elapsed
+        self.total_ms += elapsed
+        self.max_ms = max(self.max_ms, elapsed)
+        self.recent.append(elapsed)
+        if self.verbose:
+            print(f"[MAPA] klatka {self.frames}: {elapsed:.1f} ms "
+                  f"(+{self.items_created} -{self.items_deleted} ~{self.items_updated} elementów)")
+        return elapsed
+
+    @property
+    def avg_ms(self) -> float:
+        return sum(self.recent) / len(self.recent) if self.recent else 0.0
+
+    def summary(self) -> dict:
+        return {
+            "frames": self.frames,
+            "last_ms": round(self.last_ms, 3),
+            "avg_ms": round(self.avg_ms, 3),
+            "max_ms": round(self.max_ms, 3),
+            "items_created": self.items_created,
+            "items_deleted": self.items_deleted,
+            "items_updated": self.items_updated,
+        }
+
+
 class PanelMapa(tk.Frame):
     def __init__(self, parent, game_engine, bg_path: str, player_nation: str, width=800, height=600, token_info_panel=None, panel_dowodcy=None):
         super().__init__(parent)
@@ -25,14 +96,15 @@ class PanelMapa(tk.Frame):
 
         # Canvas + Scrollbary
         self.canvas = tk.Canvas(self, width=width, height=height)
-        hbar = tk.Scrollbar(self, orient="horizontal", command=self.canvas.xview)
-        vbar = tk.Scrollbar(self, orient="vertical",   command=self.canvas.yview)
+        hbar = tk.Scrollbar(self, orient="horizontal", command=self._on_xview)
+        vbar = tk.Scrollbar(self, orient="vertical",   command=self._on_yview)
         self.canvas.configure(xscrollcommand=hbar.set, yscrollcommand=vbar.set)
         self.canvas.grid(row=0, column=0, sticky="nsew")
         hbar.grid(row=1, column=0, sticky="ew")
         vbar.grid(row=0, column=1, sticky="ns")
         self.grid_rowconfigure(0, weight=1)
         self.grid_columnconfigure(0, weight=1)
+        self.canvas.bind("<Configure>", lambda _e: self._schedule_viewport_update())
 
         # Nakładka przyciemnienia zależna od pory dnia (inicjalizacja w __init__)
         self._daylight_overlay_id = None
@@ -40,6 +112,21 @@ class PanelMapa(tk.Frame):
 
         # Cache na tekstury terenu (musi istnieć zanim narysujemy siatkę)
         self._terrain_texture_cache: dict[tuple[str, int], ImageTk.PhotoImage] = {}
+        # Renderowanie w trybie zachowanym: warstwa statyczna (teren, siatka, spawny, punkty specjalne)
+        # rysowana raz, mgła jako słownik heks -> element Canvas aktualizowany różnicowo
+        self._static_layer_key = None
+        self._hex_polygons: dict[tuple[int, int], list] = {}
+        self._fog_items: dict[tuple[int, int], int] = {}
+        self._fog_visible = None  # widoczne heksy z poprzedniej klatki (None – mgła do narysowania od zera)
+        # Fragmenty mapy: klucz -> heksy; zmaterializowane fragmenty -> elementy Canvas (teren i obrysy)
+        self._chunks: dict[tuple[int, int], list] = {}
+        self._chunk_items: dict[tuple[int, int], list] = {}
+        self._materialized_hexes: set = set()
+        self._hex_textures: dict[tuple[int, int], str] = {}
+        self._layer_markers: dict[str, int] = {}
+        self._detail_level = None
+        self._viewport_job = None
+        self.frame_stats = FrameTimeCounter()
 
     # tło mapy - preferuj meta z pliku mapy, w przeciwnym razie zachowuj się jak wcześniej
         self._bg = None
@@ -66,6 +153,9 @@ class PanelMapa(tk.Frame):
         self.token_images = {}
         # mapowanie token_id -> canvas item id (dla markerów statusu ruchu)
         self._token_canvas_items = {}
+        # token_id -> ((x, y), wygląd) ostatnio narysowanego elementu; obrazy żetonów wg wyglądu
+        self._token_render_state = {}
+        self._token_photo_cache = {}
         # markery statusu ruchu (token_id -> marker canvas id)
         self._move_status_markers = {}
         # tooltip token info
@@ -198,6 +288,7 @@ class PanelMapa(tk.Frame):
         # Przewiń mapę
         self.canvas.xview_moveto(scroll_x)
         self.canvas.yview_moveto(scroll_y)
+        self._schedule_viewport_update()
 
     def center_on_nation_tokens(self, nation: str):
         """Centruje mapę na geometrycznym środku WSZYSTKICH jednostek danej nacji (nie tylko aktualnego gracza).
@@ -238,6 +329,7 @@ class PanelMapa(tk.Frame):
         scroll_y = max(0.0, min(1.0, scroll_y))
         self.canvas.xview_moveto(scroll_x)
         self.canvas.yview_moveto(scroll_y)
+        self._schedule_viewport_update()
 
     def center_on_commander_token(self, commander_id: str, nation: str):
         """Centruje mapę na środku wszystkich jednostek przypisanych do konkretnego dowódcy (po prefiksie ownera)."""
@@ -268,6 +360,7 @@ class PanelMapa(tk.Frame):
         scroll_y = max(0.0, min(1.0, scroll_y))
         self.canvas.xview_moveto(scroll_x)
         self.canvas.yview_moveto(scroll_y)
+        self._schedule_viewport_update()
 
     def _sync_player_from_engine(self):
         """Synchronizuje self.player z aktualnym obiektem gracza z silnika gry."""
@@ -278,28 +371,48 @@ class PanelMapa(tk.Frame):
                 self.token_info_panel.set_player(self.player)
 
     def _draw_hex_grid(self):
+        """Warstwy mapy: statyka przygotowana raz (_ensure_static_layer), mgła aktualizowana różnicowo,
+        elementy heksów tworzone tylko w oknie widoku (_update_viewport)."""
         self._sync_player_from_engine()
-        self.canvas.delete("hex")
-        self.canvas.delete("fog")
-        self.canvas.delete("spawn_overlay")  # Usuwamy stare nakładki spawnów
-        self.canvas.delete("terrain_texture")
-        s = self.map_model.hex_size
+        self._ensure_static_layer()
+        self._update_fog_layer(self._current_visible_hexes())
+        self._update_viewport()
+        # Po narysowaniu siatki upewnij się, że nakładka dnia/nocy jest na wierzchu
+        self._ensure_daylight_overlay_top()
+
+    def _current_visible_hexes(self) -> set:
+        player = getattr(self, 'player', None)
         visible_hexes = set()
-        if hasattr(self, 'player') and hasattr(self.player, 'visible_hexes'):
-            visible_hexes = set((int(q), int(r)) for q, r in self.player.visible_hexes)
+        if hasattr(player, 'visible_hexes'):
+            visible_hexes = set((int(q), int(r)) for q, r in player.visible_hexes)
         # Dodaj tymczasową widoczność (odkryte w tej turze)
-        if hasattr(self.player, 'temp_visible_hexes'):
-            visible_hexes |= set((int(q), int(r)) for q, r in self.player.temp_visible_hexes)
-        fogged = []
-        for key, tile in self.map_model.terrain.items():
-            if isinstance(key, tuple) and len(key) == 2:
-                q, r = key
-            else:
-                q, r = map(int, str(key).split(','))
-            cx, cy = self.map_model.hex_to_pixel(q, r)
-            if 0 <= cx <= self._bg_width and 0 <= cy <= self._bg_height:
-                if (int(q), int(r)) not in visible_hexes:
-                    fogged.append((int(q), int(r)))
+        if hasattr(player, 'temp_visible_hexes'):
+            visible_hexes |= set((int(q), int(r)) for q, r in player.temp_visible_hexes)
+        return visible_hexes
+
+    def invalidate_static_layer(self):
+        """Wymusza ponowne przygotowanie terenu i siatki przy następnym odświeżeniu (np. po zmianie mapy)."""
+        self._static_layer_key = None
+
+    def _ensure_static_layer(self):
+        """Przygotowuje geometrię heksów i fragmenty mapy oraz rysuje spawny i punkty specjalne –
+        tylko przy pierwszym użyciu lub zmianie mapy. Teren i obrysy tworzy _update_viewport."""
+        s = self.map_model.hex_size
+        layer_key = (id(self.map_model), s, self._bg_width, self._bg_height)
+        if self._static_layer_key == layer_key:
+            return
+        for tag in ("hex", "fog", "spawn_overlay", "terrain_texture", "special_point_overlay", "layer_marker"):
+            self.canvas.delete(tag)
+        self.frame_stats.items_deleted += len(self._fog_items) + sum(len(items) for items in self._chunk_items.values())
+        self._fog_items = {}
+        self._fog_visible = None
+        self._hex_polygons = {}
+        self._hex_textures = {}
+        self._chunks = {}
+        self._chunk_items = {}
+        self._materialized_hexes = set()
+        self._detail_level = None
+        created = 0
         # --- PODŚWIETLANIE SPAWNÓW ---
         spawn_colors = {
             'Polska': '#ff5555',   # półprzezroczysty czerwony
@@ -326,6 +439,12 @@ class PanelMapa(tk.Frame):
                     stipple='gray25',
                     tags='spawn_overlay'
                 )
+                created += 1
+        # Niewidoczne znaczniki warstw: elementy fragmentów są wstawiane pod nie (teren < obrysy < mgła),
+        # więc zachowują kolejność niezależnie od chwili utworzenia
+        for layer in ("terrain", "grid", "fog"):
+            self._layer_markers[layer] = self.canvas.create_line(0, 0, 0, 0, state="hidden", tags="layer_marker")
+        chunk_px = self._chunk_px()
         for key, tile in self.map_model.terrain.items():
             # Obsługa kluczy tuple (q, r) lub string "q,r"
             if isinstance(key, tuple) and len(key) == 2:
@@ -334,33 +453,12 @@ class PanelMapa(tk.Frame):
                 q, r = map(int, str(key).split(','))
             cx, cy = self.map_model.hex_to_pixel(q, r)
             if 0 <= cx <= self._bg_width and 0 <= cy <= self._bg_height:
-                texture_photo = self._get_terrain_texture_photo(getattr(tile, "texture", None))
-                if texture_photo:
-                    self.canvas.create_image(
-                        cx,
-                        cy,
-                        image=texture_photo,
-                        anchor="center",
-                        tags=("terrain_texture",)
-                    )
                 verts = get_hex_vertices(cx, cy, s)
-                flat = [coord for p in verts for coord in p]
-                self.canvas.create_polygon(
-                    flat,
-                    outline="red",
-                    fill="",
-                    width=1,
-                    tags="hex"
-                )
-                # Rysuj mgiełkę tylko jeśli (q, r) nie jest w visible_hexes (upewnij się, że tuple intów)
-                if (q, r) not in visible_hexes:
-                    self.canvas.create_polygon(
-                        flat,
-                        fill="#222222",
-                        stipple="gray50",
-                        outline="",
-                        tags="fog"
-                    )
+                self._hex_polygons[(q, r)] = [coord for p in verts for coord in p]
+                texture = getattr(tile, "texture", None)
+                if texture:
+                    self._hex_textures[(q, r)] = texture
+                self._chunks.setdefault((int(cx // chunk_px), int(cy // chunk_px)), []).append((q, r))
         # --- PODŚWIETLANIE PUNKTÓW SPECJALNYCH (mosty, miasta, fortyfikacje, węzły) ---
         key_points = getattr(self.map_model, 'key_points', {})
         special_types = {'most', 'miasto', 'fortyfikacja', 'węzeł komunikacyjny'}
@@ -384,8 +482,167 @@ class PanelMapa(tk.Frame):
                         stipple='gray25',  # bardzo delikatna mgiełka
                         tags='special_point_overlay'
                     )
-        # Po narysowaniu siatki upewnij się, że nakładka dnia/nocy jest na wierzchu
-        self._ensure_daylight_overlay_top()
+                    created += 1
+        self.frame_stats.items_created += created
+        self._static_layer_key = layer_key
+        # Zachowane żetony muszą pozostać nad nowo narysowaną statyką
+        if getattr(self, '_token_canvas_items', None):
+            self.canvas.tag_raise("token")
+
+    # ------------------------------------------------------------------
+    # Okno widoku i poziom szczegółów
+    # ------------------------------------------------------------------
+    def _chunk_px(self) -> float:
+        return self.map_model.hex_size * 1.5 * VIEWPORT_CHUNK_HEXES
+
+    def _on_xview(self, *args):
+        self.canvas.xview(*args)
+        self._schedule_viewport_update()
+
+    def _on_yview(self, *args):
+        self.canvas.yview(*args)
+        self._schedule_viewport_update()
+
+    def _schedule_viewport_update(self):
+        """Aktualizacja okna widoku po przewinięciu/zmianie rozmiaru – raz na serię zdarzeń."""
+        if getattr(self, '_viewport_job', None) is not None or not getattr(self, '_chunks', None):
+            return
+        try:
+            self._viewport_job = self.canvas.after_idle(self._run_viewport_update)
+        except (tk.TclError, RuntimeError):
+            self._viewport_job = None
+
+    def _run_viewport_update(self):
+        self._viewport_job = None
+        self.frame_stats.start()
+        self._update_viewport()
+        self.frame_stats.stop()
+
+    def _viewport_rect(self):
+        """Widoczny obszar mapy (współrzędne Canvas) jako (x0, y0, x1, y1)."""
+        canvas = self.canvas
+        try:
+            width = canvas.winfo_width()
+            height = canvas.winfo_height()
+            if width <= 1 or height <= 1:
+                # Przed pierwszym wyświetleniem – rozmiar zadany w konstruktorze
+                width = int(canvas.cget("width"))
+                height = int(canvas.cget("height"))
+            x0 = canvas.canvasx(0)
+            y0 = canvas.canvasy(0)
+        except (tk.TclError, ValueError):
+            return (0, 0, self._bg_width, self._bg_height)
+        return (x0, y0, x0 + width, y0 + height)
+
+    def _choose_detail_level(self, width: float, height: float) -> str:
+        """'full' – tekstury i obrysy heksów; 'coarse' – tylko tło, mgła i nakładki.
+
+        Panel nie ma skalowania: heks na ekranie ma hex_size mapy, więc poziom zależy
+        wyłącznie od rozmiaru heksa mapy i rozmiaru okna (liczby heksów w widoku)."""
+        hex_px = self.map_model.hex_size
+        if hex_px < LOD_MIN_HEX_PX:
+            return "coarse"
+        # Pole heksa (pointy/flat) = 3·√3/2·s²
+        hexes_in_view = (width * height) / (2.598 * hex_px * hex_px)
+        return "coarse" if hexes_in_view > LOD_MAX_DETAILED_HEXES else "full"
+
+    def _update_viewport(self):
+        """Tworzy elementy fragmentów mapy wchodzących w okno widoku (z zapasem), usuwa wychodzące."""
+        if not self._chunks:
+            return
+        x0, y0, x1, y1 = self._viewport_rect()
+        detail = self._choose_detail_level(x1 - x0, y1 - y0)
+        if detail != self._detail_level:
+            for chunk in list(self._chunk_items):
+                self._release_chunk(chunk)
+            self._detail_level = detail
+        margin = self.map_model.hex_size * 2 * VIEWPORT_MARGIN_HEXES
+        chunk_px = self._chunk_px()
+        wanted = set()
+        for cx in range(int((x0 - margin) // chunk_px), int((x1 + margin) // chunk_px) + 1):
+            for cy in range(int((y0 - margin) // chunk_px), int((y1 + margin) // chunk_px) + 1):
+                if (cx, cy) in self._chunks:
+                    wanted.add((cx, cy))
+        for chunk in [c for c in self._chunk_items if c not in wanted]:
+            self._release_chunk(chunk)
+        for chunk in wanted:
+            if chunk not in self._chunk_items:
+                self._materialize_chunk(chunk)
+
+    def _materialize_chunk(self, chunk):
+        canvas = self.canvas
+        markers = self._layer_markers
+        detailed = self._detail_level == "full"
+        hidden_from = self._fog_visible or set()
+        items = []
+        fog_created = 0
+        for pos in self._chunks[chunk]:
+            flat = self._hex_polygons[pos]
+            if detailed:
+                texture_photo = self._get_terrain_texture_photo(self._hex_textures.get(pos))
+                if texture_photo:
+                    cx, cy = self.map_model.hex_to_pixel(*pos)
+                    item = canvas.create_image(cx, cy, image=texture_photo, anchor="center", tags=("terrain_texture",))
+                    canvas.tag_lower(item, markers["terrain"])
+                    items.append(item)
+                item = canvas.create_polygon(flat, outline="red", fill="", width=1, tags="hex")
+                canvas.tag_lower(item, markers["grid"])
+                items.append(item)
+            self._materialized_hexes.add(pos)
+            # Rysuj mgiełkę tylko jeśli (q, r) nie jest w visible_hexes
+            if pos not in hidden_from and pos not in self._fog_items:
+                self._fog_items[pos] = self._create_fog_item(flat)
+                fog_created += 1
+        self._chunk_items[chunk] = items
+        self.frame_stats.items_created += len(items) + fog_created
+
+    def _release_chunk(self, chunk):
+        items = self._chunk_items.pop(chunk, ())
+        for item in items:
+            self.canvas.delete(item)
+        deleted = len(items)
+        for pos in self._chunks.get(chunk, ()):
+            self._materialized_hexes.discard(pos)
+            fog_item = self._fog_items.pop(pos, None)
+            if fog_item is not None:
+                self.canvas.delete(fog_item)
+                deleted += 1
+        self.frame_stats.items_deleted += deleted
+
+    def _create_fog_item(self, flat):
+        item = self.canvas.create_polygon(
+            flat,
+            fill="#222222",
+            stipple="gray50",
+            outline="",
+            tags="fog"
+        )
+        # Mgła nad terenem i siatką, ale pod punktami specjalnymi i żetonami
+        self.canvas.tag_lower(item, self._layer_markers["fog"])
+        return item
+
+    def _update_fog_layer(self, visible_hexes: set):
+        """Mgła tylko dla zmaterializowanych heksów, których widoczność zmieniła się od poprzedniej klatki."""
+        fog_items = self._fog_items
+        materialized = self._materialized_hexes
+        previous = self._fog_visible
+        if previous is None:
+            revealed = [pos for pos in fog_items if pos in visible_hexes]
+            hidden = [pos for pos in materialized if pos not in visible_hexes]
+        else:
+            revealed = [pos for pos in visible_hexes if pos not in previous and pos in fog_items]
+            hidden = [pos for pos in previous if pos not in visible_hexes and pos in materialized]
+        for pos in revealed:
+            self.canvas.delete(fog_items.pop(pos))
+        created = 0
+        for pos in hidden:
+            if pos in fog_items:
+                continue
+            fog_items[pos] = self._create_fog_item(self._hex_polygons[pos])
+            created += 1
+        self._fog_visible = set(visible_hexes)
+        self.frame_stats.items_created += created
+        self.frame_stats.items_deleted += len(revealed)
 
     def _resolve_background(self, fallback_path: str, fallback_width: int, fallback_height: int):
         """Zwraca słownik z kluczami image/width/height na podstawie metadanych mapy."""
@@ -454,10 +711,11 @@ class PanelMapa(tk.Frame):
             return None
 
     def _draw_tokens_on_map(self):
+        """Żetony w trybie zachowanym: istniejące elementy są przesuwane lub dostają nowy obraz,
+        tworzone są tylko nowo widoczne żetony, a usuwane te, które zniknęły z widoku."""
         self._sync_player_from_engine()
         self.tokens = self.game_engine.tokens  # Zawsze aktualizuj listę żetonów
-        self.canvas.delete("token")
-        self.canvas.delete("token_sel")  # Usuwamy stare obwódki        # Filtrowanie widoczności żetonów przez fog of war (uwzględnij temp_visible_tokens)
+        self.canvas.delete("token_sel")  # Usuwamy stare obwódki
         # Usuń stare markery statusu
         try:
             for mid in self._move_status_markers.values():
@@ -465,65 +723,39 @@ class PanelMapa(tk.Frame):
         except Exception:
             pass
         self._move_status_markers = {}
-        self._token_canvas_items = {}
+        # Filtrowanie widoczności żetonów przez fog of war (uwzględnij temp_visible_tokens)
         tokens = self.tokens
         if hasattr(self, 'player') and hasattr(self.player, 'visible_tokens') and hasattr(self.player, 'temp_visible_tokens'):
             tokens = [t for t in self.tokens if t.id in (self.player.visible_tokens | self.player.temp_visible_tokens)]
         elif hasattr(self, 'player') and hasattr(self.player, 'visible_tokens'):
             tokens = [t for t in self.tokens if t.id in self.player.visible_tokens]
+        stats = self.frame_stats
+        drawn = set()
         for token in tokens:
-            # USUNIĘTO DEBUGI
             if token.q is not None and token.r is not None:
                 # Określ ścieżkę do obrazu na podstawie detection_level dla wrogów
                 img_path = self._get_token_image_path(token)
                 if not img_path:
                     continue
                 try:
-                    img = Image.open(img_path)
-                    # SKALOWANIE ŻETONÓW: bazowo 40x40; lekkie powiększenie o ~10% (wcześniej 30%).
-                    # Aby zmienić globalnie: dostosuj TOKEN_SIZE_FACTOR albo BASE_TOKEN_SIZE poniżej.
-                    BASE_TOKEN_SIZE = 40
-                    TOKEN_SIZE_FACTOR = 1.1  # 10% większe (BYŁO 1.3)
-                    hex_size = int(round(BASE_TOKEN_SIZE * TOKEN_SIZE_FACTOR))
-                    img = img.resize((hex_size, hex_size), Image.LANCZOS)
-                    
-                    # Zastosuj przezroczystość dla nieaktywnych żetonów
-                    if self.active_commander_id is not None:
-                        token_commander_id = self._get_token_commander_id(token)
-                        if token_commander_id != self.active_commander_id:
-                            # Żeton nieaktywnego dowódcy - zmniejsz przezroczystość
-                            img = img.convert("RGBA")
-                            alpha = img.split()[-1]  # Pobierz kanał alfa
-                            alpha = alpha.point(lambda p: int(p * 0.4))  # 40% przezroczystości
-                            img.putalpha(alpha)
-                    
-                    # Zastosuj przezroczystość na podstawie detection_level dla tokenów wroga
-                    if hasattr(self, 'player') and hasattr(token, 'owner'):
-                        player_nation = getattr(self.player, 'nation', '')
-                        token_nation = token.stats.get('nation', '')
-                        
-                        if player_nation and token_nation and player_nation != token_nation:
-                            # To jest token wroga - sprawdź detection_level
-                            detection_level = 1.0  # Domyślnie pełna widoczność
-                            
-                            if hasattr(self.player, 'temp_visible_token_data'):
-                                token_data = self.player.temp_visible_token_data.get(token.id, {})
-                                detection_level = token_data.get('detection_level', 0.0)
-                            
-                            # Zastosuj przezroczystość na podstawie detection_level
-                            if detection_level < 1.0:
-                                img = img.convert("RGBA")
-                                alpha = img.split()[-1]  # Pobierz kanał alfa
-                                # Przezroczystość: 0.4-1.0 na podstawie detection_level
-                                opacity = 0.4 + (detection_level * 0.6)
-                                alpha = alpha.point(lambda p: int(p * opacity))
-                                img.putalpha(alpha)
-                    
-                    tk_img = ImageTk.PhotoImage(img)
+                    appearance = (img_path, self._token_dimmed(token), self._token_opacity(token))
+                    tk_img = self._token_photo(*appearance)
                     x, y = self.map_model.hex_to_pixel(token.q, token.r)
-                    img_item = self.canvas.create_image(x, y, image=tk_img, anchor="center", tags=("token", f"token_{token.id}"))
+                    img_item = self._token_canvas_items.get(token.id)
+                    previous = self._token_render_state.get(token.id)
+                    if img_item is None:
+                        img_item = self.canvas.create_image(x, y, image=tk_img, anchor="center", tags=("token", f"token_{token.id}"))
+                        stats.items_created += 1
+                    elif previous is None or previous != ((x, y), appearance):
+                        if previous is None or previous[0] != (x, y):
+                            self.canvas.coords(img_item, x, y)
+                        if previous is None or previous[1] != appearance:
+                            self.canvas.itemconfig(img_item, image=tk_img)
+                        stats.items_updated += 1
+                    self._token_render_state[token.id] = ((x, y), appearance)
                     self.token_images[token.id] = tk_img
                     self._token_canvas_items[token.id] = img_item
+                    drawn.add(token.id)
                     # --- USUNIĘTO: wyświetlanie parametrów tekstowych na żetonie ---
                     # Obwódka zależna od trybu ruchu
                     border_color = "yellow"  # domyślnie bojowy
@@ -535,7 +767,8 @@ class PanelMapa(tk.Frame):
                         elif token.movement_mode == 'recon':
                             border_color = "red"  # zwiad
                     if hasattr(self, 'selected_token_id') and token.id == self.selected_token_id:
-                        verts = get_hex_vertices(x, y, hex_size)
+                        token_size = int(round(BASE_TOKEN_SIZE * TOKEN_SIZE_FACTOR))
+                        verts = get_hex_vertices(x, y, token_size)
                         flat = [coord for p in verts for coord in p]
                         self.canvas.create_polygon(
                             flat,
@@ -546,12 +779,68 @@ class PanelMapa(tk.Frame):
                         )
                 except Exception as e:
                     pass  # USUNIĘTO DEBUGI
-        # Kod spełnia wymagania: synchronizacja żetonów, tagowanie, poprawna mgiełka i widoczność.
+        # Żetony zniszczone lub ukryte przez mgłę
+        for token_id in [tid for tid in self._token_canvas_items if tid not in drawn]:
+            self.canvas.delete(self._token_canvas_items.pop(token_id))
+            self._token_render_state.pop(token_id, None)
+            self.token_images.pop(token_id, None)
+            stats.items_deleted += 1
+        # Animacja migania kończy się ukryciem elementu – przywróć widoczność zachowanych żetonów
+        self.canvas.itemconfig("token", state="normal")
         # Po narysowaniu żetonów zaktualizuj markery statusu ruchu
         self._refresh_move_status_markers()
         # Upewnij się, że nakładka dnia/nocy pozostaje na wierzchu
         self._ensure_daylight_overlay_top()
 
+    def _token_dimmed(self, token) -> bool:
+        """Żeton nieaktywnego dowódcy rysowany z obniżoną przezroczystością."""
+        if self.active_commander_id is None:
+            return False
+        return self._get_token_commander_id(token) != self.active_commander_id
+
+    def _token_opacity(self, token):
+        """Krycie wrogiego żetonu wg detection_level (0.4-1.0) albo None, gdy rysowany w pełni."""
+        if hasattr(self, 'player') and hasattr(token, 'owner'):
+            player_nation = getattr(self.player, 'nation', '')
+            token_nation = token.stats.get('nation', '')
+            if player_nation and token_nation and player_nation != token_nation:
+                # To jest token wroga - sprawdź detection_level
+                detection_level = 1.0  # Domyślnie pełna widoczność
+                if hasattr(self.player, 'temp_visible_token_data'):
+                    token_data = self.player.temp_visible_token_data.get(token.id, {})
+                    detection_level = token_data.get('detection_level', 0.0)
+                if detection_level < 1.0:
+                    return 0.4 + (detection_level * 0.6)
+        return None
+
+    def _token_photo(self, img_path, dimmed, opacity):
+        """Obraz żetonu przeskalowany i z przezroczystością – wczytywany raz dla danego wyglądu."""
+        key = (img_path, dimmed, opacity)
+        photo = self._token_photo_cache.get(key)
+        if photo is not None:
+            return photo
+        img = Image.open(img_path)
+        token_size = int(round(BASE_TOKEN_SIZE * TOKEN_SIZE_FACTOR))
+        img = img.resize((token_size, token_size), Image.LANCZOS)
+        # Zastosuj przezroczystość dla nieaktywnych żetonów
+        if dimmed:
+            img = img.convert("RGBA")
+            alpha = img.split()[-1]  # Pobierz kanał alfa
+            alpha = alpha.point(lambda p: int(p * 0.4))  # 40% przezroczystości
+            img.putalpha(alpha)
+        # Zastosuj przezroczystość na podstawie detection_level dla tokenów wroga
+        if opacity is not None:
+            img = img.convert("RGBA")
+            alpha = img.split()[-1]  # Pobierz kanał alfa
+            alpha = alpha.point(lambda p: int(p * opacity))
+            img.putalpha(alpha)
+        photo = ImageTk.PhotoImage(img)
+        if len(self._token_photo_cache) >= TOKEN_PHOTO_CACHE_SIZE:
+            # Wyświetlane obrazy trzyma token_images, więc czyszczenie jest bezpieczne
+            self._token_photo_cache.clear()
+        self._token_photo_cache[key] = photo
+        return photo
+
     def _get_token_image_path(self, token):
         """Zwraca ścieżkę do obrazu tokena z uwzględnieniem detection_level dla wrogów"""
         # Sprawdź czy to token wroga
@@ -596,6 +885,17 @@ class PanelMapa(tk.Frame):
         if not img_path:
             nation = token.stats.get('nation', '')
             img_path = f"assets/tokens/{nation}/{token.id}/token.png"
+        if not os.path.exists(img_path) and token.stats.get('unitType'):
+            # Żetony kupione przez AI nie mają własnych plików – grafika z cache sprite'ów (render przy 1. użyciu)
+            try:
+                img_path = str(token_sprite_path(
+                    token.stats.get('nation', ''),
+                    token.stats.get('unitType', ''),
+                    token.stats.get('unitSize', ''),
+                    token.stats.get('support_upgrades'),
+                ))
+            except Exception:
+                pass
         if not os.path.exists(img_path):
             img_path = "assets/tokens/default/token.png" if os.path.exists("assets/tokens/default/token.png") else None
         
@@ -626,14 +926,16 @@ class PanelMapa(tk.Frame):
                     self.canvas.create_line(coords[i][0], coords[i][1], coords[i+1][0], coords[i+1][1], fill='blue', width=4, tags='path')
 
     def refresh(self):
+        self.frame_stats.start()
         self.canvas.delete('path')
         self._sync_player_from_engine()
         self._draw_hex_grid()
         self._draw_tokens_on_map()
         self._draw_path_on_map()
+        self.frame_stats.stop()
         # Po odświeżeniu aktualizujemy ewentualny podgląd hover
         if getattr(self, 'last_hover_token_id', None) and self.token_info_panel:
-            tok = next((t for t in self.tokens if t.id == self.last_hover_token_id), None)
+            tok = find_token(self.game_engine, self.last_hover_token_id)
             if tok:
                 try:
                     self.token_info_panel.show_token(tok)
@@ -798,7 +1100,7 @@ class PanelMapa(tk.Frame):
                     # print(f"[DEBUG] Utworzono Token: id={new_token.id}, q={new_token.q}, r={new_token.r}, owner={new_token.owner}")
                     self.game_engine.tokens.append(new_token)
                     # print(f"[DEBUG] Liczba żetonów po dodaniu: {len(self.game_engine.tokens)}")
-                    self.game_engine.board.set_tokens(self.game_engine.tokens)
+                    self.game_engine.board.register_token(new_token)
                     # LOG: deploy
                     try:
                         from utils.action_logger import log_action
@@ -902,7 +1204,7 @@ class PanelMapa(tk.Frame):
             self.refresh()
             return
         elif hr and self.selected_token_id:
-            token = next((t for t in self.tokens if t.id == self.selected_token_id), None)
+            token = find_token(self.game_engine, self.selected_token_id)
             if token:
                 # Spróbuj znaleźć ścieżkę do celu, a jeśli się nie uda, znajdź maksymalnie osiągalną ścieżkę
                 path = self.game_engine.board.find_path((token.q, token.r), hr, max_mp=token.currentMovePoints, max_fuel=getattr(token, 'currentFuel', 9999))
@@ -958,12 +1260,12 @@ class PanelMapa(tk.Frame):
                             # --- AUTOMATYCZNA REAKCJA WROGÓW ---
                             moved_token = token  # żeton, który się ruszał
                             # print(f"[DEBUG] Sprawdzam reakcję wrogów na ruch żetonu {moved_token.id} ({moved_token.owner}) na ({moved_token.q},{moved_token.r})")
-                            for enemy in self.game_engine.tokens:
+                            for enemy in list(self.game_engine.tokens):  # reakcja może usunąć żeton
                                 if enemy.id == moved_token.id or enemy.owner == moved_token.owner:
                                     continue
                                 # Blokada: nie atakuje własnych żetonów
-                                nation_enemy = enemy.owner.split('(')[-1].replace(')','').strip()
-                                nation_moved = moved_token.owner.split('(')[-1].replace(')','').strip()
+                                nation_enemy = enemy.nation
+                                nation_moved = moved_token.nation
                                 if nation_enemy == nation_moved:
                                     # print(f"[DEBUG] Blokada: {enemy.id} ({enemy.owner}) nie atakuje własnego żetonu {moved_token.id} ({moved_token.owner})!")
                                     continue
@@ -1016,7 +1318,7 @@ class PanelMapa(tk.Frame):
                         # Zaktualizuj panel informacji o żetonie natychmiast po ruchu
                         try:
                             if self.token_info_panel is not None:
-                                moved = next((t for t in self.tokens if t.id == token.id), None)
+                                moved = find_token(self.game_engine, token.id)
                                 if moved is not None:
                                     self.token_info_panel.show_token(moved)
                         except Exception:
@@ -1081,11 +1383,11 @@ class PanelMapa(tk.Frame):
                                 if hasattr(self.game_engine, 'players'):
                                     update_all_players_visibility(self.game_engine.players, self.game_engine.tokens, self.game_engine.board)
                                 moved_token = token
-                                for enemy in self.game_engine.tokens:
+                                for enemy in list(self.game_engine.tokens):  # reakcja może usunąć żeton
                                     if enemy.id == moved_token.id or enemy.owner == moved_token.owner:
                                         continue
-                                    nation_enemy = enemy.owner.split('(')[-1].replace(')','').strip()
-                                    nation_moved = moved_token.owner.split('(')[-1].replace(')','').strip()
+                                    nation_enemy = enemy.nation
+                                    nation_moved = moved_token.nation
                                     if nation_enemy == nation_moved:
                                         continue
                                     sight = enemy.stats.get('sight', 0)
@@ -1126,7 +1428,7 @@ class PanelMapa(tk.Frame):
                             # Zaktualizuj panel informacji o żetonie natychmiast po ruchu (fallback)
                             try:
                                 if self.token_info_panel is not None:
-                                    moved = next((t for t in self.tokens if t.id == token.id), None)
+                                    moved = find_token(self.game_engine, token.id)
                                     if moved is not None:
                                         self.token_info_panel.show_token(moved)
                             except Exception:
@@ -1188,7 +1490,7 @@ class PanelMapa(tk.Frame):
             return
         # Sprawdź, czy kliknięto w żeton przeciwnika (nie swój, nie sojusznika)
         if clicked_token and self.selected_token_id:
-            attacker = next((t for t in self.tokens if t.id == self.selected_token_id), None)
+            attacker = find_token(self.game_engine, self.selected_token_id)
             if not attacker:
                 return
             # Sprawdź, czy to przeciwnik
@@ -1285,6 +1587,8 @@ class PanelMapa(tk.Frame):
             tag = f"token_{token.id}"
             def move_step(i):
                 if i > steps:
+                    # Element przesunięty animacją – przy odświeżeniu ustaw pozycję od nowa
+                    self._token_render_state.pop(token.id, None)
                     self.refresh()
                     return
                 self.canvas.move(tag, dx, dy)
@@ -1324,8 +1628,8 @@ class PanelMapa(tk.Frame):
             blink_token(defender.id, color='orange', times=2, delay=100, on_end=after_blink)
         # Po animacjach, po odświeżeniu mapy, wypisz wartości po walce
         def print_after_refresh():
-            att = next((t for t in self.tokens if t.id == attacker.id), None)
-            defn = next((t for t in self.tokens if t.id == defender.id), None)
+            att = find_token(self.game_engine, attacker.id)
+            defn = find_token(self.game_engine, defender.id)
             # Usunięto printy debugujące
         self.canvas.after(600, print_after_refresh)
 
@@ -1361,7 +1665,7 @@ class PanelMapa(tk.Frame):
     def save_game_state(self):
         try:
             state = {
-                'tokens': [ { 'id': t.id, 'q': t.q, 'r': t.r, 'owner': t.owner, 'movement_mode': t.movement_mode, 'currentMovePoints': t.currentMovePoints, 'stats': t.stats } for t in self.tokens ],
+                'tokens': [ { 'id': t.id, 'q': t.q, 'r': t.r, 'owner': t.owner, 'movement_mode': t.movement_mode, 'currentMovePoints': t.currentMovePoints, 'stats': dict(t.stats) } for t in self.tokens ],
                 'current_player': self.game_engine.current_player_id,
                 'turn': self.game_engine.turn,
             }
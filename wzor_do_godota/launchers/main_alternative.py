@@ -303,7 +303,7 @@ def run_game(max_turns=10, victory_mode="turns"):
         game_engine.update_all_players_visibility(players)
             
         # --- SPRAWDZENIE KOŃCA GRY ---
-        if victory_conditions.check_game_over(turn_manager.current_turn, players):
+        if victory_conditions.check_game_over(turn_manager.current_turn, players, game_engine):
             print(victory_conditions.get_victory_message())
             
             victory_info = victory_conditions.get_victory_info()
@@ -260,7 +260,7 @@ def run_human_vs_human_game(game_engine, players, turn_manager, max_turns, victo
         game_engine.update_all_players_visibility(players)
             
         # --- SPRAWDZENIE KOŃCA GRY ---
-        if victory_conditions.check_game_over(turn_manager.current_turn, players):
+        if victory_conditions.check_game_over(turn_manager.current_turn, players, game_engine):
             print(victory_conditions.get_victory_message())
             
             victory_info = victory_conditions.get_victory_info()
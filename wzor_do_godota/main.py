@@ -320,7 +320,7 @@ class GameLauncher:
             if is_full_turn_end:
                 game_engine.process_key_points(players)
             game_engine.update_all_players_visibility(players)
-            if victory_conditions.check_game_over(turn_manager.current_turn, players):
+            if victory_conditions.check_game_over(turn_manager.current_turn, players, game_engine):
                 print(victory_conditions.get_victory_message())
                 
                 victory_info = victory_conditions.get_victory_info()
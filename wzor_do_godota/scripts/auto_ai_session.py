@@ -26,6 +26,7 @@ from engine.engine import (
     clear_temp_visibility,
 )
 from ai import GeneralAI, CommanderAI
+from utils.hot_path_profiler import disable_profiling, enable_profiling
 
 
 def parse_args() -> argparse.Namespace:
@@ -55,6 +56,17 @@ def parse_args() -> argparse.Namespace:
         default=42,
         help="Ziarno RNG dla GameEngine (domyślnie: 42)",
     )
+    parser.add_argument(
+        "--journal",
+        default=None,
+        help="Ścieżka dziennika akcji do odtwarzania partii (engine.replay.ReplayReader)",
+    )
+    parser.add_argument(
+        "--profile",
+        default=None,
+        metavar="KATALOG",
+        help="Mierz gorące ścieżki AI i zapisz hot_path.csv / hot_path.folded do katalogu",
+    )
     return parser.parse_args()
 
 
@@ -91,7 +103,8 @@ def build_players() -> list[Player]:
     return players
 
 
-def run_session(turns: int, victory_mode: str, skip_clean: bool, seed: int) -> None:
+def run_session(turns: int, victory_mode: str, skip_clean: bool, seed: int, journal: str = None,
+                profile: str = None) -> None:
     if not skip_clean:
         clean_ai_logs(PROJECT_ROOT)
 
@@ -107,6 +120,9 @@ def run_session(turns: int, victory_mode: str, skip_clean: bool, seed: int) -> N
     players = build_players()
     engine.players = players
     update_all_players_visibility(players, engine.tokens, engine.board)
+    if journal:
+        engine.start_journal(journal)
+    profiler = enable_profiling() if profile else None
 
     generals: Dict[int, GeneralAI] = {p.id: GeneralAI(p) for p in players if p.role == "Generał"}
     commanders: Dict[int, CommanderAI] = {p.id: CommanderAI(p) for p in players if p.role == "Dowódca"}
@@ -129,6 +145,8 @@ def run_session(turns: int, victory_mode: str, skip_clean: bool, seed: int) -> N
             engine.log_key_points_status(current_player)
         except Exception as exc:
             print(f"⚠️ Nie udało się zalogować stanu key pointów: {exc}")
+        if profiler is not None:
+            profiler.begin_turn(turn_manager.current_turn)
 
         if current_player.role == "Generał":
             generals[current_player.id].execute_turn(players, engine)
@@ -151,7 +169,7 @@ def run_session(turns: int, victory_mode: str, skip_clean: bool, seed: int) -> N
             engine.update_all_players_visibility(players)
             clear_temp_visibility(players)
 
-        if victory.check_game_over(turn_manager.current_turn, players):
+        if victory.check_game_over(turn_manager.current_turn, players, engine):
             print("\n" + "=" * 80)
             print("🏁 " + victory.get_victory_message())
             break
@@ -160,6 +178,12 @@ def run_session(turns: int, victory_mode: str, skip_clean: bool, seed: int) -> N
             print("\n✅ Osiągnięto zaplanowaną liczbę pełnych tur – kończę sesję.")
             break
 
+    engine.stop_journal()
+    if profiler is not None:
+        disable_profiling()
+        from utils.ai_commander_logger_zaawansowany import LoggerWydajnosci
+        paths = profiler.export(profile, logger=LoggerWydajnosci(Path(profile)))
+        print(f"⏱️ Profil gorących ścieżek: {paths['csv']}, {paths['folded']}")
     info = victory.get_victory_info()
     print("=" * 80)
     print("📊 Podsumowanie sesji AI:")
@@ -180,6 +204,8 @@ def main() -> None:
         victory_mode=args.victory,
         skip_clean=args.skip_clean,
         seed=args.seed,
+        journal=args.journal,
+        profile=args.profile,
     )
 
 
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Wsadowe rozgrywanie partii AI vs AI bez GUI.
+
+Rozgrywa N partii z kolejnymi ziarnami i zapisuje po jednym rekordzie JSON na partię
+(JSON Lines). Na koniec drukuje scalone podsumowanie. Z --workers partie są rozdzielane
+na pulę procesów (core.farma_symulacji), każdy z własnym katalogiem roboczym.
+
+Przykład:
+    python scripts/batch_ai_games.py --games 100 --turns 10 --seed 1000 --output wyniki.jsonl
+    python scripts/batch_ai_games.py --games 2000 --workers 0 --workdir farma/ --output wyniki.jsonl
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.farma_symulacji import run_farm, summarize
+from core.symulacja import run_batch
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Rozgrywa serię partii AI vs AI bez GUI i zapisuje wyniki (JSON Lines).",
+    )
+    parser.add_argument("--games", type=int, default=10, help="Liczba partii (domyślnie: 10)")
+    parser.add_argument("--seed", type=int, default=0, help="Ziarno pierwszej partii; kolejne +1 (domyślnie: 0)")
+    parser.add_argument("--turns", type=int, default=10, help="Limit pełnych tur na partię (domyślnie: 10)")
+    parser.add_argument(
+        "--victory",
+        choices=["turns", "elimination"],
+        default="turns",
+        help="Tryb zwycięstwa (domyślnie: turns)",
+    )
+    parser.add_argument("--output", help="Plik JSONL na wyniki (domyślnie: tylko stdout)")
+    parser.add_argument("--verbose", action="store_true", help="Nie wyciszaj wydruków AI (tylko bez --workers)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Liczba procesów farmy (0 = wszystkie rdzenie); bez opcji partie idą w bieżącym procesie",
+    )
+    parser.add_argument("--workdir", help="Katalog na katalogi robocze procesów farmy (domyślnie: tymczasowy)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    out = open(args.output, "w", encoding="utf-8") if args.output else None
+    results = []
+
+    def emit(result) -> None:
+        results.append(result)
+        line = json.dumps(result.to_dict(), ensure_ascii=False)
+        if out:
+            out.write(line + "\n")
+            out.flush()
+        else:
+            print(line)
+        if result.error:
+            print(f"⚠️ Partia seed={result.seed}: {result.error}", file=sys.stderr)
+
+    started = time.perf_counter()
+    try:
+        if args.workers is not None:
+            _, summary = run_farm(
+                args.games,
+                base_seed=args.seed,
+                workers=args.workers or None,
+                max_turns=args.turns,
+                victory_mode=args.victory,
+                root=args.workdir,
+                on_result=emit,
+            )
+        else:
+            for result in run_batch(
+                args.games,
+                base_seed=args.seed,
+                max_turns=args.turns,
+                victory_mode=args.victory,
+                quiet=not args.verbose,
+            ):
+                emit(result)
+            summary = summarize(results, time.perf_counter() - started, workers=1)
+    finally:
+        if out:
+            out.close()
+
+    wins = ", ".join(f"{nation}: {count}" for nation, count in sorted(summary.wins.items())) or "brak"
+    print(
+        f"📊 Partie: {summary.games} (procesy: {summary.workers}), zwycięstwa: {wins}, remisy: {summary.draws}, "
+        f"błędy: {summary.errors}, {summary.games_per_s} partii/s",
+        file=sys.stderr,
+    )
+    return 1 if summary.errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
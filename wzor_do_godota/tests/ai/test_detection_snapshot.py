@@ -0,0 +1,127 @@
+"""
+Wspólna migawka detekcji dowódcy – zgodność z dawną pętlą _collect_detection_map
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from ai.tokens.detection_snapshot import get_detection_snapshot
+from ai.tokens.token_ai import TokenAI
+from engine.action_refactored_clean import VisionService
+from engine.board import Board
+from engine.detection_filter import apply_detection_filter, get_detection_info_for_player, mark_visibility_changed
+from engine.player import Player
+from engine.token import Token, token_nation
+
+
+def _board(map_file):
+    return Board(map_file(8, 8, offset=True))
+
+
+def _reference(token, sight, engine, player, base_map):
+    """Dawna pętla po wszystkich żetonach silnika (przed migawką)."""
+    detection_map = dict(base_map or {})
+    my_pos = (token.q, token.r)
+    for enemy in engine.tokens:
+        if enemy is token or token_nation(enemy) == token_nation(token):
+            continue
+        info = get_detection_info_for_player(player, enemy.id, include_temp=True)
+        detection_level, distance, detected_by = 0.0, None, None
+        if info:
+            detection_level = info.get("detection_level", 0.0) or 0.0
+            distance = info.get("distance")
+            detected_by = info.get("detected_by")
+        if detection_level <= 0 and sight > 0:
+            distance = engine.board.hex_distance(my_pos, (enemy.q, enemy.r))
+            if distance < sight:
+                detection_level = VisionService.calculate_detection_level(distance, sight)
+        if detection_level <= 0:
+            detection_map.pop(enemy.id, None)
+            continue
+        filtered = apply_detection_filter(enemy, detection_level)
+        filtered["detection_level"] = detection_level
+        if distance is not None:
+            filtered["distance"] = distance
+        if detected_by:
+            filtered["detected_by"] = detected_by
+        detection_map[enemy.id] = filtered
+    active_ids = {tok.id for tok in engine.tokens}
+    return {key: value for key, value in detection_map.items() if key in active_ids}
+
+
+def _scenario(map_file):
+    board = _board(map_file)
+    own = Token("PL1", "2 (Polska)", {"move": 3, "sight": 3, "nation": "Polska"}, q=2, r=2)
+    ally = Token("PL2", "3 (Polska)", {"move": 3, "sight": 2, "nation": "Polska"}, q=6, r=0)
+    near = Token("DE1", "5 (Niemcy)", {"move": 3, "combat_value": 6, "nation": "Niemcy"}, q=3, r=2)
+    far = Token("DE2", "5 (Niemcy)", {"move": 3, "combat_value": 4, "nation": "Niemcy"}, q=7, r=3)
+    hidden = Token("DE3", "5 (Niemcy)", {"move": 3, "nation": "Niemcy"}, q=0, r=6)
+    engine = SimpleNamespace(board=board, tokens=[own, ally, near, far, hidden])
+    board.set_tokens(engine.tokens)
+    player = Player(2, "Polska", "Dowódca")
+    player.temp_visible_token_data = {"DE2": {"detection_level": 0.6, "distance": 4, "detected_by": "PL2"}}
+    return engine, player, own
+
+
+def test_view_matches_reference_loop_and_keeps_key_order(map_file):
+    engine, player, own = _scenario(map_file)
+    ai = TokenAI(own)
+    base_map = {"DE3": {"stale": True}, "GONE": {}, "PL2": {"note": 1}, "DE1": {"old": True}}
+
+    result = ai._collect_detection_map(engine, player, base_map)
+    expected = _reference(own, ai._sight(), engine, player, base_map)
+
+    assert result == expected
+    assert list(result) == list(expected) == ["PL2", "DE1", "DE2"]
+    assert result["DE2"]["detected_by"] == "PL2"
+
+    # bez indeksu zajętości (plansza nie zna żetonów silnika) – ten sam wynik
+    engine.board.tokens = []
+    assert ai._collect_detection_map(engine, player, base_map) == expected
+
+
+def test_snapshot_reused_until_visibility_or_token_list_changes(map_file):
+    engine, player, own = _scenario(map_file)
+    ai = TokenAI(own)
+    snapshot = get_detection_snapshot(engine, player)
+    ai._collect_detection_map(engine, player)
+    assert get_detection_snapshot(engine, player) is snapshot
+    assert engine.ai_detection_snapshots == {(2, "Polska"): snapshot} and not hasattr(player, "ai_detection_snapshot")
+
+    player.temp_visible_token_data["DE3"] = {"detection_level": 0.3}
+    mark_visibility_changed(player)
+    refreshed = get_detection_snapshot(engine, player)
+    assert refreshed is not snapshot
+    assert "DE3" in ai._collect_detection_map(engine, player)
+
+    engine.tokens[2].set_position(5, 5)  # ruch nie unieważnia migawki – widok czyta pozycje na żywo
+    engine.tokens[3].set_position(6, 3)
+    assert get_detection_snapshot(engine, player) is refreshed
+    moved = ai._collect_detection_map(engine, player)
+    assert moved == _reference(own, ai._sight(), engine, player, None)
+    assert "DE1" not in moved and (moved["DE2"]["q"], moved["DE2"]["r"]) == (6, 3)
+
+    engine.tokens.pop(4)  # eliminacja zmienia listę żetonów
+    assert get_detection_snapshot(engine, player) is not refreshed
+
+
+def test_records_are_filtered_once_per_snapshot(map_file, monkeypatch):
+    from ai.tokens import detection_snapshot
+
+    engine, player, own = _scenario(map_file)
+    ally_ai = TokenAI(engine.tokens[1])
+    calls = []
+    real_filter = detection_snapshot.apply_detection_filter
+    monkeypatch.setattr(detection_snapshot, "apply_detection_filter",
+                        lambda token, level: calls.append(token.id) or real_filter(token, level))
+
+    for _ in range(3):
+        first = TokenAI(own)._collect_detection_map(engine, player)
+        second = ally_ai._collect_detection_map(engine, player)
+
+    assert sorted(calls) == ["DE1", "DE2"]  # DE2 z obrazu dowódcy, DE1 z wzroku PL1
+    first["DE2"]["distance"] = 99  # widoki są kopiami
+    assert ally_ai._collect_detection_map(engine, player)["DE2"]["distance"] == 4
@@ -0,0 +1,96 @@
+"""
+Zakupy AI: plan generała przekazywany dowódcy w pamięci, sprite każdego klucza renderowany raz
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from core.ekonomia import EconomySystem
+from engine.player import Player
+from ai.commander.commander_ai import CommanderAI
+from ai.general.general_ai import GeneralAI
+from utils import token_blueprint
+from utils.token_blueprint import sprite_cache_key, token_sprite_path
+
+
+def _player(player_id, role, points):
+    player = Player(player_id, "Polska", role)
+    player.economy = EconomySystem()
+    player.economy.add_economic_points(points)
+    return player
+
+
+def test_general_purchase_is_handed_over_in_memory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    general = GeneralAI(_player(1, "Generał", 100))
+    commander = _player(2, "Dowódca", 0)
+
+    events, spent = general._execute_purchase_plan(
+        commanders=[commander],
+        commander_profiles=[{"id": 2, "token_count": 0}],
+        plan=[{"category": "infantry", "allocated": 30, "weight": 1}],
+        available_budget=30,
+    )
+
+    assert events and spent == sum(event["cost"] for event in events)
+    # Zero plików i zero pracy graficznej w trakcie zakupu
+    assert list(tmp_path.iterdir()) == []
+    assert all(event["blueprint"]["image"] == "" for event in events)
+
+    CommanderAI(commander)._ingest_purchase_orders()
+
+    queue = commander.ai_reinforcement_queue
+    assert [order["token_id"] for order in queue] == [event["token_id"] for event in events]
+    assert queue[0]["token_blueprint"]["unitType"] == events[0]["unit_type"]
+    assert queue[0]["folder"] is None
+    assert commander.ai_purchase_events == []
+
+
+def test_purchased_token_ids_follow_the_game_not_the_clock(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    def buy():
+        general = GeneralAI(_player(1, "Generał", 100))
+        commander = _player(2, "Dowódca", 0)
+        events, _ = general._execute_purchase_plan(
+            commanders=[commander],
+            commander_profiles=[{"id": 2, "token_count": 0}],
+            plan=[{"category": "infantry", "allocated": 60, "weight": 1}],
+            available_budget=60,
+            turn=3,
+        )
+        return [event["token_id"] for event in events]
+
+    ids = buy()
+
+    assert len(ids) >= 2 and len(set(ids)) == len(ids)  # identyczne zakupy w jednej turze
+    assert ids == buy()  # ten sam przebieg – te same id
+    assert ids[0].endswith("_T3_1") and ids[1].endswith("_T3_2")
+
+
+def test_sprite_cache_renders_each_key_once(tmp_path, monkeypatch):
+    rendered = []
+    original = token_blueprint._render_token_image
+
+    def counting_render(destination, nation, unit_type, unit_size):
+        rendered.append((nation, unit_type, unit_size))
+        original(destination, nation, unit_type, unit_size)
+
+    monkeypatch.setattr(token_blueprint, "_render_token_image", counting_render)
+    monkeypatch.setattr(token_blueprint, "_sprite_paths", {})
+
+    first = token_sprite_path("Polska", "P", "Pluton", ["sapers", "drużyna granatników"], cache_dir=tmp_path)
+    second = token_sprite_path("Polska", "P", "Pluton", ["drużyna granatników", "sapers"], cache_dir=tmp_path)
+    other = token_sprite_path("Niemcy", "P", "Pluton", cache_dir=tmp_path)
+
+    assert first == second and first.exists()
+    assert other != first
+    assert rendered == [("Polska", "P", "Pluton"), ("Niemcy", "P", "Pluton")]
+    assert sprite_cache_key("Polska", "P", "Pluton", None) == ("Polska", "P", "Pluton", ())
+
+    # Plik z dysku jest używany ponownie także po wyczyszczeniu pamięci procesu
+    monkeypatch.setattr(token_blueprint, "_sprite_paths", {})
+    assert token_sprite_path("Niemcy", "P", "Pluton", cache_dir=tmp_path) == other
+    assert len(rendered) == 2
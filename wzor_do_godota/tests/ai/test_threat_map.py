@@ -0,0 +1,107 @@
+"""
+Mapa zagrożenia gracza (NumPy) zamiast słownika danger_zones liczonego przez każdy żeton
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from ai.tokens.threat_map import ThreatMap, ThreatView, get_player_threat_map
+from ai.tokens.token_ai import TokenAI
+from engine.board import Board
+from engine.hex_utils import hexes_in_range
+from engine.player import Player
+from engine.token import Token
+
+
+def _board(map_file):
+    return Board(map_file(8, 8, offset=True))
+
+
+def _expected(board, contacts):
+    danger = {}
+    for pos, radius in contacts.values():
+        for h in hexes_in_range(board, pos, radius):
+            danger[h] = danger.get(h, 0) + 1
+    return danger
+
+
+def test_sync_matches_dict_and_updates_incrementally(map_file):
+    board = _board(map_file)
+    threat = ThreatMap(board)
+    contacts = {"E1": ((3, 2), 2), "E2": ((4, 2), 1), "E3": ((0, 0), 1)}
+
+    assert threat.sync(contacts)
+    assert threat.to_dict() == _expected(board, contacts)
+    assert not threat.sync(dict(contacts))  # bez zmian – bez przeliczeń
+    version = threat.version
+
+    contacts["E2"] = ((5, 1), 2)  # wróg przesunął się
+    del contacts["E3"]  # kontakt utracony
+    threat.sync(contacts)
+
+    assert threat.version == version + 1
+    assert threat.to_dict() == _expected(board, contacts)
+    assert threat.get((3, 2), 0) == threat.level_at((3, 2)) == _expected(board, contacts)[(3, 2)]
+    assert threat.get((50, 50), 0) == 0 and (50, 50) not in threat
+
+    threat.clear()
+    assert not threat and threat.counts.sum() == 0
+
+
+def test_commander_tokens_share_player_map(map_file):
+    board = _board(map_file)
+    player = Player(2, "Polska", "Dowódca")
+    enemy = Token("DE", "5 (Niemcy)", {"attack": {"range": 2, "value": 4}}, q=4, r=2)
+    detection = {"DE": {"detection_level": 1.0}}
+    player.temp_visible_token_data = dict(detection)  # kontakt z obrazu dowódcy
+    first = TokenAI(Token("PL1", "2 (Polska)", {"move": 3}, q=1, r=1))
+    second = TokenAI(Token("PL2", "2 (Polska)", {"move": 3}, q=2, r=1))
+    engine = SimpleNamespace(board=board, tokens=[first.token, second.token, enemy])
+
+    zones_a = first._compute_danger_zones(engine, [enemy], detection, player)
+    zones_b = second._compute_danger_zones(engine, [enemy], detection, player)
+
+    assert zones_a is zones_b is get_player_threat_map(player, board)
+    assert zones_a.to_dict() == _expected(board, {"DE": ((4, 2), 2)})
+    assert second._danger_level_at((4, 3), zones_b) == 1
+    assert second._danger_level_at((0, 6), zones_b) == 0
+    # słowniki (atrapy / testy kontekstu) nadal obsługiwane
+    assert second._danger_level_at((1, 0), {(1, 0): 2}) == 2
+
+
+def test_own_sight_contacts_do_not_leak_between_tokens(map_file):
+    board = _board(map_file)
+    player = Player(2, "Polska", "Dowódca")
+    scout = Token("PL1", "2 (Polska)", {"move": 3, "sight": 4}, q=1, r=1)
+    blind = Token("PL2", "2 (Polska)", {"move": 3, "sight": 1}, q=6, r=0)
+    reported = Token("DE1", "5 (Niemcy)", {"attack": {"range": 1, "value": 4}}, q=6, r=2)
+    spotted = Token("DE2", "5 (Niemcy)", {"attack": {"range": 2, "value": 4}}, q=2, r=2)
+    engine = SimpleNamespace(board=board, tokens=[scout, blind, reported, spotted])
+    board.set_tokens(engine.tokens)
+    player.temp_visible_token_data = {"DE1": {"detection_level": 1.0}}
+    scout_ai, blind_ai = TokenAI(scout), TokenAI(blind)
+
+    def zones(ai):
+        detection = ai._collect_detection_map(engine, player)
+        contacts = {enemy.id: ((enemy.q, enemy.r), ai._perceived_attack_range(enemy, detection[enemy.id]))
+                    for enemy in ai._visible_enemies(engine, detection)}
+        return ai._compute_danger_zones(engine, ai._visible_enemies(engine, detection), detection, player), contacts
+
+    scout_zones, scout_contacts = zones(scout_ai)
+    blind_zones, blind_contacts = zones(blind_ai)
+    shared = get_player_threat_map(player, board)
+    version = shared.version
+
+    assert set(scout_contacts) == {"DE1", "DE2"} and set(blind_contacts) == {"DE1"}
+    assert isinstance(scout_zones, ThreatView) and blind_zones is shared
+    # strefy żetonu po synchronizacji drugiego żetonu i odwrotnie
+    assert scout_zones.to_dict() == _expected(board, scout_contacts)
+    again, _ = zones(scout_ai)
+    assert blind_zones.to_dict() == _expected(board, blind_contacts)
+    assert again.to_dict() == scout_zones.to_dict() == _expected(board, scout_contacts)
+    assert shared.version == version  # wspólna mapa nie jest przepisywana przez kolejne żetony
+    assert scout_ai._danger_level_at((2, 2), scout_zones) == 1
+    assert blind_ai._danger_level_at((2, 2), blind_zones) == 0
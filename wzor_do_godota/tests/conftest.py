@@ -1,4 +1,44 @@
 import sys, os
+import json
+
+import pytest
+
 ROOT = os.path.dirname(os.path.dirname(__file__))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def map_file(tmp_path):
+    """Fabryka syntetycznych map JSON w tmp_path; zwraca ścieżkę (str).
+
+    map_file(cols, rows) – prostokąt (q, r) z terenem {"move_mod": 0};
+    offset=True – przesunięte r jak na prawdziwej mapie (r od -(q // 2));
+    tile – dane heksa (słownik lub funkcja (q, r) -> słownik);
+    terrain – gotowy słownik "q,r" -> dane (zastępuje generowanie);
+    pozostałe argumenty (np. key_points) trafiają do dokumentu mapy.
+    """
+    def make(cols=6, rows=6, *, offset=False, tile=None, terrain=None, hex_size=30, name="map.json", **extra):
+        if terrain is None:
+            terrain = {}
+            for q in range(cols):
+                shift = q // 2 if offset else 0
+                for r in range(-shift, rows - shift):
+                    if callable(tile):
+                        terrain[f"{q},{r}"] = tile(q, r)
+                    else:
+                        terrain[f"{q},{r}"] = dict(tile or {"move_mod": 0})
+        data = {"meta": {"hex_size": hex_size, "cols": cols, "rows": rows}, "terrain": terrain, **extra}
+        path = tmp_path / name
+        path.write_text(json.dumps(data), encoding="utf-8")
+        return str(path)
+
+    return make
+
+
+@pytest.fixture
+def empty_tokens_file(tmp_path):
+    """Pusty indeks/lista żetonów startowych dla GameEngine."""
+    path = tmp_path / "empty.json"
+    path.write_text("[]", encoding="utf-8")
+    return str(path)
@@ -0,0 +1,43 @@
+"""
+Zwycięstwo przez eliminację: silnik przekazywany jawnie, liczniki rejestru żetonów zamiast skanu
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from core.zwyciestwo import VictoryConditions
+from engine.player import Player
+from engine.token import Token
+from engine.token_registry import TokenRegistry
+
+
+def _players():
+    return [Player(1, "Polska", "Generał"), Player(2, "Polska", "Dowódca"),
+            Player(4, "Niemcy", "Generał"), Player(5, "Niemcy", "Dowódca")]
+
+
+def test_elimination_victory_uses_engine_counters():
+    pl = Token("PL", "2 (Polska)", {"nation": "Polska", "combat_value": 5})
+    de = Token("DE", "5 (Niemcy)", {"nation": "Niemcy", "combat_value": 5})
+    engine = SimpleNamespace(tokens=TokenRegistry([pl, de]))
+    players = _players()
+    victory = VictoryConditions(max_turns=10, victory_mode="elimination")
+
+    assert not victory.check_game_over(3, players, engine)
+    assert players[1].has_living_units(engine) and not players[0].has_living_units(engine)
+
+    engine.tokens.remove(de)
+    assert victory.check_game_over(4, players, engine)
+    assert victory.winner_nation == "Polska"
+
+
+def test_elimination_without_engine_assumes_nations_alive():
+    victory = VictoryConditions(max_turns=10, victory_mode="elimination")
+    assert not victory.check_game_over(3, _players())
+    # zwykła lista żetonów też wystarcza
+    engine = SimpleNamespace(tokens=[Token("DE", "5 (Niemcy)", {"nation": "Niemcy"})])
+    assert victory.check_game_over(3, _players(), engine)
+    assert victory.winner_nation == "Niemcy"
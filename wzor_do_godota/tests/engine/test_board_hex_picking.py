@@ -0,0 +1,52 @@
+"""
+Wybór heksa pod kursorem: pixel_to_hex + sąsiedzi zamiast skanu wszystkich wielokątów
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from engine.board import Board
+from engine.hex_utils import get_hex_vertices
+
+
+def _board(map_file, hex_size=30):
+    keys = [f"{q},{r}" for q in range(10) for r in range(-(q // 2), 7 - (q // 2))]
+    random.Random(5).shuffle(keys)  # kolejność terenu decyduje o remisach na krawędziach
+    keys.remove("4,2")  # dziura w mapie
+    terrain = {key: {"move_mod": 0} for key in keys}
+    return Board(map_file(10, 7, terrain=terrain, hex_size=hex_size))
+
+
+def _sample_points(board):
+    rng = random.Random(11)
+    points = [(rng.uniform(-40, 520), rng.uniform(-40, 420)) for _ in range(1500)]
+    for q, r in board.hex_coords:
+        cx, cy = board.hex_to_pixel(q, r)
+        verts = get_hex_vertices(cx, cy, board.hex_size)
+        points.append((cx, cy))
+        points.extend(verts)  # wierzchołki i środki krawędzi – przypadki brzegowe
+        points.extend(((x0 + x1) / 2, (y0 + y1) / 2) for (x0, y0), (x1, y1) in zip(verts, verts[1:] + verts[:1]))
+    return points
+
+
+def test_coords_to_hex_matches_polygon_scan(map_file):
+    board = _board(map_file)
+    points = _sample_points(board)
+
+    for x, y in points:
+        assert board.coords_to_hex(x, y) == board.coords_to_hex_scan(x, y), (x, y)
+    assert board.coords_to_hex_many(points) == [board.coords_to_hex_scan(x, y) for x, y in points]
+
+
+def test_pixel_to_hex_inverts_hex_to_pixel(map_file):
+    board = _board(map_file, hex_size=24)
+    for q, r in board.hex_coords:
+        assert board.pixel_to_hex(*board.hex_to_pixel(q, r)) == (q, r)
+        assert board.coords_to_hex(*board.hex_to_pixel(q, r)) == (q, r)
+    # poza mapą i w dziurze terenu
+    assert board.coords_to_hex(-500, -500) is None
+    assert board.coords_to_hex(*board.hex_to_pixel(4, 2)) is None
+    assert board.coords_to_hex_many([]) == []
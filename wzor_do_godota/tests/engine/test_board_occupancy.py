@@ -0,0 +1,116 @@
+"""
+Testy indeksu zajętości planszy (Board._occupancy)
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from engine.board import Board
+from engine.token import Token
+from engine.action_refactored_clean import CombatResolver
+
+
+def _make_board(map_file, cols=6, rows=6, debug=True):
+    return Board(map_file(cols, rows, tile={"move_mod": 0, "defense_mod": 0}), debug_occupancy=debug)
+
+
+def _make_token(token_id, q, r, owner="1 (Polska)"):
+    return Token(token_id, owner, {"move": 5, "maintenance": 5, "combat_value": 4}, q=q, r=r)
+
+
+def test_set_tokens_builds_index(map_file):
+    board = _make_board(map_file)
+    a = _make_token("A", 1, 1)
+    b = _make_token("B", 2, 3)
+    board.set_tokens([a, b])
+
+    assert board.is_occupied(1, 1)
+    assert board.is_occupied(2, 3)
+    assert not board.is_occupied(0, 0)
+    assert board.token_at(1, 1) is a
+    assert board.token_at(1, 1, exclude=a) is None
+    assert board.check_occupancy_consistency() == []
+
+
+def test_set_position_moves_token_in_index(map_file):
+    board = _make_board(map_file)
+    a = _make_token("A", 1, 1)
+    board.set_tokens([a])
+
+    a.set_position(3, 2)
+
+    assert not board.is_occupied(1, 1)
+    assert board.is_occupied(3, 2)
+    assert board.check_occupancy_consistency() == []
+
+
+def test_visible_tokens_filter(map_file):
+    board = _make_board(map_file)
+    board.set_tokens([_make_token("A", 1, 1)])
+
+    assert board.is_occupied(1, 1, visible_tokens={"A"})
+    assert not board.is_occupied(1, 1, visible_tokens={"X"})
+
+
+def test_register_and_unregister_token(map_file):
+    board = _make_board(map_file)
+    tokens = [_make_token("A", 1, 1)]
+    board.set_tokens(tokens)
+
+    spawned = _make_token("S", 4, 4)
+    tokens.append(spawned)
+    board.register_token(spawned)
+    assert board.is_occupied(4, 4)
+
+    tokens.remove(spawned)
+    board.unregister_token(spawned)
+    assert not board.is_occupied(4, 4)
+    spawned.set_position(0, 0)
+    assert not board.is_occupied(0, 0)
+    assert board.check_occupancy_consistency() == []
+
+
+def test_combat_removal_updates_index(map_file):
+    board = _make_board(map_file)
+
+    class Engine:
+        pass
+
+    engine = Engine()
+    engine.board = board
+    engine.tokens = [_make_token("A", 1, 1), _make_token("B", 2, 2, owner="5 (Niemcy)")]
+    board.set_tokens(engine.tokens)
+
+    CombatResolver._remove_token(engine, engine.tokens[1])
+
+    assert not board.is_occupied(2, 2)
+    assert board.check_occupancy_consistency() == []
+
+
+def test_debug_mode_detects_manual_position_change(map_file):
+    board = _make_board(map_file, debug=True)
+    a = _make_token("A", 1, 1)
+    board.set_tokens([a])
+
+    a.q, a.r = 2, 2  # z pominięciem set_position
+
+    assert board.check_occupancy_consistency()
+    with pytest.raises(RuntimeError):
+        board.is_occupied(2, 2)
+
+
+def test_find_path_avoids_indexed_tokens(map_file):
+    board = _make_board(map_file)
+    blocker = _make_token("X", 1, 0)
+    board.set_tokens([blocker])
+
+    path = board.find_path((0, 0), (2, 0))
+    assert path is not None
+    assert (1, 0) not in path
+
+    blocker.set_position(5, 5)
+    assert board.find_path((0, 0), (2, 0)) == [(0, 0), (1, 0), (2, 0)]
@@ -0,0 +1,126 @@
+"""
+Testy tablicowego magazynu terenu planszy (indeksy heksów, tabela sąsiadów, widok Tile)
+"""
+
+import heapq
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from engine.board import Board
+from engine.token import Token
+
+
+def _make_board(map_file, terrain):
+    return Board(map_file(10, 10, terrain=terrain))
+
+
+def _random_terrain(rng, cols=14, rows=12):
+    terrain = {}
+    for q in range(cols):
+        # Przesunięte r jak na prawdziwej mapie (ujemne współrzędne)
+        for r in range(-(q // 2), rows - (q // 2)):
+            if rng.random() < 0.05:
+                continue  # dziura w mapie
+            terrain[f"{q},{r}"] = {
+                "move_mod": rng.choice([0, 0, 0, 1, 2, -1]),
+                "defense_mod": rng.randint(0, 3),
+                "type": rng.choice([None, "miasto"]),
+            }
+    return terrain
+
+
+def _reference_find_path(terrain, occupied, start, goal, max_mp, max_fuel, fallback):
+    """Dawny A* na słowniku "q,r" -> dane (punkt odniesienia)."""
+    def dist(a, b):
+        return (abs(a[0] - b[0]) + abs(a[0] + a[1] - b[0] - b[1]) + abs(a[1] - b[1])) // 2
+
+    open_set = [(0, start)]
+    came_from = {}
+    cost_so_far = {start: (0, 0)}
+    best_node, best_h = start, dist(start, goal)
+    while open_set:
+        _, current = heapq.heappop(open_set)
+        if current == goal:
+            path = [current]
+            while current in came_from:
+                current = came_from[current]
+                path.append(current)
+            return path[::-1]
+        if dist(current, goal) < best_h:
+            best_h, best_node = dist(current, goal), current
+        for dq, dr in [(+1, 0), (+1, -1), (0, -1), (-1, 0), (-1, +1), (0, +1)]:
+            neighbor = (current[0] + dq, current[1] + dr)
+            data = terrain.get(f"{neighbor[0]},{neighbor[1]}")
+            if data is None or neighbor in occupied or data["move_mod"] == -1:
+                continue
+            move_cost = 1 + data["move_mod"]
+            new_mp = cost_so_far[current][0] + move_cost
+            new_fuel = cost_so_far[current][1] + move_cost
+            if new_mp > max_mp or new_fuel > max_fuel:
+                continue
+            if neighbor not in cost_so_far or (new_mp, new_fuel) < cost_so_far[neighbor]:
+                cost_so_far[neighbor] = (new_mp, new_fuel)
+                heapq.heappush(open_set, (new_mp + dist(neighbor, goal), neighbor))
+                came_from[neighbor] = current
+    if fallback and best_node != start:
+        path = [best_node]
+        current = best_node
+        while current in came_from:
+            current = came_from[current]
+            path.append(current)
+        return path[::-1]
+    return None
+
+
+def test_hex_index_and_tile_view(map_file):
+    board = _make_board(map_file, {
+        "0,0": {"move_mod": 0, "defense_mod": 1},
+        "1,-1": {"move_mod": 2, "defense_mod": 0, "type": "miasto", "value": 5},
+    })
+
+    index = board.hex_index(1, -1)
+    assert index >= 0
+    assert board.hex_coords[index] == (1, -1)
+    assert board.hex_index(5, 5) == -1
+    assert board.hex_index(1, 0) == -1  # w prostokącie, ale poza mapą
+    assert board.get_tile(1, 0) is None
+
+    tile = board.get_tile(1, -1)
+    assert tile is board.terrain["1,-1"]
+    assert (tile.q, tile.r, tile.move_mod, tile.type, tile.value) == (1, -1, 2, "miasto", 5)
+
+    tile.move_mod = -1
+    assert board.move_mods[index] == -1
+    assert board.neighbor_table[board.hex_index(0, 0)] == (index,)
+
+
+def test_find_path_matches_reference_astar(map_file):
+    rng = random.Random(1939)
+    terrain = _random_terrain(rng)
+    board = _make_board(map_file, terrain)
+    passable = [board.hex_coords[i] for i, mod in enumerate(board.move_mods) if mod != -1]
+
+    tokens = [Token(f"T{i}", "1 (Polska)", {"move": 5, "maintenance": 5}, q=q, r=r)
+              for i, (q, r) in enumerate(rng.sample(passable, 12))]
+    board.set_tokens(tokens)
+    occupied = {(t.q, t.r) for t in tokens}
+
+    for _ in range(150):
+        start = rng.choice(passable)
+        goal = rng.choice(passable + [(40, 40)])
+        max_mp = rng.randint(3, 15)
+        fallback = rng.random() < 0.5
+        expected = _reference_find_path(terrain, occupied, start, goal, max_mp, max_mp, fallback)
+        assert board.find_path(start, goal, max_mp=max_mp, max_fuel=max_mp, fallback_to_closest=fallback) == expected
+
+
+def test_overlay_items_use_tile_views(map_file):
+    board = _make_board(map_file, {
+        "0,0": {"move_mod": 1, "defense_mod": 2},
+        "1,0": {"move_mod": 0, "defense_mod": 0, "type": "miasto", "value": 3},
+    })
+    texts = sorted(txt for _, _, txt in board.get_overlay_items())
+    assert texts == ["keymiasto3", "m1d2"]
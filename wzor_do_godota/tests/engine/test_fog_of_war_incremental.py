@@ -0,0 +1,92 @@
+"""
+Test różnicowy: przyrostowa mgła wojny (engine.fog_of_war) vs pełne przeliczenie widoczności
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from engine.board import Board
+from engine.engine import update_all_players_visibility, recompute_all_players_visibility
+from engine.fog_of_war import get_fog_of_war
+from engine.player import Player
+from engine.token import Token
+
+PLAYER_SETUP = [
+    (1, "Polska", "Generał"),
+    (2, "Polska", "Dowódca"),
+    (3, "Polska", "Dowódca"),
+    (4, "Niemcy", "Generał"),
+    (5, "Niemcy", "Dowódca"),
+    (6, "Niemcy", "Dowódca"),
+]
+COMMANDERS = ["2 (Polska)", "3 (Polska)", "5 (Niemcy)", "6 (Niemcy)"]
+
+
+def _make_board(map_file, cols=16, rows=12):
+    return Board(map_file(cols, rows, offset=True))
+
+
+def _players():
+    players = [Player(pid, nation, role) for pid, nation, role in PLAYER_SETUP]
+    for p in players:
+        p.temp_visible_hexes = set()
+        p.temp_visible_tokens = set()
+        p.temp_visible_token_data = {}
+    return players
+
+
+def _snapshot(players):
+    return [
+        (p.id, sorted(p.visible_hexes), sorted(p.visible_tokens), sorted(getattr(p, "visible_token_data", {}).items()))
+        for p in players
+    ]
+
+
+def test_incremental_fog_matches_full_recompute(map_file):
+    rng = random.Random(1939)
+    board = _make_board(map_file)
+    hexes = list(board.hex_coords)
+    tokens = []
+    counter = 0
+
+    def spawn():
+        nonlocal counter
+        counter += 1
+        q, r = rng.choice(hexes)
+        tokens.append(Token(f"T{counter}", rng.choice(COMMANDERS), {"move": 4, "maintenance": 4, "sight": rng.randint(0, 3)}, q=q, r=r))
+
+    for _ in range(20):
+        spawn()
+
+    incremental_players = _players()
+    reference_players = _players()
+
+    for step in range(60):
+        action = rng.random()
+        if action < 0.6 and tokens:
+            token = rng.choice(tokens)
+            token.set_position(*rng.choice(hexes))
+        elif action < 0.75:
+            spawn()
+        elif action < 0.85 and tokens:
+            tokens.remove(rng.choice(tokens))
+        elif action < 0.9 and tokens:
+            rng.choice(tokens).owner = rng.choice(COMMANDERS)
+        else:
+            extra_hex = rng.choice(hexes)
+            extra_token = f"TEMP{step}"
+            index = rng.randrange(len(PLAYER_SETUP))
+            for players in (incremental_players, reference_players):
+                players[index].temp_visible_hexes.add(extra_hex)
+                players[index].temp_visible_tokens.add(extra_token)
+                players[index].temp_visible_token_data[extra_token] = {"detection_level": 0.5}
+
+        update_all_players_visibility(incremental_players, tokens, board)
+        recompute_all_players_visibility(reference_players, tokens, board)
+        assert _snapshot(incremental_players) == _snapshot(reference_players), f"rozbieżność w kroku {step}"
+
+    fog = get_fog_of_war(board)
+    assert fog.unchanged_tokens > fog.vision_recomputations
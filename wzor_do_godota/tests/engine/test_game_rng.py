@@ -0,0 +1,87 @@
+"""
+Nazwane strumienie losowości partii (engine.rng) i ich użycie w walce oraz pogodzie
+"""
+
+import json
+import os
+import random
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from core.pogoda import Pogoda
+from engine.action_refactored_clean import CombatCalculator
+from engine.rng import AI, COMBAT, WEATHER, GameRNG, get_rng
+
+
+def _draws(rng, count=5):
+    return [rng.random() for _ in range(count)]
+
+
+def test_streams_are_deterministic_and_independent():
+    first = GameRNG(1939)
+    second = GameRNG(1939)
+    _draws(second.stream(AI), 50)  # dodatkowe losowania AI nie przesuwają walki
+
+    assert _draws(first.stream(COMBAT)) == _draws(second.stream(COMBAT))
+    assert _draws(GameRNG(1939).stream(COMBAT)) != _draws(GameRNG(1939).stream(WEATHER))
+    assert _draws(GameRNG(1).stream(COMBAT)) != _draws(GameRNG(2).stream(COMBAT))
+
+
+def test_state_round_trips_through_json():
+    rng = GameRNG(7)
+    _draws(rng.stream(COMBAT), 3)
+    saved = json.loads(json.dumps(rng.getstate()))
+    expected = _draws(rng.stream(COMBAT))
+
+    restored = GameRNG(0)
+    restored.setstate(saved)
+    assert _draws(restored.stream(COMBAT)) == expected
+
+
+def test_combat_uses_engine_stream_not_global_random():
+    class Board:
+        def get_tile(self, q, r):
+            return SimpleNamespace(defense_mod=1)
+
+        def hex_distance(self, a, b):
+            return 1
+
+    def token(q):
+        return SimpleNamespace(q=q, r=0, stats={"attack": {"value": 6, "range": 1}, "defense_value": 4})
+
+    results = []
+    for global_seed in (1, 2):
+        random.seed(global_seed)
+        engine = SimpleNamespace(board=Board(), rng=GameRNG(42))
+        results.append(CombatCalculator.calculate_combat_result(token(0), token(1), engine))
+    assert results[0] == results[1]
+
+    # Atrapy silnika bez rng nadal losują z globalnego modułu random
+    assert get_rng(SimpleNamespace(), COMBAT) is random
+
+
+def test_weather_is_reproducible_from_stream():
+    reports = []
+    for _ in range(2):
+        pogoda = Pogoda(rng=GameRNG(3).stream(WEATHER))
+        days = []
+        for _ in range(5):
+            pogoda.generuj_pogode()
+            days.append(pogoda.generuj_raport_pogodowy())
+        reports.append(days)
+    assert reports[0] == reports[1]
+
+
+def test_engine_does_not_reseed_balance_module(tmp_path, monkeypatch, map_file, empty_tokens_file):
+    from balance import model
+    from engine.engine import GameEngine
+
+    monkeypatch.chdir(tmp_path)
+    module_state = model._BALANCE_RANDOM.getstate()
+    GameEngine(map_file(4, 4), empty_tokens_file, empty_tokens_file, seed=1, load_saved_state=False)
+    GameEngine(map_file(4, 4), empty_tokens_file, empty_tokens_file, seed=2, load_saved_state=False)
+
+    # dwa silniki w jednym procesie nie przestawiają globalnego stanu modułu balance
+    assert model._BALANCE_RANDOM.getstate() == module_state
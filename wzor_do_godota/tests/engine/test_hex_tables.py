@@ -0,0 +1,63 @@
+"""
+Testy tablic przesunięć dysków/pierścieni heksowych (engine.hex_utils)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from engine.board import Board
+from engine.engine import get_token_vision_hexes
+from engine.hex_utils import disk_offsets, ring_offsets, hexes_in_range
+from engine.token import Token
+
+
+def _distance(dq, dr):
+    return (abs(dq) + abs(dr) + abs(dq + dr)) // 2
+
+
+def _square_scan(board, center, radius):
+    q, r = center
+    return {
+        (q + dq, r + dr)
+        for dq in range(-radius, radius + 1)
+        for dr in range(-radius, radius + 1)
+        if board.hex_distance(center, (q + dq, r + dr)) <= radius and board.get_tile(q + dq, r + dr) is not None
+    }
+
+
+def test_disk_and_ring_offsets_match_distance():
+    for radius in range(0, 7):
+        expected = {(dq, dr) for dq in range(-radius, radius + 1) for dr in range(-radius, radius + 1)
+                    if _distance(dq, dr) <= radius}
+        assert set(disk_offsets(radius)) == expected
+        assert len(disk_offsets(radius)) == 3 * radius * (radius + 1) + 1
+        ring = ring_offsets(radius)
+        assert len(set(ring)) == len(ring) == max(1, 6 * radius)
+        assert all(_distance(dq, dr) == radius for dq, dr in ring)
+    assert disk_offsets(3) is disk_offsets(3)
+    assert disk_offsets(-1) == ()
+
+
+def test_hexes_in_range_clips_to_board(map_file):
+    board = Board(map_file(8, 6, offset=True))
+
+    for center in [(0, 0), (3, 1), (7, -3), (6, 2)]:
+        for radius in range(0, 5):
+            assert set(hexes_in_range(board, center, radius)) == _square_scan(board, center, radius)
+
+    token = Token("A", "1 (Polska)", {"move": 3, "maintenance": 3, "sight": 2}, q=0, r=0)
+    assert get_token_vision_hexes(token, board) == _square_scan(board, (0, 0), 2)
+
+
+def test_hexes_in_range_falls_back_for_boards_without_index():
+    class MockBoard:
+        def hex_distance(self, a, b):
+            return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+        def get_tile(self, q, r):
+            return object() if q >= 0 else None
+
+    hexes = set(hexes_in_range(MockBoard(), (0, 0), 1))
+    assert hexes == {(0, 0), (1, 0), (0, 1), (0, -1)}
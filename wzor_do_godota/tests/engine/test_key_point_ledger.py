@@ -0,0 +1,60 @@
+"""
+Rejestr key pointów: mapa pozostaje niezmienna, stan trafia na dysk tylko z zapisem gry
+"""
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from core.ekonomia import EconomySystem
+from engine.engine import GameEngine
+from engine.player import Player
+from engine.token import Token
+
+
+KEY_POINTS = {
+    "1,1": {"type": "miasto", "value": 100},
+    "3,1": {"type": "fortyfikacja", "value": 1},
+}
+
+
+def _engine(tmp_path, monkeypatch, map_file, empty):
+    monkeypatch.chdir(tmp_path)
+    map_path = Path(map_file(6, 6, offset=True, key_points=KEY_POINTS))
+    engine = GameEngine(str(map_path), empty, empty, load_saved_state=False)
+    engine.tokens = [
+        Token("Z1", "2 (Polska)", {"unitType": "Z", "move": 3, "maintenance": 3}, q=1, r=1),
+        Token("Z2", "2 (Polska)", {"unitType": "Z", "move": 3, "maintenance": 3}, q=3, r=1),
+    ]
+    engine.board.set_tokens(engine.tokens)
+    general = Player(1, "Polska", "Generał")
+    general.economy = EconomySystem()
+    commander = Player(2, "Polska", "Dowódca")
+    return engine, map_path, [general, commander]
+
+
+def test_process_key_points_does_not_touch_map(tmp_path, monkeypatch, map_file, empty_tokens_file):
+    engine, map_path, players = _engine(tmp_path, monkeypatch, map_file, empty_tokens_file)
+    before = map_path.read_bytes()
+
+    engine.process_key_points(players)
+
+    assert map_path.read_bytes() == before
+    assert engine.key_points_state["1,1"]["current_value"] == 90
+    # jedyny punkt wydany – punkt wyczerpany i zdjęty z planszy
+    assert "3,1" not in engine.key_points_state
+    assert "3,1" not in engine.board.key_points
+    assert players[0].economy.economic_points == 11
+
+
+def test_ledger_round_trips_through_save_state(tmp_path, monkeypatch, map_file, empty_tokens_file):
+    engine, map_path, players = _engine(tmp_path, monkeypatch, map_file, empty_tokens_file)
+    engine.process_key_points(players)
+    save_path = str(tmp_path / "saves" / "latest.json")
+
+    engine.save_state(save_path)
+    restored = GameEngine(str(map_path), empty_tokens_file, empty_tokens_file)
+    assert restored.key_points_state == engine.key_points_state
+    assert set(restored.board.key_points) == {"1,1"}
@@ -0,0 +1,132 @@
+"""
+Testy pamięci podręcznej osiągalności (Board.reachability)
+"""
+
+import os
+import random
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from engine.board import Board
+from engine.token import Token
+from engine.action_refactored_clean import PathfindingService
+from ai.tokens.token_ai import TokenAI
+
+
+def _make_board(map_file, cols=10, rows=10, seed=7):
+    rng = random.Random(seed)
+
+    def tile(q, r):
+        move_mod = rng.choice([0, 0, 1, 2, -1])
+        return {"move_mod": 0 if (q, r) in ((0, 0), (1, 0)) else move_mod, "defense_mod": 0}
+
+    return Board(map_file(cols, rows, tile=tile))
+
+
+def _make_token(token_id, q, r, mp=8, owner="1 (Polska)"):
+    token = Token(token_id, owner, {"move": mp, "maintenance": mp, "combat_value": 4}, q=q, r=r)
+    token.currentMovePoints = mp
+    token.currentFuel = mp
+    return token
+
+
+def _path_cost(board, path):
+    return sum(1 + board.get_tile(*step).move_mod for step in path[1:])
+
+
+def test_costs_match_astar(map_file):
+    board = _make_board(map_file)
+    board.set_tokens([_make_token("X", 3, 3)])
+    reach = board.reachability((0, 0), 9, 9)
+
+    for q, r in board.hex_coords:
+        astar = board.find_path((0, 0), (q, r), max_mp=9, max_fuel=9)
+        if astar is None:
+            assert not reach.is_reachable((q, r))
+            continue
+        path = reach.path_to((q, r))
+        assert path[0] == (0, 0) and path[-1] == (q, r)
+        assert reach.cost((q, r)) == _path_cost(board, astar) == _path_cost(board, path)
+
+
+def test_cache_hits_and_invalidation_on_move(map_file):
+    board = _make_board(map_file)
+    token = _make_token("A", 0, 0)
+    board.set_tokens([token])
+
+    first = board.reachability((0, 0), 6, 8)
+    assert board.reachability((0, 0), 6, 8) is first
+    assert board.reachability_cache_stats()["hits"] == 1
+    assert board.reachability_cache_stats()["misses"] == 1
+
+    other = _make_token("B", 5, 5)
+    board.register_token(other)
+    other.set_position(4, 4)
+
+    assert board.reachability((0, 0), 6, 8) is not first
+    assert board.reachability_cache_stats()["misses"] == 2
+
+
+def test_visible_tokens_filter_is_part_of_key(map_file):
+    board = _make_board(map_file)
+    board.set_tokens([_make_token("A", 0, 0), _make_token("E", 1, 0, owner="5 (Niemcy)")])
+
+    blind = board.reachability((0, 0), 3, 3, visible_tokens=set())
+    seeing = board.reachability((0, 0), 3, 3, visible_tokens={"E"})
+    assert (1, 0) in blind.costs
+    assert (1, 0) not in seeing.costs
+
+
+def test_find_movement_path_uses_cache_and_falls_back_to_closest(map_file):
+    board = _make_board(map_file)
+    token = _make_token("A", 0, 0, mp=3)
+    board.set_tokens([token])
+
+    class Engine:
+        pass
+
+    engine = Engine()
+    engine.board = board
+    engine.tokens = [token]
+
+    far_goal = (9, 9)
+    path = PathfindingService.find_movement_path(engine, token, (0, 0), far_goal)
+    assert path is not None and path[0] == (0, 0)
+    assert _path_cost(board, path) <= 3
+    PathfindingService.find_movement_path(engine, token, (0, 0), far_goal)
+    assert board.reachability_cache_stats()["hits"] == 1
+
+
+def test_token_ai_planning_keeps_non_negative_terrain_discount(map_file):
+    # move_mod < -1 (np. droga) nie obniża kosztu kroku poniżej 1 MP,
+    # a pola nieprzejezdne i zajęte blokują tak samo jak w dawnym przeszukaniu wszerz
+    rng = random.Random(3)
+    road = lambda q, r: {"move_mod": -2 if r == 0 else rng.choice([0, 0, 1, 2, -1])}
+    board = Board(map_file(8, 8, tile=road))
+    token = _make_token("A", 0, 0)
+    tokens = [token, _make_token("B", 2, 1), _make_token("E", 1, 3, owner="5 (Niemcy)")]
+    board.set_tokens(tokens)
+    engine = SimpleNamespace(board=board, tokens=tokens)
+    ai = TokenAI(token)
+    context = {"board": board, "position": (0, 0), "current_mp": 3, "current_fuel": 7}
+
+    def planning_cost(parents, pos):
+        cost = 0
+        while parents[pos] is not None:
+            cost += 1 + max(0, board.get_tile(*pos).move_mod)
+            pos = parents[pos]
+        return cost
+
+    planned, parents = ai._plan_candidates(engine, context)
+    reference, reference_parents = ai._search_reachable(engine, board, (0, 0), 3, 7)
+
+    assert set(planned) == set(reference)
+    assert {pos: planning_cost(parents, pos) for pos in planned} == \
+        {pos: planning_cost(reference_parents, pos) for pos in reference}
+    assert (3, 0) in planned and (4, 0) not in planned
+    # ruch silnika liczy krok tak samo – ta sama mapa z pamięci podręcznej
+    assert board.reachability((0, 0), 3, 7).cost((3, 0)) == 3 and not board.reachability((0, 0), 3, 7).is_reachable((4, 0))
+    assert board.reachability_cache_stats()["entries"] == 1
+    assert board.find_path((0, 0), (4, 0), max_mp=3, max_fuel=3) is None
@@ -0,0 +1,120 @@
+"""
+Dziennik akcji i odtwarzacz: stan każdego rekordu/tury odtworzony z delt i klatek kluczowych
+"""
+
+import os
+import sys
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from engine.engine import GameEngine
+from engine.replay import ReplayReader
+from engine.rng import COMBAT, get_rng
+from engine.token import Token
+
+
+class Shift:
+    """Atrapa akcji ruchu: przesuwa żeton i zużywa punkty ruchu."""
+
+    def __init__(self, token_id, dq):
+        self.token_id = token_id
+        self.dq = dq
+
+    def execute(self, engine):
+        token = engine.get_token(self.token_id)
+        token.set_position(token.q + self.dq, token.r)
+        token.currentMovePoints -= 1
+        return True, "OK"
+
+
+class Strike:
+    """Atrapa walki: losuje obrażenia, eliminuje obrońcę bez siły."""
+
+    def __init__(self, attacker_id, defender_id):
+        self.attacker_id = attacker_id
+        self.defender_id = defender_id
+
+    def execute(self, engine):
+        defender = engine.get_token(self.defender_id)
+        defender.combat_value -= get_rng(engine, COMBAT).randint(2, 3)
+        if defender.combat_value <= 0:
+            engine.tokens.remove(defender)
+            engine.board.set_tokens(engine.tokens)
+        return True, "trafienie"
+
+
+def _engine(tmp_path, monkeypatch, map_file, empty):
+    monkeypatch.chdir(tmp_path)
+    engine = GameEngine(map_file(8, 4), empty, empty, load_saved_state=False)
+    engine.tokens = [Token("PL1", "2 (Polska)", {"move": 4, "combat_value": 6, "nation": "Polska"}, q=0, r=0),
+                     Token("PL2", "2 (Polska)", {"move": 4, "combat_value": 6, "nation": "Polska"}, q=0, r=1),
+                     Token("DE1", "5 (Niemcy)", {"move": 4, "combat_value": 4, "nation": "Niemcy"}, q=5, r=0)]
+    engine.board.set_tokens(engine.tokens)
+    return engine
+
+
+def test_replayer_rebuilds_every_record_without_rerunning(tmp_path, monkeypatch, map_file, empty_tokens_file):
+    engine = _engine(tmp_path, monkeypatch, map_file, empty_tokens_file)
+    journal = engine.start_journal(str(tmp_path / "game.jsonl.gz"), keyframe_interval=4, compress=True)
+    live = {journal.seq - 1: [t.serialize() for t in engine.tokens]}
+
+    def step(action=None):
+        if action is None:
+            engine.next_turn()
+        else:
+            engine.execute_action(action)
+        live[journal.seq - 1] = [t.serialize() for t in engine.tokens]
+
+    step(Shift("PL1", 1))
+    step(Shift("PL2", 2))
+    step(Strike("PL1", "DE1"))
+    engine.tokens.append(Token("DE2", "5 (Niemcy)", {"move": 3, "combat_value": 5, "nation": "Niemcy"}, q=6, r=2))
+    step()  # koniec tury: reset punktów ruchu + posiłki wykryte pełnym porównaniem
+    step(Strike("PL2", "DE1"))  # eliminacja
+    step(Shift("DE2", -1))
+    step()
+    engine.stop_journal()
+
+    reader = ReplayReader(str(tmp_path / "game.jsonl.gz"))
+    assert len(reader) == journal.seq and len(reader._keyframes) >= 2
+    for seq, rows in live.items():
+        assert [t.serialize() for t in reader.state_at(seq=seq).tokens()] == rows, seq
+
+    strikes = [r for r in reader.actions() if r["type"] == "Strike"]
+    assert strikes[0]["params"] == {"attacker_id": "PL1", "defender_id": "DE1"}
+    assert set(strikes[0]["rng"]) == {COMBAT}
+    assert strikes[1]["delta"]["del"] == ["DE1"]
+    assert [r["params"]["token_id"] for r in reader.actions(turn=1) if r["type"] == "Shift"] == ["PL1", "PL2"]
+
+    # stan na koniec tury 1 wczytany do innego silnika
+    other = _engine(tmp_path, monkeypatch, map_file, empty_tokens_file)
+    state = reader.restore(other, turn=1)
+    assert [t.id for t in other.tokens] == ["PL1", "PL2", "DE1"]
+    assert other.get_token("DE1").combat_value == state.rows["DE1"]["combat_value"] < 4
+    assert other.board.tokens_at(1, 0)[0].id == "PL1"
+
+
+def test_compressed_journal_seeks_to_the_keyframe_segment(tmp_path, monkeypatch, map_file, empty_tokens_file):
+    engine = _engine(tmp_path, monkeypatch, map_file, empty_tokens_file)
+    path = str(tmp_path / "game.jsonl.gz")
+    engine.start_journal(path, keyframe_interval=2, compress=True)
+    for dq in (1, 1, 1, -1, -1):
+        engine.execute_action(Shift("PL1", dq))
+    engine.stop_journal()
+
+    reader = ReplayReader(path)
+    members = [reader._members[seq] for seq in reader._keyframes]
+    assert len(reader._keyframes) >= 3 and members == sorted(set(members)) and members[0] == 0
+    assert all(reader._offsets[seq] == 0 for seq in reader._keyframes)
+    # każdy odcinek dekompresuje się samodzielnie od swojej pozycji w pliku
+    with open(path, "rb") as f:
+        f.seek(members[-1])
+        segment = zlib.decompressobj(wbits=31).decompress(f.read())
+    assert segment.startswith(b'{"k":"keyframe","seq":%d' % reader._keyframes[-1])
+
+    # odczyt od ostatniej klatki nie dotyka wcześniejszych odcinków – działa mimo ich uszkodzenia
+    expected = [t.serialize() for t in reader.state_at().tokens()]
+    with open(path, "r+b") as f:
+        f.write(b"\0" * members[-1])
+    assert [t.serialize() for t in reader.state_at().tokens()] == expected == [t.serialize() for t in engine.tokens]
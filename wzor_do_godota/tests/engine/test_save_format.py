@@ -0,0 +1,173 @@
+"""
+Format zapisu wersji 2: kolumnowa tabela żetonów, magazyn plików nowych żetonów, delty względem bazy
+"""
+
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from engine import save_format
+from engine.save_manager import load_game, save_game
+from engine.token import Token
+
+
+def _engine(count=6):
+    tokens = [Token(f"P{i}", "2 (Polska)", {"unitType": "P", "move": 3, "combat_value": 5, "nation": "Polska"}, q=i, r=0)
+              for i in range(count)]
+    return SimpleNamespace(tokens=tokens, players=[], turn=1, current_player=2, key_points_state={})
+
+
+def _rows(engine):
+    return [t.serialize() for t in engine.tokens]
+
+
+def test_token_table_round_trip_dedupes_stats():
+    rows = _rows(_engine())
+    rows[2]["stats"] = dict(rows[2]["stats"], move=9)
+    rows[4]["extra"] = True  # kolumna obecna tylko w jednym wierszu
+
+    table = save_format.encode_token_table(rows)
+
+    assert len(table["stats"]) == 2
+    assert table["values"]["id"] == [f"P{i}" for i in range(6)]
+    assert save_format.decode_token_table(json.loads(json.dumps(table))) == rows
+
+
+def test_json_save_still_loads_and_new_tokens_use_blob_store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    engine = _engine(2)
+    engine.tokens.append(Token("nowy_X", "2 (Polska)", {"move": 4, "nation": "Polska"}, q=3, r=3))
+    aktualne = tmp_path / "assets" / "tokens" / "aktualne"
+    aktualne.mkdir(parents=True)
+    (aktualne / "nowy_X.json").write_text('{"id": "nowy_X"}', encoding="utf-8")
+    (aktualne / "nowy_X.png").write_bytes(b"\x89PNG-bytes")
+
+    legacy = str(tmp_path / "saves" / "legacy.json")
+    save_game(legacy, engine, legacy_json=True, cleanup=False)
+    with open(legacy, encoding="utf-8") as f:
+        assert "image_data" in json.load(f)["tokens"][2]
+
+    compact = str(tmp_path / "saves" / "compact.json")
+    save_game(compact, engine, compress=True)  # usuwa pliki nowego żetonu z folderu aktualne
+    assert open(compact, "rb").read(2) == save_format.GZIP_MAGIC
+    assert not (aktualne / "nowy_X.png").exists()
+    assert len(os.listdir(tmp_path / "saves" / "blobs")) == 2
+
+    for path in (legacy, compact):
+        target = SimpleNamespace(tokens=[])
+        load_game(path, target)
+        assert [t.id for t in target.tokens] == ["P0", "P1", "nowy_X"]
+        assert (target.tokens[2].q, target.tokens[2].stats["move"]) == (3, 4)
+        assert (aktualne / "nowy_X.png").read_bytes() == b"\x89PNG-bytes"
+        (aktualne / "nowy_X.png").unlink()
+
+    # kolejny zapis po sprzątaniu folderu aktualne nadal wskazuje pliki w magazynie
+    save_game(compact, engine)
+    restored = SimpleNamespace(tokens=[])
+    load_game(compact, restored)
+    assert (aktualne / "nowy_X.json").read_text(encoding="utf-8") == '{"id": "nowy_X"}'
+
+
+def test_save_against_base_writes_only_changed_tokens(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    engine = _engine()
+    base = str(tmp_path / "saves" / "base.json")
+    delta = str(tmp_path / "saves" / "turn.json")
+
+    save_game(base, engine, cleanup=False)
+    engine.turn = 2
+    engine.tokens[1].q = 7
+    engine.tokens[3].combat_value = 1
+    del engine.tokens[0]
+    engine.tokens.append(Token("N1", "5 (Niemcy)", {"move": 2, "nation": "Niemcy"}, q=1, r=1))
+    save_game(delta, engine, base=base, cleanup=False)
+
+    document = save_format.read_document(delta)
+    assert document["kind"] == "delta" and document["base"] == os.path.basename(base)
+    assert document["tokens"]["changed"]["values"]["id"] == ["P1", "P3", "N1"]
+    assert document["tokens"]["removed"] == ["P0"]
+    assert "order" not in document["tokens"]
+
+    restored = SimpleNamespace(tokens=[])
+    load_game(delta, restored)
+    assert [t.serialize() for t in restored.tokens] == _rows(engine)
+
+
+def test_per_turn_save_writes_deltas_against_rotating_base(tmp_path, monkeypatch, map_file, empty_tokens_file):
+    from engine.engine import GameEngine
+
+    monkeypatch.chdir(tmp_path)
+    engine = GameEngine(map_file(8, 8), empty_tokens_file, empty_tokens_file, load_saved_state=False)
+    engine.tokens = _engine(4).tokens
+    engine.board.set_tokens(engine.tokens)
+    saves = tmp_path / "saves"
+
+    engine.end_turn()  # tura 2 – pierwsza baza
+    engine.tokens[1].set_position(5, 5)
+    engine.end_turn()  # tura 3 – delta z jednym żetonem
+
+    latest = save_format.read_document(str(saves / "latest.json"))
+    assert latest["kind"] == "delta" and latest["base"] == "latest_base_0002.json"
+    assert latest["tokens"]["changed"]["values"]["id"] == ["P1"] and latest["turn"] == 3
+    restored = GameEngine(map_file(8, 8), empty_tokens_file, empty_tokens_file)
+    assert [t.serialize() for t in restored.tokens] == _rows(engine) and restored.turn == 3
+
+    for _ in range(3):
+        engine.end_turn()
+    engine.save_state(str(saves / "latest.json"), keyframe_interval=3)  # tura 6 – nowa baza, stara usunięta
+    assert sorted(p.name for p in saves.glob("latest_base_*")) == ["latest_base_0006.json"]
+    assert save_format.read_document(str(saves / "latest.json"))["base"] == "latest_base_0006.json"
+    assert [t.id for t in GameEngine(map_file(8, 8), empty_tokens_file, empty_tokens_file).tokens] == ["P0", "P1", "P2", "P3"]
+
+
+def test_engine_starts_fresh_when_latest_save_lost_its_base(tmp_path, monkeypatch, map_file, empty_tokens_file, capsys):
+    from engine.engine import GameEngine
+
+    monkeypatch.chdir(tmp_path)
+    engine = GameEngine(map_file(8, 8), empty_tokens_file, empty_tokens_file, load_saved_state=False)
+    engine.tokens = _engine(4).tokens
+    engine.board.set_tokens(engine.tokens)
+    engine.end_turn()
+    engine.end_turn()
+    for base in (tmp_path / "saves").glob("latest_base_*"):
+        save_format.remove_document(str(base))
+
+    restored = GameEngine(map_file(8, 8), empty_tokens_file, empty_tokens_file)
+
+    assert list(restored.tokens) == [] and restored.turn == 1
+    assert "[WARN] Pominięto zapis" in capsys.readouterr().out
+
+
+def test_base_cache_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(save_format, "_BASE_CACHE", save_format.OrderedDict())
+    monkeypatch.setattr(save_format, "BASE_CACHE_SIZE", 2)
+    rows = _rows(_engine(1))
+    paths = []
+    for index in range(3):
+        path = str(tmp_path / f"base_{index}.json")
+        data = save_format.write_document(path, {"tokens": save_format.encode_token_table(rows)})
+        save_format.remember_base(path, data, rows)
+        paths.append(path)
+
+    save_format.load_base(paths[1])  # ostatnio użyta zostaje
+    save_format.load_base(paths[0])  # odczyt z dysku wypiera najstarszą
+    assert list(save_format._BASE_CACHE) == [os.path.abspath(paths[1]), os.path.abspath(paths[0])]
+
+
+def test_base_is_read_from_disk_once_per_cache_miss(tmp_path, monkeypatch):
+    monkeypatch.setattr(save_format, "_BASE_CACHE", save_format.OrderedDict())
+    path = str(tmp_path / "base.json")
+    rows = _rows(_engine(2))
+    save_format.write_document(path, {"format": save_format.SAVE_FORMAT, "version": save_format.SAVE_FORMAT_VERSION,
+                                      "kind": "full", "tokens": save_format.encode_token_table(rows)}, True)
+    opened = []
+    monkeypatch.setattr(save_format, "open", lambda *a, **k: opened.append(a[0]) or open(*a, **k), raising=False)
+
+    digest, loaded = save_format.load_base(path)
+
+    assert opened == [path] and loaded == rows
+    with open(path, "rb") as f:
+        assert digest == save_format.content_digest(f.read())
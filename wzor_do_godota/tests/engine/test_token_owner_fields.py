@@ -0,0 +1,54 @@
+"""
+Pola owner_id / nation żetonu: parsowane raz, zsynchronizowane z owner
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from engine.player import Player
+from engine.token import Token, owned_by, parse_owner, token_nation
+
+
+def test_owner_fields_follow_owner():
+    token = Token("A", "2 (Polska)", {"move": 3})
+    assert token.owner_id == 2
+    assert token.nation == "Polska"
+
+    token.owner = "5 (Niemcy)"
+    assert (token.owner_id, token.nation) == (5, "Niemcy")
+
+    # owner bez nawiasu – nacja ze statystyk
+    bare = Token("B", "", {"move": 3, "nation": "Polska"})
+    assert bare.owner_id is None and bare.nation == "Polska"
+
+
+def test_parsed_nations_are_interned():
+    owner = "".join(["3 (", "Polska", ")"])
+    assert parse_owner(owner)[1] is parse_owner("2 (Polska)")[1]
+
+
+def test_is_enemy_of_and_owned_by():
+    pl = Token("A", "2 (Polska)", {})
+    pl2 = Token("B", "3 (Polska)", {})
+    de = Token("C", "5 (Niemcy)", {})
+
+    assert pl.is_enemy_of(de) and de.is_enemy_of(pl)
+    assert not pl.is_enemy_of(pl2)
+    assert not pl.is_enemy_of(pl) and not pl.is_enemy_of(None)
+    # atrapy bez pól nation/owner_id nadal działają
+    dummy = SimpleNamespace(owner="6 (Niemcy)", stats={})
+    assert token_nation(dummy) == "Niemcy" and pl.is_enemy_of(dummy)
+
+    commander = Player(2, "Polska", "Dowódca")
+    assert owned_by(pl, commander)
+    assert not owned_by(pl2, commander)
+    assert owned_by(SimpleNamespace(owner="2 (Polska)"), commander)
+
+
+def test_serialize_round_trip_keeps_owner_fields():
+    token = Token("A", "5 (Niemcy)", {"move": 3}, q=1, r=2)
+    restored = Token.from_dict(token.serialize())
+    assert (restored.owner, restored.owner_id, restored.nation) == ("5 (Niemcy)", 5, "Niemcy")
@@ -0,0 +1,179 @@
+"""
+Rejestr żetonów: engine.tokens zachowuje się jak lista, a wyszukiwanie po id/właścicielu jest O(1)
+"""
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from engine.engine import GameEngine
+from engine.token import Token
+from engine.token_registry import TokenRegistry, find_token
+
+
+def _token(token_id, owner="2 (Polska)", q=0, r=0):
+    return Token(token_id, owner, {"unitType": "P", "move": 3, "nation": owner.split("(")[-1][:-1]}, q=q, r=r)
+
+
+def test_registry_keeps_order_and_indexes():
+    a, b, c = _token("A"), _token("B", "5 (Niemcy)"), _token("C")
+    registry = TokenRegistry([a, b, c])
+
+    assert list(registry) == [a, b, c]
+    assert registry == [a, b, c]
+    assert registry[1] is b and registry[-1] is c
+    assert registry.get("B") is b
+    assert registry.get("X") is None
+    assert registry.by_owner("2 (Polska)") == [a, c]
+    assert registry.by_nation("Niemcy") == [b]
+    assert registry.count_by_nation("Polska") == 2
+
+
+def test_remove_and_owner_change_update_indexes():
+    a, b = _token("A"), _token("B")
+    registry = TokenRegistry([a, b])
+
+    registry.remove(a)
+    assert a not in registry and b in registry
+    assert registry.get("A") is None
+    assert registry.by_owner("2 (Polska)") == [b]
+
+    b.owner = "5 (Niemcy)"
+    assert registry.by_owner("2 (Polska)") == []
+    assert registry.by_nation("Niemcy") == [b]
+
+    # żeton spoza rejestru nie zgłasza zmian
+    a.owner = "5 (Niemcy)"
+    assert registry.by_owner("5 (Niemcy)") == [b]
+
+
+def test_iteration_does_not_copy_and_mutating_loops_use_a_snapshot():
+    tokens = [_token(f"T{i}") for i in range(5)]
+    registry = TokenRegistry(tokens)
+    registry.remove(tokens[2])
+
+    late = _token("T5")
+    seen = []
+    for token in registry:  # jak lista: bez migawki, dziury pomijane
+        seen.append(token.id)
+        if token.id == "T4":
+            registry.append(late)
+    assert seen == ["T0", "T1", "T3", "T4", "T5"]
+
+    for token in list(registry):
+        if token.id in ("T1", "T3"):
+            registry.remove(token)
+
+    assert [t.id for t in registry] == ["T0", "T4", "T5"]
+
+
+def test_duplicate_ids_resolve_to_first_registered():
+    first, second = _token("D", q=1), _token("D", q=2)
+    registry = TokenRegistry([first, second])
+
+    assert registry.get("D") is first
+    registry.remove(first)
+    assert registry.get("D") is second
+
+
+def test_engine_wraps_assigned_lists(tmp_path, monkeypatch, map_file, empty_tokens_file):
+    monkeypatch.chdir(tmp_path)
+    engine = GameEngine(map_file(4, 4), empty_tokens_file, empty_tokens_file, load_saved_state=False)
+
+    token = _token("E1", q=1, r=1)
+    engine.tokens = [token]
+
+    assert isinstance(engine.tokens, TokenRegistry)
+    assert engine.get_token("E1") is token
+    assert find_token(engine, "E1") is token
+    assert engine.tokens_of_owner("2 (Polska)") == [token]
+    engine.tokens.append(_token("E2"))
+    assert find_token(engine, "E2").id == "E2"
+
+    # przypisana lista jest kopiowana – jej późniejsze zmiany nie trafiają do silnika
+    source = [_token("L1")]
+    engine.tokens = source
+    source.append(_token("L2"))
+    assert engine.get_token("L2") is None and len(engine.tokens) == 1
+    registry = TokenRegistry()
+    engine.tokens = registry
+    assert engine.tokens is registry
+
+
+def test_list_interface_matches_list_and_rejects_duplicates(monkeypatch):
+    tokens = [_token(f"T{i}") for i in range(200)]
+    registry = TokenRegistry(tokens)
+    model = list(tokens)
+
+    assert registry.append(_token("X")) is None
+    registry.pop()
+    for add in (registry.append, lambda token: registry.insert(0, token), lambda token: registry.extend([token])):
+        with pytest.raises(ValueError):
+            add(tokens[5])
+    assert len(registry) == 200
+    with pytest.raises(ValueError):
+        registry[0] = tokens[1]
+
+    # indeksowanie, r[i] = x, pop i usuwanie ze środka nie przebudowują rejestru
+    monkeypatch.setattr(registry, "_rebuild", lambda values: pytest.fail("_rebuild"))
+    rng = random.Random(4)
+    for step in range(400):
+        action = rng.choice(["get", "set", "pop", "remove", "del", "append"])
+        if not model:
+            action = "append"
+        index = rng.randrange(len(model)) if model else 0
+        if action == "get":
+            assert registry[index] is model[index] and registry[-1] is model[-1]
+        elif action == "set":
+            fresh = _token(f"S{step}")
+            registry[index] = fresh
+            model[index] = fresh
+        elif action == "pop":
+            assert registry.pop() is model.pop()
+        elif action == "remove":
+            registry.remove(model[index])
+            del model[index]
+        elif action == "del":
+            del registry[index]
+            del model[index]
+        else:
+            fresh = _token(f"N{step}")
+            registry.append(fresh)
+            model.append(fresh)
+        assert len(registry) == len(model)
+    assert list(registry) == model
+    assert [registry[i] for i in range(len(model))] == model
+    assert registry.alive_count(owner_id=2) == len(model)
+    assert all(registry.get(t.id) is t for t in model)
+
+
+def test_alive_and_strength_counters_follow_spawn_damage_and_elimination():
+    a, b = _token("A"), _token("B", "5 (Niemcy)")
+    a.combat_value, b.combat_value = 6, 4
+    registry = TokenRegistry([a, b])
+
+    assert registry.alive_count(owner_id=2) == registry.alive_count(nation="Polska") == 1
+    assert registry.combat_strength(owner_id=2) == 6 and registry.combat_strength(nation="Niemcy") == 4
+
+    c = _token("C")  # wystawienie posiłków
+    c.combat_value = 3
+    registry.append(c)
+    assert registry.alive_count(owner_id=2) == 2 and registry.combat_strength(nation="Polska") == 9
+
+    a.combat_value = 1  # obrażenia
+    c.combat_value = -2  # ujemna wartość nie zaniża sumy
+    assert registry.combat_strength(owner_id=2) == 1
+
+    c.owner = "5 (Niemcy)"
+    assert registry.alive_count(owner_id=5) == 2 and registry.alive_count(nation="Polska") == 1
+
+    registry.remove(a)  # eliminacja
+    assert registry.alive_count(owner_id=2) == 0 and registry.combat_strength(nation="Polska") == 0
+    assert registry.alive_nations() == ["Niemcy"]
+
+    a.combat_value = 10  # żeton spoza rejestru nie zmienia liczników
+    assert registry.combat_strength(owner_id=2) == 0
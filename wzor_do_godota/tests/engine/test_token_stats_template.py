@@ -0,0 +1,108 @@
+"""
+Żeton ze slotami i wspólnym szablonem statystyk blueprintu
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from engine.token import Token, TokenStats
+
+
+BLUEPRINT = {
+    "id": "P_Pluton__2_PL_P", "nation": "Polska", "unitType": "P", "unitSize": "Pluton",
+    "move": 6, "combat_value": 6, "defense_value": 4, "maintenance": 8, "sight": 3,
+    "attack": {"range": 1, "value": 4}, "image": "p.png",
+}
+
+
+def _from_blueprint(token_id):
+    data = dict(BLUEPRINT, id=token_id, owner="2 (Polska)")
+    return Token.from_json(data)
+
+
+def test_tokens_of_one_blueprint_share_template():
+    a, b = _from_blueprint("A"), _from_blueprint("B")
+    assert a.stats._template is b.stats._template
+    assert a.stats["attack"] == {"range": 1, "value": 4}
+    assert isinstance(a.stats.get("attack"), dict)
+
+
+def test_writes_stay_on_the_token():
+    a, b = _from_blueprint("A"), _from_blueprint("B")
+    a.stats["image"] = "nowy.png"
+    a.stats["visible_for"] = [2]
+    del a.stats["shape"]
+
+    assert a.stats["image"] == "nowy.png" and b.stats["image"] == "p.png"
+    assert "visible_for" in a.stats and "visible_for" not in b.stats
+    assert "shape" not in a.stats and "shape" in b.stats
+    assert len(a.stats) == len(b.stats)
+    assert dict(b.stats) == dict(b.stats.template)
+
+
+def test_serialize_round_trip_is_plain_json():
+    token = _from_blueprint("A")
+    token.stats["image"] = "nowy.png"
+    token.currentMovePoints = 2
+
+    data = token.serialize()
+    assert type(data["stats"]) is dict
+    restored = Token.from_dict(json.loads(json.dumps(data)))
+
+    assert restored.stats == token.stats
+    assert restored.currentMovePoints == 2
+    assert restored.stats._template is not token.stats._template  # inny image -> inny szablon
+
+
+def test_slots_without_instance_dict():
+    token = _from_blueprint("A")
+    token.apply_movement_mode(reset_mp=True)
+    assert token.base_move == 6 and token.defense_value == 4
+    assert not hasattr(token, "__dict__")
+
+    assert getattr(token, "supply_assigned_kp", None) is None  # pamięć specjalistów AI – pusta do pierwszego użycia
+    token.supply_assigned_kp = "1,1"
+    assert token.supply_assigned_kp == "1,1"
+    with pytest.raises(AttributeError):
+        token.currentMovePiont = 3  # literówka nie tworzy nowego atrybutu
+
+
+def test_token_stats_copies_overrides_from_other_view():
+    base = TokenStats({"move": 3})
+    base["move"] = 5
+    clone = TokenStats(base)
+    clone["move"] = 7
+    assert base["move"] == 5 and clone["move"] == 7
+
+
+def test_nested_values_are_private_to_the_token():
+    a, b = _from_blueprint("A"), _from_blueprint("B")
+
+    a.stats["attack"]["value"] = 9
+    a.serialize()["stats"]["attack"]["range"] = 5
+    a.stats.to_dict()["attack"]["value"] = 7
+
+    assert a.stats["attack"] == {"range": 1, "value": 9}
+    assert b.stats["attack"] == {"range": 1, "value": 4}
+    assert a.stats.template["attack"] == {"range": 1, "value": 4}
+    assert a.stats._template is b.stats._template  # wartości proste nadal wspólne
+
+
+def test_templates_are_released_with_their_tokens():
+    import gc
+
+    from engine import token as token_module
+
+    stats = dict(BLUEPRINT, id="UNIKALNY_BLUEPRINT")
+    key = token_module._template_key(stats)
+    token = Token("A", "2 (Polska)", stats)
+    assert key in token_module._STAT_TEMPLATES
+
+    del token
+    gc.collect()
+    assert key not in token_module._STAT_TEMPLATES
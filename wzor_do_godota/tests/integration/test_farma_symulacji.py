@@ -0,0 +1,34 @@
+"""
+Test farmy symulacji (core.farma_symulacji) – pula procesów z izolowanymi katalogami
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from core.farma_symulacji import run_farm
+
+
+def _without_timing(results):
+    rows = []
+    for result in results:
+        data = result.to_dict()
+        data.pop("duration_s")
+        rows.append(data)
+    return rows
+
+
+def test_farm_results_do_not_depend_on_worker_count(tmp_path):
+    parallel, summary = run_farm(3, base_seed=11, workers=2, max_turns=1, root=str(tmp_path / "rownolegle"))
+    sequential, _ = run_farm(3, base_seed=11, workers=1, max_turns=1, root=str(tmp_path / "sekwencyjnie"))
+
+    assert [r.seed for r in parallel] == [11, 12, 13]
+    assert _without_timing(parallel) == _without_timing(sequential)
+    assert summary.games == 3 and summary.errors == 0
+    assert summary.draws + sum(summary.wins.values()) == 3
+
+    worker_dirs = list((tmp_path / "rownolegle").iterdir())
+    assert worker_dirs
+    for workdir in worker_dirs:
+        assert (workdir / "data" / "map_data.json").exists()
+        assert (workdir / "ai" / "logs").is_dir()
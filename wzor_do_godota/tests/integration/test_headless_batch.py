@@ -0,0 +1,32 @@
+"""
+Test wsadowego runnera partii AI vs AI (core.symulacja) – bez GUI
+"""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from core.symulacja import run_batch, run_headless_game
+
+
+def _without_timing(result):
+    data = result.to_dict()
+    data.pop("duration_s")
+    return data
+
+
+def test_batch_runs_seeded_games_to_completion():
+    results = list(run_batch(2, base_seed=7, max_turns=1))
+
+    assert [r.seed for r in results] == [7, 8]
+    for result in results:
+        assert result.error is None
+        assert result.turns_played == 1
+        assert result.player_turns == 6
+        assert set(result.victory_points) == {"Polska", "Niemcy"}
+        assert json.loads(json.dumps(result.to_dict()))["seed"] == result.seed
+
+
+def test_same_seed_gives_same_result():
+    assert _without_timing(run_headless_game(3, max_turns=1)) == _without_timing(run_headless_game(3, max_turns=1))
@@ -0,0 +1,96 @@
+"""
+Buforowany zapis AILogger: wpisy trafiają na dysk paczkami, flush/close gwarantują zapis
+"""
+
+import csv
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from ai.logs.ai_logger import AILogger
+
+
+def _read_csv(logger, component="TOKEN"):
+    with open(logger._component_paths[component]["csv"], newline="", encoding="utf-8") as handle:
+        return list(csv.DictReader(handle))
+
+
+def test_entries_are_buffered_until_flush(tmp_path):
+    logger = AILogger(log_dir=str(tmp_path), flush_interval=60, max_buffer=1000)
+    try:
+        for index in range(5):
+            logger.log_token("ruch", token_id=f"T{index}", hex=(index, 0))
+        text_path = logger._component_paths["TOKEN"]["text"]
+        assert not os.path.exists(text_path) or os.path.getsize(text_path) == 0
+
+        logger.flush()
+
+        rows = _read_csv(logger)
+        assert [json.loads(row["context"])["token_id"] for row in rows] == [f"T{i}" for i in range(5)]
+        with open(text_path, encoding="utf-8") as handle:
+            lines = handle.read().splitlines()
+        assert len(lines) == 5 and lines[0].endswith("ruch | token_id=T0, hex=(0, 0)")
+    finally:
+        logger.close()
+
+
+def test_background_writer_flushes_full_buffer(tmp_path):
+    logger = AILogger(log_dir=str(tmp_path), flush_interval=60, max_buffer=10)
+    try:
+        for index in range(10):
+            logger.log_commander("rozkaz", order=index)
+        deadline = time.time() + 5
+        while time.time() < deadline and len(_read_csv_safe(logger)) < 10:
+            time.sleep(0.01)
+        assert len(_read_csv_safe(logger)) == 10
+    finally:
+        logger.close()
+
+
+def _read_csv_safe(logger):
+    path = logger._component_paths["COMMANDER"]["csv"]
+    if not os.path.exists(path):
+        return []
+    return _read_csv(logger, "COMMANDER")
+
+
+def test_close_flushes_and_header_written_once(tmp_path):
+    logger = AILogger(log_dir=str(tmp_path))
+    logger.log_general("pierwszy")
+    logger.close()
+    second = AILogger(log_dir=str(tmp_path), buffered=False)
+    second.log_general("drugi")
+    second.close()
+
+    rows = _read_csv(second, "GENERAL")
+    assert [row["message"] for row in rows] == ["pierwszy", "drugi"]
+
+
+def test_serialization_runs_on_writer_thread_and_writes_after_close_are_dropped(tmp_path, monkeypatch):
+    from ai.logs import ai_logger
+
+    dumped_on = []
+    real_dumps = json.dumps
+    monkeypatch.setattr(ai_logger.json, "dumps", lambda *a, **k: dumped_on.append(threading.current_thread().name) or real_dumps(*a, **k))
+    logger = AILogger(log_dir=str(tmp_path), flush_interval=60, max_buffer=3)
+    try:
+        path = [(0, 0)]
+        logger.log_token("ruch", path=path)
+        path.append((1, 0))  # wpis zachowuje stan z chwili logowania
+        logger.log_token("ruch", order=2)
+        logger.log_token("ruch", order=3)
+        deadline = time.time() + 5
+        while time.time() < deadline and len(dumped_on) < 3:
+            time.sleep(0.01)
+        assert dumped_on == ["AILoggerWriter"] * 3
+    finally:
+        logger.close()
+
+    assert json.loads(_read_csv(logger)[0]["context"]) == {"path": [[0, 0]]}
+    logger.log_token("po zamknięciu")
+    assert logger.dropped_after_close == 1 and not logger._handles
+    assert len(_read_csv(logger)) == 3
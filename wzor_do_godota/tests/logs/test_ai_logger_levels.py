@@ -0,0 +1,58 @@
+"""
+Progi poziomów per komponent i leniwy kontekst w ai.logs
+"""
+
+import csv
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from ai.logs import AILogger, is_log_enabled, log_token, set_ai_logger
+
+
+def _rows(logger, component):
+    path = logger._component_paths[component]["csv"]
+    if not os.path.exists(path):
+        return []
+    with open(path, newline="", encoding="utf-8") as handle:
+        return list(csv.DictReader(handle))
+
+
+def test_disabled_level_skips_context_evaluation(tmp_path):
+    logger = AILogger(log_dir=str(tmp_path), buffered=False, levels={"TOKEN": "INFO"})
+    calls = []
+
+    def expensive():
+        calls.append(1)
+        return "a|b"
+
+    logger.log_token("ruch", "DEBUG", flags=expensive)
+    logger.log_token("atak", "WARNING", flags=expensive, context_builder=lambda: {"target": "T2"})
+    logger.log_commander("rozkaz", "DEBUG")
+    logger.close()
+
+    assert len(calls) == 1
+    token_rows = _rows(logger, "TOKEN")
+    assert [row["message"] for row in token_rows] == ["atak"]
+    assert json.loads(token_rows[0]["context"]) == {"flags": "a|b", "target": "T2"}
+    assert [row["message"] for row in _rows(logger, "COMMANDER")] == ["rozkaz"]
+
+
+def test_module_shortcuts_respect_global_levels(tmp_path):
+    logger = AILogger(log_dir=str(tmp_path), buffered=False)
+    logger.set_level("OFF")
+    set_ai_logger(logger)
+    try:
+        assert not is_log_enabled("TOKEN", "ERROR")
+        log_token("ruch", "INFO", flags=lambda: 1 / 0)
+        logger.set_level("DEBUG", "token")
+        assert is_log_enabled("TOKEN", "DEBUG")
+        log_token("ruch", "INFO", step=lambda: 3)
+    finally:
+        set_ai_logger(None)
+
+    rows = _rows(logger, "TOKEN")
+    assert len(rows) == 1
+    assert json.loads(rows[0]["context"]) == {"step": 3}
@@ -0,0 +1,83 @@
+"""
+Benchmark silnika (tools/benchmark_engine.py): scenariusz w skali, wyniki JSON i wykrywanie regresji
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+
+import json
+
+import pytest
+
+import benchmark_engine
+from ai.tokens import token_ai
+from engine import engine as engine_module
+from engine import save_manager
+from engine.player import Player
+from engine.token import Token, owned_by, token_nation
+
+
+@pytest.fixture
+def isolated_cwd(tmp_path, monkeypatch):
+    """save_load zapisuje przez save_game, które zależy od katalogu bieżącego (assets/tokens/aktualne)."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(save_manager, "AKTUALNE_DIR", tmp_path / "assets" / "tokens" / "aktualne")
+    return tmp_path
+
+
+def test_compare_flags_only_real_regressions():
+    baseline = {"results": {"a@1x": {"seconds": 1.0}, "b@1x": {"seconds": 0.001}, "c@1x": {"seconds": 0.5}}}
+    current = {"results": {"a@1x": {"seconds": 1.5}, "b@1x": {"seconds": 0.002}, "c@1x": {"seconds": 0.55},
+                           "new@1x": {"seconds": 1.0}}}
+
+    rows = {row["case"]: row for row in benchmark_engine.compare_results(baseline, current, threshold=0.2)}
+
+    assert set(rows) == {"a@1x", "b@1x", "c@1x"}
+    assert rows["a@1x"]["regression"] and rows["a@1x"]["ratio"] == 1.5
+    assert not rows["b@1x"]["regression"]  # x2, ale tylko o 1 ms – szum
+    assert not rows["c@1x"]["regression"]
+
+
+def test_suite_scales_tokens_and_reports_json(isolated_cwd):
+    result = benchmark_engine.run_suite(["find_path", "save_load"], scales=(1, 2), repeats=1, progress=None)
+
+    assert set(result["results"]) == {"find_path@1x", "save_load@1x", "find_path@2x", "save_load@2x"}
+    assert result["results"]["find_path@2x"]["tokens"] == 2 * result["results"]["find_path@1x"]["tokens"] > 0
+    assert all(entry["seconds"] > 0 for entry in result["results"].values())
+    assert result["meta"]["scales"] == [1, 2] and result["meta"]["host"] == benchmark_engine.current_host()
+
+
+def test_reference_cases_run_next_to_their_pairs():
+    names = ["find_path", "find_path_linear", "ai_turn", "ai_turn_legacy_owner", "log_token_disabled"]
+    result = benchmark_engine.run_suite(names, scales=(1,), repeats=1, progress=None)
+
+    assert all(entry["seconds"] > 0 for entry in result["results"].values())
+    ratios = {row["reference"]: row["current"] for row in benchmark_engine.reference_ratios(result["results"])}
+    assert ratios == {"find_path_linear@1x": "find_path@1x", "ai_turn_legacy_owner@1x": "ai_turn@1x"}
+    assert token_ai.token_nation is token_nation  # podmiana cofnięta po przypadku
+
+
+def test_legacy_owner_checks_match_current_helpers_and_are_restored():
+    tokens = [Token("PL", "2 (Polska)", {}), Token("DE", "5 (Niemcy)", {}), Token("X", "7", {"nation": "Polska"})]
+    player = Player(2, "Polska", "Dowódca")
+
+    with benchmark_engine.legacy_owner_checks():
+        assert token_ai.token_nation is benchmark_engine._legacy_token_nation
+        assert engine_module.owned_by is benchmark_engine._legacy_owned_by
+        legacy = [(engine_module.token_nation(t), engine_module.owned_by(t, player)) for t in tokens]
+
+    assert token_ai.token_nation is token_nation and engine_module.owned_by is owned_by
+    assert legacy == [(token_nation(t), owned_by(t, player)) for t in tokens]
+
+
+def test_compare_refuses_baseline_from_another_host(tmp_path, monkeypatch, capsys):
+    baseline = tmp_path / "inny.json"
+    baseline.write_text(json.dumps({"meta": {"host": "inny-host"}, "results": {}}), encoding="utf-8")
+    monkeypatch.setattr(benchmark_engine, "run_suite", lambda *a, **k: pytest.fail("pomiar mimo innego hosta"))
+
+    assert benchmark_engine.main(["--compare", str(baseline), "--cases", "find_path"]) == 2
+    assert "inny-host" in capsys.readouterr().out
+    assert benchmark_engine.default_baseline_path("vm") == benchmark_engine.BASELINE_DIR / "vm.json"
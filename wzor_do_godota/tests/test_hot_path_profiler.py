@@ -0,0 +1,77 @@
+"""
+Profiler gorących ścieżek (utils/hot_path_profiler.py): no-op gdy wyłączony, agregacja per tura/typ, eksport
+"""
+
+import csv
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import hot_path_profiler as hpp
+from utils.ai_commander_logger_zaawansowany import LoggerWydajnosci
+
+
+class Unit:
+    def __init__(self, unit_type):
+        self.token = SimpleNamespace(stats={"unitType": unit_type})
+
+    @hpp.profiled("Unit.turn", token_type=lambda unit: unit.token.stats["unitType"])
+    def turn(self):
+        self.plan()
+        self.plan()
+        with hpp.profile_section("write"):
+            pass
+        return "done"
+
+    @hpp.profiled("Unit.plan")
+    def plan(self):
+        return sum(range(2000))
+
+
+def test_disabled_profiler_is_transparent():
+    hpp.disable_profiling()
+    assert Unit("P").turn() == "done"
+    assert hpp.profile_section("x") is hpp.profile_section("y")  # współdzielony pusty kontekst
+    assert Unit.turn.__name__ == "turn"
+
+
+def test_sections_aggregate_per_turn_and_token_type(tmp_path):
+    profiler = hpp.enable_profiling()
+    try:
+        for turn in (1, 2):
+            profiler.begin_turn(turn)
+            Unit("P").turn()
+            Unit("TS").turn()
+        profiler.begin_turn(2)
+        Unit("P").turn()
+    finally:
+        assert hpp.disable_profiling() is profiler
+
+    rows = {(row["turn"], row["token_type"], row["section"]): row for row in profiler.rows()}
+    assert rows[(1, "TS", "Unit.plan")]["calls"] == 2  # typ odziedziczony po sekcji zewnętrznej
+    assert rows[(2, "P", "Unit.plan")]["calls"] == 4
+    assert rows[(2, "P", "write")]["calls"] == 2
+    root = rows[(1, "P", "Unit.turn")]
+    assert root["total_ms"] >= root["self_ms"] and root["total_ms"] >= rows[(1, "P", "Unit.plan")]["total_ms"]
+    assert profiler.max_depth == 2
+
+    csv_path = profiler.export_csv(str(tmp_path / "out" / "hot.csv"))
+    with open(csv_path, encoding="utf-8") as f:
+        exported = list(csv.DictReader(f))
+    assert list(exported[0]) == hpp.CSV_COLUMNS and len(exported) == len(rows)
+
+    profiler._folded["Unit.turn;Unit.plan"] += 5_000_000  # gwarantuje linię ≥ 1 µs niezależnie od maszyny
+    folded = (tmp_path / "hot.folded")
+    profiler.export_folded(str(folded))
+    lines = folded.read_text(encoding="utf-8").splitlines()
+    assert any(line.startswith("Unit.turn;Unit.plan ") for line in lines)
+    assert not any(line.startswith("Unit.plan") for line in lines)  # plan zawsze zagnieżdżony
+
+    logger = LoggerWydajnosci(tmp_path)
+    assert profiler.log_performance(logger, nation="Polska") == 2
+    (log_file,) = list((tmp_path / "ai_commander_zaawansowany" / "wydajnosc_ai").glob("*.csv"))
+    with open(log_file, encoding="utf-8") as f:
+        logged = list(csv.reader(f))
+    assert len(logged) == 3 and "Unit.plan" in ",".join(logged[1])
@@ -0,0 +1,263 @@
+"""
+PanelMapa w trybie zachowanym: statyka rysowana raz, mgła i żetony aktualizowane różnicowo,
+elementy heksów tylko w oknie widoku (z uproszczonym poziomem szczegółów przy oddaleniu);
+Canvas jest atrapą, więc testy nie wymagają Tk
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.board import Board
+from engine.token import Token
+from gui.panel_mapa import FrameTimeCounter, PanelMapa
+
+
+class RecordingCanvas:
+    """Minimalny Canvas: elementy z tagami, bez Tk."""
+
+    def __init__(self, width=10_000, height=10_000):
+        self.items = {}
+        self.next_id = 1
+        self.created = 0
+        self.width, self.height = width, height
+        self.x = self.y = 0  # przewinięcie
+
+    def _create(self, kind, coords, tags):
+        tags = (tags,) if isinstance(tags, str) else tuple(tags or ())
+        item = self.next_id
+        self.next_id += 1
+        self.items[item] = {"kind": kind, "coords": coords, "tags": tags}
+        self.created += 1
+        return item
+
+    def create_polygon(self, flat, **kw):
+        return self._create("polygon", list(flat), kw.get("tags"))
+
+    def create_image(self, x, y, **kw):
+        return self._create("image", [x, y], kw.get("tags"))
+
+    def create_text(self, x, y, **kw):
+        return self._create("text", [x, y], kw.get("tags"))
+
+    def create_line(self, *coords, **kw):
+        return self._create("line", list(coords), kw.get("tags"))
+
+    def _match(self, tag_or_id):
+        if isinstance(tag_or_id, int):
+            return [tag_or_id] if tag_or_id in self.items else []
+        return [i for i, it in self.items.items() if tag_or_id in it["tags"]]
+
+    def delete(self, tag_or_id):
+        for item in self._match(tag_or_id):
+            del self.items[item]
+
+    def coords(self, item, *coords):
+        self.items[item]["coords"] = list(coords)
+
+    def itemconfig(self, tag_or_id, **kw):
+        for item in self._match(tag_or_id):
+            self.items[item].update(kw)
+
+    def tag_raise(self, *args):
+        pass
+
+    def tag_lower(self, tag_or_id, below=None):
+        for item in self._match(tag_or_id):
+            self.items[item]["below"] = below
+
+    def after_idle(self, callback):
+        callback()
+        return "after#1"
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+    def cget(self, option):
+        return getattr(self, option)
+
+    def xview(self, *args):
+        pass
+
+    def canvasx(self, x):
+        return self.x + x
+
+    def canvasy(self, y):
+        return self.y + y
+
+    def tagged(self, tag):
+        return self._match(tag)
+
+
+def _panel(map_file, cols=6, rows=5, viewport=(800, 600)):
+    board = Board(map_file(cols, rows, offset=True, key_points={"2,1": {"type": "miasto", "value": 50}}))
+    player = SimpleNamespace(nation="Polska", visible_hexes={(0, 0), (1, 0)}, temp_visible_hexes=set(),
+                             visible_tokens={"A", "B"}, temp_visible_tokens=set(), temp_visible_token_data={})
+    tokens = [Token("A", "2 (Polska)", {"nation": "Polska"}, q=0, r=0),
+              Token("B", "2 (Polska)", {"nation": "Polska"}, q=1, r=0)]
+    engine = SimpleNamespace(board=board, tokens=tokens, current_player_obj=player)
+
+    panel = PanelMapa.__new__(PanelMapa)
+    panel.game_engine = engine
+    panel.map_model = board
+    panel.tokens = tokens
+    panel.token_info_panel = None
+    panel.active_commander_id = None
+    panel.current_path = None
+    panel.canvas = RecordingCanvas(*viewport)
+    panel._bg_width, panel._bg_height = 10_000, 10_000
+    panel._daylight_overlay_id = None
+    panel._terrain_texture_cache = {}
+    panel._static_layer_key = None
+    panel._hex_polygons = {}
+    panel._fog_items = {}
+    panel._fog_visible = None
+    panel._chunks = {}
+    panel._chunk_items = {}
+    panel._materialized_hexes = set()
+    panel._hex_textures = {}
+    panel._layer_markers = {}
+    panel._detail_level = None
+    panel._viewport_job = None
+    panel.frame_stats = FrameTimeCounter()
+    panel.token_images = {}
+    panel._token_canvas_items = {}
+    panel._token_render_state = {}
+    panel._token_photo_cache = {}
+    panel._move_status_markers = {}
+    panel._get_token_image_path = lambda token: f"{token.id}.png"
+    panel._token_photo = lambda img_path, dimmed, opacity: (img_path, dimmed, opacity)  # bez Tk
+    return panel, engine, player
+
+
+def test_second_refresh_without_changes_creates_nothing(map_file):
+    panel, engine, player = _panel(map_file)
+    panel.refresh()
+    canvas = panel.canvas
+    hexes = len(engine.board.hex_coords)
+    assert len(canvas.tagged("hex")) == hexes
+    assert len(canvas.tagged("fog")) == hexes - 2
+    assert len(canvas.tagged("special_point_overlay")) == 1
+    assert panel.frame_stats.frames == 1 and panel.frame_stats.items_created > hexes
+
+    created = canvas.created
+    panel.refresh()
+    assert canvas.created == created
+    assert panel.frame_stats.summary()["items_created"] == 0
+    assert len(canvas.tagged("special_point_overlay")) == 1  # nakładki nie kumulują się
+
+
+def test_fog_and_tokens_are_diffed(map_file):
+    panel, engine, player = _panel(map_file)
+    panel.refresh()
+    canvas = panel.canvas
+    item_a = panel._token_canvas_items["A"]
+    fog_before = set(canvas.tagged("fog"))
+
+    player.temp_visible_hexes = {(2, 0)}
+    engine.tokens[0].q, engine.tokens[0].r = 2, 0  # ruch A
+    player.visible_tokens = {"A"}  # B znika z widoku
+    panel.refresh()
+
+    assert (2, 0) not in panel._fog_items
+    assert set(canvas.tagged("fog")) < fog_before and len(canvas.tagged("fog")) == len(fog_before) - 1
+    assert panel._token_canvas_items["A"] == item_a  # ten sam element, przesunięty
+    assert canvas.items[item_a]["coords"] == list(engine.board.hex_to_pixel(2, 0))
+    assert "B" not in panel._token_canvas_items and len(canvas.tagged("token")) == 1
+    stats = panel.frame_stats.summary()
+    assert (stats["items_created"], stats["items_deleted"], stats["items_updated"]) == (0, 2, 1)
+
+    # zmiana wyglądu (dowódca nieaktywny) – nowy obraz bez tworzenia elementu
+    panel.active_commander_id = "7"
+    panel.refresh()
+    assert panel._token_canvas_items["A"] == item_a
+    assert canvas.items[item_a]["image"] == ("A.png", True, None)
+
+
+def test_only_hexes_near_viewport_are_materialized(map_file):
+    panel, engine, player = _panel(map_file, cols=60, rows=40, viewport=(400, 300))
+    panel.refresh()
+    canvas = panel.canvas
+    hexes = len(engine.board.hex_coords)
+    near_origin = len(canvas.tagged("hex"))
+    assert 0 < near_origin < hexes / 4
+    assert (0, 0) in panel._materialized_hexes and (59, -29) not in panel._materialized_hexes
+    assert len(canvas.tagged("fog")) == len(panel._materialized_hexes) - 2
+
+    # przewinięcie na drugi koniec mapy – stare fragmenty usunięte, nowe utworzone
+    canvas.x, canvas.y = 1400, 1000
+    panel._on_xview("moveto", 0.8)
+    assert (0, 0) not in panel._materialized_hexes and (0, 0) not in panel._fog_items
+    assert (40, 5) in panel._materialized_hexes
+    assert len(canvas.tagged("hex")) == len(panel._materialized_hexes)
+    assert panel.frame_stats.items_deleted > 0 and panel.frame_stats.items_created > 0
+
+    # oddalony widok (duże okno) – bez obrysów i tekstur, mgła zostaje
+    canvas.width, canvas.height = 6000, 5000
+    canvas.x = canvas.y = 0
+    panel.refresh()
+    assert panel._detail_level == "coarse"
+    assert not canvas.tagged("hex")
+    assert len(canvas.tagged("fog")) == len(panel._materialized_hexes) - 2 == hexes - 2
+
+
+def _editor():
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "edytory"))
+    from map_editor_prototyp import MapEditor
+
+    editor = MapEditor.__new__(MapEditor)
+    editor.canvas = RecordingCanvas(400, 300)
+    editor.hex_size = 30
+    editor.hex_defaults = {"defense_mod": 0, "move_mod": 0}
+    editor.hex_data = {}
+    editor._grid_layer_marker = editor.canvas.create_line(0, 0, 0, 0, tags="grid_layer_marker")
+    editor._grid_cells = set()
+    editor._grid_detail = None
+    editor.hex_centers = {}
+    for col in range(80):
+        for row in range(60):
+            hex_id = f"{col},{row - (col // 2)}"
+            editor.hex_centers[hex_id] = (30 + col * 45, 26 + row * 52 + (26 if col % 2 else 0))
+            editor.hex_data[hex_id] = {"move_mod": 0, "defense_mod": 0}
+    return editor
+
+
+def test_map_editor_grid_materializes_viewport_only():
+    editor = _editor()
+    editor._update_grid_viewport()
+    cells = set(editor._grid_cells)
+    assert "0,0" in cells and "79,-39" not in cells
+    assert len(editor.canvas.tagged("grid_cell")) == 2 * len(cells)  # obrys + opis
+    assert all(item["below"] == editor._grid_layer_marker
+               for item in map(editor.canvas.items.get, editor.canvas.tagged("grid_cell")))
+
+    editor.canvas.x, editor.canvas.y = 3000, 2500
+    editor._on_canvas_xview("moveto", 0.9)
+    assert "0,0" not in editor._grid_cells and "70,10" in editor._grid_cells
+    assert not editor.canvas.tagged("cell_0,0")
+
+    editor.canvas.width, editor.canvas.height = 5000, 4000  # oddalony widok
+    editor._update_grid_viewport()
+    assert editor._grid_detail == "coarse" and not editor.canvas.tagged("grid_cell")
+
+
+def test_map_editor_redraw_after_edit_replaces_cell_and_respects_viewport():
+    editor = _editor()
+    editor._update_grid_viewport()
+    canvas = editor.canvas
+
+    editor.hex_data["1,0"] = {"move_mod": 2, "defense_mod": 1}
+    editor._redraw_grid_cell("1,0")  # heks w oknie – obrys i opis zastąpione, nie zdublowane
+    cell = [canvas.items[i] for i in canvas.tagged("cell_1,0")]
+    assert sorted(item["kind"] for item in cell) == ["polygon", "text"]
+    assert all(item["below"] == editor._grid_layer_marker for item in cell)
+    assert "1,0" in editor._grid_cells
+
+    created = canvas.created
+    editor._redraw_grid_cell("70,10")  # poza oknem – powstanie przy przewinięciu
+    assert canvas.created == created and not canvas.tagged("cell_70,10")
@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Zestaw benchmarków silnika z zapisywanymi wynikami bazowymi.
+
+Ładuje prawdziwą mapę (data/map_data.json) i żetony startowe (assets/start_tokens.json),
+powiela je do skal 1×/4×/16× (gdy żetonów startowych brak – syntetyczna armia bazowa
+obu nacji) i mierzy:
+  * find_path      – seria Board.find_path między pozycjami żetonów,
+  * visibility     – update_all_players_visibility,
+  * token_ai       – TokenAI.execute_turn wszystkich żetonów jednego dowódcy,
+  * commander_ai   – CommanderAI.execute_turn wszystkich dowódców,
+  * general_ai     – GeneralAI.execute_turn generałów,
+  * ai_turn_cycle  – pełny cykl tury (generałowie, dowódcy, widoczność, TurnManager.next_turn),
+  * save_load      – save_game + load_game.
+Przypadki odniesienia (tylko przez --cases, wypisywane obok swojej pary jako krotność):
+  * find_path_linear     – find_path z dawnym liniowym skanem zajętości (para: find_path),
+  * commander_ai_logged  – commander_ai przy logowaniu AI na poziomie DEBUG (para: commander_ai),
+  * log_token_disabled   – 100 000 odrzuconych progiem wywołań log_token z leniwym kontekstem,
+  * ai_turn              – dowódcy obu stron, po każdym odświeżenie widoczności,
+  * ai_turn_legacy_owner – ai_turn z dawnym, napisowym sprawdzaniem właściciela (para: ai_turn).
+Logowanie AI jest wyłączone (poza commander_ai_logged), wynik przypadku to minimum
+z kilku powtórzeń (każde na świeżym stanie).
+
+Wyniki zapisuje się jako JSON (--save), a tryb --compare porównuje z zapisanym plikiem
+i kończy się kodem 1, gdy któryś przypadek zwolnił ponad próg. Czasy są bezwzględne,
+więc plik bazowy ma sens tylko na maszynie, na której powstał: domyślna ścieżka to
+tools/benchmark_baselines/<host>.json (katalog poza repozytorium), a --compare odmawia
+porównania z wynikiem innego hosta (kod 2), chyba że podano --allow-other-host.
+W CI bazę trzeba nagrać w tym samym zadaniu (--save przed zmianą, --compare po niej).
+
+Uruchomienie:
+    python tools/benchmark_engine.py --save                      # nowy tools/benchmark_baselines/<host>.json
+    python tools/benchmark_engine.py --compare --threshold 0.25  # porównanie z bazą tego hosta
+    python tools/benchmark_engine.py --cases find_path,save_load --scales 1,4
+    python tools/benchmark_engine.py --cases ai_turn,ai_turn_legacy_owner --scales 1
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from ai.commander.commander_ai import CommanderAI
+from ai.general.general_ai import GeneralAI
+from ai.logs import AILogger, get_ai_logger, log_token, set_ai_logger
+from ai.tokens.token_ai import TokenAI
+from core.ekonomia import EconomySystem
+from core.tura import TurnManager
+from engine.board import Board
+from engine.engine import GameEngine, update_all_players_visibility
+from engine.player import Player
+from engine.save_manager import load_game, save_game
+from engine.token import Token, parse_owner
+
+MAP_PATH = PROJECT_ROOT / "data" / "map_data.json"
+TOKENS_INDEX = PROJECT_ROOT / "assets" / "tokens" / "index.json"
+START_TOKENS = PROJECT_ROOT / "assets" / "start_tokens.json"
+SCALES = (1, 4, 16)
+SYNTHETIC_BASE_TOKENS = 24  # gdy assets/start_tokens.json jest puste
+SYNTHETIC_SIDES = ((2, "Polska"), (5, "Niemcy"))
+GENERAL_IDS = {"Polska": 1, "Niemcy": 4}
+DEFAULT_THRESHOLD = 0.20
+MIN_DELTA_S = 0.005  # krótsze przypadki (np. widoczność przy 1×) mają szum rzędu milisekund
+BASELINE_DIR = PROJECT_ROOT / "tools" / "benchmark_baselines"  # wyniki per host, poza repozytorium
+# Przypadek odniesienia -> przypadek mierzący obecną implementację
+REFERENCE_PAIRS = {
+    "find_path_linear": "find_path",
+    "commander_ai_logged": "commander_ai",
+    "ai_turn_legacy_owner": "ai_turn",
+}
+# Moduły, które importują token_nation/owned_by z engine.token (podmiana musi objąć każdy z nich)
+OWNER_HELPER_MODULES = (
+    "engine.token",
+    "engine.engine",
+    "engine.action_refactored_clean",
+    "ai.tokens.token_ai",
+    "ai.tokens.detection_snapshot",
+)
+
+
+def current_host() -> str:
+    return platform.node() or "unknown"
+
+
+def default_baseline_path(host: Optional[str] = None) -> Path:
+    return BASELINE_DIR / f"{host or current_host()}.json"
+
+
+# ---------------------------------------------------------------- scenariusz
+
+def _templates(engine: GameEngine) -> List[Tuple[str, dict]]:
+    """(owner, statystyki) żetonów startowych albo syntetycznej armii bazowej."""
+    templates = [(token.owner, token.stats.to_dict()) for token in engine.tokens]
+    if templates:
+        return templates
+    for index in range(SYNTHETIC_BASE_TOKENS):
+        player_id, nation = SYNTHETIC_SIDES[index % 2]
+        stats = {"move": 6, "maintenance": 6, "combat_value": 6, "sight": 3, "attack": {"range": 1, "value": 4},
+                 "unitType": "P", "nation": nation, "price": 20}
+        templates.append((f"{player_id} ({nation})", stats))
+    return templates
+
+
+def build_scenario(scale: int, seed: int, map_path: str = str(MAP_PATH), token_count: Optional[int] = None):
+    """Silnik z żetonami startowymi powielonymi `scale` razy wokół jednego punktu mapy.
+
+    token_count – dokładna liczba żetonów zamiast wielokrotności szablonów (skala jest wtedy pomijana).
+    Żetony są skupione, więc strony się widzą (ruch z wykrywaniem wroga, walka)."""
+    rng = random.Random(seed)
+    random.seed(seed)
+    engine = GameEngine(map_path, str(TOKENS_INDEX), str(START_TOKENS), seed=seed, read_only=True, load_saved_state=False)
+    templates = _templates(engine)
+    count = token_count if token_count is not None else len(templates) * scale
+    hexes = [h for h in engine.board.hex_coords if engine.board.get_tile(*h) and engine.board.get_tile(*h).move_mod != -1]
+    center = rng.choice(hexes)
+    cluster = sorted(hexes, key=lambda h: engine.board.hex_distance(h, center))[: count * 3]
+    rng.shuffle(cluster)
+    tokens = []
+    for index, (q, r) in enumerate(cluster[:count]):
+        owner, stats = templates[index % len(templates)]
+        tokens.append(Token(f"BENCH_{index}", owner, dict(stats), q=q, r=r))
+    engine.tokens = tokens
+    engine.board.set_tokens(engine.tokens)
+
+    players = []
+    commanders = {}
+    for token in tokens:
+        player_id, nation = parse_owner(token.owner)
+        commanders.setdefault((player_id, nation), None)
+    for nation in sorted({nation for _, nation in commanders}):
+        players.append(Player(GENERAL_IDS.get(nation, 90 + len(players)), nation, "Generał", economy=EconomySystem()))
+    for player_id, nation in sorted(commanders, key=lambda key: str(key[0])):
+        players.append(Player(player_id, nation, "Dowódca", economy=EconomySystem()))
+    for player in players:
+        player.is_ai = True  # bez logów akcji człowieka (ai/logs/human)
+        player.economy.economic_points = 0
+    engine.players = players
+    update_all_players_visibility(players, engine.tokens, engine.board)
+    return engine, players
+
+
+def _commanders(players):
+    return [p for p in players if p.role == "Dowódca"]
+
+
+def _generals(players):
+    return [p for p in players if p.role == "Generał"]
+
+
+# ---------------------------------------------------------------- przypadki
+# Każdy przypadek: setup(engine, players, rng) -> funkcja mierzona (bez argumentów,
+# opcjonalnie z atrybutem cleanup wywoływanym poza pomiarem)
+
+def case_find_path(engine, players, rng):
+    positions = [(t.q, t.r) for t in engine.tokens]
+    queries = [(rng.choice(positions), rng.choice(positions)) for _ in range(100)]
+    board = engine.board
+
+    def run():
+        for start, goal in queries:
+            board.find_path(start, goal, max_mp=12, max_fuel=12, fallback_to_closest=True)
+    return run
+
+
+def case_visibility(engine, players, rng):
+    def run():
+        for _ in range(5):
+            update_all_players_visibility(players, engine.tokens, engine.board)
+    return run
+
+
+def case_token_ai(engine, players, rng):
+    player = _commanders(players)[0]
+    expected = f"{player.id} ({player.nation})"
+    ais = [TokenAI(token) for token in engine.tokens if token.owner == expected]
+
+    def run():
+        for ai in ais:
+            ai.execute_turn(engine, player)
+    return run
+
+
+def case_commander_ai(engine, players, rng):
+    commanders = [CommanderAI(player) for player in _commanders(players)]
+
+    def run():
+        for commander in commanders:
+            commander.execute_turn(engine)
+    return run
+
+
+def case_general_ai(engine, players, rng):
+    generals = [GeneralAI(player) for player in _generals(players)]
+
+    def run():
+        for general in generals:
+            general.execute_turn(players, engine)
+    return run
+
+
+def case_ai_turn_cycle(engine, players, rng):
+    generals = {p.id: GeneralAI(p) for p in _generals(players)}
+    commanders = {p.id: CommanderAI(p) for p in _commanders(players)}
+    turn_manager = TurnManager(players, game_engine=engine)
+
+    def run():
+        for _ in range(len(players)):
+            player = turn_manager.get_current_player()
+            if player.id in generals:
+                generals[player.id].execute_turn(players, engine)
+            elif player.id in commanders:
+                commanders[player.id].execute_turn(engine)
+            update_all_players_visibility(players, engine.tokens, engine.board)
+            turn_manager.next_turn()
+    return run
+
+
+def case_save_load(engine, players, rng):
+    directory = tempfile.mkdtemp(prefix="bench_save_")
+    path = str(Path(directory) / "bench.json")
+
+    def run():
+        save_game(path, engine, cleanup=False)
+        load_game(path, engine)
+    run.cleanup = lambda: shutil.rmtree(directory, ignore_errors=True)
+    return run
+
+
+# ---------------------------------------------------------------- przypadki odniesienia
+
+class LinearScanBoard(Board):
+    """Plansza z dawnym, liniowym sprawdzaniem zajętości (punkt odniesienia dla find_path)."""
+
+    def is_occupied(self, q, r, visible_tokens=None):
+        if visible_tokens is not None:
+            return any(t.q == q and t.r == r and t.id in visible_tokens for t in self.tokens)
+        return any(t.q == q and t.r == r for t in self.tokens)
+
+
+def case_find_path_linear(engine, players, rng):
+    # Świeża plansza scenariusza – podmiana klasy nie wycieka poza przypadek
+    engine.board.__class__ = LinearScanBoard
+    return case_find_path(engine, players, rng)
+
+
+def case_commander_ai_logged(engine, players, rng):
+    logger = get_ai_logger()
+    commanders = [CommanderAI(player) for player in _commanders(players)]
+    logger.set_level("DEBUG")
+
+    def run():
+        for commander in commanders:
+            commander.execute_turn(engine)
+        logger.flush()  # zapis na dysk należy do kosztu logowania
+    run.cleanup = lambda: logger.set_level("OFF")
+    return run
+
+
+def case_log_token_disabled(engine, players, rng):
+    flags = {"recon", "hold", "screen"}
+
+    def run():
+        for index in range(100000):
+            log_token("ruch", "DEBUG", step=index, flags=lambda: "|".join(sorted(flags)))
+    return run
+
+
+def case_ai_turn(engine, players, rng):
+    commanders = [CommanderAI(player) for player in _commanders(players)]
+
+    def run():
+        for commander in commanders:
+            commander.execute_turn(engine)
+            update_all_players_visibility(players, engine.tokens, engine.board)
+    return run
+
+
+def _legacy_token_nation(token):
+    owner = getattr(token, "owner", None) or ""
+    if "(" in owner:
+        return owner.split("(")[-1].replace(")", "").strip()
+    nation = (getattr(token, "stats", None) or {}).get("nation")
+    return str(nation).strip() if nation else None
+
+
+def _legacy_owned_by(token, player):
+    return player is not None and getattr(token, "owner", None) == f"{player.id} ({player.nation})"
+
+
+@contextlib.contextmanager
+def legacy_owner_checks():
+    """Podstawia dawne, napisowe sprawdzanie nacji i właściciela (parsowanie owner przy każdym wywołaniu)."""
+    replaced = []
+    try:
+        for module_name in OWNER_HELPER_MODULES:
+            module = importlib.import_module(module_name)
+            for name, legacy in (("token_nation", _legacy_token_nation), ("owned_by", _legacy_owned_by)):
+                if hasattr(module, name):
+                    replaced.append((module, name, getattr(module, name)))
+                    setattr(module, name, legacy)
+        yield
+    finally:
+        for module, name, original in reversed(replaced):
+            setattr(module, name, original)
+
+
+def case_ai_turn_legacy_owner(engine, players, rng):
+    run = case_ai_turn(engine, players, rng)
+    stack = contextlib.ExitStack()
+    stack.enter_context(legacy_owner_checks())
+    run.cleanup = stack.close
+    return run
+
+
+CASES: Dict[str, Callable] = {
+    "find_path": case_find_path,
+    "visibility": case_visibility,
+    "token_ai": case_token_ai,
+    "commander_ai": case_commander_ai,
+    "general_ai": case_general_ai,
+    "ai_turn_cycle": case_ai_turn_cycle,
+    "save_load": case_save_load,
+    "find_path_linear": case_find_path_linear,
+    "commander_ai_logged": case_commander_ai_logged,
+    "log_token_disabled": case_log_token_disabled,
+    "ai_turn": case_ai_turn,
+    "ai_turn_legacy_owner": case_ai_turn_legacy_owner,
+}
+# Domyślny przebieg (i plik bazowy) – bez przypadków odniesienia
+DEFAULT_CASES = ("find_path", "visibility", "token_ai", "commander_ai", "general_ai", "ai_turn_cycle", "save_load")
+
+
+# ---------------------------------------------------------------- pomiar
+
+def time_case(name: str, scale: int, seed: int, repeats: int) -> Dict[str, float]:
+    best = None
+    tokens = 0
+    for _ in range(max(1, repeats)):
+        engine, players = build_scenario(scale, seed)
+        tokens = len(engine.tokens)
+        run = CASES[name](engine, players, random.Random(seed))
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                started = time.perf_counter()
+                run()
+                elapsed = time.perf_counter() - started
+        finally:
+            cleanup = getattr(run, "cleanup", None)
+            if cleanup is not None:
+                cleanup()
+        best = elapsed if best is None else min(best, elapsed)
+    return {"tokens": tokens, "seconds": best}
+
+
+def run_suite(cases=None, scales=SCALES, seed: int = 1939, repeats: int = 3, progress=print) -> dict:
+    cases = list(cases or DEFAULT_CASES)
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="bench_engine_") as log_dir:
+        logger = AILogger(log_dir=log_dir, levels={"GENERAL": "OFF", "COMMANDER": "OFF", "TOKEN": "OFF", "DEBUG": "OFF"})
+        set_ai_logger(logger)
+        try:
+            for scale in scales:
+                for name in cases:
+                    key = f"{name}@{scale}x"
+                    results[key] = time_case(name, scale, seed, repeats)
+                    if progress:
+                        progress(f"  {key:<22} {results[key]['tokens']:>6} żet. {results[key]['seconds'] * 1000:10.1f} ms")
+        finally:
+            set_ai_logger(None)
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "host": current_host(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "repeats": repeats,
+            "scales": list(scales),
+        },
+        "results": results,
+    }
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD,
+                    min_delta_s: float = MIN_DELTA_S) -> List[dict]:
+    """Porównanie przypadków obecnych w obu wynikach; `regression` gdy czas wzrósł ponad próg
+    (względny i co najmniej o min_delta_s w wartościach bezwzględnych)."""
+    rows = []
+    base_results = baseline.get("results", {})
+    for key, result in current.get("results", {}).items():
+        base = base_results.get(key)
+        if not base or not base.get("seconds"):
+            continue
+        ratio = result["seconds"] / base["seconds"]
+        rows.append({
+            "case": key,
+            "baseline_s": base["seconds"],
+            "current_s": result["seconds"],
+            "ratio": ratio,
+            "regression": ratio > 1.0 + threshold and result["seconds"] - base["seconds"] > min_delta_s,
+        })
+    return rows
+
+
+def reference_ratios(results: dict) -> List[dict]:
+    """Krotności przypadków odniesienia względem ich par zmierzonych w tej samej skali."""
+    rows = []
+    for key, result in results.items():
+        name, _, scale = key.partition("@")
+        current = results.get(f"{REFERENCE_PAIRS.get(name)}@{scale}")
+        if current and current["seconds"] > 0:
+            rows.append({"reference": key, "current": f"{REFERENCE_PAIRS[name]}@{scale}",
+                         "speedup": result["seconds"] / current["seconds"]})
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", default=",".join(DEFAULT_CASES),
+                        help=f"Lista przypadków oddzielona przecinkami (dostępne: {', '.join(CASES)})")
+    parser.add_argument("--scales", default=",".join(str(s) for s in SCALES), help="Skale liczby żetonów, np. 1,4,16")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1939)
+    parser.add_argument("--save", nargs="?", const=str(default_baseline_path()), default=None,
+                        help="Zapisz wyniki jako JSON (bez ścieżki: tools/benchmark_baselines/<host>.json)")
+    parser.add_argument("--compare", nargs="?", const=str(default_baseline_path()), default=None,
+                        help="Plik bazowy JSON do porównania (bez ścieżki: tools/benchmark_baselines/<host>.json)")
+    parser.add_argument("--allow-other-host", action="store_true",
+                        help="Porównaj także z wynikiem nagranym na innej maszynie (czasy nieporównywalne)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Dopuszczalny wzrost czasu względem bazy (0.2 = +20%%)")
+    args = parser.parse_args(argv)
+
+    cases = [name.strip() for name in args.cases.split(",") if name.strip()]
+    unknown = [name for name in cases if name not in CASES]
+    if unknown:
+        parser.error(f"Nieznane przypadki: {', '.join(unknown)}")
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+
+    baseline = None
+    if args.compare:
+        # Plik bazowy sprawdzany przed pomiarem – nie ma sensu mierzyć, gdy porównanie zostanie odrzucone
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        baseline_host = baseline.get("meta", {}).get("host")
+        if baseline_host != current_host() and not args.allow_other_host:
+            print(f"Plik bazowy {args.compare} pochodzi z hosta {baseline_host or 'nieznanego'}, "
+                  f"a pomiar z {current_host()} – czasy bezwzględne są nieporównywalne. "
+                  f"Nagraj bazę na tej maszynie (--save) albo użyj --allow-other-host.")
+            return 2
+
+    print(f"Benchmark silnika – przypadki: {', '.join(cases)}, skale: {scales}")
+    current = run_suite(cases, scales, args.seed, args.repeats)
+    for row in reference_ratios(current["results"]):
+        print(f"  {row['reference']} / {row['current']}: x{row['speedup']:.2f}")
+
+    if args.save:
+        Path(args.save).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+        print(f"Zapisano wyniki: {args.save}")
+
+    if baseline is not None:
+        rows = compare_results(baseline, current, args.threshold)
+        missing = sorted(set(current["results"]) - {row["case"] for row in rows})
+        if missing:
+            print(f"Brak w pliku bazowym: {', '.join(missing)}")
+        print(f"\nPorównanie z {args.compare} (próg +{args.threshold:.0%}):")
+        for row in rows:
+            flag = "REGRESJA" if row["regression"] else "ok"
+            print(f"  {row['case']:<22} {row['baseline_s'] * 1000:10.1f} ms -> {row['current_s'] * 1000:10.1f} ms"
+                  f"  x{row['ratio']:.2f}  {flag}")
+        if any(row["regression"] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
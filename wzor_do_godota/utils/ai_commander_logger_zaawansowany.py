@@ -11,6 +11,7 @@ from typing import Dict, List, Any, Optional
 import json
 
 from .ai_logger_config_pl import POLISH_CONFIG, NAZWY_PLIKOW, POLISH_COLUMN_MAPPING
+from .hot_path_profiler import profiled
 
 
 class PolskiLoggerBazowy:
@@ -36,6 +37,7 @@ class PolskiLoggerBazowy:
         katalog.mkdir(parents=True, exist_ok=True)
         return katalog
     
+    @profiled("PolskiLoggerBazowy.zapisz_wiersz_csv")
     def zapisz_wiersz_csv(self, sciezka_pliku: Path, dane: Dict[str, Any], kolumny: List[str]):
         """Zapisuje wiersz do pliku CSV z polskimi nazwami kolumn"""
         plik_istnieje = sciezka_pliku.exists()
@@ -0,0 +1,266 @@
+"""
+Profiler gorących ścieżek tury AI (włączany na żądanie).
+
+Sekcje oznacza się dekoratorem @profiled("nazwa") albo blokiem `with profile_section("nazwa")`.
+Gdy profiler jest wyłączony (domyślnie), dekorator sprawdza tylko jedną zmienną modułu
+i woła funkcję bez dalszej pracy, a profile_section zwraca współdzielony pusty kontekst.
+
+Po enable_profiling() każda sekcja zapisuje czas całkowity i własny (bez sekcji
+zagnieżdżonych), zagregowany per (tura, typ żetonu, sekcja), oraz stos wywołań
+w formacie "folded" (flamegraph.pl, speedscope). Typ żetonu podaje sekcja zewnętrzna
+(TokenAI.execute_turn), sekcje wewnętrzne go dziedziczą. Turę bierze się z
+utils.turn_context, chyba że ustawiono ją jawnie przez begin_turn().
+
+Zmienna środowiskowa KAMPANIA_PROFILE=<katalog> włącza profiler przy imporcie
+i zapisuje raport do katalogu przy wyjściu z programu.
+"""
+from __future__ import annotations
+
+import atexit
+import csv
+import functools
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.turn_context import get_current_turn
+
+CSV_COLUMNS = ["turn", "token_type", "section", "calls", "total_ms", "self_ms", "avg_ms", "max_ms"]
+
+_active: Optional["HotPathProfiler"] = None
+
+
+class HotPathProfiler:
+    """Agregaty czasów sekcji: (tura, typ żetonu, sekcja) -> wywołania, czas całkowity/własny, maksimum."""
+
+    def __init__(self):
+        self.turn: Optional[int] = None
+        self._thread = threading.get_ident()
+        # ramka: [nazwa, typ żetonu, start_ns, czas dzieci ns, ścieżka stosu]
+        self._stack: List[list] = []
+        self._stats: Dict[Tuple[Any, Any, str], List[int]] = {}
+        self._folded: Dict[str, int] = {}
+        self.max_depth = 0
+
+    def begin_turn(self, turn: Optional[int]) -> None:
+        self.turn = turn
+
+    def _enter(self, name: str, token_type: Optional[str]) -> bool:
+        if threading.get_ident() != self._thread:
+            return False  # np. wątek zapisujący logi – mierzymy tylko pętlę tury
+        stack = self._stack
+        if stack:
+            parent = stack[-1]
+            path = f"{parent[4]};{name}"
+            if token_type is None:
+                token_type = parent[1]
+        else:
+            path = name
+        stack.append([name, token_type, time.perf_counter_ns(), 0, path])
+        if len(stack) > self.max_depth:
+            self.max_depth = len(stack)
+        return True
+
+    def _exit(self) -> None:
+        name, token_type, started, children, path = self._stack.pop()
+        elapsed = time.perf_counter_ns() - started
+        if self._stack:
+            self._stack[-1][3] += elapsed
+        own = elapsed - children
+        turn = self.turn if self.turn is not None else get_current_turn()
+        key = (turn, token_type, name)
+        entry = self._stats.get(key)
+        if entry is None:
+            self._stats[key] = [1, elapsed, own, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] += own
+            if elapsed > entry[3]:
+                entry[3] = elapsed
+        self._folded[path] = self._folded.get(path, 0) + own
+
+    def reset(self) -> None:
+        self._stats.clear()
+        self._folded.clear()
+        self.max_depth = len(self._stack)
+
+    # ------------------------------------------------------------ raporty
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """Wiersze raportu posortowane po turze i malejącym czasie własnym."""
+        rows = []
+        for (turn, token_type, name), (calls, total, own, longest) in self._stats.items():
+            rows.append({
+                "turn": turn,
+                "token_type": token_type or "",
+                "section": name,
+                "calls": calls,
+                "total_ms": round(total / 1e6, 3),
+                "self_ms": round(own / 1e6, 3),
+                "avg_ms": round(total / calls / 1e6, 4),
+                "max_ms": round(longest / 1e6, 3),
+            })
+        rows.sort(key=lambda row: (row["turn"] is None, row["turn"] or 0, -row["self_ms"]))
+        return rows
+
+    def export_csv(self, path: str) -> str:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+            writer.writeheader()
+            writer.writerows(self.rows())
+        return path
+
+    def folded_stacks(self) -> List[str]:
+        """Linie "a;b;c <mikrosekundy>" – wejście flamegraph.pl / speedscope."""
+        return [f"{path} {own // 1000}" for path, own in sorted(self._folded.items()) if own >= 1000]
+
+    def export_folded(self, path: str) -> str:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(self.folded_stacks()) + "\n")
+        return path
+
+    def turn_summaries(self, top: int = 5) -> List[Dict[str, Any]]:
+        """Podsumowanie tur w kolumnach LoggerWydajnosci (utils.ai_commander_logger_zaawansowany)."""
+        by_turn: Dict[Any, List[Dict[str, Any]]] = {}
+        for row in self.rows():
+            by_turn.setdefault(row["turn"], []).append(row)
+        summaries = []
+        for turn, rows in by_turn.items():
+            by_section: Dict[str, float] = {}
+            for row in rows:
+                by_section[row["section"]] = by_section.get(row["section"], 0.0) + row["self_ms"]
+            hottest = sorted(by_section.items(), key=lambda item: -item[1])[:top]
+            summaries.append({
+                "turn": turn,
+                # czas własny wszystkich sekcji = czas spędzony w instrumentowanym kodzie
+                "decision_latency_ms": round(sum(by_section.values()), 3),
+                "calculations_performed": sum(row["calls"] for row in rows),
+                "algorithms_used": "|".join(f"{name}:{ms:.1f}ms" for name, ms in hottest),
+                "decision_tree_depth": self.max_depth,
+            })
+        return summaries
+
+    def log_performance(self, logger, nation: Optional[str] = None) -> int:
+        """Zapisuje podsumowania tur do LoggerWydajnosci (lub ZaawansowanyLoggerAI); zwraca liczbę wierszy."""
+        write = getattr(logger, "loguj_wydajnosc", None) or getattr(logger, "loguj")
+        summaries = self.turn_summaries()
+        for summary in summaries:
+            if nation is not None:
+                summary["nation"] = nation
+            write(summary)
+        return len(summaries)
+
+    def export(self, directory: str, logger=None) -> Dict[str, str]:
+        """CSV + stosy folded do katalogu; opcjonalnie podsumowania do loggera wydajności."""
+        paths = {
+            "csv": self.export_csv(os.path.join(directory, "hot_path.csv")),
+            "folded": self.export_folded(os.path.join(directory, "hot_path.folded")),
+        }
+        if logger is not None:
+            self.log_performance(logger)
+        return paths
+
+
+class _Section:
+    __slots__ = ("profiler", "name", "token_type", "entered")
+
+    def __init__(self, profiler: HotPathProfiler, name: str, token_type: Optional[str]):
+        self.profiler = profiler
+        self.name = name
+        self.token_type = token_type
+        self.entered = False
+
+    def __enter__(self):
+        self.entered = self.profiler._enter(self.name, self.token_type)
+        return self
+
+    def __exit__(self, *exc):
+        if self.entered:
+            self.profiler._exit()
+        return False
+
+
+class _NoSection:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SECTION = _NoSection()
+
+
+def profile_section(name: str, token_type: Optional[str] = None):
+    """Blok mierzony przez aktywny profiler; bez profilera – pusty kontekst."""
+    profiler = _active
+    if profiler is None:
+        return _NO_SECTION
+    return _Section(profiler, name, token_type)
+
+
+def profiled(name: str, token_type: Optional[Callable[[Any], Optional[str]]] = None):
+    """Dekorator sekcji; `token_type(pierwszy_argument)` wyznacza typ żetonu (liczone tylko przy włączonym profilerze)."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _active
+            if profiler is None:
+                return func(*args, **kwargs)
+            kind = token_type(args[0]) if token_type is not None and args else None
+            if not profiler._enter(name, kind):
+                return func(*args, **kwargs)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler._exit()
+        return wrapper
+    return decorator
+
+
+def enable_profiling(profiler: Optional[HotPathProfiler] = None) -> HotPathProfiler:
+    """Włącza profiler (nowy albo podany) dla bieżącego wątku."""
+    global _active
+    _active = profiler or HotPathProfiler()
+    _active._thread = threading.get_ident()
+    return _active
+
+
+def disable_profiling() -> Optional[HotPathProfiler]:
+    """Wyłącza profiler i zwraca go (z zebranymi danymi)."""
+    global _active
+    profiler, _active = _active, None
+    return profiler
+
+
+def get_profiler() -> Optional[HotPathProfiler]:
+    return _active
+
+
+def _profile_from_environment() -> None:
+    directory = os.environ.get("KAMPANIA_PROFILE")
+    if not directory:
+        return
+    if directory == "1":
+        directory = os.path.join("logs", "profiler")
+    profiler = enable_profiling()
+
+    @atexit.register
+    def _export_at_exit():
+        try:
+            profiler.export(directory)
+        except Exception:
+            pass
+
+
+_profile_from_environment()
@@ -185,6 +185,14 @@ class SessionManager:
         cls._session_start_time = None
         cls._session_lock_file = None
     
+    @classmethod
+    def reset(cls):
+        """Zapomina bieżącą sesję bez archiwizacji i komunikatów – następne
+        get_current_session_dir() założy nową (np. kolejna partia w procesie symulacji)."""
+        cls._current_session_path = None
+        cls._session_start_time = None
+        cls._session_lock_file = None
+    
     @classmethod
     def cleanup_empty_sessions(cls):
         """Usuwa puste katalogi sesji (bez plików logów)"""
@@ -1,25 +1,38 @@
-"""Helpery do generowania blueprintów i assetów żetonów dla AI i GUI."""
+"""Helpery do generowania blueprintów i assetów żetonów dla AI i GUI.
+
+Zakupy AI korzystają z build_token_blueprint – blueprint powstaje wyłącznie w pamięci.
+Grafika żetonu renderowana jest dopiero wtedy, gdy GUI jej potrzebuje (token_sprite_path),
+i trafia do współdzielonej pamięci podręcznej adresowanej treścią klucza
+(nation, unitType, unitSize, supports). Pillow importowany jest leniwie.
+"""
 from __future__ import annotations
 
+import hashlib
 import json
+import os
 import re
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Iterable, Optional
-
-from PIL import Image, ImageDraw, ImageFont
+from typing import Dict, Iterable, Optional, Tuple
 
 from balance.model import build_unit_names, compute_token
-from edytory.token_editor_prototyp import create_flag_background
 
 __all__ = [
     "TokenAssetBundle",
+    "TokenBlueprintOrder",
+    "build_token_blueprint",
     "generate_token_assets",
+    "sprite_cache_key",
+    "token_sprite_path",
 ]
 
 _DEFAULT_IMAGE_SIZE = (240, 240)
 _PREVIEW_IMAGE_SIZE = (120, 120)
+_SPRITE_CACHE_DIR = Path("assets") / "tokens" / "sprite_cache"
+
+# (klucz, katalog) -> ścieżka wyrenderowanego sprite'a
+_sprite_paths: Dict[Tuple[tuple, str], Path] = {}
 
 
 @dataclass
@@ -34,6 +47,15 @@ class TokenAssetBundle:
     cost: int
 
 
+@dataclass
+class TokenBlueprintOrder:
+    """Blueprint zakupionego żetonu przekazywany w pamięci (bez plików na dysku)."""
+
+    token_id: str
+    blueprint: dict
+    cost: int
+
+
 def _safe_filename(value: str) -> str:
     value = value or "token"
     value = value.strip()
@@ -43,7 +65,7 @@ def _safe_filename(value: str) -> str:
     return value
 
 
-def _wrap_text(draw: ImageDraw.ImageDraw, text: str, font: ImageFont.ImageFont, max_width: int) -> list[str]:
+def _wrap_text(draw: "ImageDraw.ImageDraw", text: str, font: "ImageFont.ImageFont", max_width: int) -> list[str]:
     words = text.split()
     if not words:
         return [""]
@@ -61,6 +83,10 @@ def _wrap_text(draw: ImageDraw.ImageDraw, text: str, font: ImageFont.ImageFont,
 
 
 def _render_token_image(destination: Path, nation: str, unit_type: str, unit_size: str) -> None:
+    from PIL import ImageDraw, ImageFont
+
+    from edytory.token_editor_prototyp import create_flag_background
+
     width, height = _DEFAULT_IMAGE_SIZE
     token_img = create_flag_background(nation, width, height)
     draw = ImageDraw.Draw(token_img)
@@ -147,7 +173,7 @@ def _ensure_support_list(supports: Optional[Iterable[str]]) -> list[str]:
     return [str(value) for value in supports]
 
 
-def generate_token_assets(
+def build_token_blueprint(
     *,
     commander_id: int | str,
     nation: str,
@@ -155,10 +181,14 @@ def generate_token_assets(
     unit_size: str,
     supports: Optional[Iterable[str]] = None,
     quality: str = "standard",
-    base_folder: Path | None = None,
     timestamp: Optional[datetime] = None,
-) -> TokenAssetBundle:
-    """Tworzy folder nowego żetonu wraz z token.json i token.png."""
+    turn: Optional[int] = None,
+    sequence: Optional[int] = None,
+) -> TokenBlueprintOrder:
+    """Buduje blueprint nowego żetonu w pamięci – bez folderu, token.json i grafiki.
+    Pole "image" pozostaje puste; GUI pobiera grafikę z token_sprite_path.
+    `turn`/`sequence` – tura partii i numer zakupu dowódcy; gdy podane, zastępują znacznik czasu
+    w id, więc id zależy tylko od przebiegu partii (zakupy AI)."""
 
     supports_list = _ensure_support_list(supports)
     stats = compute_token(unit_type, unit_size, nation, supports_list, quality=quality)
@@ -166,15 +196,12 @@ def generate_token_assets(
 
     commander_id = str(commander_id)
     clean_label = _safe_filename(names["label"])
-    ts = (timestamp or datetime.utcnow()).strftime("%Y%m%d%H%M%S")
+    if sequence is not None:
+        ts = f"T{turn or 0}_{sequence}"
+    else:
+        ts = (timestamp or datetime.utcnow()).strftime("%Y%m%d%H%M%S")
 
     token_id = f"nowy_{unit_type}_{unit_size}__{commander_id}_{clean_label}_{ts}"
-
-    tokens_root = Path(base_folder or Path("assets") / "tokens")
-    target_folder = tokens_root / f"nowe_dla_{commander_id}" / token_id
-    target_folder.mkdir(parents=True, exist_ok=True)
-
-    image_rel_path = (target_folder / "token.png").as_posix()
     blueprint = {
         "id": token_id,
         "nation": nation,
@@ -191,11 +218,45 @@ def generate_token_assets(
         "price": stats.total_cost,
         "sight": stats.sight,
         "support_upgrades": supports_list,
-        "image": image_rel_path,
+        "image": "",
         "w": _DEFAULT_IMAGE_SIZE[0],
         "h": _DEFAULT_IMAGE_SIZE[1],
         "quality": quality,
     }
+    return TokenBlueprintOrder(token_id=token_id, blueprint=blueprint, cost=stats.total_cost)
+
+
+def generate_token_assets(
+    *,
+    commander_id: int | str,
+    nation: str,
+    unit_type: str,
+    unit_size: str,
+    supports: Optional[Iterable[str]] = None,
+    quality: str = "standard",
+    base_folder: Path | None = None,
+    timestamp: Optional[datetime] = None,
+) -> TokenAssetBundle:
+    """Tworzy folder nowego żetonu wraz z token.json i token.png."""
+    from PIL import Image
+
+    order = build_token_blueprint(
+        commander_id=commander_id,
+        nation=nation,
+        unit_type=unit_type,
+        unit_size=unit_size,
+        supports=supports,
+        quality=quality,
+        timestamp=timestamp,
+    )
+    token_id = order.token_id
+    blueprint = order.blueprint
+
+    tokens_root = Path(base_folder or Path("assets") / "tokens")
+    target_folder = tokens_root / f"nowe_dla_{commander_id}" / token_id
+    target_folder.mkdir(parents=True, exist_ok=True)
+
+    blueprint["image"] = (target_folder / "token.png").as_posix()
 
     json_path = target_folder / "token.json"
     with json_path.open("w", encoding="utf-8") as handle:
@@ -217,5 +278,38 @@ def generate_token_assets(
         json_path=json_path,
         image_path=image_path,
         blueprint=blueprint,
-        cost=stats.total_cost,
+        cost=order.cost,
     )
+
+
+def sprite_cache_key(nation: str, unit_type: str, unit_size: str, supports: Optional[Iterable[str]] = None) -> tuple:
+    """Klucz grafiki żetonu: (nation, unitType, unitSize, posortowane wsparcia)."""
+    return (nation or "", unit_type or "", unit_size or "", tuple(sorted(_ensure_support_list(supports))))
+
+
+def token_sprite_path(
+    nation: str,
+    unit_type: str,
+    unit_size: str,
+    supports: Optional[Iterable[str]] = None,
+    cache_dir: Path | None = None,
+) -> Path:
+    """Zwraca ścieżkę grafiki żetonu, renderując ją przy pierwszym użyciu.
+    Nazwa pliku to skrót treści klucza, więc identyczne jednostki dzielą jeden plik
+    (także między sesjami)."""
+    key = sprite_cache_key(nation, unit_type, unit_size, supports)
+    cache_root = Path(cache_dir or _SPRITE_CACHE_DIR)
+    memo_key = (key, str(cache_root))
+    cached = _sprite_paths.get(memo_key)
+    if cached is not None and cached.exists():
+        return cached
+
+    digest = hashlib.sha1(json.dumps(key, ensure_ascii=False).encode("utf-8")).hexdigest()[:20]
+    path = cache_root / f"{digest}.png"
+    if not path.exists():
+        cache_root.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_root / f"{digest}.{os.getpid()}.tmp.png"
+        _render_token_image(tmp_path, key[0], key[1], key[2])
+        os.replace(tmp_path, path)
+    _sprite_paths[memo_key] = path
+    return path